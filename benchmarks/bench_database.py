@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# benchmarks/bench_database.py
+"""
+Suite de benchmarks de core/database.py sobre bibliotecas sintéticas.
+
+Para cada tamaño (por defecto 1k, 10k y 100k juegos) mide:
+- Throughput de add_game (en batch() y con commit por juego) y de upsert
+- Latencia de list_games, search, count, status_counts y get_game en frío
+- Coste de abrir la BD y tamaño del archivo
+
+Guarda los resultados en JSON para compararlos entre commits:
+
+    python benchmarks/bench_database.py -o before.json
+    ... cambios ...
+    python benchmarks/bench_database.py -o after.json --compare before.json
+
+Con --compare, el script termina con código 1 si alguna métrica empeora
+más que --threshold (default 15%).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.database import GameDatabase, Game, GameStatus  # noqa: E402
+from synthetic import populate, synthetic_games  # noqa: E402
+
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# Sufijo de la métrica → True si más alto es mejor
+_HIGHER_IS_BETTER = {"_per_s": True, "_ms": False, "_bytes": False}
+
+
+def median_ms(fn: Callable, repeat: int) -> float:
+    """Mediana en milisegundos de `repeat` llamadas a fn() (tras una de calentamiento)."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def bench_size(size: int, repeat: int, seed: int) -> Dict[str, float]:
+    """Ejecuta todas las medidas sobre una biblioteca de `size` juegos."""
+    results: Dict[str, float] = {}
+    rng = random.Random(seed)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        
+        # Sin caché: se mide SQLite + mapeo, no aciertos de LRU
+        with GameDatabase(db_path, cache_size=0) as db:
+            start = time.perf_counter()
+            populate(db, size, seed=seed)
+            results["add_batch_per_s"] = size / (time.perf_counter() - start)
+            
+            # Commit por juego (como la GUI/CLI): muestra pequeña, fsync por commit
+            sample = min(200, size)
+            extra = list(synthetic_games(sample, seed=seed + 1))
+            for i, game in enumerate(extra):
+                game.title_id = f"FFFF{i:04X}"
+            start = time.perf_counter()
+            for game in extra:
+                db.add_game(game)
+            results["add_autocommit_per_s"] = sample / (time.perf_counter() - start)
+            
+            # Upsert sobre juegos existentes
+            title_ids = [row[0] for row in db.conn.execute(
+                "SELECT title_id FROM games ORDER BY RANDOM() LIMIT ?", (min(1000, size),)
+            )]
+            start = time.perf_counter()
+            with db.batch():
+                for title_id in title_ids:
+                    db.add_or_update_game(
+                        Game(title_id=title_id, game_name="Upserted", status=GameStatus.ANALYSED)
+                    )
+            results["upsert_per_s"] = len(title_ids) / (time.perf_counter() - start)
+            
+            ids = [row[0] for row in db.conn.execute("SELECT id FROM games")]
+            words = ["Halo", "Dragon", "Wake", "zzz-no-match"]
+            
+            results["list_games_ms"] = median_ms(lambda: db.list_games(), repeat)
+            results["list_by_status_ms"] = median_ms(
+                lambda: db.list_games(GameStatus.ANALYSED), repeat
+            )
+            results["search_name_ms"] = median_ms(
+                lambda: db.search(rng.choice(words)), repeat
+            )
+            results["search_title_id_ms"] = median_ms(
+                lambda: db.search("4E4D"), repeat
+            )
+            results["count_ms"] = median_ms(db.count, repeat)
+            results["status_counts_ms"] = median_ms(db.status_counts, repeat)
+            results["get_game_ms"] = median_ms(
+                lambda: db.get_game(rng.choice(ids)), repeat * 10
+            )
+            results["get_by_title_id_ms"] = median_ms(
+                lambda: db.get_by_title_id(rng.choice(title_ids)), repeat * 10
+            )
+        
+        results["open_ms"] = median_ms(
+            lambda: GameDatabase(db_path, cache_size=0).close(), repeat
+        )
+        results["file_size_bytes"] = os.path.getsize(db_path)
+    
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(sizes: List[int], repeat: int, seed: int) -> dict:
+    """Ejecuta la suite completa y retorna el documento de resultados."""
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": {},
+    }
+    for size in sizes:
+        print(f"📦 Biblioteca sintética de {size} juegos...")
+        report["results"][str(size)] = bench_size(size, repeat, seed)
+    return report
+
+
+def _higher_is_better(metric: str) -> bool:
+    for suffix, higher in _HIGHER_IS_BETTER.items():
+        if metric.endswith(suffix):
+            return higher
+    return False
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """
+    Compara dos informes y retorna las regresiones encontradas.
+    
+    :param threshold: Empeoramiento relativo tolerado (0.15 = 15%)
+    :return: Lista de descripciones de regresiones
+    """
+    regressions = []
+    print(f"\n📊 Comparación con {baseline['meta'].get('commit', '?')}:\n")
+    for size, metrics in current["results"].items():
+        old_metrics = baseline["results"].get(size)
+        if not old_metrics:
+            continue
+        print(f"  {size} juegos")
+        for metric, value in metrics.items():
+            old = old_metrics.get(metric)
+            if not old:
+                continue
+            change = (value - old) / old
+            worse = -change if _higher_is_better(metric) else change
+            flag = "❌" if worse > threshold else ("✅" if worse < -threshold else "  ")
+            print(f"    {flag} {metric:24s} {old:14.3f} → {value:14.3f} ({change:+.1%})")
+            if worse > threshold:
+                regressions.append(f"{size}/{metric}: {change:+.1%}")
+    return regressions
+
+
+def print_report(report: dict):
+    for size, metrics in report["results"].items():
+        print(f"\n{'─'*50}\n  {size} juegos\n{'─'*50}")
+        for metric, value in metrics.items():
+            print(f"  {metric:24s} {value:14.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de la base de datos")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Tamaños de biblioteca separados por coma")
+    parser.add_argument("--repeat", type=int, default=15, help="Repeticiones por medida")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla del generador")
+    parser.add_argument("-o", "--output", help="Guardar resultados en JSON")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Empeoramiento tolerado al comparar (default: 0.15)")
+    args = parser.parse_args()
+    
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    report = run_suite(sizes, args.repeat, args.seed)
+    print_report(report)
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Resultados guardados en {args.output}")
+    
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regresión(es) > {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"\n✅ Sin regresiones > {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# benchmarks/bench_recomp_output.py
+"""
+Benchmark de descubrimiento de archivos generados por XenonRecomp.
+
+Genera un árbol sintético tipo recompiled/ (por defecto 20k archivos entre
+la raíz y build/) y compara:
+- el _find_generated_files anterior (os.walk de output_dir y otra vez de
+  build/, con duplicados)
+- split_generated_files() (una pasada con os.scandir, solo rutas) y
+  scan_generated_files() (además tamaño y mtime: un stat por archivo)
+- build_output_manifest() en frío (hashea todo) y con el manifiesto previo
+- validate_recomp_output() leyendo el manifiesto, con y sin --verify
+
+Uso:
+    python benchmarks/bench_recomp_output.py --files 20000 --repeat 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.recomp_manifest import (  # noqa: E402
+    build_output_manifest, load_output_manifest, scan_generated_files, split_generated_files
+)
+from core.shader_recomp import validate_recomp_output  # noqa: E402
+
+
+def legacy_find_generated_files(directory: str):
+    """Copia del _find_generated_files anterior."""
+    cpp_files = []
+    header_files = []
+    
+    build_dir = os.path.join(directory, "build")
+    search_dirs = [directory, build_dir] if os.path.isdir(build_dir) else [directory]
+    
+    for search_dir in search_dirs:
+        for root, _, files in os.walk(search_dir):
+            for file in files:
+                full_path = os.path.join(root, file)
+                if file.endswith(".cpp"):
+                    cpp_files.append(full_path)
+                elif file.endswith(".h") or file.endswith(".hpp"):
+                    header_files.append(full_path)
+    
+    return cpp_files, header_files
+
+
+def populate(root: Path, files: int, file_size: int):
+    """Crea `files` archivos: 90% .cpp en la raíz, headers y mapeos en build/."""
+    build = root / "build"
+    build.mkdir()
+    body = b"// generated\n" + b"x" * max(0, file_size - 13)
+    for i in range(files):
+        if i % 10 == 0:
+            (build / f"ppc_recomp_{i}.h").write_bytes(body)
+        elif i % 10 == 1:
+            (build / f"ppc_func_mapping_{i}.cpp").write_bytes(body)
+        else:
+            (root / f"ppc_recomp.{i}.cpp").write_bytes(body)
+
+
+def timed(fn, repeat: int) -> float:
+    """Retorna el tiempo medio por llamada en milisegundos."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de descubrimiento de salidas de recompilación")
+    parser.add_argument("--files", type=int, default=20_000, help="Archivos sintéticos")
+    parser.add_argument("--size", type=int, default=2048, help="Tamaño de cada archivo en bytes")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por medida")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        print(f"📦 Generando {args.files} archivos sintéticos...")
+        populate(root, args.files, args.size)
+        out = str(root)
+        
+        legacy_cpp, legacy_h = legacy_find_generated_files(out)
+        scanned = scan_generated_files(out)
+        print(f"   os.walk x2: {len(legacy_cpp) + len(legacy_h)} rutas (con duplicados), "
+              f"scandir: {len(scanned)}")
+        
+        results = [
+            ("os.walk + build/ (anterior)", timed(lambda: legacy_find_generated_files(out), args.repeat)),
+            ("split_generated_files()", timed(lambda: split_generated_files(out), args.repeat)),
+            ("scan_generated_files()", timed(lambda: scan_generated_files(out), args.repeat)),
+            ("build_output_manifest() frío", timed(lambda: build_output_manifest(out), 1)),
+        ]
+        previous = load_output_manifest(out)
+        results += [
+            ("build_output_manifest() previo",
+             timed(lambda: build_output_manifest(out, previous=previous), args.repeat)),
+            ("validate (manifiesto)", timed(lambda: validate_recomp_output(out), args.repeat)),
+            ("validate --verify", timed(lambda: validate_recomp_output(out, verify=True), args.repeat)),
+        ]
+        
+        print(f"\n{'─'*50}")
+        for label, ms in results:
+            print(f"{label:32s} {ms:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
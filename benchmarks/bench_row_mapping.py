@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# benchmarks/bench_row_mapping.py
+"""
+Benchmark de conversión fila → Game sobre una BD sintética.
+
+Compara el _row_to_game anterior (sqlite3.Row, get_field con try/except,
+GameStatus(...) y dos datetime.fromisoformat por fila, dataclass sin
+slots) con el mapper compilado actual (tuplas, índices fijos, slots y
+fechas perezosas). Mide tiempo de mapeo y memoria de la lista cargada.
+
+Uso:
+    python benchmarks/bench_row_mapping.py --rows 100000
+"""
+import argparse
+import dataclasses
+import gc
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.database import GameDatabase, Game, GameStatus  # noqa: E402
+from bench_status_counts import populate  # noqa: E402
+
+# Game tal como era antes: dataclass con __dict__ por instancia
+LegacyGame = dataclasses.make_dataclass(
+    "LegacyGame",
+    [(f.name, f.type, dataclasses.field(default=f.default)) for f in dataclasses.fields(Game)],
+)
+
+
+def legacy_row_to_game(row: sqlite3.Row):
+    """Copia del _row_to_game anterior."""
+    def get_field(name, default=None):
+        try:
+            return row[name]
+        except (IndexError, KeyError):
+            return default
+    
+    return LegacyGame(
+        id=row["id"],
+        title_id=row["title_id"] or "",
+        game_name=row["game_name"],
+        status=GameStatus(row["status"]),
+        created_at=datetime.fromisoformat(row["created_at"]) if row["created_at"] else None,
+        updated_at=datetime.fromisoformat(row["updated_at"]) if row["updated_at"] else None,
+        iso_path=row["iso_path"],
+        extracted_dir=row["extracted_dir"],
+        xex_path=row["xex_path"],
+        analysis_json=row["analysis_json"],
+        project_toml=row["project_toml"],
+        notes=row["notes"],
+        media_id=get_field("media_id"),
+        version=get_field("version"),
+        disc_number=get_field("disc_number", 1) or 1,
+        total_discs=get_field("total_discs", 1) or 1,
+        regions=get_field("regions"),
+        esrb_rating=get_field("esrb_rating"),
+        entry_point=get_field("entry_point"),
+        original_pe_name=get_field("original_pe_name"),
+        xex_info_json=get_field("xex_info_json"),
+    )
+
+
+def measure(label: str, rows: list, map_row) -> tuple:
+    """Retorna (label, ms de mapeo, bytes por juego cargado)."""
+    gc.collect()
+    start = time.perf_counter()
+    games = [map_row(row) for row in rows]
+    elapsed = (time.perf_counter() - start) * 1000
+    del games
+    
+    gc.collect()
+    tracemalloc.start()
+    games = [map_row(row) for row in rows]
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return label, elapsed, current / len(games)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de fila → Game")
+    parser.add_argument("--rows", type=int, default=100_000, help="Juegos sintéticos")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        
+        with GameDatabase(db_path, cache_size=0) as db:
+            print(f"📦 Generando {args.rows} juegos sintéticos...")
+            populate(db, args.rows)
+            
+            # Las filas se leen fuera de la medida: solo se compara el mapeo
+            legacy_rows = db.conn.execute("SELECT * FROM games").fetchall()
+            cursor, map_row = db._select_games("SELECT * FROM games")
+            tuple_rows = cursor.fetchall()
+            
+            results = [
+                measure("legacy (Row + fromisoformat)", legacy_rows, legacy_row_to_game),
+                measure("compilado (slots + lazy)", tuple_rows, map_row),
+            ]
+    
+    print(f"\n{'─'*60}")
+    print(f"{'':30s} {'ms':>10s} {'bytes/juego':>14s}")
+    for label, ms, per_game in results:
+        print(f"{label:30s} {ms:10.1f} {per_game:14.0f}")
+
+
+if __name__ == "__main__":
+    main()
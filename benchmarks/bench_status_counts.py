@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# benchmarks/bench_status_counts.py
+"""
+Benchmark de conteos por status sobre una BD sintética.
+
+Compara:
+- N llamadas a count() (una por status, como hacía cmd_list)
+- status_counts() con GROUP BY
+- status_counts() con la tabla game_stats mantenida por triggers
+
+Uso:
+    python benchmarks/bench_status_counts.py --rows 100000 --repeat 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from core.database import GameDatabase, GameStatus  # noqa: E402
+
+
+def populate(db: GameDatabase, rows: int, seed: int = 0):
+    """Inserta `rows` juegos con status aleatorio en una sola transacción."""
+    rng = random.Random(seed)
+    statuses = [s.value for s in GameStatus]
+    db.conn.executemany(
+        "INSERT INTO games (title_id, game_name, status) VALUES (?, ?, ?)",
+        (
+            (f"{i:08X}", f"Synthetic Game {i}", rng.choice(statuses))
+            for i in range(rows)
+        )
+    )
+    db.conn.commit()
+
+
+def timed(fn, repeat: int) -> float:
+    """Retorna el tiempo medio por llamada en milisegundos."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de status_counts()")
+    parser.add_argument("--rows", type=int, default=100_000, help="Juegos sintéticos")
+    parser.add_argument("--repeat", type=int, default=20, help="Repeticiones por medida")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        
+        with GameDatabase(db_path) as db:
+            print(f"📦 Generando {args.rows} juegos sintéticos...")
+            populate(db, args.rows)
+            
+            def count_per_status():
+                return {s: db.count(s) for s in GameStatus}
+            
+            results = [
+                ("count() x status", timed(count_per_status, args.repeat)),
+                ("status_counts() GROUP BY", timed(db.status_counts, args.repeat)),
+            ]
+            
+            db.enable_stats_table()
+            results.append(
+                ("status_counts() game_stats", timed(db.status_counts, args.repeat))
+            )
+            
+            assert db.status_counts() == count_per_status()
+        
+        print(f"\n{'─'*50}")
+        for label, ms in results:
+            print(f"{label:30s} {ms:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -62,9 +62,10 @@ def cmd_list(args):
         # Estadísticas
         if not args.verbose:
             print(f"\n{'─'*60}")
-            total = db.count()
-            completed = db.count(GameStatus.COMPLETED)
-            failed = db.count(GameStatus.FAILED)
+            counts = db.status_counts()
+            total = sum(counts.values())
+            completed = counts[GameStatus.COMPLETED]
+            failed = counts[GameStatus.FAILED]
             print(f"Total: {total} | ✅ Completados: {completed} | ❌ Fallidos: {failed}")
 
 
@@ -143,7 +144,7 @@ def cmd_status(args):
             print(f"   Válidos: {', '.join(s.value for s in GameStatus)}")
             sys.exit(1)
         
-        db.update_status(args.id, new_status)
+        db.update_status(args.id, new_status, tool="cli")
         print(f"✅ Status actualizado: {game.game_name} → {new_status.value}")
 
 
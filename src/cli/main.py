@@ -120,6 +120,8 @@ def _register_subcommands(subparsers):
         description="Muestra todos los workspaces de juegos creados"
     )
     list_parser.add_argument("-v", "--verbose", action="store_true", help="Mostrar más detalles")
+    list_parser.add_argument("--refresh", action="store_true",
+                             help="Reconstruir el índice y los contadores de tamaño desde disco")
     list_parser.set_defaults(func=_cmd_list)
     
     # info
@@ -139,8 +141,131 @@ def _register_subcommands(subparsers):
     )
     sync_parser.add_argument("title_id", help="Title ID del juego (ej: 4E4D07F5)")
     sync_parser.add_argument("-y", "--yes", action="store_true", help="No pedir confirmación")
+    sync_parser.add_argument("-j", "--jobs", type=int, default=None,
+                             help="Copias simultáneas (defecto: 4)")
+    sync_parser.add_argument("-s", "--strategy", default="auto",
+                             choices=["auto", "move", "reflink", "hardlink", "copy"],
+                             help="Cómo colocar los archivos (defecto: auto = reflink, hardlink para XEX/ISO, copia)")
     sync_parser.set_defaults(func=_cmd_sync)
     
+    # verify
+    verify_parser = subparsers.add_parser(
+        "verify",
+        help="Verificar integridad de workspaces",
+        description="Compara los archivos del workspace con su manifiesto (.manifest.json)"
+    )
+    verify_parser.add_argument("title_id", nargs="?", help="Title ID del juego (ej: 4E4D07F5)")
+    verify_parser.add_argument("--all", action="store_true", help="Verificar todos los workspaces")
+    verify_parser.add_argument("-q", "--quick", action="store_true",
+                               help="Solo comparar tamaño/mtime (no detecta corrupción silenciosa)")
+    verify_parser.add_argument("-u", "--update", action="store_true",
+                               help="Registrar en el manifiesto los archivos nuevos/editados/borrados")
+    verify_parser.add_argument("-j", "--jobs", type=int, default=None,
+                               help="Hilos de hasheo (defecto: nº de CPUs, máx. 8)")
+    verify_parser.set_defaults(func=_cmd_verify)
+    
+    # store
+    store_parser = subparsers.add_parser(
+        "store",
+        help="Gestionar el almacén de objetos deduplicados",
+        description="Almacén por contenido (~/.mrmonkeyshopware/objects) compartido por los workspaces"
+    )
+    store_sub = store_parser.add_subparsers(dest="store_command")
+    
+    store_report = store_sub.add_parser("report", help="Bytes lógicos vs físicos")
+    store_report.set_defaults(func=_cmd_store_report)
+    
+    store_dedup = store_sub.add_parser("dedup", help="Mover XEX/ISO existentes al almacén")
+    store_dedup.add_argument("title_id", nargs="?", help="Title ID del juego")
+    store_dedup.add_argument("--all", action="store_true", help="Todos los workspaces")
+    store_dedup.set_defaults(func=_cmd_store_dedup)
+    
+    store_gc = store_sub.add_parser("gc", help="Borrar objetos sin referencias")
+    store_gc.add_argument("-n", "--dry-run", action="store_true", help="Solo mostrar qué se borraría")
+    store_gc.set_defaults(func=_cmd_store_gc)
+    
+    # evict / regen
+    evict_parser = subparsers.add_parser(
+        "evict",
+        help="Liberar espacio desalojando datos regenerables",
+        description="Borra extracted/, cleaned/ y recompiled/ menos usados hasta cumplir la cuota"
+    )
+    evict_parser.add_argument("-q", "--quota", type=float, default=None, metavar="GB",
+                              help="Cuota de la biblioteca en GB (defecto: storage.quota_gb)")
+    evict_parser.add_argument("-n", "--dry-run", action="store_true", help="Solo mostrar qué se desalojaría")
+    evict_parser.set_defaults(func=_cmd_evict)
+    
+    regen_parser = subparsers.add_parser(
+        "regen",
+        help="Regenerar datos desalojados",
+        description="Rehace desde la ISO/XEX/TOML los subdirectorios desalojados de un workspace"
+    )
+    regen_parser.add_argument("title_id", help="Title ID del juego (ej: 4E4D07F5)")
+    regen_parser.add_argument("subdir", nargs="?", choices=["extracted", "cleaned", "recompiled"],
+                              help="Solo este subdirectorio (defecto: todos los desalojados)")
+    regen_parser.set_defaults(func=_cmd_regen)
+    
+    # snapshot
+    snapshot_parser = subparsers.add_parser(
+        "snapshot",
+        help="Snapshots de recompiled/",
+        description="Copias baratas (hardlinks) de recompiled/ para comparar entre recompilaciones"
+    )
+    snapshot_sub = snapshot_parser.add_subparsers(dest="snapshot_command")
+    
+    snapshot_create = snapshot_sub.add_parser("create", help="Crear un snapshot de recompiled/")
+    snapshot_create.add_argument("title_id", help="Title ID del juego (ej: 4E4D07F5)")
+    snapshot_create.set_defaults(func=_cmd_snapshot_create)
+    
+    snapshot_list = snapshot_sub.add_parser("list", help="Listar snapshots")
+    snapshot_list.add_argument("title_id", help="Title ID del juego")
+    snapshot_list.set_defaults(func=_cmd_snapshot_list)
+    
+    snapshot_diff = snapshot_sub.add_parser("diff", help="Comparar snapshots o un snapshot con recompiled/")
+    snapshot_diff.add_argument("title_id", help="Title ID del juego")
+    snapshot_diff.add_argument("old", nargs="?", default="latest",
+                               help="Snapshot base (nombre o prefijo; defecto: latest)")
+    snapshot_diff.add_argument("new", nargs="?", help="Snapshot a comparar (defecto: recompiled/ actual)")
+    snapshot_diff.set_defaults(func=_cmd_snapshot_diff)
+    
+    snapshot_prune = snapshot_sub.add_parser("prune", help="Borrar snapshots antiguos")
+    snapshot_prune.add_argument("title_id", help="Title ID del juego")
+    snapshot_prune.add_argument("-k", "--keep", type=int, default=None, help="Conservar los N más recientes")
+    snapshot_prune.add_argument("--older-than", type=float, default=None, metavar="DIAS",
+                                help="Borrar los de hace más de N días")
+    snapshot_prune.add_argument("-n", "--dry-run", action="store_true", help="Solo mostrar qué se borraría")
+    snapshot_prune.set_defaults(func=_cmd_snapshot_prune)
+    
+    # pack / unpack
+    pack_parser = subparsers.add_parser(
+        "pack",
+        help="Empaquetar un workspace en un único archivo",
+        description="Empaqueta el workspace en .tar.zst (o .zip sin zstandard) para moverlo a otro equipo"
+    )
+    pack_parser.add_argument("title_id", help="Title ID del juego (ej: 4E4D07F5)")
+    pack_parser.add_argument("-o", "--output", help="Archivo destino (defecto: <carpeta>.tar.zst/.zip)")
+    pack_parser.add_argument("-x", "--exclude-regenerable", action="store_true",
+                             help="Omitir extracted/, cleaned/ y recompiled/ (se regeneran)")
+    pack_parser.add_argument("-f", "--format", choices=["zstd", "zip"],
+                             help="Formato (defecto: zstd si está instalado)")
+    pack_parser.add_argument("-l", "--level", type=int, default=3, help="Nivel de compresión (defecto: 3)")
+    pack_parser.add_argument("-j", "--jobs", type=int, default=None,
+                             help="Hilos de compresión zstd (defecto: nº de CPUs)")
+    pack_parser.set_defaults(func=_cmd_pack)
+    
+    unpack_parser = subparsers.add_parser(
+        "unpack",
+        help="Desempaquetar un workspace",
+        description="Restaura un workspace empaquetado con 'pack', o lista/extrae miembros sueltos"
+    )
+    unpack_parser.add_argument("archive", help="Archivo .tar.zst / .zip")
+    unpack_parser.add_argument("-l", "--list", action="store_true", help="Solo listar el contenido")
+    unpack_parser.add_argument("-m", "--member", action="append", metavar="RUTA",
+                               help="Extraer solo este miembro (repetible)")
+    unpack_parser.add_argument("-d", "--dest", help="Directorio destino (defecto: directorio de ports)")
+    unpack_parser.add_argument("--force", action="store_true", help="Extraer sobre un workspace existente")
+    unpack_parser.set_defaults(func=_cmd_unpack)
+    
     # === Comandos de utilidad ===
     
     # db
@@ -154,9 +279,45 @@ def _register_subcommands(subparsers):
     db_list = db_sub.add_parser("list", help="Listar juegos en BD")
     db_list.set_defaults(func=_cmd_db_list)
     
-    db_export = db_sub.add_parser("export", help="Exportar BD a JSON")
-    db_export.add_argument("-o", "--output", default="games_export.json")
+    db_export = db_sub.add_parser("export", help="Exportar BD a JSONL/CSV")
+    db_export.add_argument("-o", "--output", default="games_export.jsonl",
+                           help="Archivo destino (.jsonl, .csv, + .gz para comprimir)")
+    db_export.add_argument("-f", "--format", choices=["jsonl", "csv"],
+                           help="Formato (default: según la extensión)")
+    db_export.add_argument("-z", "--gzip", action="store_true",
+                           help="Comprimir con gzip")
     db_export.set_defaults(func=_cmd_db_export)
+    
+    db_import = db_sub.add_parser("import", help="Importar juegos desde JSONL/CSV/JSON")
+    db_import.add_argument("input", help="Archivo exportado (.jsonl, .csv, .json, opcional .gz)")
+    db_import.add_argument("-c", "--on-conflict", default="skip",
+                           choices=["skip", "replace", "newer", "fail"],
+                           help="Qué hacer si el title_id ya existe (default: skip)")
+    db_import.add_argument("-b", "--batch-size", type=int, default=1000,
+                           help="Juegos por transacción (default: 1000)")
+    db_import.set_defaults(func=_cmd_db_import)
+    
+    db_maintain = db_sub.add_parser(
+        "maintain", help="Backup, compactación y optimize de la BD"
+    )
+    db_maintain.add_argument("--no-backup", action="store_true",
+                             help="No crear backup antes del mantenimiento")
+    db_maintain.add_argument("--backup-to", metavar="FILE",
+                             help="Destino del backup (default: ~/.mrmonkeyshopware/backups)")
+    db_maintain.add_argument("--no-compact", action="store_true",
+                             help="No compactar (VACUUM)")
+    db_maintain.add_argument("--analyze", action="store_true",
+                             help="ANALYZE completo en vez de PRAGMA optimize")
+    db_maintain.add_argument("--if-due", action="store_true",
+                             help="Solo si toca (7 días o muchas páginas libres); si no, solo optimize")
+    db_maintain.set_defaults(func=_cmd_db_maintain)
+    
+    db_stats = db_sub.add_parser("stats", help="Estadísticas de tiempos y fallos por etapa")
+    db_stats.add_argument("-d", "--days", type=int, default=14,
+                          help="Días de throughput a mostrar (default: 14)")
+    db_stats.add_argument("--open", action="store_true",
+                          help="Incluir el tiempo en el status actual hasta ahora")
+    db_stats.set_defaults(func=_cmd_db_stats)
 
 
 # === Implementación de comandos ===
@@ -167,6 +328,8 @@ def _cmd_analyse(args):
     from core.analyser import analyse_xex
     from core.game_workspace import get_or_create_workspace, GameInfo
     from core.database import GameDatabase, Game, GameStatus
+    from core.workspace_lock import workspace_lock
+    from core.atomic_io import write_behind
     
     xex_path = args.xex
     if not os.path.exists(xex_path):
@@ -187,55 +350,57 @@ def _cmd_analyse(args):
         print(f"\n📋 Juego detectado: {xex_info.display_name}")
         print(f"   Title ID: {xex_info.title_id}")
         
-        # Crear workspace
-        game_name = xex_info.display_name or os.path.basename(xex_path).replace(".xex", "")
-        workspace, is_new = get_or_create_workspace(xex_info.title_id, game_name)
-        
-        if is_new:
-            print(f"\n📁 Creado workspace: {workspace.root}")
-        else:
-            print(f"\n📁 Usando workspace existente: {workspace.root}")
-        
-        # Guardar info
-        game_info = GameInfo.from_xex_info(xex_info, source_type="xex", source_path=xex_path)
-        workspace.save_info(game_info)
-        print("   ✅ info.json guardado")
-        
-        # Copiar archivos de análisis
-        import shutil
-        if result.json_file and os.path.exists(result.json_file):
-            dest = workspace.analysis_dir / os.path.basename(result.json_file)
-            shutil.copy2(result.json_file, dest)
-            print(f"   📊 {os.path.basename(result.json_file)} copiado")
-        
-        if result.toml_file and os.path.exists(result.toml_file):
-            dest = workspace.analysis_dir / os.path.basename(result.toml_file)
-            shutil.copy2(result.toml_file, dest)
-            print(f"   📄 {os.path.basename(result.toml_file)} copiado")
-        
-        # Guardar en BD
-        try:
-            import json
-            game = Game(
-                title_id=xex_info.title_id,
-                game_name=game_name,
-                status=GameStatus.ANALYSED,
-                xex_path=xex_path,
-                extracted_dir=str(workspace.root),
-                analysis_json=result.json_file,
-                project_toml=result.toml_file,
-                media_id=xex_info.media_id,
-                version=xex_info.version,
-                regions=xex_info.regions,
-                esrb_rating=xex_info.esrb_rating
-            )
+        # Lock del workspace: la GUI u otro proceso pueden estar escribiéndolo.
+        # Los metadatos se escriben una vez al salir, antes de soltar el lock.
+        with workspace_lock(xex_info.title_id), write_behind():
+            # Crear workspace
+            game_name = xex_info.display_name or os.path.basename(xex_path).replace(".xex", "")
+            workspace, is_new = get_or_create_workspace(xex_info.title_id, game_name)
             
-            with GameDatabase() as db:
-                game_id = db.add_or_update_game(game)
+            if is_new:
+                print(f"\n📁 Creado workspace: {workspace.root}")
+            else:
+                print(f"\n📁 Usando workspace existente: {workspace.root}")
             
-            print(f"\n💾 Guardado en base de datos (ID: {game_id})")
-        except Exception as e:
-            print(f"⚠️ No se pudo guardar en BD: {e}")
+            # Guardar info
+            game_info = GameInfo.from_xex_info(xex_info, source_type="xex", source_path=xex_path)
+            workspace.save_info(game_info)
+            print("   ✅ info.json guardado")
+            
+            # Mover archivos de análisis al workspace
+            if result.json_file and os.path.exists(result.json_file):
+                placed = workspace.import_analysis_file(result.json_file)
+                result.json_file = placed.dst
+                print(f"   📊 {os.path.basename(placed.dst)} → workspace ({placed.method.value})")
+            
+            if result.toml_file and os.path.exists(result.toml_file):
+                placed = workspace.import_analysis_file(result.toml_file)
+                result.toml_file = placed.dst
+                print(f"   📄 {os.path.basename(placed.dst)} → workspace ({placed.method.value})")
+            
+            # Guardar en BD
+            try:
+                import json
+                game = Game(
+                    title_id=xex_info.title_id,
+                    game_name=game_name,
+                    status=GameStatus.ANALYSED,
+                    xex_path=xex_path,
+                    extracted_dir=str(workspace.root),
+                    analysis_json=result.json_file,
+                    project_toml=result.toml_file,
+                    media_id=xex_info.media_id,
+                    version=xex_info.version,
+                    regions=xex_info.regions,
+                    esrb_rating=xex_info.esrb_rating
+                )
+                
+                with GameDatabase() as db:
+                    game_id = db.add_or_update_game(game, tool="cli")
+                
+                print(f"\n💾 Guardado en base de datos (ID: {game_id})")
+            except Exception as e:
+                print(f"⚠️ No se pudo guardar en BD: {e}")
     
     print("\n🎉 ¡Análisis completado!")
 
@@ -335,9 +500,10 @@ def _cmd_scan_usb(args):
 def _cmd_list(args):
     """Comando: list"""
     from core.game_workspace import GameWorkspace
+    from core.workspace_usage import RECONCILE_INTERVAL_S
     import os
     
-    workspaces = GameWorkspace.list_all()
+    workspaces = GameWorkspace.list_all(refresh=args.refresh)
     
     if not workspaces:
         print("📂 No hay workspaces creados aún")
@@ -346,8 +512,9 @@ def _cmd_list(args):
     
     print(f"📂 Workspaces ({len(workspaces)}):\n")
     
+    total_bytes = 0
     for ws in workspaces:
-        info = ws.load_info()
+        info = ws.cached_info()
         print(f"  📁 {ws.game_name} [{ws.title_id}]")
         
         if info:
@@ -355,6 +522,14 @@ def _cmd_list(args):
         
         if args.verbose:
             print(f"     Ruta: {ws.root}")
+            usage = ws.usage(max_age=0 if args.refresh else RECONCILE_INTERVAL_S)
+            total_bytes += usage.total_bytes
+            parts = [
+                f"{name}/ {_format_bytes(usage.get(name).bytes)}"
+                for name in ("extracted", "cleaned", "recompiled") if usage.get(name).bytes
+            ]
+            detail = f" ({', '.join(parts)})" if parts else ""
+            print(f"     Tamaño: {_format_bytes(usage.total_bytes)}{detail}")
             # Verificar archivos
             files = []
             if ws.info_file.exists():
@@ -367,7 +542,10 @@ def _cmd_list(args):
         
         print()
     
-    print(f"Total: {len(workspaces)} workspace(s)")
+    if args.verbose:
+        print(f"Total: {len(workspaces)} workspace(s), {_format_bytes(total_bytes)}")
+    else:
+        print(f"Total: {len(workspaces)} workspace(s)")
 
 
 def _cmd_info(args):
@@ -459,7 +637,10 @@ def _cmd_sync(args):
     
     # Ejecutar sync
     print("\n📥 Sincronizando...")
-    new_paths = workspace.sync_all_files(game, log=print)
+    new_paths = workspace.sync_all_files(
+        game, log=print, progress=_print_sync_progress, workers=args.jobs,
+        strategy=args.strategy
+    )
     
     # Actualizar BD
     if new_paths:
@@ -478,6 +659,319 @@ def _cmd_sync(args):
     print(f"📁 Workspace: {workspace.root}")
 
 
+def _cmd_verify(args):
+    """Comando: verify"""
+    from core.game_workspace import GameWorkspace
+    from core.file_sync import format_rate
+    from core.workspace_manifest import DEFAULT_HASH_WORKERS, verify_many
+    
+    if args.all:
+        workspaces = GameWorkspace.list_all()
+    elif args.title_id:
+        workspaces = [_find_workspace_or_exit(args.title_id)]
+    else:
+        print("❌ Indica un Title ID o --all")
+        sys.exit(1)
+    
+    if not workspaces:
+        print("📂 No hay workspaces creados aún")
+        return
+    
+    names = {str(ws.root): f"{ws.game_name} [{ws.title_id}]" for ws in workspaces}
+    mode = "rápida (tamaño/mtime)" if args.quick else "completa (hash)"
+    print(f"🔍 Verificando {len(workspaces)} workspace(s), modo {mode}...\n")
+    
+    def on_report(report):
+        name = names[report.root]
+        if report.created:
+            print(f"  🆕 {name}: manifiesto creado ({len(report.added)} archivos)")
+            return
+        status = "❌" if report.has_problems else ("⚠️" if report.modified or report.added else "✅")
+        print(f"  {status} {name}: {len(report.ok)} OK")
+        for label, paths in (
+            ("💥 Corrupto", report.corrupt),
+            ("🚫 Falta", report.missing),
+            ("✏️ Modificado", report.modified),
+            ("➕ Nuevo", report.added),
+        ):
+            for path in paths:
+                print(f"     {label}: {path}")
+    
+    reports = verify_many(
+        [ws.root for ws in workspaces],
+        full=not args.quick,
+        update=args.update,
+        workers=args.jobs or DEFAULT_HASH_WORKERS,
+        on_report=on_report
+    )
+    
+    total_bytes = sum(r.bytes_hashed for r in reports)
+    total_seconds = sum(r.seconds for r in reports)
+    rate = format_rate(total_bytes / total_seconds) if total_seconds else "-"
+    print(f"\n📊 {_format_bytes(total_bytes)} hasheados en {total_seconds:.1f}s ({rate})")
+    
+    problems = [r for r in reports if r.has_problems]
+    if problems:
+        print(f"❌ {len(problems)} workspace(s) con archivos corruptos o desaparecidos")
+        sys.exit(1)
+    if args.update:
+        print("💾 Manifiestos actualizados")
+    print("✅ Verificación completada")
+
+
+def _cmd_store_report(args):
+    """Comando: store report"""
+    from core.object_store import get_object_store
+    
+    report = get_object_store().report()
+    print("📦 Almacén de objetos\n")
+    print(f"   Objetos:     {report.objects}")
+    print(f"   Referencias: {report.refs}")
+    print(f"   Lógico:      {_format_bytes(report.logical_bytes)}")
+    print(f"   Físico:      {_format_bytes(report.physical_bytes)}")
+    print(f"   Ahorrado:    {_format_bytes(report.saved_bytes)} ({report.ratio:.2f}x)")
+
+
+def _cmd_store_dedup(args):
+    """Comando: store dedup"""
+    from core.game_workspace import GameWorkspace
+    from core.object_store import get_object_store
+    
+    if args.all:
+        workspaces = GameWorkspace.list_all()
+    elif args.title_id:
+        workspaces = [_find_workspace_or_exit(args.title_id)]
+    else:
+        print("❌ Indica un Title ID o --all")
+        sys.exit(1)
+    
+    store = get_object_store()
+    before = store.report()
+    for ws in workspaces:
+        for path in ws.immutable_files():
+            placed = store.adopt(str(path), ws.title_id)
+            if placed is None:
+                print(f"   ⚠️ {path.name}: el almacén está en otro disco, se omite")
+            else:
+                print(f"   🔗 {ws.game_name} [{ws.title_id}] {path.name} ({placed.method.value})")
+    
+    after = store.report()
+    print(f"\n💾 Ahorrado: {_format_bytes(after.saved_bytes)} "
+          f"(antes {_format_bytes(before.saved_bytes)})")
+
+
+def _cmd_store_gc(args):
+    """Comando: store gc"""
+    from core.object_store import get_object_store
+    
+    report = get_object_store().gc(dry_run=args.dry_run)
+    prefix = "🔍 Se borrarían" if args.dry_run else "🧹 Borrados"
+    print(f"{prefix} {report.removed_objects} objeto(s) ({_format_bytes(report.freed_bytes)})")
+    print(f"   Referencias obsoletas: {report.stale_refs}")
+    print(f"   Temporales abandonados: {report.removed_staging}")
+
+
+def _cmd_evict(args):
+    """Comando: evict"""
+    from pathlib import Path
+    from core.game_workspace import GameWorkspace
+    from core.workspace_eviction import enforce_quota, quota_bytes
+    
+    quota = int(args.quota * 1024 ** 3) if args.quota is not None else quota_bytes()
+    if not quota:
+        print("❌ No hay cuota: usa --quota GB o configura storage.quota_gb")
+        sys.exit(1)
+    
+    roots = [ws.root for ws in GameWorkspace.list_all()]
+    report = enforce_quota(roots, quota=quota, dry_run=args.dry_run, log=print)
+    print(f"\n📊 Biblioteca: {_format_bytes(report.library_bytes)} / cuota {_format_bytes(quota)}")
+    
+    if args.dry_run:
+        for evicted in report.evicted:
+            print(f"   🔍 {Path(evicted.root).name}/{evicted.subdir}: {_format_bytes(evicted.bytes)}")
+    prefix = "Se liberarían" if args.dry_run else "Liberados"
+    print(f"🧹 {prefix} {_format_bytes(report.freed_bytes)} en {len(report.evicted)} directorio(s)")
+    if report.over_quota:
+        print("⚠️ Sigue por encima de la cuota: el resto no es regenerable o se usó hace poco")
+
+
+def _cmd_regen(args):
+    """Comando: regen"""
+    workspace = _find_workspace_or_exit(args.title_id)
+    
+    subdirs = [args.subdir] if args.subdir else list(workspace.evicted_dirs())
+    if not subdirs:
+        print("✅ No hay nada desalojado")
+        return
+    
+    failed = [subdir for subdir in subdirs if not workspace.ensure_dir(subdir, log=print)]
+    if failed:
+        print(f"❌ No se pudo regenerar: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"✅ Regenerado: {', '.join(subdirs)}")
+
+
+def _find_workspace_or_exit(title_id: str):
+    from core.game_workspace import GameWorkspace
+    
+    workspace = GameWorkspace.find_existing(title_id.upper())
+    if not workspace:
+        print(f"❌ No se encontró workspace para Title ID: {title_id.upper()}")
+        sys.exit(1)
+    return workspace
+
+
+def _cmd_snapshot_create(args):
+    """Comando: snapshot create"""
+    workspace = _find_workspace_or_exit(args.title_id)
+    if not workspace.recompiled_dir.is_dir():
+        print(f"❌ No existe {workspace.recompiled_dir}")
+        sys.exit(1)
+    
+    snapshot = workspace.snapshot()
+    print(f"📸 Snapshot {snapshot.name}: {snapshot.files} archivos, {_format_bytes(snapshot.bytes)}")
+    print(f"   🔗 {snapshot.linked} enlazados a {snapshot.base or '-'}, "
+          f"{_format_bytes(snapshot.new_bytes)} copiados ({snapshot.seconds:.2f}s)")
+
+
+def _cmd_snapshot_list(args):
+    """Comando: snapshot list"""
+    from datetime import datetime
+    
+    workspace = _find_workspace_or_exit(args.title_id)
+    snapshots = workspace.snapshots()
+    if not snapshots:
+        print("📭 Sin snapshots")
+        return
+    
+    print(f"📸 Snapshots de {workspace.game_name} [{workspace.title_id}]:")
+    for snapshot in snapshots:
+        created = datetime.fromtimestamp(snapshot.created).strftime("%Y-%m-%d %H:%M")
+        print(f"   {snapshot.name}  {created}  {snapshot.files:>6} archivos  "
+              f"{_format_bytes(snapshot.bytes):>10}  (+{_format_bytes(snapshot.new_bytes)} nuevos)")
+
+
+def _cmd_snapshot_diff(args):
+    """Comando: snapshot diff"""
+    workspace = _find_workspace_or_exit(args.title_id)
+    try:
+        diff = workspace.diff_snapshots(args.old, args.new)
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        sys.exit(1)
+    
+    for label, paths in (("+", diff.added), ("-", diff.removed), ("M", diff.modified)):
+        for path in paths:
+            print(f"   {label} {path}")
+    print(f"\n📊 {len(diff.added)} nuevos, {len(diff.removed)} borrados, "
+          f"{len(diff.modified)} modificados, {diff.unchanged} iguales")
+
+
+def _cmd_snapshot_prune(args):
+    """Comando: snapshot prune"""
+    if args.keep is None and args.older_than is None:
+        print("❌ Indica --keep N y/o --older-than DIAS")
+        sys.exit(1)
+    
+    workspace = _find_workspace_or_exit(args.title_id)
+    older_than = args.older_than * 86400 if args.older_than is not None else None
+    pruned = workspace.prune_snapshots(keep=args.keep, older_than=older_than, dry_run=args.dry_run)
+    for snapshot in pruned:
+        print(f"   🗑️ {snapshot.name}")
+    prefix = "Se borrarían" if args.dry_run else "Borrados"
+    print(f"🧹 {prefix} {len(pruned)} snapshot(s)")
+
+
+def _cmd_pack(args):
+    """Comando: pack"""
+    from core.file_sync import format_rate
+    from core.workspace_pack import pack_workspace
+    
+    workspace = _find_workspace_or_exit(args.title_id)
+    
+    def on_progress(done, total):
+        percent = done * 100 / total if total else 100.0
+        end = "\n" if done >= total else ""
+        print(f"\r   ⏳ {percent:5.1f}%  {_format_bytes(done)} / {_format_bytes(total)}", end=end, flush=True)
+    
+    print(f"📦 Empaquetando {workspace.game_name} [{workspace.title_id}]...")
+    try:
+        result = pack_workspace(
+            workspace,
+            output=args.output,
+            exclude_regenerable=args.exclude_regenerable,
+            fmt=args.format,
+            level=args.level,
+            workers=args.jobs,
+            progress=on_progress
+        )
+    except (RuntimeError, ValueError, OSError) as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    
+    rate = format_rate(result.bytes_in / result.seconds) if result.seconds else "-"
+    print(f"✅ {result.path} ({result.format})")
+    print(f"   {result.members} archivos, {_format_bytes(result.bytes_in)} → "
+          f"{_format_bytes(result.bytes_out)} ({result.ratio:.2f}x) en {result.seconds:.1f}s ({rate})")
+    if result.excluded:
+        print(f"   ⏭️ Omitidos: {', '.join(d + '/' for d in result.excluded)}")
+
+
+def _cmd_unpack(args):
+    """Comando: unpack"""
+    import os
+    from pathlib import Path
+    from core.workspace_pack import PackError, open_pack, unpack_workspace
+    
+    if not os.path.isfile(args.archive):
+        print(f"❌ No existe: {args.archive}")
+        sys.exit(1)
+    
+    try:
+        if args.list or args.member:
+            with open_pack(args.archive) as pack:
+                if args.list:
+                    meta = pack.meta
+                    print(f"📦 {meta.get('game_name', '?')} [{meta.get('title_id', '?')}] ({pack.format})\n")
+                    for member in pack.members():
+                        print(f"   {_format_bytes(member.size):>10}  {member.name}")
+                    return
+                dest = args.dest or "."
+                for name in args.member:
+                    print(f"   📄 {pack.extract(name, dest)}")
+                return
+        
+        workspace = unpack_workspace(
+            args.archive,
+            base_dir=Path(args.dest) if args.dest else None,
+            overwrite=args.force
+        )
+    except FileExistsError as e:
+        print(f"❌ {e} (usa --force para sobrescribir)")
+        sys.exit(1)
+    except PackError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    except OSError as e:
+        print(f"❌ Error al extraer: {e}")
+        sys.exit(1)
+    
+    print(f"✅ Workspace restaurado: {workspace.root}")
+
+
+def _print_sync_progress(progress):
+    """Línea de progreso de sync (se sobrescribe con \\r)."""
+    from core.file_sync import format_rate
+    
+    line = (
+        f"   ⏳ {progress.percent:5.1f}%  "
+        f"{_format_bytes(progress.total_copied)} / {_format_bytes(progress.total_size)}  "
+        f"{format_rate(progress.total_rate)}"
+    )
+    end = "\n" if progress.total_copied >= progress.total_size else ""
+    print(f"\r{line}", end=end, flush=True)
+
+
 def _cmd_db_list(args):
     """Comando: db list"""
     from core.database import GameDatabase
@@ -501,27 +995,154 @@ def _cmd_db_list(args):
 
 def _cmd_db_export(args):
     """Comando: db export"""
-    import json
     from core.database import GameDatabase
+    from core.db_transfer import export_games
+    
+    output = args.output
+    if args.gzip and not output.endswith(".gz"):
+        output += ".gz"
     
     with GameDatabase() as db:
-        games = db.list_games()
+        count = export_games(
+            db, output, fmt=args.format, compress=args.gzip or None
+        )
     
-    export_data = []
-    for game in games:
-        export_data.append({
-            "id": game.id,
-            "title_id": game.title_id,
-            "game_name": game.game_name,
-            "status": game.status.value,
-            "xex_path": game.xex_path,
-            "iso_path": game.iso_path,
-        })
-    
-    with open(args.output, 'w', encoding='utf-8') as f:
-        json.dump(export_data, f, indent=2, ensure_ascii=False)
-    
-    print(f"✅ Exportados {len(games)} juegos a {args.output}")
+    print(f"✅ Exportados {count} juegos a {output}")
+
+
+def _cmd_db_import(args):
+    """Comando: db import"""
+    import os
+    import sqlite3
+    from core.database import GameDatabase
+    from core.db_transfer import import_games
+    from core.db_maintenance import maybe_maintain
+    
+    if not os.path.exists(args.input):
+        print(f"❌ No se encontró el archivo: {args.input}")
+        sys.exit(1)
+    
+    with GameDatabase() as db:
+        try:
+            result = import_games(
+                db, args.input,
+                on_conflict=args.on_conflict,
+                batch_size=args.batch_size
+            )
+        except (sqlite3.Error, ValueError) as e:
+            print(f"❌ Importación abortada: {e}")
+            sys.exit(1)
+        
+        # Tras un lote grande: optimize siempre, mantenimiento si toca
+        maybe_maintain(db)
+    
+    print(f"✅ Importados {result.total} juegos de {args.input}")
+    print(f"   ➕ Nuevos: {result.inserted}")
+    print(f"   🔄 Actualizados: {result.updated}")
+    print(f"   ⏭️  Omitidos: {result.skipped}")
+    if result.invalid:
+        print(f"   ⚠️  Inválidos (descartados): {result.invalid}")
+
+
+def _format_bytes(size: float) -> str:
+    """Formatea un tamaño en B/KB/MB/GB."""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def _cmd_db_maintain(args):
+    """Comando: db maintain"""
+    from core.database import GameDatabase
+    from core.db_maintenance import maintain, maintenance_due, optimize
+    
+    with GameDatabase() as db:
+        if args.if_due and not maintenance_due(db):
+            optimize(db, analyze=args.analyze)
+            print("✅ Mantenimiento al día (solo se ejecutó optimize)")
+            return
+        
+        report = maintain(
+            db,
+            do_backup=not args.no_backup,
+            do_compact=not args.no_compact,
+            analyze=args.analyze,
+            backup_dest=args.backup_to,
+            log=print
+        )
+    
+    before, after = report.before, report.after
+    print(f"\n🧹 Mantenimiento completado en {report.duration_s:.1f}s\n")
+    print(f"  {'':16s} {'antes':>12s} {'después':>12s}")
+    print(f"  {'Tamaño':16s} {_format_bytes(before.size_bytes):>12s} {_format_bytes(after.size_bytes):>12s}")
+    print(f"  {'Páginas libres':16s} {before.freelist_count:>12d} {after.freelist_count:>12d}")
+    print(f"  {'Fragmentación':16s} {before.fragmentation:>12.1%} {after.fragmentation:>12.1%}")
+    print(f"\n  Acciones: {', '.join(report.actions)}")
+    if report.backup_path:
+        print(f"  💾 Backup: {report.backup_path}")
+
+
+def _format_seconds(seconds: float) -> str:
+    """Formatea una duración en s/min/h/días."""
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.1f}min"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 86400:.1f}d"
+
+
+def _cmd_db_stats(args):
+    """Comando: db stats"""
+    from core.database import GameDatabase, GameStatus
+    
+    with GameDatabase() as db:
+        counts = db.status_counts()
+        durations = db.state_durations(include_open=args.open)
+        to_analysed = db.time_between(GameStatus.PENDING, GameStatus.ANALYSED)
+        throughput = db.throughput_per_day(GameStatus.ANALYSED, days=args.days)
+        failures = db.failure_rate_by_tool()
+    
+    print(f"📊 Estadísticas de la base de datos\n")
+    print(f"  Total: {sum(counts.values())} juego(s)")
+    for status, n in counts.items():
+        if n:
+            print(f"     {status.value:12s} {n}")
+    
+    print(f"\n⏱️  Tiempo en cada status:\n")
+    if not durations:
+        print("  Sin transiciones registradas")
+    else:
+        print(f"  {'status':12s} {'n':>6s} {'p50':>9s} {'p90':>9s} {'p99':>9s}")
+        for status, summary in durations.items():
+            print(
+                f"  {status.value:12s} {summary['count']:6d} "
+                f"{_format_seconds(summary['p50']):>9s} "
+                f"{_format_seconds(summary['p90']):>9s} "
+                f"{_format_seconds(summary['p99']):>9s}"
+            )
+    
+    if to_analysed["count"]:
+        print(
+            f"\n  pending → analysed: p50 {_format_seconds(to_analysed['p50'])}"
+            f" | p90 {_format_seconds(to_analysed['p90'])}"
+            f" ({to_analysed['count']} juegos)"
+        )
+    
+    print(f"\n📈 Analizados por día (últimos {args.days} días):\n")
+    if not throughput:
+        print("  Sin actividad")
+    for day, n in throughput:
+        print(f"  {day}  {'█' * min(n, 50)} {n}")
+    
+    print(f"\n❌ Tasa de fallos por herramienta:\n")
+    if not failures:
+        print("  Sin eventos")
+    for tool, stats in failures.items():
+        print(f"  {tool:12s} {stats['failed']:4d}/{stats['total']:<4d} ({stats['rate']:.0%})")
 
 
 if __name__ == "__main__":
@@ -5,6 +5,7 @@ Comando CLI para recompilación con XenonRecomp.
 import argparse
 import sys
 import os
+from contextlib import contextmanager
 
 from core.shader_recomp import (
     run_recompilation,
@@ -21,6 +22,39 @@ def log_print(msg: str):
     print(msg)
 
 
+@contextmanager
+def _workspace_target(path: str):
+    """
+    Si `path` está en extracted/, cleaned/ o recompiled/ de un workspace,
+    toma su lock (el desalojo por cuota no lo toca mientras tanto),
+    registra el acceso para el orden LRU del desalojo y al terminar
+    recuenta ese subdirectorio en los contadores de uso (.usage.json).
+    """
+    from core.game_workspace import GameWorkspace
+    from core.workspace_lock import LockTimeout
+    from core.workspace_usage import refresh_dirs
+    
+    found = GameWorkspace.containing(path)
+    if found is None:
+        yield None
+        return
+    workspace, subdir = found
+    try:
+        lock = workspace.lock().acquire()
+    except LockTimeout as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    try:
+        workspace.touch(subdir)
+        yield workspace
+    finally:
+        try:
+            refresh_dirs(workspace.root, [subdir])
+        except OSError as e:
+            print(f"⚠️ No se pudo actualizar el uso de disco: {e}")
+        lock.release()
+
+
 def cmd_recomp_toml(args):
     """Recompila desde un TOML existente."""
     toml_path = args.toml
@@ -31,13 +65,19 @@ def cmd_recomp_toml(args):
     
     print(f"🔧 Recompilando desde: {toml_path}")
     
-    result = run_recompilation(
-        toml_path=toml_path,
-        output_dir=args.output,
-        log=log_print
-    )
+    with _workspace_target(args.output or os.path.dirname(os.path.abspath(toml_path))):
+        result = run_recompilation(
+            toml_path=toml_path,
+            output_dir=args.output,
+            log=log_print,
+            force=args.force
+        )
     
-    if result.success:
+    if result.skipped:
+        print(f"\n⏭️ Sin cambios, no se recompiló ({result.skip_reason})")
+        print(f"📁 Directorio: {result.output_dir}")
+        print(f"📄 Archivos C++: {len(result.cpp_files)}  (usa --force para recompilar)")
+    elif result.success:
         print(f"\n✅ Recompilación exitosa!")
         print(f"📁 Directorio: {result.output_dir}")
         print(f"📄 Archivos C++: {len(result.cpp_files)}")
@@ -78,13 +118,18 @@ def cmd_recomp_xex(args):
     
     # Paso 3: Recompilar
     print("\n🔧 Paso 3/3: Ejecutando XenonRecomp...")
-    result = run_recompilation(
-        toml_path=project_toml,
-        output_dir=output_dir,
-        log=log_print
-    )
+    with _workspace_target(output_dir):
+        result = run_recompilation(
+            toml_path=project_toml,
+            output_dir=output_dir,
+            log=log_print,
+            force=args.force
+        )
     
-    if result.success:
+    if result.skipped:
+        print(f"\n⏭️ Sin cambios, no se recompiló ({result.skip_reason})")
+        print(f"📁 Directorio: {result.output_dir}")
+    elif result.success:
         print(f"\n🎉 Pipeline de recompilación completado!")
         print(f"📁 Directorio: {result.output_dir}")
         print(f"📄 Archivos C++: {len(result.cpp_files)}")
@@ -112,15 +157,152 @@ def cmd_validate(args):
         print(f"❌ Directorio no encontrado: {output_dir}")
         sys.exit(1)
     
-    success, files = validate_recomp_output(output_dir, log=log_print)
+    success, files = validate_recomp_output(output_dir, log=log_print, verify=args.verify)
     
     if success:
         print(f"\n✅ Validación exitosa: {len(files)} archivos encontrados")
+    elif args.verify and any(f.endswith(".cpp") for f in files):
+        print(f"\n❌ La salida no coincide con el manifiesto (vuelve a recompilar)")
+        sys.exit(1)
     else:
         print(f"\n❌ No se encontraron archivos de recompilación")
         sys.exit(1)
 
 
+def cmd_build(args):
+    """Compila el C++ generado (caché de objetos, en paralelo)."""
+    from core.cpp_build import build_objects
+    
+    if not os.path.isdir(args.dir):
+        print(f"❌ Directorio no encontrado: {args.dir}")
+        sys.exit(1)
+    
+    with _workspace_target(args.dir):
+        result = build_objects(
+            args.dir,
+            obj_dir=args.obj_dir,
+            cxx=args.cxx,
+            cxxflags=args.flags,
+            jobs=args.jobs,
+            use_cache=not args.no_cache,
+            log=log_print
+        )
+    if result.error:
+        sys.exit(1)
+    
+    print(f"\n📊 Build ({result.jobs} en paralelo):")
+    print(f"   🔨 {len(result.compiled)} compiladas   ⚡ {len(result.cached)} de caché   "
+          f"❌ {len(result.failed)} fallidas")
+    print(f"   ⏱️ {_format_duration(result.wall_seconds)} reales, "
+          f"{_format_duration(result.compile_seconds)} de compilación")
+    for unit in result.slowest(args.top):
+        print(f"   🐢 {unit.source}: {unit.seconds:.2f}s")
+    print(f"📁 Objetos: {result.obj_dir}")
+    if result.failed:
+        for unit in result.failed[:5]:
+            print(f"\n❌ {unit.source}:\n{unit.error}")
+        sys.exit(1)
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s"
+
+
+def cmd_queue_add(args):
+    """Encola project.toml o Title IDs."""
+    from core.recomp_queue import RecompQueue
+    
+    queue = RecompQueue()
+    options = dict(priority=args.priority, timeout=args.timeout, cpus=args.cpus, mem_mb=args.mem_mb)
+    for target in args.targets:
+        try:
+            if os.path.isfile(target):
+                job = queue.add(target, output_dir=args.output, **options)
+            else:
+                job = queue.add_title(target, **options)
+        except LookupError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"➕ #{job.id} {job.label} (prioridad {job.priority})")
+    print(f"📋 {len(queue.pending())} trabajo(s) pendiente(s)")
+
+
+def cmd_queue_run(args):
+    """Ejecuta la cola."""
+    from core.recomp_queue import DONE, FAILED, SKIPPED, TIMEOUT, RecompQueue
+    from core.workspace_lock import LockTimeout
+    
+    if not check_xenon_recomp_available():
+        print("❌ XenonRecomp no está instalado o no se encuentra")
+        sys.exit(1)
+    
+    queue = RecompQueue()
+    if not queue.pending():
+        print("📭 No hay trabajos pendientes")
+        return
+    
+    try:
+        summary = queue.run(cpu_budget=args.jobs, mem_budget_mb=args.mem_budget, force=args.force,
+                            log=log_print if args.verbose else _queue_log)
+    except LockTimeout as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    mem = f"{summary.mem_budget_mb} MB" if summary.mem_budget_mb else "sin límite"
+    print(f"\n📊 Resumen ({summary.cpu_budget} núcleos, memoria {mem}):")
+    print(f"   ✅ {summary.count(DONE)} recompilados   ⏭️ {summary.count(SKIPPED)} sin cambios   "
+          f"❌ {summary.count(FAILED)} fallidos   ⏰ {summary.count(TIMEOUT)} timeout")
+    print(f"   ⏱️ {_format_duration(summary.wall_seconds)} reales, "
+          f"{_format_duration(summary.busy_seconds)} de proceso (x{summary.parallelism:.1f} en paralelo)")
+    print(f"   🚀 {summary.jobs_per_hour:.1f} trabajos/hora, {summary.cpp_files} archivos C++ generados")
+    for job in summary.slowest(3):
+        if job.duration:
+            print(f"   🐢 {job.label}: {_format_duration(job.duration)}")
+    if summary.count(FAILED) or summary.count(TIMEOUT):
+        sys.exit(1)
+
+
+def _queue_log(msg: str):
+    """Solo los mensajes de la cola (no el detalle de cada XenonRecomp)."""
+    if not msg.startswith("["):
+        print(msg)
+
+
+def cmd_queue_status(args):
+    """Muestra los trabajos de la cola."""
+    from core.recomp_queue import PENDING, RecompQueue
+    
+    queue = RecompQueue()
+    if not queue.jobs:
+        print("📭 Cola vacía")
+        return
+    
+    order = {job.id: n for n, job in enumerate(queue.pending(), 1)}
+    icons = {"pending": "⏳", "running": "🔄", "done": "✅", "skipped": "⏭️", "failed": "❌", "timeout": "⏰"}
+    for job in sorted(queue.jobs, key=lambda j: (j.state != PENDING, order.get(j.id, 0), j.id)):
+        detail = job.error or job.skip_reason or ""
+        duration = f" {_format_duration(job.duration)}" if job.duration else ""
+        print(f"   {icons.get(job.state, '?')} #{job.id:<3} {job.label:<20} p={job.priority:<3} "
+              f"{job.state}{duration} {detail}")
+
+
+def cmd_queue_retry(args):
+    """Reintenta los trabajos fallidos."""
+    from core.recomp_queue import RecompQueue
+    
+    print(f"🔁 {RecompQueue().retry()} trabajo(s) de nuevo en cola")
+
+
+def cmd_queue_clear(args):
+    """Quita de la cola los trabajos terminados."""
+    from core.recomp_queue import RecompQueue
+    
+    print(f"🧹 {RecompQueue().clear()} trabajo(s) terminados eliminados")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Recompilación de Xbox 360 con XenonRecomp",
@@ -133,14 +315,48 @@ def main():
     p_toml = subparsers.add_parser("toml", help="Recompilar desde project.toml")
     p_toml.add_argument("-t", "--toml", required=True, help="Ruta al project.toml")
     p_toml.add_argument("-o", "--output", help="Directorio de salida")
+    p_toml.add_argument("-f", "--force", action="store_true",
+                        help="Recompilar aunque las entradas no hayan cambiado")
     p_toml.set_defaults(func=cmd_recomp_toml)
     
     # xex - Recompilar desde XEX (pipeline completo)
     p_xex = subparsers.add_parser("xex", help="Recompilar desde XEX (pipeline completo)")
     p_xex.add_argument("-x", "--xex", required=True, help="Ruta al archivo XEX")
     p_xex.add_argument("-o", "--output", help="Directorio de salida")
+    p_xex.add_argument("-f", "--force", action="store_true",
+                       help="Recompilar aunque las entradas no hayan cambiado")
     p_xex.set_defaults(func=cmd_recomp_xex)
     
+    # queue - Cola de recompilación
+    p_queue = subparsers.add_parser("queue", help="Cola de recompilación (varios juegos en paralelo)")
+    queue_sub = p_queue.add_subparsers(dest="queue_command")
+    
+    q_add = queue_sub.add_parser("add", help="Encolar project.toml o Title IDs")
+    q_add.add_argument("targets", nargs="+", help="Rutas a project.toml o Title IDs")
+    q_add.add_argument("-p", "--priority", type=int, default=0, help="Prioridad (mayor = antes)")
+    q_add.add_argument("-t", "--timeout", type=int, default=None, help="Timeout por trabajo en segundos")
+    q_add.add_argument("-o", "--output", help="Directorio de salida (solo para TOML)")
+    q_add.add_argument("--cpus", type=int, default=1, help="Núcleos que reserva cada trabajo")
+    q_add.add_argument("--mem-mb", type=int, default=None, help="Memoria que reserva cada trabajo")
+    q_add.set_defaults(func=cmd_queue_add)
+    
+    q_run = queue_sub.add_parser("run", help="Ejecutar los trabajos pendientes")
+    q_run.add_argument("-j", "--jobs", type=int, default=None, help="Presupuesto de núcleos (defecto: todos)")
+    q_run.add_argument("--mem-budget", type=int, default=None, metavar="MB",
+                       help="Presupuesto de memoria (defecto: 75%% de la RAM; 0 = sin límite)")
+    q_run.add_argument("-f", "--force", action="store_true", help="Recompilar aunque nada haya cambiado")
+    q_run.add_argument("-v", "--verbose", action="store_true", help="Mostrar la salida de cada trabajo")
+    q_run.set_defaults(func=cmd_queue_run)
+    
+    q_status = queue_sub.add_parser("status", help="Ver la cola")
+    q_status.set_defaults(func=cmd_queue_status)
+    
+    q_retry = queue_sub.add_parser("retry", help="Reintentar fallidos y timeouts")
+    q_retry.set_defaults(func=cmd_queue_retry)
+    
+    q_clear = queue_sub.add_parser("clear", help="Quitar los trabajos terminados")
+    q_clear.set_defaults(func=cmd_queue_clear)
+    
     # version - Mostrar versión
     p_version = subparsers.add_parser("version", help="Mostrar versión de XenonRecomp")
     p_version.set_defaults(func=cmd_version)
@@ -148,11 +364,24 @@ def main():
     # validate - Validar output
     p_validate = subparsers.add_parser("validate", help="Validar output de recompilación")
     p_validate.add_argument("-d", "--dir", required=True, help="Directorio a validar")
+    p_validate.add_argument("--verify", action="store_true",
+                            help="Comprobar que los archivos del manifiesto siguen en disco")
     p_validate.set_defaults(func=cmd_validate)
     
+    # build - Compilar el C++ generado
+    p_build = subparsers.add_parser("build", help="Compilar el C++ generado (con caché de objetos)")
+    p_build.add_argument("-d", "--dir", required=True, help="Directorio con los .cpp generados")
+    p_build.add_argument("-o", "--obj-dir", help="Destino de los .o (defecto: <dir>/obj)")
+    p_build.add_argument("-j", "--jobs", type=int, default=None, help="Compilaciones simultáneas")
+    p_build.add_argument("--cxx", help="Compilador (defecto: build.cxx, $CXX, clang++ o g++)")
+    p_build.add_argument("--flags", help="Flags del compilador (defecto: build.cxxflags)")
+    p_build.add_argument("--no-cache", action="store_true", help="Compilar todo sin usar la caché")
+    p_build.add_argument("--top", type=int, default=5, help="Unidades más lentas a mostrar")
+    p_build.set_defaults(func=cmd_build)
+    
     args = parser.parse_args()
     
-    if not args.command:
+    if not args.command or not hasattr(args, "func"):
         parser.print_help()
         sys.exit(1)
     
@@ -6,7 +6,9 @@ from .analyser import analyse_xex
 from .cleaner_xex import clean_xex
 from .toml_generator import generate_project_toml, validate_project_toml
 from .pipeline import full_pipeline, find_main_xex, PipelineResult
-from .database import GameDatabase, Game, GameStatus
+from .database import GameDatabase, Game, GameStatus, GameEvent
+from .game_cache import GameCache
+from .async_database import AsyncGameDatabase
 from .shader_recomp import run_recompilation, RecompResult, validate_recomp_output, check_xenon_recomp_available
 from .game_profiles import GameProfile, ProfileManager
 from .logger import get_logger, setup_logging, add_gui_handler, GUILogHandler
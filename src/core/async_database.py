@@ -0,0 +1,283 @@
+# core/async_database.py
+"""
+Fachada asíncrona de GameDatabase para pipelines con asyncio.
+
+Las consultas nunca bloquean el event loop:
+- Las escrituras van a un hilo escritor dedicado que agrupa las de
+  muchas corrutinas en un solo commit (group commit).
+- Las lecturas se reparten en un pool pequeño de hilos lectores, cada
+  uno con su propia conexión (WAL permite leer mientras se escribe).
+"""
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, List, Optional
+
+from core.database import GameDatabase, Game, GameStatus
+
+
+# Métodos de GameDatabase expuestos como corrutinas
+READ_METHODS = frozenset({
+    "get_game", "get_by_title_id", "list_games", "search", "count",
+    "status_counts", "get_events", "state_durations", "time_between",
+    "throughput_per_day", "failure_rate_by_tool",
+})
+
+WRITE_METHODS = frozenset({
+    "add_game", "add_or_update_game", "update_game", "update_status",
+    "delete_game", "record_event",
+})
+
+
+class AsyncGameDatabase:
+    """
+    Acceso asíncrono a la base de datos de juegos.
+    
+    Uso:
+        async with AsyncGameDatabase() as adb:
+            game_id = await adb.add_game(Game(title_id="12345678", game_name="X"))
+            game = await adb.get_game(game_id)
+            
+            async for game in adb.iter_games(status=GameStatus.ANALYSED):
+                print(game.game_name)
+    
+    Todos los métodos de READ_METHODS y WRITE_METHODS de GameDatabase
+    están disponibles con la misma firma, pero hay que usar await.
+    """
+    
+    def __init__(
+        self,
+        db_path: str = None,
+        readers: int = 2,
+        flush_latency: float = 0.005,
+        max_batch: int = 256
+    ):
+        """
+        :param db_path: Ruta a la BD (None = ruta por defecto)
+        :param readers: Hilos lectores (con ":memory:" se lee desde el escritor)
+        :param flush_latency: Segundos que el escritor espera a juntar más escrituras
+        :param max_batch: Máximo de escrituras por commit
+        """
+        self.flush_latency = flush_latency
+        self.max_batch = max_batch
+        
+        # Contadores para observar el group commit
+        self.writes = 0
+        self.commits = 0
+        
+        # El escritor abre la BD primero: aplica migraciones y activa WAL
+        self._writer_db = GameDatabase(db_path)
+        self.db_path = self._writer_db.db_path
+        self._in_memory = self.db_path == ":memory:"
+        if not self._in_memory:
+            self._writer_db.conn.execute("PRAGMA journal_mode=WAL")
+        
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="db-writer", daemon=True
+        )
+        self._writer.start()
+        
+        self._reader_local = threading.local()
+        self._reader_dbs: List[GameDatabase] = []
+        self._reader_lock = threading.Lock()
+        self._readers: Optional[ThreadPoolExecutor] = None
+        if readers > 0 and not self._in_memory:
+            self._readers = ThreadPoolExecutor(
+                max_workers=readers, thread_name_prefix="db-reader"
+            )
+        
+        self._closed = False
+    
+    # ══════════════════════════════════════════════════════════════
+    # API pública
+    # ══════════════════════════════════════════════════════════════
+    
+    def __getattr__(self, name: str):
+        if name in READ_METHODS:
+            async def read_method(*args, **kwargs):
+                return await self.run_read(
+                    lambda db: getattr(db, name)(*args, **kwargs)
+                )
+            return read_method
+        if name in WRITE_METHODS:
+            async def write_method(*args, **kwargs):
+                return await self.run_write(
+                    lambda db: getattr(db, name)(*args, **kwargs)
+                )
+            return write_method
+        raise AttributeError(name)
+    
+    async def run_read(self, fn: Callable[[GameDatabase], Any]) -> Any:
+        """Ejecuta fn(db) en un hilo lector y espera su resultado."""
+        self._check_open()
+        if self._readers is None:
+            return await self.run_write(fn)
+        return await asyncio.wrap_future(
+            self._readers.submit(lambda: fn(self._reader_db()))
+        )
+    
+    async def run_write(self, fn: Callable[[GameDatabase], Any]) -> Any:
+        """
+        Ejecuta fn(db) en el hilo escritor.
+        
+        El resultado se entrega después del commit del grupo en el que
+        se incluyó la escritura.
+        """
+        self._check_open()
+        future: Future = Future()
+        self._queue.put((fn, future))
+        return await asyncio.wrap_future(future)
+    
+    async def iter_games(
+        self,
+        status: GameStatus = None,
+        chunk_size: int = 500
+    ) -> AsyncIterator[Game]:
+        """
+        Recorre los juegos por bloques sin cargar todo el resultado.
+        
+        Cada bloque es una consulta independiente por id (keyset), así
+        que no retiene un cursor abierto entre iteraciones.
+        """
+        last_id = 0
+        while True:
+            chunk = await self.run_read(
+                lambda db, after=last_id: _fetch_chunk(db, status, after, chunk_size)
+            )
+            for game in chunk:
+                yield game
+            if len(chunk) < chunk_size:
+                break
+            last_id = chunk[-1].id
+    
+    async def flush(self):
+        """Espera a que se confirmen todas las escrituras encoladas."""
+        await self.run_write(lambda db: None)
+    
+    async def close(self):
+        """Confirma lo pendiente, detiene los hilos y cierra las conexiones."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        await asyncio.get_running_loop().run_in_executor(None, self._shutdown)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+    
+    # ══════════════════════════════════════════════════════════════
+    # Hilos
+    # ══════════════════════════════════════════════════════════════
+    
+    def _check_open(self):
+        if self._closed:
+            raise RuntimeError("AsyncGameDatabase está cerrada")
+    
+    def _reader_db(self) -> GameDatabase:
+        """Conexión propia del hilo lector actual."""
+        db = getattr(self._reader_local, "db", None)
+        if db is None:
+            db = GameDatabase(self.db_path)
+            self._reader_local.db = db
+            with self._reader_lock:
+                self._reader_dbs.append(db)
+        return db
+    
+    def _collect_batch(self, first: tuple) -> tuple[list, bool]:
+        """Junta escrituras hasta flush_latency o max_batch."""
+        ops = [first]
+        stop = False
+        deadline = time.monotonic() + self.flush_latency
+        while len(ops) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            ops.append(item)
+        return ops, stop
+    
+    def _writer_loop(self):
+        db = self._writer_db
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            ops, stop = self._collect_batch(first)
+            self._apply_batch(db, ops)
+            if stop:
+                break
+        
+        # Escrituras que llegaron después del cierre
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[1].set_exception(RuntimeError("AsyncGameDatabase está cerrada"))
+    
+    def _apply_batch(self, db: GameDatabase, ops: list):
+        """Aplica un grupo de escrituras con un solo commit."""
+        # Descartar las escrituras cuya corrutina ya fue cancelada
+        ops = [(fn, future) for fn, future in ops if future.set_running_or_notify_cancel()]
+        if not ops:
+            return
+        
+        results = []
+        try:
+            with db.batch():
+                for fn, future in ops:
+                    # Cada escritura en su savepoint: un fallo no tumba al resto
+                    db.conn.execute("SAVEPOINT async_write")
+                    try:
+                        results.append((future, fn(db), None))
+                        db.conn.execute("RELEASE async_write")
+                    except Exception as e:
+                        db.conn.execute("ROLLBACK TO async_write")
+                        db.conn.execute("RELEASE async_write")
+                        results.append((future, None, e))
+        except Exception as e:
+            for _fn, future in ops:
+                future.set_exception(e)
+            return
+        
+        self.writes += len(ops)
+        self.commits += 1
+        for future, value, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+    
+    def _shutdown(self):
+        self._writer.join()
+        if self._readers is not None:
+            self._readers.shutdown(wait=True)
+        for db in self._reader_dbs:
+            db.close()
+        self._writer_db.close()
+
+
+def _fetch_chunk(db: GameDatabase, status: Optional[GameStatus], after_id: int, limit: int) -> List[Game]:
+    """Lee el siguiente bloque de juegos con id > after_id."""
+    if status:
+        cursor, map_row = db._select_games(
+            "SELECT * FROM games WHERE status = ? AND id > ? ORDER BY id LIMIT ?",
+            (status.value, after_id, limit)
+        )
+    else:
+        cursor, map_row = db._select_games(
+            "SELECT * FROM games WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit)
+        )
+    return [map_row(row) for row in cursor.fetchall()]
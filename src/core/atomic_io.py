@@ -0,0 +1,246 @@
+# core/atomic_io.py
+"""
+Escrituras atómicas de metadatos y coalescencia write-behind.
+
+- atomic_write_*: escribe en un temporal del mismo directorio y lo
+  renombra con os.replace. Un corte a mitad deja el archivo anterior
+  intacto, nunca uno truncado.
+- Política de fsync (storage.fsync):
+    "none" → sin fsync (lo más rápido; el SO decide cuándo persistir)
+    "file" → fsync del temporal antes de renombrar (por defecto)
+    "full" → además fsync del directorio tras renombrar (sobrevive a un
+             corte de luz también el rename)
+- write_behind(): dentro del bloque, las escrituras con write_coalesced()
+  se acumulan y cada archivo se escribe como mucho una vez por intervalo
+  (la última versión gana). Al salir del bloque más externo se vuelca todo.
+"""
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from core.settings import get_setting
+
+# Intervalo de volcado del write-behind
+DEFAULT_FLUSH_INTERVAL_S = 1.0
+
+
+class FsyncPolicy(str, Enum):
+    """Cuánto esperar a que los datos lleguen al disco."""
+    NONE = "none"
+    FILE = "file"
+    FULL = "full"
+
+
+def default_fsync_policy() -> FsyncPolicy:
+    """Política configurada en storage.fsync ("file" si no es válida)."""
+    try:
+        return FsyncPolicy(get_setting("storage.fsync", FsyncPolicy.FILE.value))
+    except ValueError:
+        return FsyncPolicy.FILE
+
+
+def _fsync_dir(path: Path):
+    # Windows no permite abrir directorios: el rename ya es durable allí
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path, data: bytes, fsync: Optional[FsyncPolicy] = None):
+    """
+    Escribe un archivo de forma atómica (temporal + os.replace).
+    
+    :param path: Destino
+    :param data: Contenido
+    :param fsync: Política (None = storage.fsync)
+    """
+    path = Path(path)
+    policy = FsyncPolicy(fsync) if fsync is not None else default_fsync_policy()
+    # Temporal único por hilo: dos escritores no se pisan el temporal
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            if policy != FsyncPolicy.NONE:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if policy == FsyncPolicy.FULL:
+        _fsync_dir(path.parent)
+
+
+def atomic_write_text(path, text: str, encoding: str = "utf-8", fsync: Optional[FsyncPolicy] = None):
+    """Como atomic_write_bytes() para texto."""
+    atomic_write_bytes(path, text.encode(encoding), fsync=fsync)
+
+
+def atomic_write_json(path, data, indent: Optional[int] = 2, fsync: Optional[FsyncPolicy] = None):
+    """Serializa a JSON (UTF-8) y lo escribe de forma atómica."""
+    atomic_write_text(path, json.dumps(data, indent=indent, ensure_ascii=False), fsync=fsync)
+
+
+# ══════════════════════════════════════════════════════════════════
+# Write-behind
+# ══════════════════════════════════════════════════════════════════
+
+@dataclass
+class _Pending:
+    data: bytes
+    fsync: Optional[FsyncPolicy]
+    on_written: List[Callable[[], None]] = field(default_factory=list)
+
+
+class WriteCoalescer:
+    """
+    Acumula escrituras por archivo y las vuelca periódicamente.
+    
+    Thread-safe. Las lecturas deben consultar pending() para ver la
+    versión aún no escrita.
+    """
+    
+    def __init__(self, interval: float = DEFAULT_FLUSH_INTERVAL_S):
+        self.interval = interval
+        self.writes = 0      # Escrituras reales a disco
+        self.coalesced = 0   # Escrituras ahorradas (sustituidas por una posterior)
+        self._pending: Dict[str, _Pending] = {}
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._active = 0
+    
+    @property
+    def active(self) -> bool:
+        """True dentro de algún bloque batch()."""
+        return self._active > 0
+    
+    def submit(
+        self,
+        path,
+        data: bytes,
+        fsync: Optional[FsyncPolicy] = None,
+        on_written: Optional[Callable[[], None]] = None
+    ):
+        """
+        Encola (o escribe ya, fuera de un batch) el contenido de un archivo.
+        
+        :param on_written: Callback tras escribirlo de verdad a disco
+        """
+        key = os.path.abspath(path)
+        with self._lock:
+            if not self._active:
+                self._pending.pop(key, None)  # Lo inmediato sustituye a lo encolado
+                self._write(key, _Pending(data, fsync, [on_written] if on_written else []))
+                return
+            previous = self._pending.get(key)
+            entry = _Pending(data, fsync)
+            if previous is not None:
+                self.coalesced += 1
+                entry.on_written = previous.on_written
+            if on_written:
+                entry.on_written.append(on_written)
+            self._pending[key] = entry
+            if self._timer is None:
+                self._timer = threading.Timer(self.interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    def pending(self, path) -> Optional[bytes]:
+        """Contenido encolado y aún no escrito de un archivo."""
+        with self._lock:
+            entry = self._pending.get(os.path.abspath(path))
+            return entry.data if entry else None
+    
+    def flush(self, path=None):
+        """
+        Vuelca lo encolado a disco.
+        
+        :param path: Solo este archivo (None = todos)
+        """
+        with self._lock:
+            if path is not None:
+                key = os.path.abspath(path)
+                entries = {key: self._pending.pop(key)} if key in self._pending else {}
+            else:
+                entries, self._pending = self._pending, {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            for key, entry in entries.items():
+                self._write(key, entry)
+    
+    def _write(self, key: str, entry: _Pending):
+        atomic_write_bytes(key, entry.data, fsync=entry.fsync)
+        self.writes += 1
+        for callback in entry.on_written:
+            callback()
+    
+    @contextmanager
+    def batch(self):
+        """Bloque write-behind (anidable); al salir del más externo se vuelca todo."""
+        with self._lock:
+            self._active += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._active -= 1
+                if not self._active:
+                    self.flush()
+
+
+_coalescer = WriteCoalescer()
+atexit.register(_coalescer.flush)
+
+
+def get_coalescer() -> WriteCoalescer:
+    """Coalescedor compartido del proceso."""
+    return _coalescer
+
+
+def write_behind():
+    """
+    Agrupa las escrituras de metadatos (info.json, notes.md...) del bloque.
+        
+        with write_behind():
+            for step in pipeline:
+                workspace.save_info(info)   # Una sola escritura por intervalo
+    """
+    return _coalescer.batch()
+
+
+def write_coalesced(
+    path,
+    content: Union[str, bytes],
+    fsync: Optional[FsyncPolicy] = None,
+    on_written: Optional[Callable[[], None]] = None
+):
+    """Escritura atómica, diferida si hay un write_behind() activo."""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    _coalescer.submit(path, data, fsync=fsync, on_written=on_written)
+
+
+def read_text(path, encoding: str = "utf-8") -> str:
+    """Lee un archivo viendo también la versión encolada y aún no escrita."""
+    pending = _coalescer.pending(path)
+    if pending is not None:
+        return pending.decode(encoding)
+    with open(path, "r", encoding=encoding) as f:
+        return f.read()
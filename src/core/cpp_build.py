@@ -0,0 +1,446 @@
+# core/cpp_build.py
+"""
+Compilación en paralelo del C++ generado por XenonRecomp.
+
+run_recompilation() deja miles de .cpp en output_dir. Este módulo los
+compila a objetos (.o) con el gcc/clang local:
+
+- Un compilador por unidad de traducción, hasta `jobs` a la vez
+- Caché de objetos por contenido (como ccache) en
+  ~/.mrmonkeyshopware/cpp_cache. La clave combina el compilador (ruta y
+  --version), los flags, el hash del .cpp, el de ppc_context.h y el de los
+  headers generados, así que solo se recompilan las unidades que cambiaron
+- Tiempo por archivo y las unidades más lentas en build_report.json
+
+Los hashes de los .cpp y headers salen del manifiesto de salida
+(.recomp_output.json) cuando su tamaño y mtime siguen coincidiendo. El
+enlazado no se hace aquí: depende del runtime de cada port.
+"""
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from hashlib import blake2b
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.atomic_io import atomic_write_json
+from core.config import PPC_CONTEXT_PATH
+from core.recomp_manifest import load_output_manifest, scan_generated_files
+from core.settings import get_setting
+from core.workspace_manifest import hash_algorithm, hash_file
+
+OBJ_DIRNAME = "obj"
+BUILD_REPORT_FILE = "build_report.json"
+
+DEFAULT_CXXFLAGS = "-O2 -std=c++20"
+DEFAULT_CACHE_MAX_MB = 4096
+
+# Versión del formato de la clave (cambiarla invalida toda la caché)
+_KEY_VERSION = "1"
+
+# Cola de stderr que se guarda de una unidad que falla
+_ERROR_TAIL = 2000
+
+
+def default_cache_dir() -> Path:
+    """~/.mrmonkeyshopware/cpp_cache"""
+    return Path.home() / ".mrmonkeyshopware" / "cpp_cache"
+
+
+def find_compiler() -> Optional[str]:
+    """
+    Compilador C++: build.cxx, $CXX, clang++ o g++ (en ese orden).
+    
+    :return: Ruta al compilador o None si no hay ninguno
+    """
+    for candidate in (get_setting("build.cxx", ""), os.environ.get("CXX"), "clang++", "g++"):
+        if candidate:
+            path = shutil.which(candidate)
+            if path:
+                return path
+    return None
+
+
+def compiler_identity(cxx: str) -> str:
+    """Ruta y salida de --version (otra versión del compilador genera otro código)."""
+    try:
+        result = subprocess.run([cxx, "--version"], capture_output=True, text=True, timeout=30)
+        version = result.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        version = "unknown"
+    return f"{os.path.realpath(cxx)}\n{version}"
+
+
+@dataclass
+class UnitResult:
+    """Resultado de compilar un .cpp."""
+    source: str                  # Relativo a output_dir, con "/"
+    object_path: str
+    seconds: float = 0.0
+    cached: bool = False
+    success: bool = True
+    error: Optional[str] = None  # Cola de stderr si falló
+
+
+@dataclass
+class BuildResult:
+    """Resultado de build_objects()."""
+    units: List[UnitResult] = field(default_factory=list)
+    obj_dir: Optional[str] = None
+    jobs: int = 1
+    wall_seconds: float = 0.0
+    error: Optional[str] = None  # Error global (sin compilador, sin fuentes...)
+    
+    @property
+    def success(self) -> bool:
+        return self.error is None and all(u.success for u in self.units)
+    
+    @property
+    def compiled(self) -> List[UnitResult]:
+        return [u for u in self.units if u.success and not u.cached]
+    
+    @property
+    def cached(self) -> List[UnitResult]:
+        return [u for u in self.units if u.cached]
+    
+    @property
+    def failed(self) -> List[UnitResult]:
+        return [u for u in self.units if not u.success]
+    
+    @property
+    def compile_seconds(self) -> float:
+        """Suma de los tiempos de compilación (sin contar la caché)."""
+        return sum(u.seconds for u in self.units if not u.cached)
+    
+    def slowest(self, n: int = 10) -> List[UnitResult]:
+        """Unidades compiladas más lentas."""
+        units = [u for u in self.units if u.success and not u.cached]
+        return sorted(units, key=lambda u: u.seconds, reverse=True)[:n]
+
+
+class ObjectCache:
+    """
+    Caché de objetos compilados: <root>/<aa>/<clave>.o
+    
+    Los objetos se comparten con obj/ por hardlink (o copia si el sistema de
+    archivos no lo permite) y son de solo lectura. Un acierto actualiza el
+    mtime, que prune() usa como orden LRU.
+    """
+    
+    def __init__(self, root: Path = None):
+        self.root = Path(root) if root else default_cache_dir()
+        self.hits = 0
+        self.misses = 0
+    
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.o"
+    
+    def fetch(self, key: str, dst: str) -> bool:
+        """Coloca el objeto de la clave en dst. False si no está en caché."""
+        src = self.path_for(key)
+        try:
+            os.utime(src)
+        except OSError:
+            self.misses += 1
+            return False
+        _place(str(src), dst)
+        self.hits += 1
+        return True
+    
+    def store(self, key: str, obj_path: str):
+        """Añade un objeto recién compilado (no falla si no se puede)."""
+        dst = self.path_for(key)
+        tmp = dst.with_name(f".{dst.name}.{_tmp_suffix()}.tmp")
+        try:
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            _place(obj_path, str(tmp))
+            os.chmod(tmp, 0o444)
+            os.replace(tmp, dst)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+    
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self.root.glob("*/*.o"))
+    
+    def prune(self, max_bytes: int) -> int:
+        """
+        Borra los objetos usados hace más tiempo hasta quedar en max_bytes.
+        
+        :return: Objetos borrados
+        """
+        entries = []
+        for path in self.root.glob("*/*.o"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+
+def _tmp_suffix() -> str:
+    # Dos unidades con el mismo contenido comparten clave: el temporal es por hilo
+    return f"{os.getpid()}.{threading.get_ident()}"
+
+
+def _place(src: str, dst: str):
+    """Hardlink de src en dst (copia si no se puede), reemplazando dst."""
+    try:
+        if os.path.samefile(src, dst):
+            return  # Ya enlazado (rename entre dos enlaces al mismo inodo no hace nada)
+    except OSError:
+        pass
+    tmp = f"{dst}.{_tmp_suffix()}.link"
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+
+def _digest(*parts: str) -> str:
+    hasher = blake2b(digest_size=20)
+    for part in parts:
+        hasher.update(part.encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+def _source_hashes(output_dir: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Hash de cada .cpp y header bajo output_dir.
+    
+    Reutiliza el hash del manifiesto de salida si el tamaño y mtime coinciden.
+    
+    :return: ({rel: hash} de los .cpp, {rel: hash} de los headers)
+    """
+    manifest = load_output_manifest(output_dir)
+    known = {}
+    if manifest is not None and manifest.algorithm == hash_algorithm():
+        known = {f.path: f for f in manifest.files}
+    sources, headers = {}, {}
+    for f in scan_generated_files(output_dir):
+        old = known.get(f.path)
+        if old is not None and old.hash and (old.size, old.mtime_ns) == (f.size, f.mtime_ns):
+            digest = old.hash
+        else:
+            digest = hash_file(os.path.join(output_dir, f.path))
+        (sources if f.is_source else headers)[f.path] = digest
+    return sources, headers
+
+
+def _compile_unit(
+    cxx: str,
+    flags: List[str],
+    output_dir: str,
+    rel: str,
+    obj_path: str,
+    key: str,
+    cache: Optional[ObjectCache]
+) -> UnitResult:
+    if cache is not None and cache.fetch(key, obj_path):
+        return UnitResult(source=rel, object_path=obj_path, cached=True)
+    
+    os.makedirs(os.path.dirname(obj_path), exist_ok=True)
+    tmp = f"{obj_path}.{_tmp_suffix()}.tmp"
+    cmd = [cxx, *flags, "-c", os.path.join(output_dir, rel), "-o", tmp]
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(cmd, cwd=output_dir, capture_output=True, text=True, errors="replace")
+    except OSError as e:
+        return UnitResult(source=rel, object_path=obj_path, success=False, error=str(e))
+    seconds = time.perf_counter() - start
+    
+    if proc.returncode != 0:
+        # Ni el temporal ni el objeto de una compilación anterior: no debe enlazarse
+        for path in (tmp, obj_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return UnitResult(source=rel, object_path=obj_path, seconds=seconds, success=False,
+                          error=(proc.stderr or proc.stdout)[-_ERROR_TAIL:])
+    os.replace(tmp, obj_path)
+    if cache is not None:
+        cache.store(key, obj_path)
+    return UnitResult(source=rel, object_path=obj_path, seconds=seconds)
+
+
+def build_objects(
+    output_dir: str,
+    obj_dir: str = None,
+    cxx: str = None,
+    cxxflags: str = None,
+    jobs: int = None,
+    cache: Optional[ObjectCache] = None,
+    use_cache: bool = True,
+    ppc_context: str = None,
+    log: Callable[[str], None] = None
+) -> BuildResult:
+    """
+    Compila todos los .cpp de una salida de XenonRecomp.
+    
+    :param output_dir: Directorio con los .cpp generados
+    :param obj_dir: Destino de los .o (default: output_dir/obj)
+    :param cxx: Compilador (default: find_compiler())
+    :param cxxflags: Flags (default: build.cxxflags)
+    :param jobs: Compilaciones simultáneas (default: build.jobs o núcleos)
+    :param cache: Caché de objetos (default: ~/.mrmonkeyshopware/cpp_cache)
+    :param use_cache: False = compilar todo sin leer ni escribir la caché
+    :param ppc_context: ppc_context.h (default: PPC_CONTEXT_PATH)
+    :param log: Función de logging
+    :return: BuildResult con el tiempo de cada unidad
+    """
+    start = time.perf_counter()
+    output_dir = os.path.abspath(output_dir)
+    obj_dir = os.path.abspath(obj_dir or os.path.join(output_dir, OBJ_DIRNAME))
+    jobs = jobs or int(get_setting("build.jobs", 0) or 0) or (os.cpu_count() or 1)
+    result = BuildResult(obj_dir=obj_dir, jobs=jobs)
+    
+    cxx = cxx or find_compiler()
+    if not cxx:
+        result.error = "No se encontró compilador C++ (build.cxx, $CXX, clang++ o g++)"
+        if log:
+            log(f"❌ {result.error}")
+        return result
+    if not os.path.isdir(output_dir):
+        result.error = f"Directorio no existe: {output_dir}"
+        if log:
+            log(f"❌ {result.error}")
+        return result
+    
+    ppc_context = ppc_context or PPC_CONTEXT_PATH
+    flags = shlex.split(cxxflags if cxxflags is not None else get_setting("build.cxxflags", DEFAULT_CXXFLAGS))
+    flags += ["-I", output_dir]
+    context_hash = ""
+    if os.path.isfile(ppc_context):
+        flags += ["-I", os.path.dirname(os.path.abspath(ppc_context))]
+        context_hash = hash_file(ppc_context)
+    elif log:
+        log(f"⚠️ PPC Context no encontrado: {ppc_context}")
+    
+    sources, headers = _source_hashes(output_dir)
+    if not sources:
+        result.error = f"No hay archivos .cpp en {output_dir}"
+        if log:
+            log(f"❌ {result.error}")
+        return result
+    
+    # Todo lo que comparten las unidades: si cambia, cambian todas las claves
+    common = _digest(
+        _KEY_VERSION, compiler_identity(cxx), shlex.join(flags), context_hash,
+        *(f"{rel}={digest}" for rel, digest in sorted(headers.items()))
+    )
+    if use_cache:
+        cache = cache or ObjectCache()
+    
+    if log:
+        log(f"🔨 Compilando {len(sources)} unidades con {os.path.basename(cxx)} ({jobs} en paralelo)...")
+    
+    done = 0
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="cpp-build") as pool:
+        futures = [
+            pool.submit(
+                _compile_unit, cxx, flags, output_dir, rel,
+                os.path.join(obj_dir, os.path.splitext(rel)[0] + ".o"),
+                _digest(common, digest), cache if use_cache else None
+            )
+            for rel, digest in sorted(sources.items())
+        ]
+        for future in as_completed(futures):
+            unit = future.result()
+            result.units.append(unit)
+            done += 1
+            if log and not unit.success:
+                log(f"❌ {unit.source}: {_first_error(unit.error)}")
+            elif log and done % 500 == 0:
+                log(f"   {done}/{len(sources)}...")
+    
+    result.units.sort(key=lambda u: u.source)
+    result.wall_seconds = time.perf_counter() - start
+    _remove_stale_objects(obj_dir, {u.object_path for u in result.units})
+    
+    if use_cache:
+        max_mb = int(get_setting("build.cache_max_mb", DEFAULT_CACHE_MAX_MB) or 0)
+        if max_mb:
+            cache.prune(max_mb * 1024 * 1024)
+    
+    _write_report(result, cxx, flags)
+    if log:
+        log(f"📊 {len(result.compiled)} compiladas, ⚡ {len(result.cached)} de caché, "
+            f"❌ {len(result.failed)} fallidas en {result.wall_seconds:.1f}s")
+    return result
+
+
+def _first_error(stderr: Optional[str]) -> str:
+    """Primera línea con "error" de la salida del compilador."""
+    lines = (stderr or "").strip().splitlines()
+    for line in lines:
+        if "error" in line:
+            return line.strip()
+    return lines[-1].strip() if lines else "error"
+
+
+def _remove_stale_objects(obj_dir: str, expected: set):
+    """
+    Borra los .o de fuentes que ya no existen (para que no acaben enlazados).
+    
+    Solo los que generó el build anterior según su build_report.json: obj_dir
+    puede ser un directorio del usuario con otros objetos.
+    """
+    try:
+        with open(os.path.join(obj_dir, BUILD_REPORT_FILE), "r", encoding="utf-8") as f:
+            units = json.load(f).get("units", [])
+    except (OSError, ValueError, AttributeError):
+        return
+    for unit in units:
+        source = unit.get("source") if isinstance(unit, dict) else None
+        if not source:
+            continue
+        path = os.path.normpath(os.path.join(obj_dir, os.path.splitext(source)[0] + ".o"))
+        if path not in expected and os.path.commonpath([obj_dir, path]) == obj_dir:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _write_report(result: BuildResult, cxx: str, flags: List[str]):
+    """Guarda obj_dir/build_report.json con el tiempo de cada unidad."""
+    try:
+        os.makedirs(result.obj_dir, exist_ok=True)
+        atomic_write_json(os.path.join(result.obj_dir, BUILD_REPORT_FILE), {
+            "created": time.time(),
+            "compiler": cxx,
+            "flags": flags,
+            "jobs": result.jobs,
+            "wall_seconds": round(result.wall_seconds, 3),
+            "compile_seconds": round(result.compile_seconds, 3),
+            "units": [
+                {"source": u.source, "seconds": round(u.seconds, 3), "cached": u.cached,
+                 "success": u.success}
+                for u in result.units
+            ],
+        }, indent=1)
+    except OSError:
+        pass
@@ -2,14 +2,18 @@
 """
 Base de datos SQLite para gestión de juegos procesados.
 """
+import json
 import sqlite3
-from dataclasses import dataclass, field
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple, Iterable, Iterator, Callable
 from enum import Enum
 from pathlib import Path
 import os
 
+from core.game_cache import GameCache, DEFAULT_CACHE_SIZE, get_shared_cache
+
 
 class GameStatus(Enum):
     """Estados posibles de un juego en el pipeline."""
@@ -22,9 +26,15 @@ class GameStatus(Enum):
     FAILED = "failed"
 
 
-@dataclass
+@dataclass(slots=True)
 class Game:
-    """Representa un juego en la base de datos."""
+    """
+    Representa un juego en la base de datos.
+    
+    Usa __slots__ para ocupar menos memoria por juego cargado. Al leer de
+    la BD, created_at/updated_at guardan el texto de SQLite y se convierten
+    a datetime la primera vez que se consultan.
+    """
     id: Optional[int] = None
     title_id: str = ""
     game_name: str = ""
@@ -47,6 +57,111 @@ class Game:
     entry_point: Optional[str] = None
     original_pe_name: Optional[str] = None
     xex_info_json: Optional[str] = None  # JSON completo de XexInfo
+    
+    def __copy__(self) -> "Game":
+        # Copia los slots en crudo: no fuerza el parseo de las fechas
+        clone = object.__new__(Game)
+        for slot in _GAME_SLOTS:
+            slot.__set__(clone, slot.__get__(self))
+        return clone
+
+
+class _LazyDatetime:
+    """Descriptor que convierte a datetime el texto guardado en un slot al leerlo."""
+    
+    __slots__ = ("slot",)
+    
+    def __init__(self, slot):
+        self.slot = slot  # Descriptor original del slot
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return None  # Valor por defecto para dataclasses.fields()
+        value = self.slot.__get__(obj)
+        if value.__class__ is str:
+            value = datetime.fromisoformat(value)
+            self.slot.__set__(obj, value)
+        return value
+    
+    def __set__(self, obj, value):
+        self.slot.__set__(obj, value)
+
+
+_GAME_SLOTS = tuple(Game.__dict__[f.name] for f in fields(Game))
+Game.created_at = _LazyDatetime(Game.__dict__["created_at"])
+Game.updated_at = _LazyDatetime(Game.__dict__["updated_at"])
+
+# Lookup directo en vez de GameStatus(value) por fila
+_STATUS_BY_VALUE = {status.value: status for status in GameStatus}
+
+# Conversión por columna al construir un Game desde una fila
+_COLUMN_EXPRESSIONS = {
+    "title_id": "row[{i}] or ''",
+    "status": "_status[row[{i}]]",
+    "created_at": "row[{i}] or None",
+    "updated_at": "row[{i}] or None",
+    "disc_number": "row[{i}] or 1",
+    "total_discs": "row[{i}] or 1",
+}
+
+_row_mappers: Dict[Tuple[str, ...], Callable[[tuple], Game]] = {}
+
+
+def _row_mapper(columns: Tuple[str, ...]) -> Callable[[tuple], Game]:
+    """
+    Retorna una función fila → Game compilada para un orden de columnas.
+    
+    Se genera una vez por lista de columnas (cursor.description) con los
+    índices fijos, sin búsquedas por nombre ni try/except por fila. Las
+    columnas que falten (BD antiguas) toman el valor por defecto de Game.
+    
+    :param columns: Nombres de columna en el orden de la consulta
+    :return: Función que recibe una tupla y retorna un Game
+    """
+    mapper = _row_mappers.get(columns)
+    if mapper is not None:
+        return mapper
+    
+    index = {name: i for i, name in enumerate(columns)}
+    args = []
+    for f in fields(Game):
+        if f.name in index:
+            expression = _COLUMN_EXPRESSIONS.get(f.name, "row[{i}]")
+            args.append(expression.format(i=index[f.name]))
+        else:
+            args.append(repr(f.default) if f.name != "status" else "_default_status")
+    
+    source = f"def map_row(row):\n    return _new({', '.join(args)})\n"
+    namespace = {
+        "_new": Game,
+        "_status": _STATUS_BY_VALUE,
+        "_default_status": GameStatus.PENDING,
+    }
+    exec(source, namespace)
+    mapper = namespace["map_row"]
+    _row_mappers[columns] = mapper
+    return mapper
+
+
+@dataclass
+class GameEvent:
+    """
+    Evento registrado en game_events (append-only).
+    
+    is_transition=False: el juego no cambió de status (ej: fallo del
+    pipeline que conserva el status real); no cuenta en las analíticas
+    de tiempos ni de llegadas.
+    """
+    id: int
+    game_id: int
+    from_status: Optional[GameStatus]
+    to_status: GameStatus
+    created_at: datetime
+    tool: Optional[str] = None
+    duration_s: Optional[float] = None
+    metrics: Optional[dict] = None
+    error: Optional[str] = None
+    is_transition: bool = True
 
 
 def _get_default_db_path() -> str:
@@ -57,6 +172,204 @@ def _get_default_db_path() -> str:
     return str(db_dir / "games.db")
 
 
+def _migration_base_schema(cursor: sqlite3.Cursor):
+    """v1: tabla games con metadata de XexTool e índices básicos."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS games (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title_id TEXT UNIQUE,
+            game_name TEXT NOT NULL,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            iso_path TEXT,
+            extracted_dir TEXT,
+            xex_path TEXT,
+            analysis_json TEXT,
+            project_toml TEXT,
+            notes TEXT,
+            media_id TEXT,
+            version TEXT,
+            disc_number INTEGER DEFAULT 1,
+            total_discs INTEGER DEFAULT 1,
+            regions TEXT,
+            esrb_rating TEXT,
+            entry_point TEXT,
+            original_pe_name TEXT,
+            xex_info_json TEXT
+        )
+    """)
+    
+    # BD anteriores a la metadata de XexTool: añadir solo lo que falte
+    existing = {row[1] for row in cursor.execute("PRAGMA table_info(games)").fetchall()}
+    metadata_columns = [
+        ("media_id", "TEXT"),
+        ("version", "TEXT"),
+        ("disc_number", "INTEGER DEFAULT 1"),
+        ("total_discs", "INTEGER DEFAULT 1"),
+        ("regions", "TEXT"),
+        ("esrb_rating", "TEXT"),
+        ("entry_point", "TEXT"),
+        ("original_pe_name", "TEXT"),
+        ("xex_info_json", "TEXT"),
+    ]
+    for column_name, column_type in metadata_columns:
+        if column_name not in existing:
+            cursor.execute(f"ALTER TABLE games ADD COLUMN {column_name} {column_type}")
+    
+    # Índices para búsquedas rápidas
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_status ON games(status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_title_id ON games(title_id)")
+
+
+def _migration_game_events(cursor: sqlite3.Cursor):
+    """v2: historial append-only de transiciones de status."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS game_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            game_id INTEGER NOT NULL,
+            from_status TEXT,
+            to_status TEXT NOT NULL,
+            created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
+            tool TEXT,
+            duration_s REAL,
+            metrics_json TEXT,
+            error TEXT
+        )
+    """)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_game_events_game ON game_events(game_id, id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_game_events_created ON game_events(created_at)"
+    )
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_game_events_no_update
+        BEFORE UPDATE ON game_events
+        BEGIN
+            SELECT RAISE(ABORT, 'game_events es append-only');
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_game_events_no_delete
+        BEFORE DELETE ON game_events
+        BEGIN
+            SELECT RAISE(ABORT, 'game_events es append-only');
+        END
+    """)
+    
+    # Los juegos existentes arrancan el historial en su status actual
+    cursor.execute("""
+        INSERT INTO game_events (game_id, from_status, to_status, created_at, tool)
+        SELECT id, NULL, status, COALESCE(updated_at, CURRENT_TIMESTAMP), 'migration'
+        FROM games
+    """)
+
+
+def _migration_maintenance_runs(cursor: sqlite3.Cursor):
+    """v3: registro de mantenimientos (backup, optimize, compactación)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS maintenance_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
+            actions TEXT NOT NULL,
+            size_before INTEGER,
+            size_after INTEGER,
+            fragmentation_before REAL,
+            fragmentation_after REAL,
+            duration_s REAL,
+            backup_path TEXT
+        )
+    """)
+
+
+def _migration_event_kind(cursor: sqlite3.Cursor):
+    """v4: game_events.is_transition para eventos que no cambian el status."""
+    cursor.execute(
+        "ALTER TABLE game_events ADD COLUMN is_transition INTEGER NOT NULL DEFAULT 1"
+    )
+    # Fallos ya registrados por el pipeline: el juego conservó su status
+    cursor.execute("DROP TRIGGER IF EXISTS trg_game_events_no_update")
+    cursor.execute("""
+        UPDATE game_events SET is_transition = 0
+        WHERE tool = 'pipeline' AND to_status = 'failed'
+    """)
+    cursor.execute("""
+        CREATE TRIGGER trg_game_events_no_update
+        BEFORE UPDATE ON game_events
+        BEGIN
+            SELECT RAISE(ABORT, 'game_events es append-only');
+        END
+    """)
+
+
+# Registro ordenado de migraciones: (versión, descripción, función)
+# Para cambiar el esquema añade una entrada nueva al final; nunca edites una existente.
+_MIGRATIONS = [
+    (1, "Esquema base con metadata de XexTool", _migration_base_schema),
+    (2, "Historial de transiciones game_events", _migration_game_events),
+    (3, "Registro de mantenimientos maintenance_runs", _migration_maintenance_runs),
+    (4, "Eventos sin transición en game_events", _migration_event_kind),
+]
+
+# Versión del esquema que espera este código (PRAGMA user_version)
+SCHEMA_VERSION = _MIGRATIONS[-1][0]
+
+_STATUS_VALUES = {status.value for status in GameStatus}
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil con interpolación lineal sobre una lista ya ordenada."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def _summarize(values: List[float], percentiles: Iterable[float]) -> Dict[str, float]:
+    """Resume una muestra de duraciones en count, mean y percentiles."""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    summary = {"count": len(ordered), "mean": sum(ordered) / len(ordered)}
+    for pct in percentiles:
+        summary[f"p{pct:g}"] = _percentile(ordered, pct)
+    return summary
+
+
+# Tabla de contadores por status mantenida con triggers (opcional)
+_STATS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS game_stats (
+        status TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    );
+    
+    CREATE TRIGGER IF NOT EXISTS trg_game_stats_insert
+    AFTER INSERT ON games
+    BEGIN
+        INSERT OR IGNORE INTO game_stats (status, count) VALUES (NEW.status, 0);
+        UPDATE game_stats SET count = count + 1 WHERE status = NEW.status;
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_game_stats_update
+    AFTER UPDATE OF status ON games
+    WHEN OLD.status IS NOT NEW.status
+    BEGIN
+        UPDATE game_stats SET count = count - 1 WHERE status = OLD.status;
+        INSERT OR IGNORE INTO game_stats (status, count) VALUES (NEW.status, 0);
+        UPDATE game_stats SET count = count + 1 WHERE status = NEW.status;
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_game_stats_delete
+    AFTER DELETE ON games
+    BEGIN
+        UPDATE game_stats SET count = count - 1 WHERE status = OLD.status;
+    END;
+"""
+
+
 class GameDatabase:
     """
     Gestor de base de datos de juegos.
@@ -72,119 +385,163 @@ class GameDatabase:
         games = db.list_games(status=GameStatus.COMPLETED)
     """
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, cache_size: int = DEFAULT_CACHE_SIZE):
         """
         Inicializa la conexión a la base de datos.
         
         :param db_path: Ruta a la BD. Si es None, usa ~/.mrmonkeyshopware/games.db
                         Usa ":memory:" para BD en memoria (tests)
+        :param cache_size: Entradas de la caché LRU de Game (0 la desactiva).
+                           Todas las instancias de una misma ruta comparten caché.
         """
         self.db_path = db_path or _get_default_db_path()
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        self.conn = self._connect()
+        self._stats_table: Optional[bool] = None
+        self._batch_depth = 0
+        self._pending_invalidations: List[Tuple[Optional[int], Optional[str]]] = []
+        self._data_version: Optional[int] = None
+        
+        if cache_size <= 0:
+            self.cache: Optional[GameCache] = None
+        elif self.db_path == ":memory:":
+            self.cache = GameCache(cache_size)
+        else:
+            self.cache = get_shared_cache(os.path.abspath(self.db_path), cache_size)
+        
         self._init_schema()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Abre una conexión nueva a db_path."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
     def _init_schema(self):
-        """Crea las tablas si no existen."""
+        """
+        Aplica las migraciones pendientes del esquema.
+        
+        Con el esquema al día solo cuesta leer PRAGMA user_version.
+        """
+        current = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if current < SCHEMA_VERSION:
+            self._run_migrations()
+    
+    def _run_migrations(self):
+        """Ejecuta en una sola transacción las migraciones con versión > user_version."""
         cursor = self.conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS games (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title_id TEXT UNIQUE,
-                game_name TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                iso_path TEXT,
-                extracted_dir TEXT,
-                xex_path TEXT,
-                analysis_json TEXT,
-                project_toml TEXT,
-                notes TEXT,
-                media_id TEXT,
-                version TEXT,
-                disc_number INTEGER DEFAULT 1,
-                total_discs INTEGER DEFAULT 1,
-                regions TEXT,
-                esrb_rating TEXT,
-                entry_point TEXT,
-                original_pe_name TEXT,
-                xex_info_json TEXT
-            )
-        """)
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            # Releer dentro del lock por si otro proceso ya migró
+            current = cursor.execute("PRAGMA user_version").fetchone()[0]
+            for version, _description, migrate in _MIGRATIONS:
+                if version > current:
+                    migrate(cursor)
+            cursor.execute(f"PRAGMA user_version = {max(current, SCHEMA_VERSION)}")
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+    
+    def _commit(self):
+        """Confirma la transacción salvo dentro de un batch()."""
+        if self._batch_depth == 0:
+            self.conn.commit()
+            self._flush_invalidations()
+    
+    def _invalidate(self, game_id: Optional[int] = None, title_id: Optional[str] = None):
+        """
+        Invalida un juego en la caché.
         
-        # Migración: añadir columnas nuevas si no existen
-        self._migrate_schema(cursor)
+        Se repite tras el commit para descartar lecturas concurrentes que
+        hayan visto la versión anterior a la escritura.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(game_id, title_id)
+            self._pending_invalidations.append((game_id, title_id))
+    
+    def _flush_invalidations(self):
+        if self.cache is not None:
+            for game_id, title_id in self._pending_invalidations:
+                self.cache.invalidate(game_id, title_id)
+        self._pending_invalidations.clear()
+    
+    def _sync_cache(self):
+        """
+        Vacía la caché si otra conexión modificó la BD.
         
-        # Crear índices para búsquedas rápidas
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_games_status ON games(status)
-        """)
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_games_title_id ON games(title_id)
-        """)
+        PRAGMA data_version cambia cuando otra conexión (de este u otro
+        proceso, ej: la CLI con la GUI abierta) confirma cambios; los commits
+        de esta conexión no lo alteran y ya invalidan sus entradas.
         
-        self.conn.commit()
+        El valor es propio de cada conexión y la caché compartida sobrevive a
+        las instancias: una instancia nueva no sabe qué se confirmó antes de
+        abrirse, así que en su primera consulta vacía la caché.
+        """
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self.cache.clear()
+        self._data_version = version
     
-    def _migrate_schema(self, cursor):
-        """Añade columnas nuevas para usuarios existentes."""
-        new_columns = [
-            ("media_id", "TEXT"),
-            ("version", "TEXT"),
-            ("disc_number", "INTEGER DEFAULT 1"),
-            ("total_discs", "INTEGER DEFAULT 1"),
-            ("regions", "TEXT"),
-            ("esrb_rating", "TEXT"),
-            ("entry_point", "TEXT"),
-            ("original_pe_name", "TEXT"),
-            ("xex_info_json", "TEXT"),
-        ]
+    def cache_stats(self) -> dict:
+        """Contadores de la caché de Game (hits, misses, hit_rate...)."""
+        return self.cache.stats() if self.cache is not None else {}
+    
+    @contextmanager
+    def batch(self):
+        """
+        Agrupa varias escrituras en una sola transacción.
         
-        for column_name, column_type in new_columns:
-            try:
-                cursor.execute(f"ALTER TABLE games ADD COLUMN {column_name} {column_type}")
-            except Exception:
-                pass  # Columna ya existe
+        Dentro del bloque los métodos de escritura no hacen commit; se
+        confirma todo al salir (o se hace rollback si hay excepción).
+        Los batch() anidados se integran en el más externo.
+        
+        Uso:
+            with db.batch():
+                for game in games:
+                    db.add_game(game)
+        """
+        if self._batch_depth == 0 and not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.conn.rollback()
+                self._pending_invalidations.clear()
+                if self.cache is not None:
+                    self.cache.clear()  # Pudo cachear datos no confirmados
+            raise
+        else:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.conn.commit()
+                self._flush_invalidations()
     
     def _row_to_game(self, row: sqlite3.Row) -> Game:
-        """Convierte una fila de SQLite a un objeto Game."""
-        # Helper para obtener campos que pueden no existir en BD antiguas
-        def get_field(name, default=None):
-            try:
-                return row[name]
-            except (IndexError, KeyError):
-                return default
-        
-        return Game(
-            id=row["id"],
-            title_id=row["title_id"] or "",
-            game_name=row["game_name"],
-            status=GameStatus(row["status"]),
-            created_at=datetime.fromisoformat(row["created_at"]) if row["created_at"] else None,
-            updated_at=datetime.fromisoformat(row["updated_at"]) if row["updated_at"] else None,
-            iso_path=row["iso_path"],
-            extracted_dir=row["extracted_dir"],
-            xex_path=row["xex_path"],
-            analysis_json=row["analysis_json"],
-            project_toml=row["project_toml"],
-            notes=row["notes"],
-            # Nuevos campos de metadata
-            media_id=get_field("media_id"),
-            version=get_field("version"),
-            disc_number=get_field("disc_number", 1) or 1,
-            total_discs=get_field("total_discs", 1) or 1,
-            regions=get_field("regions"),
-            esrb_rating=get_field("esrb_rating"),
-            entry_point=get_field("entry_point"),
-            original_pe_name=get_field("original_pe_name"),
-            xex_info_json=get_field("xex_info_json"),
-        )
+        """Convierte una fila de SQLite (sqlite3.Row) a un objeto Game."""
+        return _row_mapper(tuple(row.keys()))(tuple(row))
     
-    def add_game(self, game: Game) -> int:
+    def _select_games(self, sql: str, params: tuple = ()) -> Tuple[sqlite3.Cursor, Callable[[tuple], Game]]:
+        """
+        Ejecuta una consulta sobre games con filas como tuplas.
+        
+        :return: (cursor, función fila → Game para sus columnas)
+        """
+        cursor = self.conn.cursor()
+        cursor.row_factory = None  # Tuplas: más baratas que sqlite3.Row
+        cursor.execute(sql, params)
+        columns = tuple(col[0] for col in cursor.description)
+        return cursor, _row_mapper(columns)
+    
+    def add_game(self, game: Game, tool: str = None, metrics: dict = None) -> int:
         """
         Añade un juego a la base de datos.
         
         :param game: Objeto Game a insertar
+        :param tool: Herramienta/etapa que lo registra (para game_events)
+        :param metrics: Métricas de la etapa (ej: {"duration_s": 12.5})
         :return: ID del juego insertado
         :raises sqlite3.IntegrityError: Si el title_id ya existe
         """
@@ -217,14 +574,19 @@ class GameDatabase:
             game.original_pe_name,
             game.xex_info_json,
         ))
-        self.conn.commit()
-        return cursor.lastrowid
+        game_id = cursor.lastrowid
+        self._insert_event(cursor, game_id, None, game.status, tool, metrics)
+        self._invalidate(game_id, game.title_id)
+        self._commit()
+        return game_id
     
-    def add_or_update_game(self, game: Game) -> int:
+    def add_or_update_game(self, game: Game, tool: str = None, metrics: dict = None) -> int:
         """
         Añade un juego o actualiza si ya existe (por title_id).
         
         :param game: Objeto Game a insertar/actualizar
+        :param tool: Herramienta/etapa que lo registra (para game_events)
+        :param metrics: Métricas de la etapa
         :return: ID del juego
         """
         # Buscar si existe por title_id
@@ -238,11 +600,11 @@ class GameDatabase:
                     game.notes = existing.notes
                 if not game.iso_path and existing.iso_path:
                     game.iso_path = existing.iso_path
-                self.update_game(game)
+                self.update_game(game, tool=tool, metrics=metrics)
                 return existing.id
         
         # Insertar nuevo
-        return self.add_game(game)
+        return self.add_game(game, tool=tool, metrics=metrics)
     
     def get_game(self, game_id: int) -> Optional[Game]:
         """
@@ -251,10 +613,22 @@ class GameDatabase:
         :param game_id: ID del juego
         :return: Objeto Game o None si no existe
         """
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM games WHERE id = ?", (game_id,))
+        if self.cache is not None:
+            self._sync_cache()
+            cached = self.cache.get_by_id(game_id)
+            if cached is not None:
+                return cached
+            generation = self.cache.generation
+        
+        cursor, map_row = self._select_games(
+            "SELECT * FROM games WHERE id = ?", (game_id,)
+        )
         row = cursor.fetchone()
-        return self._row_to_game(row) if row else None
+        game = map_row(row) if row else None
+        
+        if game is not None and self.cache is not None:
+            self.cache.put(game, generation)
+        return game
     
     def get_by_title_id(self, title_id: str) -> Optional[Game]:
         """
@@ -263,22 +637,54 @@ class GameDatabase:
         :param title_id: Title ID del juego (ej: "12345678")
         :return: Objeto Game o None si no existe
         """
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM games WHERE title_id = ?", (title_id,))
+        if self.cache is not None:
+            self._sync_cache()
+            cached = self.cache.get_by_title_id(title_id)
+            if cached is not None:
+                return cached
+            generation = self.cache.generation
+        
+        cursor, map_row = self._select_games(
+            "SELECT * FROM games WHERE title_id = ?", (title_id,)
+        )
+        row = cursor.fetchone()
+        game = map_row(row) if row else None
+        
+        if game is not None and self.cache is not None:
+            self.cache.put(game, generation)
+        return game
+    
+    def get_by_path(self, path: str) -> Optional[Game]:
+        """
+        Obtiene el juego cuyo iso_path o xex_path es `path`.
+        
+        :param path: Ruta al ISO o al XEX (se compara la ruta absoluta)
+        :return: Objeto Game o None si no existe
+        """
+        path = os.path.abspath(path)
+        cursor, map_row = self._select_games(
+            "SELECT * FROM games WHERE iso_path = ? OR xex_path = ? ORDER BY id LIMIT 1",
+            (path, path)
+        )
         row = cursor.fetchone()
-        return self._row_to_game(row) if row else None
+        return map_row(row) if row else None
     
-    def update_game(self, game: Game) -> bool:
+    def update_game(self, game: Game, tool: str = None, metrics: dict = None) -> bool:
         """
         Actualiza un juego existente.
         
+        Registra un evento si cambia el status o si se indica `tool`.
+        
         :param game: Objeto Game con ID válido
+        :param tool: Herramienta/etapa que lo actualiza (para game_events)
+        :param metrics: Métricas de la etapa
         :return: True si se actualizó, False si no existe
         """
         if game.id is None:
             return False
         
         cursor = self.conn.cursor()
+        old_status = self._current_status(cursor, game.id)
         cursor.execute("""
             UPDATE games SET
                 title_id = ?,
@@ -322,15 +728,33 @@ class GameDatabase:
             game.xex_info_json,
             game.id
         ))
-        self.conn.commit()
-        return cursor.rowcount > 0
+        updated = cursor.rowcount > 0
+        if updated and (old_status != game.status.value or tool):
+            self._insert_event(cursor, game.id, old_status, game.status, tool, metrics)
+        self._invalidate(game.id, game.title_id)
+        self._commit()
+        return updated
     
-    def update_status(self, game_id: int, status: GameStatus, **kwargs) -> bool:
+    def update_status(
+        self,
+        game_id: int,
+        status: GameStatus,
+        tool: str = None,
+        metrics: dict = None,
+        error: str = None,
+        **kwargs
+    ) -> bool:
         """
         Actualiza el status de un juego y opcionalmente otros campos.
         
+        La transición queda registrada en game_events junto con la
+        herramienta, sus métricas y el texto de error (si lo hay).
+        
         :param game_id: ID del juego
         :param status: Nuevo status
+        :param tool: Herramienta/etapa que provoca el cambio (ej: "extract")
+        :param metrics: Métricas de la etapa (ej: {"duration_s": 42.0})
+        :param error: Texto de error (normalmente con GameStatus.FAILED)
         :param kwargs: Campos adicionales a actualizar (iso_path, xex_path, etc.)
         :return: True si se actualizó
         """
@@ -349,12 +773,17 @@ class GameDatabase:
         values.append(game_id)
         
         cursor = self.conn.cursor()
+        old_status = self._current_status(cursor, game_id)
         cursor.execute(
             f"UPDATE games SET {', '.join(set_clauses)} WHERE id = ?",
             values
         )
-        self.conn.commit()
-        return cursor.rowcount > 0
+        updated = cursor.rowcount > 0
+        if updated and (old_status != status.value or tool or error):
+            self._insert_event(cursor, game_id, old_status, status, tool, metrics, error)
+        self._invalidate(game_id)
+        self._commit()
+        return updated
     
     def delete_game(self, game_id: int) -> bool:
         """
@@ -365,7 +794,8 @@ class GameDatabase:
         """
         cursor = self.conn.cursor()
         cursor.execute("DELETE FROM games WHERE id = ?", (game_id,))
-        self.conn.commit()
+        self._invalidate(game_id)
+        self._commit()
         return cursor.rowcount > 0
     
     def list_games(self, status: GameStatus = None, limit: int = 100) -> List[Game]:
@@ -376,20 +806,39 @@ class GameDatabase:
         :param limit: Límite de resultados (default: 100)
         :return: Lista de objetos Game
         """
-        cursor = self.conn.cursor()
-        
         if status:
-            cursor.execute(
+            cursor, map_row = self._select_games(
                 "SELECT * FROM games WHERE status = ? ORDER BY updated_at DESC LIMIT ?",
                 (status.value, limit)
             )
         else:
-            cursor.execute(
+            cursor, map_row = self._select_games(
                 "SELECT * FROM games ORDER BY updated_at DESC LIMIT ?",
                 (limit,)
             )
         
-        return [self._row_to_game(row) for row in cursor.fetchall()]
+        return [map_row(row) for row in cursor.fetchall()]
+    
+    def iter_games(self, status: GameStatus = None, chunk_size: int = 500) -> Iterator[Game]:
+        """
+        Recorre todos los juegos (por id) sin cargarlos todos en memoria.
+        
+        :param status: Filtrar por status (opcional)
+        :param chunk_size: Filas leídas del cursor por bloque
+        :return: Iterador de objetos Game
+        """
+        if status:
+            cursor, map_row = self._select_games(
+                "SELECT * FROM games WHERE status = ? ORDER BY id", (status.value,)
+            )
+        else:
+            cursor, map_row = self._select_games("SELECT * FROM games ORDER BY id")
+        
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from map(map_row, rows)
     
     def search(self, query: str) -> List[Game]:
         """
@@ -398,15 +847,14 @@ class GameDatabase:
         :param query: Término de búsqueda
         :return: Lista de juegos que coinciden
         """
-        cursor = self.conn.cursor()
         search_term = f"%{query}%"
-        cursor.execute("""
+        cursor, map_row = self._select_games("""
             SELECT * FROM games 
             WHERE game_name LIKE ? OR title_id LIKE ?
             ORDER BY updated_at DESC
         """, (search_term, search_term))
         
-        return [self._row_to_game(row) for row in cursor.fetchall()]
+        return [map_row(row) for row in cursor.fetchall()]
     
     def count(self, status: GameStatus = None) -> int:
         """
@@ -427,6 +875,280 @@ class GameDatabase:
         
         return cursor.fetchone()[0]
     
+    def status_counts(self) -> Dict[GameStatus, int]:
+        """
+        Cuenta los juegos de todos los status en una sola consulta.
+        
+        Si la tabla de estadísticas está activa (ver enable_stats_table)
+        se lee directamente de ella; si no, se usa un GROUP BY.
+        
+        :return: Dict con todos los GameStatus (0 si no hay juegos)
+        """
+        counts = {status: 0 for status in GameStatus}
+        cursor = self.conn.cursor()
+        
+        if self.has_stats_table():
+            cursor.execute("SELECT status, count FROM game_stats")
+        else:
+            cursor.execute("SELECT status, COUNT(*) FROM games GROUP BY status")
+        
+        for status, n in cursor.fetchall():
+            try:
+                counts[GameStatus(status)] = n
+            except ValueError:
+                continue  # Status desconocido (BD de otra versión)
+        
+        return counts
+    
+    def has_stats_table(self) -> bool:
+        """Indica si la tabla de estadísticas mantenida por triggers existe."""
+        if self._stats_table is None:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'game_stats'"
+            )
+            self._stats_table = cursor.fetchone() is not None
+        return self._stats_table
+    
+    def enable_stats_table(self):
+        """
+        Crea la tabla game_stats y los triggers que la mantienen.
+        
+        Los triggers actualizan los contadores en cada INSERT, DELETE y
+        cambio de status, por lo que status_counts() pasa a ser O(1).
+        La tabla persiste en el archivo de la BD.
+        """
+        cursor = self.conn.cursor()
+        cursor.executescript(_STATS_TABLE_SQL)
+        
+        # Inicializar contadores con el estado actual
+        cursor.execute("DELETE FROM game_stats")
+        cursor.executemany(
+            "INSERT INTO game_stats (status, count) VALUES (?, 0)",
+            [(status.value,) for status in GameStatus]
+        )
+        cursor.execute("""
+            INSERT INTO game_stats (status, count)
+            SELECT status, COUNT(*) FROM games GROUP BY status
+            ON CONFLICT(status) DO UPDATE SET count = excluded.count
+        """)
+        self.conn.commit()
+        self._stats_table = True
+    
+    def disable_stats_table(self):
+        """Elimina la tabla game_stats y sus triggers."""
+        self.conn.executescript("""
+            DROP TRIGGER IF EXISTS trg_game_stats_insert;
+            DROP TRIGGER IF EXISTS trg_game_stats_update;
+            DROP TRIGGER IF EXISTS trg_game_stats_delete;
+            DROP TABLE IF EXISTS game_stats;
+        """)
+        self.conn.commit()
+        self._stats_table = False
+    
+    # ══════════════════════════════════════════════════════════════
+    # Historial de transiciones (game_events)
+    # ══════════════════════════════════════════════════════════════
+    
+    @staticmethod
+    def _current_status(cursor: sqlite3.Cursor, game_id: int) -> Optional[str]:
+        """Lee el status actual de un juego (None si no existe)."""
+        row = cursor.execute("SELECT status FROM games WHERE id = ?", (game_id,)).fetchone()
+        return row[0] if row else None
+    
+    @staticmethod
+    def _insert_event(
+        cursor: sqlite3.Cursor,
+        game_id: int,
+        from_status: Optional[str],
+        to_status: GameStatus,
+        tool: str = None,
+        metrics: dict = None,
+        error: str = None,
+        is_transition: bool = True
+    ):
+        """Añade una fila a game_events (sin commit)."""
+        duration = metrics.get("duration_s") if metrics else None
+        cursor.execute("""
+            INSERT INTO game_events (
+                game_id, from_status, to_status, tool, duration_s, metrics_json, error,
+                is_transition
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            game_id,
+            from_status,
+            to_status.value,
+            tool,
+            duration,
+            json.dumps(metrics) if metrics else None,
+            error,
+            int(is_transition),
+        ))
+    
+    def record_event(
+        self,
+        game_id: int,
+        status: GameStatus,
+        tool: str = None,
+        metrics: dict = None,
+        error: str = None
+    ):
+        """
+        Registra un evento sin modificar el juego.
+        
+        Útil para etapas que no cambian el status (ej: recompilación
+        repetida) o para fallos que no deben sobrescribir el status.
+        Se guarda con is_transition=0: cuenta en failure_rate_by_tool()
+        pero no en state_durations(), time_between() ni throughput_per_day().
+        """
+        cursor = self.conn.cursor()
+        old_status = self._current_status(cursor, game_id)
+        self._insert_event(cursor, game_id, old_status, status, tool, metrics, error,
+                           is_transition=False)
+        self._commit()
+    
+    def get_events(self, game_id: int) -> List[GameEvent]:
+        """
+        Obtiene el historial de transiciones de un juego.
+        
+        :param game_id: ID del juego
+        :return: Lista de GameEvent en orden cronológico
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT * FROM game_events WHERE game_id = ? ORDER BY id",
+            (game_id,)
+        )
+        return [
+            GameEvent(
+                id=row["id"],
+                game_id=row["game_id"],
+                from_status=GameStatus(row["from_status"]) if row["from_status"] else None,
+                to_status=GameStatus(row["to_status"]),
+                created_at=datetime.fromisoformat(row["created_at"]),
+                tool=row["tool"],
+                duration_s=row["duration_s"],
+                metrics=json.loads(row["metrics_json"]) if row["metrics_json"] else None,
+                error=row["error"],
+                is_transition=bool(row["is_transition"]),
+            )
+            for row in cursor.fetchall()
+        ]
+    
+    def state_durations(
+        self,
+        percentiles: Iterable[float] = (50, 90, 99),
+        include_open: bool = False
+    ) -> Dict[GameStatus, Dict[str, float]]:
+        """
+        Percentiles del tiempo (segundos) que pasan los juegos en cada status.
+        
+        El tiempo en un status va desde su evento hasta la siguiente
+        transición del mismo juego (los eventos sin transición no cortan).
+        
+        :param percentiles: Percentiles a calcular (0-100)
+        :param include_open: Contar también el status actual hasta ahora
+        :return: {status: {"count", "mean", "p50", ...}} solo con status con datos
+        """
+        end_expr = "julianday('now')" if include_open else "NULL"
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+            SELECT to_status, (
+                COALESCE(
+                    julianday(LEAD(created_at) OVER (PARTITION BY game_id ORDER BY id)),
+                    {end_expr}
+                ) - julianday(created_at)
+            ) * 86400.0 AS seconds
+            FROM game_events
+            WHERE is_transition
+        """)
+        
+        samples: Dict[str, List[float]] = {}
+        for status, seconds in cursor.fetchall():
+            if seconds is not None:
+                samples.setdefault(status, []).append(seconds)
+        
+        return {
+            GameStatus(status): _summarize(values, percentiles)
+            for status, values in samples.items()
+            if status in _STATUS_VALUES
+        }
+    
+    def time_between(
+        self,
+        start: GameStatus = GameStatus.PENDING,
+        end: GameStatus = GameStatus.ANALYSED,
+        percentiles: Iterable[float] = (50, 90, 99)
+    ) -> Dict[str, float]:
+        """
+        Percentiles del tiempo (segundos) para ir de `start` a `end`.
+        
+        Usa la primera llegada a cada status por juego (solo transiciones).
+        
+        :return: {"count", "mean", "p50", ...} (count=0 si no hay datos)
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT (julianday(e.reached) - julianday(s.reached)) * 86400.0
+            FROM (
+                SELECT game_id, MIN(created_at) AS reached FROM game_events
+                WHERE to_status = ? AND is_transition GROUP BY game_id
+            ) AS s
+            JOIN (
+                SELECT game_id, MIN(created_at) AS reached FROM game_events
+                WHERE to_status = ? AND is_transition GROUP BY game_id
+            ) AS e ON e.game_id = s.game_id
+            WHERE e.reached >= s.reached
+        """, (start.value, end.value))
+        
+        return _summarize([row[0] for row in cursor.fetchall()], percentiles)
+    
+    def throughput_per_day(
+        self,
+        status: GameStatus = GameStatus.COMPLETED,
+        days: int = 30
+    ) -> List[Tuple[str, int]]:
+        """
+        Juegos que llegaron a `status` por día.
+        
+        :param status: Status de llegada a contar
+        :param days: Ventana en días hacia atrás desde hoy
+        :return: Lista de (fecha "YYYY-MM-DD", cantidad) ordenada por fecha
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT date(created_at) AS day, COUNT(DISTINCT game_id)
+            FROM game_events
+            WHERE to_status = ? AND is_transition AND created_at >= datetime('now', ?)
+            GROUP BY day
+            ORDER BY day
+        """, (status.value, f"-{int(days)} days"))
+        return [(day, n) for day, n in cursor.fetchall()]
+    
+    def failure_rate_by_tool(self) -> Dict[str, Dict[str, float]]:
+        """
+        Tasa de fallos por herramienta/etapa.
+        
+        Los eventos sin herramienta se agrupan como "manual".
+        
+        :return: {tool: {"total", "failed", "rate"}}
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT COALESCE(tool, 'manual') AS tool_name,
+                   COUNT(*),
+                   SUM(CASE WHEN to_status = ? OR error IS NOT NULL THEN 1 ELSE 0 END)
+            FROM game_events
+            GROUP BY tool_name
+            ORDER BY tool_name
+        """, (GameStatus.FAILED.value,))
+        
+        return {
+            tool: {"total": total, "failed": failed, "rate": failed / total if total else 0.0}
+            for tool, total, failed in cursor.fetchall()
+        }
+    
     def close(self):
         """Cierra la conexión a la base de datos."""
         self.conn.close()
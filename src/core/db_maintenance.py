@@ -0,0 +1,305 @@
+# core/db_maintenance.py
+"""
+Mantenimiento de la base de datos de juegos.
+
+- optimize(): PRAGMA optimize (o ANALYZE completo) para refrescar los planes
+- backup(): copia en caliente con la API de backup de sqlite3, por bloques
+  de páginas para no bloquear a los escritores
+- compact(): VACUUM sobre el propio archivo, con el lock normal de SQLite
+  (nunca se reemplaza el archivo ni se toca el WAL)
+- maintain() / maybe_maintain(): todo lo anterior con registro en
+  maintenance_runs, para lanzarlo desde la CLI o tras lotes grandes
+"""
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from core.database import GameDatabase
+
+
+# Backups que se conservan por defecto en el directorio de backups
+DEFAULT_BACKUP_KEEP = 5
+
+# Fracción de páginas libres a partir de la cual compensa compactar
+DEFAULT_COMPACT_THRESHOLD = 0.10
+
+# Intervalo por defecto entre mantenimientos completos
+DEFAULT_MAINTENANCE_INTERVAL = timedelta(days=7)
+
+
+@dataclass
+class DbHealth:
+    """Tamaño y fragmentación de la BD."""
+    size_bytes: int
+    page_size: int
+    page_count: int
+    freelist_count: int
+    slack_bytes: Optional[int] = None  # Bytes sin usar dentro de páginas (dbstat)
+    
+    @property
+    def free_bytes(self) -> int:
+        return self.freelist_count * self.page_size
+    
+    @property
+    def free_ratio(self) -> float:
+        """Fracción del archivo en páginas libres (lo que recupera compactar)."""
+        if not self.size_bytes:
+            return 0.0
+        return self.free_bytes / self.size_bytes
+    
+    @property
+    def fragmentation(self) -> float:
+        """Fracción del archivo que no contiene datos (0.0 - 1.0)."""
+        if not self.size_bytes:
+            return 0.0
+        return (self.free_bytes + (self.slack_bytes or 0)) / self.size_bytes
+
+
+@dataclass
+class MaintenanceReport:
+    """Resultado de maintain()."""
+    before: DbHealth
+    after: DbHealth
+    actions: List[str] = field(default_factory=list)
+    backup_path: Optional[str] = None
+    duration_s: float = 0.0
+
+
+def get_health(db: GameDatabase, detailed: bool = True) -> DbHealth:
+    """
+    Mide tamaño y fragmentación.
+    
+    :param db: Base de datos
+    :param detailed: Sumar el espacio libre dentro de las páginas (usa dbstat
+                     si SQLite lo trae compilado; recorre toda la BD)
+    :return: DbHealth
+    """
+    conn = db.conn
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    
+    slack_bytes = None
+    if detailed:
+        try:
+            slack_bytes = conn.execute(
+                "SELECT COALESCE(SUM(unused), 0) FROM dbstat"
+            ).fetchone()[0]
+        except sqlite3.OperationalError:
+            pass  # SQLite sin SQLITE_ENABLE_DBSTAT_VTAB
+    
+    return DbHealth(
+        size_bytes=page_size * page_count,
+        page_size=page_size,
+        page_count=page_count,
+        freelist_count=freelist_count,
+        slack_bytes=slack_bytes,
+    )
+
+
+def optimize(db: GameDatabase, analyze: bool = False) -> str:
+    """
+    Actualiza las estadísticas del planificador.
+    
+    :param analyze: ANALYZE completo en vez de PRAGMA optimize
+    :return: Acción ejecutada
+    """
+    if analyze:
+        db.conn.execute("ANALYZE")
+        db.conn.commit()
+        return "analyze"
+    db.conn.execute("PRAGMA optimize")
+    return "optimize"
+
+
+def default_backup_dir() -> Path:
+    """~/.mrmonkeyshopware/backups"""
+    return Path.home() / ".mrmonkeyshopware" / "backups"
+
+
+def backup(
+    db: GameDatabase,
+    dest: Optional[str] = None,
+    pages: int = 256,
+    keep: int = DEFAULT_BACKUP_KEEP,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> str:
+    """
+    Copia la BD en caliente con la API de backup de sqlite3.
+    
+    Copia `pages` páginas por paso y suelta el lock entre pasos, así
+    que la GUI/CLI pueden seguir escribiendo durante el backup.
+    
+    :param db: Base de datos origen
+    :param dest: Archivo destino (None = backups/games-<fecha>.db con rotación)
+    :param pages: Páginas por paso
+    :param keep: Backups a conservar en el directorio por defecto
+    :param progress: Callback (copiadas, total)
+    :return: Ruta del backup
+    """
+    rotate = dest is None
+    if dest is None:
+        backup_dir = default_backup_dir()
+        backup_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        dest = str(backup_dir / f"games-{stamp}.db")
+        suffix = 1
+        while os.path.exists(dest):  # Dos backups en el mismo segundo
+            dest = str(backup_dir / f"games-{stamp}-{suffix}.db")
+            suffix += 1
+    
+    def on_progress(status, remaining, total):
+        if progress:
+            progress(total - remaining, total)
+    
+    target = sqlite3.connect(dest)
+    try:
+        db.conn.backup(target, pages=pages, progress=on_progress)
+    finally:
+        target.close()
+    
+    if rotate:
+        _rotate_backups(Path(dest).parent, keep)
+    return dest
+
+
+def _rotate_backups(backup_dir: Path, keep: int):
+    """Borra los backups más antiguos dejando los `keep` más recientes."""
+    backups = sorted(backup_dir.glob("games-*.db"))
+    for old in backups[:-keep] if keep > 0 else []:
+        old.unlink(missing_ok=True)
+
+
+def compact(db: GameDatabase) -> bool:
+    """
+    Compacta la BD con VACUUM sobre el propio archivo.
+    
+    No se usa VACUUM INTO + reemplazo del archivo: cualquier commit de otra
+    conexión (GUI, pipeline, escritor de AsyncGameDatabase) entre la copia y
+    el reemplazo se perdería, igual que lo que siguiera en el WAL, y los
+    demás procesos seguirían leyendo el archivo antiguo. VACUUM toma el lock
+    de escritura de SQLite durante la operación: los demás escritores
+    esperan (busy_timeout) y ninguna conexión queda apuntando a otro archivo.
+    
+    :return: True si se compactó (False para BD en memoria)
+    """
+    if db.db_path == ":memory:":
+        return False
+    
+    db.conn.commit()  # VACUUM no puede ejecutarse dentro de una transacción
+    db.conn.execute("VACUUM")
+    return True
+
+
+def maintain(
+    db: GameDatabase,
+    do_backup: bool = True,
+    do_compact: bool = True,
+    analyze: bool = False,
+    backup_dest: Optional[str] = None,
+    compact_threshold: float = DEFAULT_COMPACT_THRESHOLD,
+    log: Callable[[str], None] = None
+) -> MaintenanceReport:
+    """
+    Ejecuta el mantenimiento completo y lo registra en maintenance_runs.
+    
+    Orden: backup → compactación (si páginas libres >= compact_threshold)
+    → optimize/ANALYZE.
+    
+    :param db: Base de datos
+    :param do_backup: Hacer backup antes de tocar nada
+    :param do_compact: Permitir compactar
+    :param analyze: ANALYZE completo en vez de PRAGMA optimize
+    :param backup_dest: Destino del backup (None = directorio por defecto)
+    :param compact_threshold: Fracción mínima de páginas libres para compactar
+    :param log: Función de logging opcional
+    :return: MaintenanceReport con el estado antes y después
+    """
+    log = log or (lambda msg: None)
+    start = time.perf_counter()
+    before = get_health(db)
+    report = MaintenanceReport(before=before, after=before)
+    
+    if do_backup:
+        log("💾 Creando backup...")
+        report.backup_path = backup(db, backup_dest)
+        report.actions.append("backup")
+    
+    if do_compact and before.free_ratio >= compact_threshold:
+        log(f"🗜️ Compactando ({before.free_ratio:.1%} en páginas libres)...")
+        if compact(db):
+            report.actions.append("vacuum")
+    
+    log("📈 Actualizando estadísticas...")
+    report.actions.append(optimize(db, analyze=analyze))
+    
+    report.after = get_health(db)
+    report.duration_s = time.perf_counter() - start
+    
+    db.conn.execute("""
+        INSERT INTO maintenance_runs (
+            actions, size_before, size_after, fragmentation_before,
+            fragmentation_after, duration_s, backup_path
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (
+        ",".join(report.actions),
+        report.before.size_bytes,
+        report.after.size_bytes,
+        report.before.fragmentation,
+        report.after.fragmentation,
+        report.duration_s,
+        report.backup_path,
+    ))
+    db.conn.commit()
+    return report
+
+
+def last_maintenance(db: GameDatabase) -> Optional[datetime]:
+    """Fecha del último maintain() o None si nunca se ejecutó."""
+    row = db.conn.execute("SELECT MAX(created_at) FROM maintenance_runs").fetchone()
+    return datetime.fromisoformat(row[0]) if row[0] else None
+
+
+def maintenance_due(
+    db: GameDatabase,
+    interval: timedelta = DEFAULT_MAINTENANCE_INTERVAL,
+    compact_threshold: float = DEFAULT_COMPACT_THRESHOLD
+) -> bool:
+    """
+    Indica si toca mantenimiento completo.
+    
+    Toca si nunca se hizo, si pasó `interval` desde el último o si las
+    páginas libres ya superan `compact_threshold`.
+    """
+    # created_at está en UTC: comparar en SQLite evita líos de zona horaria
+    row = db.conn.execute(
+        "SELECT (julianday('now') - julianday(MAX(created_at))) * 86400 FROM maintenance_runs"
+    ).fetchone()
+    if row[0] is None or row[0] >= interval.total_seconds():
+        return True
+    return get_health(db, detailed=False).free_ratio >= compact_threshold
+
+
+def maybe_maintain(
+    db: GameDatabase,
+    interval: timedelta = DEFAULT_MAINTENANCE_INTERVAL,
+    do_compact: bool = False,
+    log: Callable[[str], None] = None
+) -> Optional[MaintenanceReport]:
+    """
+    Para después de lotes grandes (importaciones, pipelines masivos).
+    
+    Siempre ejecuta PRAGMA optimize (barato); el mantenimiento completo
+    solo si maintenance_due(). Por defecto no compacta, ya que otro proceso
+    (ej: la GUI) puede tener la BD abierta.
+    
+    :return: MaintenanceReport si hubo mantenimiento completo, si no None
+    """
+    if not maintenance_due(db, interval):
+        optimize(db)
+        return None
+    return maintain(db, do_compact=do_compact, log=log)
@@ -0,0 +1,322 @@
+# core/db_transfer.py
+"""
+Exportación e importación masiva de la base de datos de juegos.
+
+La exportación recorre un cursor por bloques y escribe fila a fila, así
+que la memoria no crece con el tamaño de la biblioteca. Formatos:
+- JSONL (.jsonl): un objeto JSON por juego con todas las columnas
+- CSV (.csv): cabecera con todas las columnas
+- JSON (.json): array, solo para importar exportaciones antiguas
+Cualquiera de ellos acepta .gz para comprimir con gzip.
+"""
+import csv
+import gzip
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from core.database import GameDatabase, GameStatus
+
+
+FORMATS = ("jsonl", "csv")
+
+# Políticas ante un title_id que ya existe en la BD destino
+CONFLICT_POLICIES = ("skip", "replace", "newer", "fail")
+
+# Columnas que no se copian entre BD: el id es local a cada una
+_LOCAL_COLUMNS = {"id"}
+
+# Columnas en las que "" del CSV no significa NULL
+_NOT_NULL_COLUMNS = {"game_name"}
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+# Por debajo del límite histórico de SQLite (999 parámetros por sentencia)
+_PARAMS_PER_QUERY = 500
+
+_VALID_STATUSES = frozenset(status.value for status in GameStatus)
+
+
+@dataclass
+class ImportResult:
+    """Resultado de una importación."""
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    invalid: int = 0  # Filas descartadas (status desconocido, sin game_name)
+    
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.skipped + self.invalid
+
+
+def detect_format(path: str) -> Tuple[str, bool]:
+    """
+    Deduce formato y compresión a partir de la extensión.
+    
+    :param path: Ruta del archivo (ej: games.jsonl.gz)
+    :return: (formato, gzip)
+    """
+    suffixes = [s.lower() for s in Path(path).suffixes]
+    compressed = bool(suffixes) and suffixes[-1] == ".gz"
+    if compressed:
+        suffixes = suffixes[:-1]
+    ext = suffixes[-1].lstrip(".") if suffixes else ""
+    if ext not in FORMATS + ("json",):
+        ext = "jsonl"
+    return ext, compressed
+
+
+def _open_text(path: str, mode: str, compressed: bool):
+    if compressed:
+        return gzip.open(path, mode + "t", encoding="utf-8", newline="")
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def export_games(
+    db: GameDatabase,
+    output: str,
+    fmt: Optional[str] = None,
+    compress: Optional[bool] = None,
+    status: GameStatus = None,
+    chunk_size: int = 500
+) -> int:
+    """
+    Exporta los juegos sin cargarlos todos en memoria.
+    
+    :param db: Base de datos origen
+    :param output: Archivo destino
+    :param fmt: "jsonl" o "csv" (None = según la extensión)
+    :param compress: Comprimir con gzip (None = según la extensión)
+    :param status: Exportar solo un status (opcional)
+    :param chunk_size: Filas leídas del cursor por bloque
+    :return: Número de juegos exportados
+    """
+    detected_fmt, detected_gzip = detect_format(output)
+    fmt = fmt or detected_fmt
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato de exportación no soportado: {fmt}")
+    if compress is None:
+        compress = detected_gzip
+    
+    cursor = db.conn.cursor()
+    if status:
+        cursor.execute("SELECT * FROM games WHERE status = ? ORDER BY id", (status.value,))
+    else:
+        cursor.execute("SELECT * FROM games ORDER BY id")
+    columns = [col[0] for col in cursor.description]
+    
+    count = 0
+    with _open_text(output, "w", compress) as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(columns)
+        
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            if fmt == "csv":
+                writer.writerows(
+                    ["" if value is None else value for value in row] for row in rows
+                )
+            else:
+                f.writelines(
+                    json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n"
+                    for row in rows
+                )
+            count += len(rows)
+    
+    return count
+
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Lee registros de un archivo exportado (JSONL, CSV o JSON, con o sin gzip).
+    
+    :param path: Archivo de origen
+    :param fmt: Formato (None = según la extensión)
+    :return: Iterador de dicts columna → valor
+    """
+    fmt = fmt or detect_format(path)[0]
+    with open(path, "rb") as raw:
+        compressed = raw.read(2) == _GZIP_MAGIC  # No depender de la extensión
+    
+    with _open_text(path, "r", compressed) as f:
+        if fmt == "csv":
+            for record in csv.DictReader(f):
+                yield {
+                    key: (None if value == "" and key not in _NOT_NULL_COLUMNS else value)
+                    for key, value in record.items()
+                }
+        elif fmt == "json":
+            # Exportaciones antiguas: un único array
+            yield from json.load(f)
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def import_games(
+    db: GameDatabase,
+    source: str,
+    on_conflict: str = "skip",
+    batch_size: int = 1000,
+    fmt: Optional[str] = None
+) -> ImportResult:
+    """
+    Carga juegos en lotes, una transacción por lote.
+    
+    Los juegos se emparejan por title_id. Políticas de conflicto:
+    - skip: conservar el juego existente
+    - replace: sobrescribir con los datos importados
+    - newer: sobrescribir solo si el importado tiene updated_at más reciente
+    - fail: abortar con sqlite3.IntegrityError (los lotes ya confirmados se mantienen)
+    
+    Los juegos nuevos reciben un evento None → status con tool "import", y
+    los existentes cuyo status cambia (replace/newer), uno anterior → nuevo.
+    
+    :param db: Base de datos destino
+    :param source: Archivo exportado
+    :param on_conflict: Política ante title_id repetido
+    :param batch_size: Juegos por transacción
+    :param fmt: Formato (None = según la extensión)
+    :return: ImportResult con insertados/actualizados/omitidos
+    """
+    if on_conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"Política de conflicto no soportada: {on_conflict}")
+    
+    table_info = db.conn.execute("PRAGMA table_info(games)").fetchall()
+    table_columns = [row[1] for row in table_info if row[1] not in _LOCAL_COLUMNS]
+    # Columnas con DEFAULT: ausentes o NULL en el archivo toman el DEFAULT
+    defaulted = {row[1] for row in table_info if row[4] is not None}
+    result = ImportResult()
+    
+    try:
+        batch: List[Dict] = []
+        for record in read_records(source, fmt):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                _import_batch(db, batch, table_columns, defaulted, on_conflict, result)
+                batch = []
+        if batch:
+            _import_batch(db, batch, table_columns, defaulted, on_conflict, result)
+    finally:
+        # Las escrituras directas no pasan por la invalidación por juego
+        if db.cache is not None:
+            db.cache.clear()
+    
+    return result
+
+
+def _is_valid(record: Dict) -> bool:
+    """Una fila inválida rompería las lecturas (el mapper no admite status desconocidos)."""
+    if not record.get("game_name"):
+        return False
+    status = record.get("status")
+    return status is None or status in _VALID_STATUSES
+
+
+def _import_batch(
+    db: GameDatabase,
+    records: List[Dict],
+    table_columns: List[str],
+    defaulted: Set[str],
+    on_conflict: str,
+    result: ImportResult
+):
+    """
+    Inserta un lote con executemany dentro de una transacción.
+    
+    Los registros se agrupan por las columnas que traen: una columna ausente
+    (o vacía, si tiene DEFAULT) toma el DEFAULT de la tabla (status
+    'pending', created_at...), no NULL.
+    """
+    # Columnas presentes en el archivo (las desconocidas se ignoran)
+    present = set()
+    for record in records:
+        present.update(record)
+    if "game_name" not in present:
+        raise ValueError("Los registros importados no tienen game_name")
+    
+    valid = [record for record in records if _is_valid(record)]
+    result.invalid += len(records) - len(valid)
+    
+    groups: Dict[Tuple[str, ...], List[Tuple]] = {}
+    for record in valid:
+        columns = tuple(
+            col for col in table_columns
+            if col in record and not (record[col] is None and col in defaulted)
+        )
+        groups.setdefault(columns, []).append(tuple(record[col] for col in columns))
+    
+    title_ids = sorted({record["title_id"] for record in valid if record.get("title_id")})
+    
+    with db.batch():
+        cursor = db.conn.cursor()
+        last_id = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM games").fetchone()[0]
+        # Status previo de los juegos que pueden actualizarse por conflicto
+        before = _statuses(cursor, title_ids) if on_conflict in ("replace", "newer") else {}
+        
+        changed = 0
+        for columns, rows in groups.items():
+            cursor.executemany(_insert_sql(columns, on_conflict), rows)
+            changed += cursor.rowcount  # Sin contar filas tocadas por triggers
+        
+        # Historial de los juegos nuevos (AUTOINCREMENT: ids siempre crecientes)
+        cursor.execute("""
+            INSERT INTO game_events (game_id, from_status, to_status, tool)
+            SELECT id, NULL, status, 'import' FROM games WHERE id > ?
+        """, (last_id,))
+        inserted = cursor.rowcount
+        
+        # ... y de los existentes cuyo status cambió con el DO UPDATE
+        if before:
+            after = _statuses(cursor, list(before))
+            cursor.executemany("""
+                INSERT INTO game_events (game_id, from_status, to_status, tool)
+                VALUES (?, ?, ?, 'import')
+            """, [
+                (game_id, old, after[title_id][1])
+                for title_id, (game_id, old) in before.items()
+                if after[title_id][1] != old
+            ])
+    
+    result.inserted += inserted
+    result.updated += changed - inserted
+    result.skipped += len(valid) - changed
+
+
+def _statuses(cursor, title_ids: List[str]) -> Dict[str, Tuple[int, str]]:
+    """{title_id: (id, status)} de los juegos existentes, en trozos bajo el límite de parámetros."""
+    found: Dict[str, Tuple[int, str]] = {}
+    for start in range(0, len(title_ids), _PARAMS_PER_QUERY):
+        chunk = title_ids[start:start + _PARAMS_PER_QUERY]
+        placeholders = ", ".join("?" for _ in chunk)
+        for game_id, title_id, status in cursor.execute(
+            f"SELECT id, title_id, status FROM games WHERE title_id IN ({placeholders})", chunk
+        ):
+            found[title_id] = (game_id, status)
+    return found
+
+
+def _insert_sql(columns: Tuple[str, ...], on_conflict: str) -> str:
+    """INSERT con la política de conflicto (solo se actualizan las columnas presentes)."""
+    placeholders = ", ".join("?" for _ in columns)
+    sql = f"INSERT INTO games ({', '.join(columns)}) VALUES ({placeholders})"
+    
+    updatable = [col for col in columns if col != "title_id"]
+    assignments = ", ".join(f"{col} = excluded.{col}" for col in updatable)
+    if on_conflict == "skip":
+        sql += " ON CONFLICT(title_id) DO NOTHING"
+    elif on_conflict == "replace":
+        sql += f" ON CONFLICT(title_id) DO UPDATE SET {assignments}"
+    elif on_conflict == "newer":
+        sql += (
+            f" ON CONFLICT(title_id) DO UPDATE SET {assignments}"
+            " WHERE excluded.updated_at > games.updated_at"
+        )
+    return sql
@@ -0,0 +1,257 @@
+# core/file_placement.py
+"""
+Colocación de archivos en el workspace sin duplicar datos cuando se puede.
+
+Estrategias, de más barata a más cara:
+- move:     os.replace si origen y destino están en el mismo dispositivo
+            (solo si el origen no se conserva, ej: análisis en TEMP)
+- reflink:  clon copy-on-write (ioctl FICLONE) en Btrfs/XFS/bcachefs...
+            Los datos se comparten hasta que uno de los dos se modifique
+- hardlink: mismo inodo; solo para entradas inmutables (ISO, XEX), ya
+            que modificar una ruta modifica la otra
+- copy:     copia completa, siempre como último recurso
+
+Las capacidades se detectan por par de dispositivos (st_dev origen,
+st_dev destino) y se recuerdan: si un reflink falla entre dos
+dispositivos no se vuelve a intentar.
+"""
+import errno
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, Optional, Set, Tuple
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+# _IOW(0x94, 9, int) de linux/fs.h
+FICLONE = 0x40049409
+
+
+class PlacementStrategy(str, Enum):
+    """Estrategia de colocación."""
+    AUTO = "auto"
+    MOVE = "move"
+    REFLINK = "reflink"
+    HARDLINK = "hardlink"
+    COPY = "copy"
+
+
+@dataclass
+class PlacementResult:
+    """Resultado de place_file()."""
+    src: str
+    dst: str
+    method: PlacementStrategy
+    size: int
+    
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes que no se escribieron gracias a la estrategia."""
+        return 0 if self.method == PlacementStrategy.COPY else self.size
+
+
+@dataclass
+class Capabilities:
+    """Qué estrategias son posibles entre dos rutas."""
+    same_device: bool
+    reflink: bool
+    hardlink: bool
+
+
+# Métodos que fallaron por par de dispositivos
+_unsupported: Dict[Tuple[int, int], Set[PlacementStrategy]] = {}
+_unsupported_lock = threading.Lock()
+
+# Errores que indican "no soportado en este par de dispositivos": se recuerdan
+_UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.EOPNOTSUPP, errno.ENOTTY, errno.ENOSYS}
+
+# FICLONE devuelve EINVAL si el sistema de archivos no soporta reflinks
+_REFLINK_UNSUPPORTED_ERRNOS = _UNSUPPORTED_ERRNOS | {errno.EINVAL}
+
+# Fallos de un archivo concreto (permisos, inmutable, límite de enlaces del
+# inode): se copia ese archivo pero el método sigue disponible para el resto
+_FILE_FALLBACK_ERRNOS = {errno.EPERM, errno.EACCES, errno.EMLINK, errno.EINVAL}
+
+
+def _device_pair(src: str, dst: str) -> Tuple[int, int]:
+    """(st_dev origen, st_dev del directorio destino)."""
+    dst_dir = os.path.dirname(os.path.abspath(dst))
+    return os.stat(src).st_dev, os.stat(dst_dir).st_dev
+
+
+def _mark_unsupported(pair: Tuple[int, int], method: PlacementStrategy):
+    with _unsupported_lock:
+        _unsupported.setdefault(pair, set()).add(method)
+
+
+def _is_unsupported(pair: Tuple[int, int], method: PlacementStrategy) -> bool:
+    with _unsupported_lock:
+        return method in _unsupported.get(pair, ())
+
+
+def detect_capabilities(src: str, dst: str) -> Capabilities:
+    """
+    Capacidades entre un origen y un destino.
+    
+    Reflink y hardlink requieren el mismo dispositivo; el reflink además
+    requiere FICLONE (Linux) y un sistema de archivos CoW, lo que solo
+    se sabe intentándolo: hasta el primer fallo se considera posible.
+    
+    :param src: Archivo origen
+    :param dst: Ruta destino (su directorio debe existir)
+    :return: Capabilities
+    """
+    pair = _device_pair(src, dst)
+    same_device = pair[0] == pair[1]
+    return Capabilities(
+        same_device=same_device,
+        reflink=same_device and HAS_FCNTL and not _is_unsupported(pair, PlacementStrategy.REFLINK),
+        hardlink=same_device and hasattr(os, "link") and not _is_unsupported(pair, PlacementStrategy.HARDLINK),
+    )
+
+
+def reflink(src: str, dst: str):
+    """
+    Clona src en dst con FICLONE (copy-on-write).
+    
+    :raises OSError: Si el sistema de archivos no soporta reflinks
+    """
+    if not HAS_FCNTL:
+        raise OSError(errno.EOPNOTSUPP, "reflink no disponible en este sistema")
+    with open(src, "rb") as fsrc:
+        try:
+            with open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            if os.path.exists(dst):
+                os.remove(dst)
+            raise
+    shutil.copystat(src, dst)
+
+
+def _try(method: PlacementStrategy, pair: Tuple[int, int], action: Callable[[], None]) -> bool:
+    """
+    Ejecuta una estrategia.
+    
+    :return: False si hay que copiar; si el método no está soportado en el
+             par de dispositivos se recuerda, si solo falló este archivo no
+    """
+    unsupported = _REFLINK_UNSUPPORTED_ERRNOS if method == PlacementStrategy.REFLINK else _UNSUPPORTED_ERRNOS
+    try:
+        action()
+        return True
+    except OSError as e:
+        if e.errno in unsupported:
+            _mark_unsupported(pair, method)
+            return False
+        if e.errno in _FILE_FALLBACK_ERRNOS:
+            return False
+        raise
+
+
+def _remove_existing(dst: str):
+    """rename/link no sobrescriben en todos los sistemas: borrar antes."""
+    if os.path.lexists(dst):
+        os.remove(dst)
+
+
+def try_place(
+    src: str,
+    dst: str,
+    strategy: PlacementStrategy = PlacementStrategy.AUTO,
+    keep_source: bool = True,
+    immutable: bool = False
+) -> Optional[PlacementResult]:
+    """
+    Intenta colocar src en dst sin copiar los datos.
+    
+    Con AUTO se prueba: move (si keep_source=False) → reflink → hardlink
+    (si immutable=True). Con una estrategia concreta solo se prueba esa.
+    
+    :param src: Archivo origen
+    :param dst: Ruta destino (se crea su directorio)
+    :param strategy: Estrategia preferida
+    :param keep_source: False si el origen puede desaparecer (archivos temporales)
+    :param immutable: El archivo no se modificará nunca (permite hardlink)
+    :return: PlacementResult, o None si hay que copiar
+    """
+    strategy = PlacementStrategy(strategy)
+    size = os.path.getsize(src)
+    os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+    
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        return PlacementResult(src, dst, PlacementStrategy.HARDLINK, size)
+    
+    if strategy == PlacementStrategy.AUTO:
+        candidates = []
+        if not keep_source:
+            candidates.append(PlacementStrategy.MOVE)
+        candidates.append(PlacementStrategy.REFLINK)
+        if immutable:
+            candidates.append(PlacementStrategy.HARDLINK)
+    elif strategy == PlacementStrategy.COPY:
+        return None
+    else:
+        candidates = [strategy]
+    
+    caps = detect_capabilities(src, dst)
+    pair = _device_pair(src, dst)
+    
+    for method in candidates:
+        if method == PlacementStrategy.MOVE and caps.same_device:
+            if _try(method, pair, lambda: os.replace(src, dst)):
+                return PlacementResult(src, dst, method, size)
+        elif method == PlacementStrategy.REFLINK and caps.reflink:
+            if _try(method, pair, lambda: reflink(src, dst)):
+                return PlacementResult(src, dst, method, size)
+        elif method == PlacementStrategy.HARDLINK and caps.hardlink:
+            _remove_existing(dst)
+            if _try(method, pair, lambda: os.link(src, dst)):
+                return PlacementResult(src, dst, method, size)
+    return None
+
+
+def place_file(
+    src: str,
+    dst: str,
+    strategy: PlacementStrategy = PlacementStrategy.AUTO,
+    keep_source: bool = True,
+    immutable: bool = False,
+    copy: Optional[Callable[[str, str], None]] = None
+) -> PlacementResult:
+    """
+    Coloca src en dst con la estrategia más barata posible; si ninguna
+    es posible, copia.
+    
+    Si el origen no se conserva (keep_source=False o strategy=MOVE) y
+    hubo que copiar (otro dispositivo), el origen se borra tras la copia.
+    
+    :param copy: Función de copia de respaldo (defecto: shutil.copy2)
+    :return: PlacementResult con el método usado
+    """
+    result = try_place(src, dst, strategy, keep_source, immutable)
+    if result is not None:
+        return result
+    
+    size = os.path.getsize(src)
+    (copy or shutil.copy2)(src, dst)
+    if strategy == PlacementStrategy.MOVE or not keep_source:
+        os.remove(src)  # Mover entre dispositivos = copiar + borrar
+    return PlacementResult(src, dst, PlacementStrategy.COPY, size)
+
+
+def format_saved(results) -> str:
+    """Resumen "N MB ahorrados (reflink: 2, hardlink: 1)" de varios resultados."""
+    saved = sum(r.bytes_saved for r in results)
+    methods: Dict[str, int] = {}
+    for r in results:
+        if r.method != PlacementStrategy.COPY:
+            methods[r.method.value] = methods.get(r.method.value, 0) + 1
+    detail = ", ".join(f"{name}: {count}" for name, count in methods.items())
+    return f"{saved / (1024 * 1024):.1f} MB ahorrados" + (f" ({detail})" if detail else "")
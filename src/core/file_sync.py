@@ -0,0 +1,414 @@
+# core/file_sync.py
+"""
+Motor de sincronización de archivos hacia los workspaces.
+
+- Copia varios archivos a la vez (ThreadPoolExecutor)
+- Copia por bloques con os.copy_file_range cuando el sistema lo soporta
+  (la copia la hace el kernel, sin pasar por Python); si no, pread/pwrite
+- Diario de reanudación (<destino>.part.json): una copia interrumpida de
+  una ISO de 8 GB continúa desde el último bloque confirmado
+- Verifica cada bloque con BLAKE2b mientras copia (origen vs destino)
+- Informa progreso y throughput por archivo y total
+"""
+import errno
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+# Tamaño de bloque por defecto (8 MiB)
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Bloques entre cada fsync + actualización del diario
+JOURNAL_EVERY = 8
+
+# Copias simultáneas por defecto
+DEFAULT_WORKERS = 4
+
+HAS_COPY_FILE_RANGE = hasattr(os, "copy_file_range")
+
+# Errores de copy_file_range que indican "no soportado aquí" (entre
+# sistemas de archivos en kernels antiguos, FUSE, SMB...)
+_NO_KERNEL_COPY_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM}
+
+PART_SUFFIX = ".part"
+JOURNAL_SUFFIX = ".part.json"
+
+
+class SyncCancelled(Exception):
+    """La sincronización se canceló; el diario permite reanudarla."""
+
+
+class ChecksumMismatch(Exception):
+    """Un bloque copiado no coincide con el origen."""
+
+
+@dataclass
+class SyncTask:
+    """Archivo a copiar."""
+    src: str
+    dst: str
+    size: int = 0
+    label: str = ""
+
+
+@dataclass
+class SyncProgress:
+    """Estado de la sincronización en un momento dado."""
+    task: SyncTask
+    file_copied: int
+    file_total: int
+    total_copied: int
+    total_size: int
+    file_rate: float   # bytes/s del archivo actual
+    total_rate: float  # bytes/s de toda la sincronización
+    
+    @property
+    def percent(self) -> float:
+        return self.total_copied / self.total_size * 100 if self.total_size else 100.0
+
+
+@dataclass
+class FileSyncResult:
+    """Resultado de copiar un archivo."""
+    task: SyncTask
+    success: bool
+    bytes_copied: int = 0
+    resumed_from: int = 0
+    checksum: Optional[str] = None
+    seconds: float = 0.0
+    error: Optional[str] = None
+    method: str = "copy"  # "copy" o la estrategia de core.file_placement usada
+    
+    @property
+    def rate(self) -> float:
+        """Throughput en bytes/s."""
+        return self.bytes_copied / self.seconds if self.seconds else 0.0
+    
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes que no hubo que copiar (reflink/hardlink/move)."""
+        return self.task.size if self.success and self.method != "copy" else 0
+
+
+@dataclass
+class _Totals:
+    size: int
+    copied: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _chunk_digest(data) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _tree_checksum(chunk_digests: List[str], chunk_size: int) -> str:
+    """Checksum del archivo: BLAKE2b sobre los digests de sus bloques."""
+    h = hashlib.blake2b(digest_size=32, person=b"mmsw-sync")
+    h.update(chunk_size.to_bytes(8, "little"))
+    for digest in chunk_digests:
+        h.update(bytes.fromhex(digest))
+    return h.hexdigest()
+
+
+def _read_journal(journal_path: str, src_stat: os.stat_result, chunk_size: int) -> List[str]:
+    """Digests de los bloques ya confirmados, o [] si no se puede reanudar."""
+    try:
+        with open(journal_path, "r", encoding="utf-8") as f:
+            journal = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return []
+    if (
+        journal.get("size") != src_stat.st_size
+        or journal.get("mtime_ns") != src_stat.st_mtime_ns
+        or journal.get("chunk_size") != chunk_size
+    ):
+        return []  # El origen cambió: empezar de cero
+    return list(journal.get("chunks", []))
+
+
+def _write_journal(journal_path: str, src: str, src_stat: os.stat_result, chunk_size: int, chunks: List[str]):
+    tmp_path = journal_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "src": src,
+            "size": src_stat.st_size,
+            "mtime_ns": src_stat.st_mtime_ns,
+            "chunk_size": chunk_size,
+            "chunks": chunks,
+        }, f)
+    os.replace(tmp_path, journal_path)
+
+
+def _copy_chunk(src_fd: int, dst_fd: int, offset: int, length: int, buffer: bytearray, verify: bool) -> Optional[bytes]:
+    """
+    Copia un bloque y retorna su digest (si verify).
+    
+    Con copy_file_range el kernel mueve los datos; la verificación relee
+    origen y destino, normalmente desde la caché de páginas.
+    """
+    view = memoryview(buffer)[:length]
+    if HAS_COPY_FILE_RANGE and _kernel_copy(src_fd, dst_fd, offset, length):
+        if not verify:
+            return None
+        _pread_exact(src_fd, view, offset)
+        digest = _chunk_digest(view)
+    else:
+        _pread_exact(src_fd, view, offset)
+        digest = _chunk_digest(view) if verify else None
+        _pwrite_all(dst_fd, view, offset)
+        if not verify:
+            return None
+    
+    # Verificar lo que quedó escrito en el destino
+    _pread_exact(dst_fd, view, offset)
+    if _chunk_digest(view) != digest:
+        raise ChecksumMismatch(f"Bloque en offset {offset} no coincide con el origen")
+    return digest
+
+
+def _kernel_copy(src_fd: int, dst_fd: int, offset: int, length: int) -> bool:
+    """
+    Copia un rango con os.copy_file_range.
+    
+    :return: False si el sistema de archivos no lo soporta (copia manual)
+    """
+    done = 0
+    try:
+        while done < length:
+            n = os.copy_file_range(src_fd, dst_fd, length - done, offset + done, offset + done)
+            if n == 0:
+                raise OSError(f"Fin de archivo inesperado en offset {offset + done}")
+            done += n
+    except OSError as e:
+        if e.errno in _NO_KERNEL_COPY_ERRNOS:
+            return False  # Lo ya copiado se reescribe con pread/pwrite
+        raise
+    return True
+
+
+def _pread(fd: int, length: int, offset: int) -> bytes:
+    if hasattr(os, "pread"):
+        return os.pread(fd, length, offset)
+    os.lseek(fd, offset, os.SEEK_SET)  # Windows: cada fd lo usa un solo hilo
+    return os.read(fd, length)
+
+
+def _pwrite(fd: int, data, offset: int) -> int:
+    if hasattr(os, "pwrite"):
+        return os.pwrite(fd, data, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.write(fd, data)
+
+
+def _pread_exact(fd: int, view: memoryview, offset: int):
+    done = 0
+    while done < len(view):
+        data = _pread(fd, len(view) - done, offset + done)
+        if not data:
+            raise OSError(f"Fin de archivo inesperado en offset {offset + done}")
+        view[done:done + len(data)] = data
+        done += len(data)
+
+
+def _pwrite_all(fd: int, view: memoryview, offset: int):
+    done = 0
+    while done < len(view):
+        done += _pwrite(fd, view[done:], offset + done)
+
+
+def copy_file(
+    task: SyncTask,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    verify: bool = True,
+    progress: Optional[Callable[[SyncProgress], None]] = None,
+    cancel: Optional[threading.Event] = None,
+    _totals: Optional[_Totals] = None
+) -> FileSyncResult:
+    """
+    Copia un archivo por bloques con diario de reanudación.
+    
+    Escribe en <dst>.part y lo renombra a <dst> al terminar, así que
+    el destino nunca queda a medias. Conserva fechas como shutil.copy2.
+    
+    :param task: Origen y destino
+    :param chunk_size: Tamaño de bloque
+    :param verify: Comparar BLAKE2b de cada bloque en origen y destino
+    :param progress: Callback con SyncProgress tras cada bloque
+    :param cancel: Event para cancelar (deja el diario para reanudar)
+    :return: FileSyncResult
+    """
+    start = time.perf_counter()
+    part_path = task.dst + PART_SUFFIX
+    journal_path = task.dst + JOURNAL_SUFFIX
+    
+    try:
+        src_stat = os.stat(task.src)
+        size = src_stat.st_size
+        task.size = size
+        os.makedirs(os.path.dirname(task.dst) or ".", exist_ok=True)
+        
+        chunks = _read_journal(journal_path, src_stat, chunk_size)
+        if chunks and os.path.exists(part_path) and os.path.getsize(part_path) >= len(chunks) * chunk_size:
+            resumed_from = min(len(chunks) * chunk_size, size)
+        else:
+            chunks, resumed_from = [], 0
+        offset = resumed_from
+        
+        totals = _totals or _Totals(size=size)
+        with totals.lock:
+            totals.copied += resumed_from
+        
+        buffer = bytearray(chunk_size)
+        src_fd = os.open(task.src, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0)
+            dst_fd = os.open(part_path, flags, 0o644)
+            try:
+                os.ftruncate(dst_fd, offset)
+                pending = 0
+                while offset < size:
+                    if cancel is not None and cancel.is_set():
+                        os.fsync(dst_fd)
+                        _write_journal(journal_path, task.src, src_stat, chunk_size, chunks)
+                        raise SyncCancelled(task.dst)
+                    
+                    length = min(chunk_size, size - offset)
+                    digest = _copy_chunk(src_fd, dst_fd, offset, length, buffer, verify)
+                    chunks.append(digest.hex() if digest else "")
+                    offset += length
+                    pending += 1
+                    
+                    if pending >= JOURNAL_EVERY:
+                        # Los datos deben estar en disco antes que el diario que los da por buenos
+                        os.fsync(dst_fd)
+                        _write_journal(journal_path, task.src, src_stat, chunk_size, chunks)
+                        pending = 0
+                    
+                    with totals.lock:
+                        totals.copied += length
+                        total_copied = totals.copied
+                        total_elapsed = time.perf_counter() - totals.started
+                    if progress:
+                        file_elapsed = time.perf_counter() - start
+                        progress(SyncProgress(
+                            task=task,
+                            file_copied=offset,
+                            file_total=size,
+                            total_copied=total_copied,
+                            total_size=totals.size,
+                            file_rate=(offset - resumed_from) / file_elapsed if file_elapsed else 0.0,
+                            total_rate=total_copied / total_elapsed if total_elapsed else 0.0,
+                        ))
+                os.fsync(dst_fd)
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+        
+        shutil.copystat(task.src, part_path)
+        os.replace(part_path, task.dst)
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+        
+        return FileSyncResult(
+            task=task,
+            success=True,
+            bytes_copied=size - resumed_from,
+            resumed_from=resumed_from,
+            checksum=_tree_checksum(chunks, chunk_size) if verify else None,
+            seconds=time.perf_counter() - start,
+        )
+    except SyncCancelled:
+        return FileSyncResult(
+            task=task, success=False, seconds=time.perf_counter() - start,
+            error="Cancelado (se reanudará en la próxima sincronización)"
+        )
+    except (OSError, ChecksumMismatch) as e:
+        if isinstance(e, ChecksumMismatch):
+            # Un bloque corrupto invalida lo copiado: no reanudar sobre él
+            for path in (part_path, journal_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        return FileSyncResult(
+            task=task, success=False, seconds=time.perf_counter() - start, error=str(e)
+        )
+
+
+def content_hash(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
+    """
+    Checksum de un archivo sin copiarlo.
+    
+    Coincide con FileSyncResult.checksum de una copia verificada con el
+    mismo chunk_size, así que sirve como identificador de contenido.
+    
+    :param path: Archivo
+    :param chunk_size: Tamaño de bloque
+    :return: Checksum en hexadecimal
+    """
+    chunks = []
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            # Llenar el bloque entero: los límites deben coincidir con copy_file
+            n = 0
+            while n < chunk_size:
+                read = f.readinto(view[n:])
+                if not read:
+                    break
+                n += read
+            if not n:
+                break
+            chunks.append(_chunk_digest(view[:n]).hex())
+    return _tree_checksum(chunks, chunk_size)
+
+
+def sync_files(
+    tasks: List[SyncTask],
+    workers: int = DEFAULT_WORKERS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    verify: bool = True,
+    progress: Optional[Callable[[SyncProgress], None]] = None,
+    cancel: Optional[threading.Event] = None
+) -> List[FileSyncResult]:
+    """
+    Copia varios archivos en paralelo.
+    
+    :param tasks: Archivos a copiar
+    :param workers: Copias simultáneas
+    :param chunk_size: Tamaño de bloque
+    :param verify: Verificar cada bloque con BLAKE2b
+    :param progress: Callback con SyncProgress (se llama desde los hilos copiadores)
+    :param cancel: Event para cancelar
+    :return: Resultados en el mismo orden que tasks
+    """
+    for task in tasks:
+        if not task.size and os.path.exists(task.src):
+            task.size = os.path.getsize(task.src)
+    totals = _Totals(size=sum(task.size for task in tasks))
+    
+    if workers <= 1 or len(tasks) <= 1:
+        return [
+            copy_file(task, chunk_size, verify, progress, cancel, totals) for task in tasks
+        ]
+    
+    # Los archivos grandes primero: el tiempo total lo marca el más grande
+    order = sorted(range(len(tasks)), key=lambda i: tasks[i].size, reverse=True)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="file-sync") as pool:
+        futures = {
+            i: pool.submit(copy_file, tasks[i], chunk_size, verify, progress, cancel, totals)
+            for i in order
+        }
+        return [futures[i].result() for i in range(len(tasks))]
+
+
+def format_rate(bytes_per_s: float) -> str:
+    """Formatea un throughput en MB/s."""
+    return f"{bytes_per_s / (1024 * 1024):.1f} MB/s"
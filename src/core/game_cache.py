@@ -0,0 +1,143 @@
+# core/game_cache.py
+"""
+Caché LRU en proceso de objetos Game.
+
+GameDatabase la consulta en get_game / get_by_title_id y la invalida en
+cada escritura, así que navegar por la GUI no vuelve a SQLite en cada click.
+Los cambios hechos por otra conexión (ej: la CLI con la GUI abierta) se
+detectan con PRAGMA data_version en cada consulta y vacían la caché.
+"""
+import copy
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Entradas por defecto en la caché compartida de cada BD
+DEFAULT_CACHE_SIZE = 256
+
+
+class GameCache:
+    """
+    LRU de objetos Game indexada por id y por title_id.
+    
+    Devuelve copias: los Game obtenidos se pueden modificar sin
+    alterar la caché.
+    
+    Para evitar guardar datos obsoletos cuando una lectura compite con
+    una escritura, put() recibe la generación leída antes de consultar
+    la BD y descarta la entrada si hubo invalidaciones entre medias.
+    """
+    
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, object]" = OrderedDict()
+        self._title_index: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+        
+        # Contadores
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def get_by_id(self, game_id: int):
+        """Retorna una copia del Game cacheado o None."""
+        with self._lock:
+            game = self._entries.get(game_id)
+            if game is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(game_id)
+            self.hits += 1
+            return copy.copy(game)
+    
+    def get_by_title_id(self, title_id: str):
+        """Retorna una copia del Game cacheado o None."""
+        with self._lock:
+            game_id = self._title_index.get(title_id)
+            game = self._entries.get(game_id) if game_id is not None else None
+            if game is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(game_id)
+            self.hits += 1
+            return copy.copy(game)
+    
+    def put(self, game, generation: int):
+        """
+        Guarda una copia de `game`.
+        
+        :param generation: Valor de self.generation antes de leer de la BD
+        """
+        if game.id is None:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return  # Hubo escrituras durante la lectura
+            self._remove(game.id)
+            self._entries[game.id] = copy.copy(game)
+            if game.title_id:
+                self._title_index[game.title_id] = game.id
+            while len(self._entries) > self.max_size:
+                oldest_id, oldest = self._entries.popitem(last=False)
+                self._drop_title(oldest_id, oldest)
+                self.evictions += 1
+    
+    def invalidate(self, game_id: Optional[int] = None, title_id: Optional[str] = None):
+        """Elimina las entradas de un juego por id y/o title_id."""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            if title_id:
+                indexed_id = self._title_index.get(title_id)
+                if indexed_id is not None:
+                    self._remove(indexed_id)
+            if game_id is not None:
+                self._remove(game_id)
+    
+    def clear(self):
+        """Vacía la caché (ej: tras una importación masiva o un rollback)."""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self._entries.clear()
+            self._title_index.clear()
+    
+    def stats(self) -> dict:
+        """Contadores de uso y tasa de aciertos."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+    
+    def _remove(self, game_id: int):
+        game = self._entries.pop(game_id, None)
+        if game is not None:
+            self._drop_title(game_id, game)
+    
+    def _drop_title(self, game_id: int, game):
+        if game.title_id and self._title_index.get(game.title_id) == game_id:
+            del self._title_index[game.title_id]
+
+
+# Cachés compartidas por ruta de BD dentro del proceso
+_shared_caches: Dict[str, GameCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache(db_path: str, max_size: int = DEFAULT_CACHE_SIZE) -> GameCache:
+    """Retorna la caché compartida de una BD (la crea si no existe)."""
+    with _shared_lock:
+        cache = _shared_caches.get(db_path)
+        if cache is None:
+            cache = GameCache(max_size)
+            _shared_caches[db_path] = cache
+        return cache
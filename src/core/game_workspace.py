@@ -5,12 +5,29 @@ Centraliza todos los archivos generados en una estructura organizada.
 """
 import os
 import json
+import sqlite3
 from pathlib import Path
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from typing import Optional
 
 from core.xex_parser import XexInfo
+from core.atomic_io import read_text, write_coalesced
+from core.workspace_registry import get_registry, parse_folder_name
+from core.file_sync import (
+    DEFAULT_WORKERS, FileSyncResult, SyncTask, content_hash, format_rate, sync_files
+)
+from core.object_store import get_object_store
+from core.settings import get_setting
+from core.file_placement import PlacementResult, PlacementStrategy, place_file, try_place
+from core.workspace_manifest import (
+    DEFAULT_HASH_WORKERS, MANIFEST_NAME, VerifyReport, update_manifest, verify_manifest
+)
+from core import workspace_eviction, workspace_snapshot
+from core.workspace_lock import DEFAULT_LOCK_TIMEOUT_S, WorkspaceLock, workspace_lock
+from core.workspace_usage import (
+    RECONCILE_INTERVAL_S, WorkspaceUsage, get_usage, refresh_dirs, refresh_paths
+)
 
 
 def get_base_ports_dir() -> Path:
@@ -147,52 +164,102 @@ class GameWorkspace:
         """Archivo de notas."""
         return self.root / "notes.md"
     
+    @property
+    def manifest_file(self) -> Path:
+        """Manifiesto de integridad (.manifest.json)."""
+        return self.root / MANIFEST_NAME
+    
+    @property
+    def snapshots_dir(self) -> Path:
+        """Snapshots de recompiled/ (.snapshots/)."""
+        return self.root / workspace_snapshot.SNAPSHOTS_DIRNAME
+    
     def exists(self) -> bool:
         """Verifica si el workspace ya existe."""
         return self.root.exists()
     
-    def create(self) -> Path:
-        """Crea la estructura de directorios."""
-        self.root.mkdir(parents=True, exist_ok=True)
-        self.analysis_dir.mkdir(exist_ok=True)
-        self.extracted_dir.mkdir(exist_ok=True)
-        self.cleaned_dir.mkdir(exist_ok=True)
-        self.recompiled_dir.mkdir(exist_ok=True)
+    def lock(self, shared: bool = False, timeout: float = DEFAULT_LOCK_TIMEOUT_S) -> WorkspaceLock:
+        """
+        Lock consultivo del workspace entre procesos (ver core.workspace_lock).
         
-        # Crear notes.md si no existe
-        if not self.notes_file.exists():
-            self.notes_file.write_text(f"# {self.game_name}\n\nNotas del port:\n\n")
+        Los métodos que escriben ya lo toman; usarlo para agrupar varias
+        escrituras (ej: info.json + análisis + BD) como una sola.
+        
+        :param shared: Modo compartido (lectura); False = exclusivo
+        :param timeout: Segundos de espera (0 = no esperar)
+        """
+        return workspace_lock(self.title_id, shared=shared, timeout=timeout, base_dir=self.root.parent)
+    
+    def create(self) -> Path:
+        """Crea la estructura de directorios y lo registra en el índice."""
+        base_mtime = _base_mtime_ns(self.root.parent)
+        with self.lock():
+            self.root.mkdir(parents=True, exist_ok=True)
+            self.analysis_dir.mkdir(exist_ok=True)
+            self.extracted_dir.mkdir(exist_ok=True)
+            self.cleaned_dir.mkdir(exist_ok=True)
+            self.recompiled_dir.mkdir(exist_ok=True)
+            
+            # Crear notes.md si no existe
+            if not self.notes_file.exists():
+                self.notes_file.write_text(f"# {self.game_name}\n\nNotas del port:\n\n")
         
+        get_registry(self.root.parent).register(
+            self.title_id, self.root.name, self.game_name, base_mtime
+        )
         return self.root
     
     def save_info(self, game_info: GameInfo):
-        """Guarda la información del juego en info.json."""
+        """
+        Guarda la información del juego en info.json.
+        
+        Escritura atómica (nunca deja un info.json truncado). Dentro de un
+        bloque write_behind() se agrupa con las siguientes llamadas.
+        """
         game_info.updated_at = datetime.now().isoformat()
         
-        with open(self.info_file, 'w', encoding='utf-8') as f:
-            json.dump(asdict(game_info), f, indent=2, ensure_ascii=False)
+        data = asdict(game_info)
+        registry = get_registry(self.root.parent)
+        with self.lock():
+            write_coalesced(
+                self.info_file,
+                json.dumps(data, indent=2, ensure_ascii=False),
+                on_written=lambda: registry.update_info(self.title_id, self.root.name, data)
+            )
     
     def load_info(self) -> Optional[GameInfo]:
-        """Carga la información del juego desde info.json."""
-        if not self.info_file.exists():
-            return None
-        
+        """Carga la información del juego desde info.json (o la versión aún en cola)."""
         try:
-            with open(self.info_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return GameInfo(**data)
+            return GameInfo(**json.loads(read_text(self.info_file)))
         except Exception:
             return None
     
+    def cached_info(self) -> Optional[GameInfo]:
+        """
+        Info del juego desde el índice de workspaces, sin abrir info.json.
+        
+        Si el índice no la tiene (ej: workspace creado por otra versión),
+        la lee de disco como load_info().
+        """
+        entry = get_registry(self.root.parent).get(self.title_id)
+        if entry is None or entry["folder"] != self.root.name or entry["info"] is None:
+            return self.load_info()
+        try:
+            return GameInfo(**entry["info"])
+        except TypeError:
+            return self.load_info()
+    
     def get_notes(self) -> str:
         """Lee las notas del juego."""
-        if self.notes_file.exists():
-            return self.notes_file.read_text(encoding='utf-8')
-        return ""
+        try:
+            return read_text(self.notes_file)
+        except FileNotFoundError:
+            return ""
     
     def save_notes(self, notes: str):
-        """Guarda las notas del juego."""
-        self.notes_file.write_text(notes, encoding='utf-8')
+        """Guarda las notas del juego (atómico; agrupable con write_behind())."""
+        with self.lock():
+            write_coalesced(self.notes_file, notes)
     
     def is_in_workspace(self, path: str) -> bool:
         """Verifica si una ruta está dentro del workspace."""
@@ -261,41 +328,65 @@ class GameWorkspace:
         
         return external
     
-    def sync_file(self, external_file: "ExternalFile", log=None) -> bool:
+    # Mapeo tipo de archivo externo → campo de BD
+    _SYNC_FIELDS = {
+        "xex": "xex_path",
+        "iso": "iso_path",
+        "toml": "project_toml",
+        "json": "analysis_json"
+    }
+    
+    # Entradas que nunca se modifican en el workspace (se pueden enlazar)
+    _IMMUTABLE_TYPES = ("xex", "iso")
+    
+    def sync_file(
+        self,
+        external_file: "ExternalFile",
+        log=None,
+        progress=None,
+        cancel=None,
+        strategy: PlacementStrategy = PlacementStrategy.AUTO
+    ) -> bool:
         """
         Copia un archivo externo al workspace.
         
+        Si es posible lo clona (reflink) o enlaza (hardlink, solo XEX/ISO)
+        en vez de copiarlo; si no, copia por bloques con verificación y se
+        reanuda si una copia anterior quedó a medias (ver core.file_sync).
+        
         :param external_file: Archivo a sincronizar
         :param log: Función de logging opcional
+        :param progress: Callback con SyncProgress
+        :param cancel: threading.Event para cancelar
+        :param strategy: Estrategia de colocación (ver core.file_placement)
         :return: True si se copió correctamente
         """
-        import shutil
-        
-        try:
-            target = Path(external_file.target_path)
-            target.parent.mkdir(parents=True, exist_ok=True)
-            
-            if log:
-                size_mb = external_file.size / (1024 * 1024)
-                log(f"📥 Copiando {external_file.label} ({size_mb:.1f} MB)...")
-            
-            shutil.copy2(external_file.current_path, target)
-            
-            if log:
-                log(f"   ✅ {os.path.basename(external_file.current_path)} → {target.name}")
-            
-            return True
-        except Exception as e:
-            if log:
-                log(f"   ❌ Error: {e}")
-            return False
+        results = self._sync(
+            [external_file], log=log, progress=progress, cancel=cancel, workers=1, strategy=strategy
+        )
+        return results[0].success
     
-    def sync_all_files(self, game, log=None) -> dict:
+    def sync_all_files(
+        self,
+        game,
+        log=None,
+        progress=None,
+        cancel=None,
+        workers: int = None,
+        strategy: PlacementStrategy = PlacementStrategy.AUTO
+    ) -> dict:
         """
         Sincroniza todos los archivos externos al workspace.
         
+        Los archivos que no se pueden clonar/enlazar se copian en paralelo;
+        las ISOs grandes por bloques con diario de reanudación.
+        
         :param game: Objeto Game de la BD
         :param log: Función de logging
+        :param progress: Callback con SyncProgress (desde hilos copiadores)
+        :param cancel: threading.Event para cancelar; lo copiado se reanuda
+        :param workers: Copias simultáneas (None = por defecto)
+        :param strategy: Estrategia de colocación (ver core.file_placement)
         :return: Dict con nuevas rutas para actualizar en BD
         """
         external = self.check_external_files(game)
@@ -309,68 +400,380 @@ class GameWorkspace:
         if log:
             log(f"🔄 Sincronizando {len(external)} archivo(s)...\n")
         
-        for ef in external:
-            if self.sync_file(ef, log):
-                # Mapear tipo a campo de BD
-                field_map = {
-                    "xex": "xex_path",
-                    "iso": "iso_path",
-                    "toml": "project_toml",
-                    "json": "analysis_json"
-                }
-                if ef.file_type in field_map:
-                    new_paths[field_map[ef.file_type]] = ef.target_path
+        with self.lock():
+            results = self._sync(
+                external, log=log, progress=progress, cancel=cancel, workers=workers, strategy=strategy
+            )
+        for ef, result in zip(external, results):
+            if result.success and ef.file_type in self._SYNC_FIELDS:
+                new_paths[self._SYNC_FIELDS[ef.file_type]] = ef.target_path
         
         if log:
-            log(f"\n✅ Sincronización completada ({len(new_paths)} archivos)")
+            total_bytes = sum(r.bytes_copied for r in results)
+            elapsed = max((r.seconds for r in results), default=0.0)
+            rate = format_rate(total_bytes / elapsed) if elapsed else "-"
+            log(f"\n✅ Sincronización completada ({len(new_paths)} archivos, {rate})")
+            saved = sum(r.bytes_saved for r in results)
+            if saved:
+                log(f"💾 {saved / (1024 * 1024):.1f} MB sin copiar (reflink/hardlink/move)")
         
+        self._enforce_quota(log)
         return new_paths
     
-    @classmethod
-    def find_existing(cls, title_id: str) -> Optional["GameWorkspace"]:
-        """Busca un workspace existente por title_id."""
-        base = get_base_ports_dir()
+    def _sync(
+        self,
+        external: list["ExternalFile"],
+        log=None,
+        progress=None,
+        cancel=None,
+        workers: int = None,
+        strategy: PlacementStrategy = PlacementStrategy.AUTO
+    ) -> list:
+        """
+        Coloca los archivos externos en el workspace y registra cada resultado.
+        
+        - XEX/ISO con strategy AUTO: vía almacén de objetos (core.object_store),
+          enlazados desde el objeto; si el contenido ya está, no se copia nada
+        - Resto: move/reflink/hardlink (core.file_placement)
+        - Lo que no se pueda enlazar se copia con core.file_sync
+        """
+        strategy = PlacementStrategy(strategy)
+        store = self._object_store() if strategy == PlacementStrategy.AUTO else None
+        tasks = [
+            SyncTask(src=ef.current_path, dst=ef.target_path, size=ef.size, label=ef.label)
+            for ef in external
+        ]
+        results: list = [None] * len(external)
+        pending = []
+        staged = set()  # Índices que se copian al staging del almacén
+        
+        for i, ef in enumerate(external):
+            try:
+                if store and ef.file_type in self._IMMUTABLE_TYPES and store.can_link(ef.target_path):
+                    method = self._place_via_store(store, tasks[i], ef)
+                    if method is None:
+                        staged.add(i)
+                    placed = method
+                else:
+                    result = try_place(
+                        ef.current_path,
+                        ef.target_path,
+                        strategy,
+                        keep_source=strategy != PlacementStrategy.MOVE,
+                        immutable=ef.file_type in self._IMMUTABLE_TYPES
+                    )
+                    placed = result.method.value if result else None
+            except (OSError, sqlite3.Error) as e:
+                placed = None
+                staged.discard(i)
+                tasks[i].dst = ef.target_path
+                if log:
+                    log(f"⚠️ {ef.label}: {strategy.value} falló ({e}), se copiará")
+            
+            if placed is not None:
+                results[i] = FileSyncResult(task=tasks[i], success=True, method=placed)
+                if log:
+                    log(f"🔗 {ef.label} → {os.path.basename(ef.target_path)} ({placed}, sin copiar datos)")
+                continue
+            
+            pending.append(i)
+            if log:
+                size_mb = ef.size / (1024 * 1024)
+                log(f"📥 Copiando {ef.label} ({size_mb:.1f} MB)...")
         
-        if not base.exists():
+        copied = sync_files(
+            [tasks[i] for i in pending],
+            workers=workers or DEFAULT_WORKERS,
+            progress=progress,
+            cancel=cancel
+        ) if pending else []
+        
+        for i, result in zip(pending, copied):
+            results[i] = result
+            if result.success and i in staged:
+                # Copiado al almacén: registrar el objeto y enlazarlo al workspace
+                try:
+                    store.commit(result.task.dst, result.checksum)
+                    store.link(result.checksum, external[i].target_path, self.title_id)
+                except (OSError, sqlite3.Error) as e:
+                    result.success, result.error = False, str(e)
+            if result.success and strategy == PlacementStrategy.MOVE:
+                os.remove(result.task.src)  # Mover entre dispositivos = copiar + borrar
+            if not log:
+                continue
+            name = os.path.basename(result.task.src)
+            target = os.path.basename(external[i].target_path)
+            if result.success:
+                resumed = ""
+                if result.resumed_from:
+                    resumed = f", reanudado desde {result.resumed_from / (1024 * 1024):.0f} MB"
+                log(f"   ✅ {name} → {target} ({format_rate(result.rate)}{resumed})")
+            else:
+                log(f"   ❌ Error: {result.error}")
+        
+        refresh_paths(self.root, [ef.target_path for ef, r in zip(external, results) if r and r.success])
+        self._refresh_manifest()
+        return results
+    
+    @staticmethod
+    def _object_store():
+        """Almacén de objetos si la deduplicación está activada (storage.dedup)."""
+        if not get_setting("storage.dedup", True):
             return None
+        try:
+            return get_object_store()
+        except (OSError, sqlite3.Error):
+            return None
+    
+    def _place_via_store(self, store, task: SyncTask, ef: "ExternalFile") -> Optional[str]:
+        """
+        Coloca un XEX/ISO desde el almacén de objetos.
         
-        # Buscar carpetas que contengan el title_id
-        # No usamos glob porque [] son caracteres especiales
-        suffix = f"[{title_id}]"
-        for folder in base.iterdir():
-            if folder.is_dir() and folder.name.endswith(suffix):
-                # Extraer nombre del juego
-                name = folder.name.rsplit(' [', 1)[0]
-                ws = cls(title_id, name)
-                ws._root = folder
-                return ws
+        :return: Método usado ("dedup" si el contenido ya estaba, "reflink"
+                 si se clonó al almacén) o None si hay que copiarlo: en ese
+                 caso task.dst pasa a ser el temporal del almacén
+        """
+        digest = None
+        if store.has_size(ef.size):
+            # Solo se hashea si hay un objeto del mismo tamaño
+            digest = content_hash(ef.current_path)
+            if store.has(digest):
+                store.link(digest, ef.target_path, self.title_id)
+                return "dedup"
+        
+        staging = store.staging_path(ef.current_path)
+        cloned = try_place(ef.current_path, staging, PlacementStrategy.REFLINK)
+        if cloned is not None:
+            digest = digest or content_hash(staging)
+            store.commit(staging, digest)
+            store.link(digest, ef.target_path, self.title_id)
+            return "reflink"
         
+        task.dst = staging
         return None
     
+    def immutable_files(self) -> list[Path]:
+        """XEX e ISO del workspace (candidatos al almacén de objetos)."""
+        files = []
+        for pattern in ("*.xex", "*.iso"):
+            files.extend(p for p in self.root.glob(pattern) if p.is_file())
+        return sorted(files)
+    
+    def import_analysis_file(self, path: str) -> PlacementResult:
+        """
+        Trae un archivo de análisis recién generado (en TEMP) a analysis/.
+        
+        El original es temporal: se mueve si está en el mismo dispositivo
+        y, si no, se clona o copia y se borra.
+        
+        :param path: Archivo generado por el análisis
+        :return: PlacementResult (dst = nueva ruta)
+        """
+        dest = self.analysis_dir / os.path.basename(path)
+        with self.lock():
+            result = place_file(path, str(dest), keep_source=False)
+            refresh_dirs(self.root, ["analysis"])
+            self._refresh_manifest()
+        return result
+    
+    def update_manifest(self, workers: int = None) -> VerifyReport:
+        """
+        Crea o actualiza el manifiesto de integridad.
+        
+        Incremental: solo rehashea archivos nuevos o con tamaño/mtime distinto.
+        """
+        with self.lock():
+            return update_manifest(self.root, workers=workers or DEFAULT_HASH_WORKERS)
+    
+    def verify(self, full: bool = True, update: bool = False, workers: int = None) -> VerifyReport:
+        """
+        Verifica los archivos del workspace contra su manifiesto.
+        
+        :param full: Rehashear todo para detectar corrupción silenciosa
+                     (False = solo comparar tamaño/mtime)
+        :param update: Registrar los cambios legítimos (nuevos, editados, borrados)
+        :param workers: Hilos de hasheo
+        :return: VerifyReport
+        """
+        # Compartido si solo se lee: varias verificaciones pueden ir a la vez
+        with self.lock(shared=not update and self.manifest_file.exists()):
+            return verify_manifest(
+                self.root, full=full, update=update, workers=workers or DEFAULT_HASH_WORKERS
+            )
+    
+    def _refresh_manifest(self):
+        """Registra en el manifiesto (si ya existe) los archivos recién colocados."""
+        if self.manifest_file.exists():
+            self.update_manifest()
+    
+    def usage(self, max_age: float = RECONCILE_INTERVAL_S) -> WorkspaceUsage:
+        """
+        Uso de disco por subdirectorio, desde los contadores de .usage.json.
+        
+        :param max_age: Reconciliar con scandir si la última es más vieja (0 = ahora)
+        """
+        return get_usage(self.root, max_age)
+    
+    def touch(self, subdir: str):
+        """Registra un uso de extracted/, cleaned/ o recompiled/ (orden LRU del desalojo)."""
+        workspace_eviction.touch(self.root, subdir)
+    
+    def evicted_dirs(self) -> dict:
+        """Subdirectorios desalojados por cuota y pendientes de regenerar."""
+        return workspace_eviction.evicted_dirs(self.root)
+    
+    def ensure_dir(self, subdir: str, log=None) -> bool:
+        """
+        Garantiza que un subdirectorio regenerable tenga contenido.
+        
+        Si se desalojó, lo regenera desde la ISO/XEX/TOML del workspace.
+        
+        :param subdir: "extracted", "cleaned" o "recompiled"
+        :return: False si estaba desalojado y no se pudo regenerar
+        """
+        with self.lock():
+            if subdir in self.evicted_dirs():
+                if log:
+                    log(f"♻️ Regenerando {subdir}/ (desalojado por cuota)...")
+                if not workspace_eviction.regenerate(self.root, subdir, log=log):
+                    return False
+            self.touch(subdir)
+        return True
+    
+    def snapshot(self) -> workspace_snapshot.Snapshot:
+        """
+        Snapshot de recompiled/ (hardlinks a lo que no cambió desde el anterior).
+        
+        Tomarlo antes de volver a recompilar para poder comparar después.
+        
+        :raises FileNotFoundError: Si recompiled/ no existe
+        """
+        with self.lock():
+            snapshot = workspace_snapshot.create_snapshot(self.recompiled_dir, self.snapshots_dir)
+            refresh_dirs(self.root, [workspace_snapshot.SNAPSHOTS_DIRNAME])
+        return snapshot
+    
+    def snapshots(self) -> list[workspace_snapshot.Snapshot]:
+        """Snapshots de recompiled/, del más antiguo al más reciente."""
+        return workspace_snapshot.list_snapshots(self.snapshots_dir)
+    
+    def diff_snapshots(self, old: str = "latest", new: str = None) -> workspace_snapshot.SnapshotDiff:
+        """
+        Compara dos snapshots, o un snapshot con recompiled/ actual.
+        
+        :param old: Nombre (o prefijo) del snapshot; "latest" = el último
+        :param new: Otro snapshot (None = recompiled/ actual)
+        :raises KeyError: Si algún snapshot no existe o el prefijo es ambiguo
+        """
+        paths = []
+        for name in (old, new):
+            if name is None:
+                paths.append(self.recompiled_dir)
+                continue
+            found = workspace_snapshot.find_snapshot(self.snapshots_dir, name)
+            if found is None:
+                raise KeyError(f"Snapshot no encontrado: {name}")
+            paths.append(Path(found.path))
+        with self.lock(shared=True):
+            return workspace_snapshot.diff_trees(*paths)
+    
+    def prune_snapshots(
+        self,
+        keep: int = None,
+        older_than: float = None,
+        dry_run: bool = False
+    ) -> list[workspace_snapshot.Snapshot]:
+        """
+        Borra snapshots antiguos (el más reciente nunca).
+        
+        :param keep: Conservar los N más recientes
+        :param older_than: Borrar los de hace más de estos segundos
+        :return: Snapshots borrados (o que se borrarían en dry_run)
+        """
+        with self.lock():
+            pruned = workspace_snapshot.prune_snapshots(
+                self.snapshots_dir, keep=keep, older_than=older_than, dry_run=dry_run
+            )
+            if pruned and not dry_run:
+                refresh_dirs(self.root, [workspace_snapshot.SNAPSHOTS_DIRNAME])
+        return pruned
+    
     @classmethod
-    def list_all(cls) -> list["GameWorkspace"]:
-        """Lista todos los workspaces existentes."""
-        base = get_base_ports_dir()
-        workspaces = []
+    def _enforce_quota(cls, log=None):
+        """Aplica storage.quota_gb a toda la biblioteca (si hay cuota)."""
+        quota = workspace_eviction.quota_bytes()
+        if not quota:
+            return
+        report = workspace_eviction.enforce_quota(
+            [ws.root for ws in cls.list_all()], quota=quota, log=log
+        )
+        if log and report.evicted:
+            log(f"🧹 Cuota: {report.freed_bytes / (1024 * 1024):.1f} MB regenerables desalojados")
+    
+    @classmethod
+    def _from_folder(cls, base: Path, folder: str) -> Optional["GameWorkspace"]:
+        parsed = parse_folder_name(folder)
+        if parsed is None:
+            return None
+        name, tid = parsed
+        ws = cls(tid, name)
+        ws._root = base / folder
+        return ws
+    
+    @classmethod
+    def containing(cls, path) -> Optional[tuple["GameWorkspace", str]]:
+        """
+        Workspace y subdirectorio regenerable que contienen una ruta.
         
-        if not base.exists():
-            return workspaces
+        Ej: ".../Halo 3 [4D5307E6]/recompiled/obj" → (workspace, "recompiled")
         
-        for folder in base.iterdir():
-            if folder.is_dir() and '[' in folder.name and ']' in folder.name:
-                try:
-                    # Extraer nombre y title_id
-                    name, tid = folder.name.rsplit(' [', 1)
-                    tid = tid.rstrip(']')
-                    ws = cls(tid, name)
-                    ws._root = folder
-                    workspaces.append(ws)
-                except ValueError:
-                    continue
+        :return: (workspace, subdir) o None si la ruta no está en extracted/,
+                 cleaned/ o recompiled/ de un workspace
+        """
+        path = Path(os.path.abspath(path))
+        for child in (path, *path.parents):
+            if child.name in workspace_eviction.REGENERABLE_DIRS:
+                ws = cls._from_folder(child.parent.parent, child.parent.name)
+                if ws is not None:
+                    return ws, child.name
+        return None
+    
+    @classmethod
+    def find_existing(cls, title_id: str) -> Optional["GameWorkspace"]:
+        """Busca un workspace existente por title_id (vía índice, O(1))."""
+        base = get_base_ports_dir()
+        entry = get_registry(base).get(title_id)
+        if entry is None:
+            return None
+        return cls._from_folder(base, entry["folder"])
+    
+    @classmethod
+    def list_all(cls, refresh: bool = False) -> list["GameWorkspace"]:
+        """
+        Lista todos los workspaces existentes.
         
+        :param refresh: Reconstruir el índice desde disco antes de listar
+        """
+        base = get_base_ports_dir()
+        registry = get_registry(base)
+        if refresh:
+            registry.refresh()
+        
+        workspaces = []
+        for _title_id, entry in registry.entries():
+            ws = cls._from_folder(base, entry["folder"])
+            if ws is not None:
+                workspaces.append(ws)
         return workspaces
 
 
+def _base_mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
 def get_or_create_workspace(title_id: str, game_name: str) -> tuple[GameWorkspace, bool]:
     """
     Obtiene un workspace existente o crea uno nuevo.
@@ -0,0 +1,345 @@
+# core/object_store.py
+"""
+Almacén de objetos por contenido, compartido por todos los workspaces.
+
+Las variantes de región, los re-dumps y las copias TEMP/workspace guardan
+los mismos bytes de XEX e ISO varias veces. El almacén guarda cada
+contenido una sola vez en ~/.mrmonkeyshopware/objects/<aa>/<hash> y los
+workspaces lo referencian con hardlinks o reflinks.
+
+- El hash es el checksum de core.file_sync (BLAKE2b por bloques), así que
+  una copia verificada al almacén ya trae su identificador
+- Los objetos son de solo lectura: editarlos por un hardlink cambiaría
+  todos los workspaces que los comparten
+- refs.db (SQLite) guarda qué rutas apuntan a qué objeto; gc() descarta
+  las referencias cuya ruta ya no apunta al objeto y borra los objetos
+  sin referencias
+"""
+import os
+import sqlite3
+import stat
+import threading
+import time
+from dataclasses import dataclass
+from hashlib import blake2b
+from pathlib import Path
+from typing import Dict, Optional
+
+from core.file_placement import PlacementResult, PlacementStrategy, detect_capabilities, place_file
+from core.file_sync import content_hash
+
+# Los temporales de staging (copias a medias) se conservan este tiempo
+# para poder reanudarlas
+STAGING_MAX_AGE_S = 7 * 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_objects_size ON objects(size);
+CREATE TABLE IF NOT EXISTS refs (
+    path TEXT PRIMARY KEY,
+    hash TEXT NOT NULL REFERENCES objects(hash),
+    workspace TEXT,
+    method TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_refs_hash ON refs(hash);
+"""
+
+
+def default_store_dir() -> Path:
+    """~/.mrmonkeyshopware/objects"""
+    return Path.home() / ".mrmonkeyshopware" / "objects"
+
+
+@dataclass
+class StoreReport:
+    """Bytes lógicos (lo que ven los workspaces) vs físicos (lo que ocupa)."""
+    objects: int
+    refs: int
+    logical_bytes: int
+    physical_bytes: int
+    
+    @property
+    def saved_bytes(self) -> int:
+        return max(0, self.logical_bytes - self.physical_bytes)
+    
+    @property
+    def ratio(self) -> float:
+        """Factor de deduplicación (lógico / físico)."""
+        return self.logical_bytes / self.physical_bytes if self.physical_bytes else 1.0
+
+
+@dataclass
+class GcReport:
+    """Resultado de gc()."""
+    stale_refs: int = 0
+    removed_objects: int = 0
+    freed_bytes: int = 0
+    removed_staging: int = 0
+
+
+class ObjectStore:
+    """
+    Almacén de objetos direccionado por contenido.
+    
+    Thread-safe: una conexión SQLite protegida por un lock.
+    """
+    
+    def __init__(self, root: Path = None):
+        self.root = Path(root) if root else default_store_dir()
+        self.staging_dir = self.root / "tmp"
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(str(self.root / "refs.db"), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(_SCHEMA)
+    
+    def close(self):
+        with self._lock:
+            self.conn.close()
+    
+    # ══════════════════════════════════════════════════════════════
+    # Objetos
+    # ══════════════════════════════════════════════════════════════
+    
+    def object_path(self, digest: str) -> Path:
+        """Ruta del objeto: objects/<2 primeros>/<hash>."""
+        return self.root / digest[:2] / digest
+    
+    def has(self, digest: str) -> bool:
+        """True si el objeto está registrado y en disco."""
+        with self._lock:
+            row = self.conn.execute("SELECT 1 FROM objects WHERE hash = ?", (digest,)).fetchone()
+        return row is not None and self.object_path(digest).exists()
+    
+    def has_size(self, size: int) -> bool:
+        """True si hay algún objeto de ese tamaño (si no, no hace falta hashear para deduplicar)."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT 1 FROM objects WHERE size = ? LIMIT 1", (size,)
+            ).fetchone() is not None
+    
+    def can_link(self, dst: str) -> bool:
+        """
+        True si los objetos se pueden enlazar (hardlink/reflink) en dst.
+        
+        Si no (otro disco), guardar en el almacén duplicaría los datos.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+        caps = detect_capabilities(str(self.root / "refs.db"), dst)
+        return caps.hardlink or caps.reflink
+    
+    def staging_path(self, src: str) -> str:
+        """
+        Temporal donde copiar src antes de conocer su hash.
+        
+        Es determinista por ruta de origen: una copia interrumpida se
+        reanuda con el diario de core.file_sync.
+        """
+        key = blake2b(os.path.abspath(src).encode("utf-8"), digest_size=10).hexdigest()
+        return str(self.staging_dir / key)
+    
+    def commit(self, staged: str, digest: str) -> Path:
+        """
+        Mueve un archivo del staging al almacén con su hash.
+        
+        Si el objeto ya existía, el temporal se descarta.
+        
+        :param staged: Archivo copiado en staging_path()
+        :param digest: Su hash (FileSyncResult.checksum)
+        :return: Ruta del objeto
+        """
+        obj = self.object_path(digest)
+        with self._lock:
+            if self.has(digest):
+                os.remove(staged)
+                return obj
+            obj.parent.mkdir(exist_ok=True)
+            os.replace(staged, obj)
+            os.chmod(obj, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO objects (hash, size, created_at) VALUES (?, ?, ?)",
+                (digest, obj.stat().st_size, time.time())
+            )
+            self.conn.commit()
+        return obj
+    
+    def add_file(self, src: str, keep_source: bool = True) -> str:
+        """
+        Guarda un archivo en el almacén.
+        
+        :param src: Archivo
+        :param keep_source: False para moverlo (si está en el mismo disco)
+        :return: Hash del objeto
+        """
+        digest = content_hash(src)
+        if self.has(digest):
+            if not keep_source:
+                os.remove(src)
+            return digest
+        staged = self.staging_path(src)
+        # Nunca hardlink del original: si el usuario lo edita, el objeto cambiaría
+        place_file(src, staged, keep_source=keep_source)
+        self.commit(staged, digest)
+        return digest
+    
+    # ══════════════════════════════════════════════════════════════
+    # Referencias
+    # ══════════════════════════════════════════════════════════════
+    
+    def link(self, digest: str, dst: str, workspace: str = None) -> PlacementResult:
+        """
+        Coloca un objeto en dst (hardlink o reflink) y registra la referencia.
+        
+        :param digest: Hash del objeto
+        :param dst: Ruta en el workspace
+        :param workspace: Title ID del workspace (informativo)
+        :return: PlacementResult (COPY si no se pudo enlazar)
+        """
+        obj = str(self.object_path(digest))
+        if os.path.lexists(dst) and not os.path.samefile(obj, dst):
+            os.remove(dst)
+        result = place_file(obj, dst, immutable=True)
+        st = os.stat(dst)
+        with self._lock:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO refs (path, hash, workspace, method, size, mtime_ns)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (os.path.abspath(dst), digest, workspace, result.method.value, st.st_size, st.st_mtime_ns))
+            self.conn.commit()
+        return result
+    
+    def adopt(self, path: str, workspace: str = None) -> Optional[PlacementResult]:
+        """
+        Deduplica un archivo que ya está en un workspace.
+        
+        Lo mueve al almacén (o reutiliza el objeto existente) y deja en su
+        lugar un enlace al objeto.
+        
+        :return: PlacementResult del enlace, o None si el almacén está en
+                 otro disco y no se puede enlazar
+        """
+        path = os.path.abspath(path)
+        if not self.can_link(path):
+            return None
+        digest = content_hash(path)
+        if not self.has(digest):
+            staged = self.staging_path(path)
+            place_file(path, staged, keep_source=False)
+            self.commit(staged, digest)
+        return self.link(digest, path, workspace)
+    
+    def release(self, path: str):
+        """Olvida la referencia de una ruta (el objeto se borra en el próximo gc())."""
+        with self._lock:
+            self.conn.execute("DELETE FROM refs WHERE path = ?", (os.path.abspath(path),))
+            self.conn.commit()
+    
+    def _ref_is_valid(self, ref: sqlite3.Row) -> bool:
+        """La ruta sigue existiendo y apuntando al objeto."""
+        try:
+            st = os.stat(ref["path"])
+        except OSError:
+            return False
+        if ref["method"] == PlacementStrategy.HARDLINK.value:
+            try:
+                return os.path.samefile(ref["path"], self.object_path(ref["hash"]))
+            except OSError:
+                return False
+        # Reflink/copia: mismo tamaño y mtime que al enlazar
+        return st.st_size == ref["size"] and st.st_mtime_ns == ref["mtime_ns"]
+    
+    # ══════════════════════════════════════════════════════════════
+    # GC e informes
+    # ══════════════════════════════════════════════════════════════
+    
+    def gc(self, dry_run: bool = False) -> GcReport:
+        """
+        Recolecta basura por conteo de referencias.
+        
+        1. Descarta las referencias cuya ruta se borró o ya no es el objeto
+        2. Borra los objetos sin referencias
+        3. Borra temporales de staging abandonados
+        
+        :param dry_run: Solo calcular, sin borrar nada
+        :return: GcReport
+        """
+        report = GcReport()
+        with self._lock:
+            stale = [
+                ref["path"] for ref in self.conn.execute("SELECT * FROM refs")
+                if not self._ref_is_valid(ref)
+            ]
+            report.stale_refs = len(stale)
+            if not dry_run:
+                self.conn.executemany("DELETE FROM refs WHERE path = ?", [(p,) for p in stale])
+            stale_set = set(stale)
+            
+            counts: Dict[str, int] = {}
+            for ref in self.conn.execute("SELECT path, hash FROM refs"):
+                if ref["path"] not in stale_set:
+                    counts[ref["hash"]] = counts.get(ref["hash"], 0) + 1
+            
+            for obj in self.conn.execute("SELECT hash, size FROM objects").fetchall():
+                if counts.get(obj["hash"], 0):
+                    continue
+                report.removed_objects += 1
+                report.freed_bytes += obj["size"]
+                if dry_run:
+                    continue
+                path = self.object_path(obj["hash"])
+                if path.exists():
+                    os.chmod(path, stat.S_IWUSR | stat.S_IRUSR)  # Windows no borra solo-lectura
+                    path.unlink()
+                self.conn.execute("DELETE FROM objects WHERE hash = ?", (obj["hash"],))
+            if not dry_run:
+                self.conn.commit()
+        
+        cutoff = time.time() - STAGING_MAX_AGE_S
+        for entry in self.staging_dir.iterdir():
+            if entry.stat().st_mtime < cutoff:
+                report.removed_staging += 1
+                if not dry_run:
+                    entry.unlink()
+        return report
+    
+    def report(self) -> StoreReport:
+        """
+        Bytes lógicos vs físicos.
+        
+        Lógico: suma de los archivos referenciados en los workspaces.
+        Físico: objetos del almacén + referencias que acabaron en copia.
+        """
+        with self._lock:
+            objects, object_bytes = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects"
+            ).fetchone()
+            refs, logical = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(o.size), 0) FROM refs r JOIN objects o ON o.hash = r.hash"
+            ).fetchone()
+            copied = self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM refs WHERE method = ?",
+                (PlacementStrategy.COPY.value,)
+            ).fetchone()[0]
+        return StoreReport(
+            objects=objects, refs=refs, logical_bytes=logical, physical_bytes=object_bytes + copied
+        )
+
+
+# Almacén compartido dentro del proceso
+_store: Optional[ObjectStore] = None
+_store_lock = threading.Lock()
+
+
+def get_object_store() -> ObjectStore:
+    """Retorna el almacén compartido (~/.mrmonkeyshopware/objects)."""
+    global _store
+    with _store_lock:
+        if _store is None or _store.root != default_store_dir():
+            _store = ObjectStore()
+        return _store
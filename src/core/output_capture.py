@@ -0,0 +1,153 @@
+# core/output_capture.py
+"""
+Captura acotada de la salida de un proceso externo.
+
+subprocess.run(capture_output=True) guarda toda la salida en memoria; con
+XenonRecomp en un juego grande son cientos de MB que luego se recortan a
+500 caracteres para el log. Aquí:
+
+- stdout y stderr se leen en streaming (un hilo por tubería, líneas de
+  como mucho MAX_LINE_BYTES)
+- en memoria solo queda la cola de cada una (RingBuffer de tail_bytes)
+- la salida completa va a un log comprimido con gzip, con las líneas de
+  stderr marcadas con "[stderr] "
+
+La memoria usada no depende del volumen de salida.
+"""
+import gzip
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Cola que se conserva en memoria por tubería
+DEFAULT_TAIL_BYTES = 64 * 1024
+
+# Una línea más larga se trocea (sin salto de línea no hay límite natural)
+MAX_LINE_BYTES = 64 * 1024
+
+# gzip rápido: el log no debe frenar al proceso que escribe en la tubería
+_GZIP_LEVEL = 1
+
+_STDERR_PREFIX = b"[stderr] "
+
+
+class RingBuffer:
+    """Últimos max_bytes escritos (por líneas)."""
+    
+    def __init__(self, max_bytes: int = DEFAULT_TAIL_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0     # Todo lo que se escribió
+        self._chunks = deque()
+        self._size = 0
+    
+    def append(self, data: bytes):
+        self.total_bytes += len(data)
+        if len(data) > self.max_bytes:
+            data = data[-self.max_bytes:] if self.max_bytes else b""
+        self._chunks.append(data)
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            self._size -= len(self._chunks.popleft())
+    
+    @property
+    def dropped_bytes(self) -> int:
+        """Bytes que ya no están en la cola."""
+        return self.total_bytes - self._size
+    
+    def getvalue(self) -> str:
+        return b"".join(self._chunks).decode("utf-8", errors="replace")
+
+
+@dataclass
+class CapturedRun:
+    """Resultado de run_captured()."""
+    returncode: Optional[int]
+    stdout: str                  # Cola de stdout
+    stderr: str                  # Cola de stderr
+    stdout_bytes: int = 0        # Tamaño total de la salida (no solo la cola)
+    stderr_bytes: int = 0
+    log_path: Optional[str] = None
+    timed_out: bool = False
+    seconds: float = 0.0
+
+
+def _pump(stream, ring: RingBuffer, log_file, log_lock: threading.Lock, prefix: bytes):
+    with stream:
+        while True:
+            line = stream.readline(MAX_LINE_BYTES)
+            if not line:
+                break
+            ring.append(line)
+            if log_file is not None:
+                with log_lock:
+                    log_file.write(prefix + line if prefix else line)
+
+
+def run_captured(
+    cmd: List[str],
+    cwd: Optional[str] = None,
+    timeout: Optional[float] = None,
+    tail_bytes: int = DEFAULT_TAIL_BYTES,
+    log_path: Optional[str] = None
+) -> CapturedRun:
+    """
+    Ejecuta un proceso guardando solo la cola de su salida en memoria.
+    
+    :param cmd: Comando
+    :param cwd: Directorio de trabajo
+    :param timeout: Segundos; al vencer se mata el proceso (timed_out=True)
+    :param tail_bytes: Bytes de cola que se conservan por tubería
+    :param log_path: Log .gz con la salida completa (None = no guardar)
+    :raises OSError: Si el proceso no se puede lanzar
+    """
+    start = time.perf_counter()
+    log_file = gzip.open(log_path, "wb", compresslevel=_GZIP_LEVEL) if log_path else None
+    try:
+        proc = subprocess.Popen(
+            cmd, cwd=cwd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except BaseException:
+        if log_file is not None:
+            log_file.close()
+        raise
+    
+    log_lock = threading.Lock()
+    out_ring, err_ring = RingBuffer(tail_bytes), RingBuffer(tail_bytes)
+    pumps = [
+        threading.Thread(target=_pump, args=(proc.stdout, out_ring, log_file, log_lock, b""), daemon=True),
+        threading.Thread(target=_pump, args=(proc.stderr, err_ring, log_file, log_lock, _STDERR_PREFIX),
+                         daemon=True),
+    ]
+    for pump in pumps:
+        pump.start()
+    
+    timed_out = False
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        proc.kill()
+        proc.wait()
+    except BaseException:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        for pump in pumps:
+            pump.join()
+        if log_file is not None:
+            log_file.close()
+    
+    return CapturedRun(
+        returncode=proc.returncode,
+        stdout=out_ring.getvalue(),
+        stderr=err_ring.getvalue(),
+        stdout_bytes=out_ring.total_bytes,
+        stderr_bytes=err_ring.total_bytes,
+        log_path=log_path,
+        timed_out=timed_out,
+        seconds=time.perf_counter() - start,
+    )
@@ -6,6 +6,7 @@ Ahora con auto-guardado en base de datos.
 """
 import os
 import json
+import time
 from dataclasses import dataclass, field
 from typing import Callable, Optional
 
@@ -16,6 +17,7 @@ from core.toml_generator import generate_project_toml
 from core.config import TEMP_BASE
 from core.database import GameDatabase, Game, GameStatus
 from core.xex_parser import XexInfo
+from core.workspace_lock import workspace_lock
 
 
 @dataclass
@@ -32,6 +34,7 @@ class PipelineResult:
     steps_completed: list = field(default_factory=list)
     xex_info: Optional[XexInfo] = None  # Metadata del juego detectado
     game_id: Optional[int] = None  # ID del juego en BD
+    stage_times: dict = field(default_factory=dict)  # Segundos por paso
 
 
 def find_main_xex(extracted_dir: str) -> Optional[str]:
@@ -59,6 +62,50 @@ def find_main_xex(extracted_dir: str) -> Optional[str]:
     return xex_files[0]
 
 
+def _record_failure(
+    result: PipelineResult,
+    pipeline_start: float,
+    stage: str,
+    paths: list,
+    log: Callable[[str], None]
+) -> PipelineResult:
+    """
+    Registra un evento FAILED (tool="pipeline") con el error y los tiempos.
+    
+    El juego conserva su status: el evento queda como no-transición y
+    solo cuenta en failure_rate_by_tool().
+    
+    El fallo se asocia al juego ya registrado con alguna de las rutas
+    (ISO o XEX); si no hay ninguno no se puede registrar (game_events
+    necesita un game_id).
+    
+    :param stage: Paso que falló ("dump", "extract", "analyse"...)
+    :param paths: Rutas con las que buscar el juego en la BD
+    :return: result, para usarlo en el return del pipeline
+    """
+    paths = [p for p in paths if p]
+    if not paths:
+        return result
+    
+    metrics = {
+        "duration_s": time.perf_counter() - pipeline_start,
+        "stages": result.stage_times,
+        "failed_stage": stage,
+    }
+    try:
+        with GameDatabase() as db:
+            game = next(filter(None, (db.get_by_path(p) for p in paths)), None)
+            if game is None:
+                return result
+            db.record_event(game.id, GameStatus.FAILED, tool="pipeline",
+                            metrics=metrics, error=result.error)
+            result.game_id = game.id
+        log(f"📝 Fallo registrado en el historial del juego (ID: {game.id})")
+    except Exception as e:
+        log(f"⚠️ No se pudo registrar el fallo en BD: {e}")
+    return result
+
+
 def full_pipeline(
     drive_letter: Optional[str] = None,
     iso_path: Optional[str] = None,
@@ -96,6 +143,7 @@ def full_pipeline(
     os.makedirs(output_dir, exist_ok=True)
     
     _log(f"📁 Directorio de salida: {output_dir}")
+    pipeline_start = time.perf_counter()
     
     # ══════════════════════════════════════════════════════════════
     # PASO 1: Dump (solo si se proporciona drive_letter)
@@ -106,12 +154,14 @@ def full_pipeline(
         _log(f"{'═'*50}")
         
         iso_out = os.path.join(output_dir, "game.iso")
+        step_start = time.perf_counter()
         dump_result = dump_disc(drive_letter, out_path=iso_out)
+        result.stage_times["dump"] = time.perf_counter() - step_start
         
         if not dump_result:
             result.error = f"Error en dump desde {drive_letter}"
             _log(f"❌ {result.error}")
-            return result
+            return _record_failure(result, pipeline_start, "dump", [iso_out], _log)
         
         result.iso_path = iso_out
         result.steps_completed.append("dump")
@@ -129,12 +179,14 @@ def full_pipeline(
         _log(f"{'═'*50}")
         
         extract_out = os.path.join(output_dir, "extracted")
+        step_start = time.perf_counter()
         extracted_dir = extract_iso(iso_path, output_dir=extract_out, log=_log)
+        result.stage_times["extract"] = time.perf_counter() - step_start
         
         if not extracted_dir:
             result.error = f"Error extrayendo {iso_path}"
             _log(f"❌ {result.error}")
-            return result
+            return _record_failure(result, pipeline_start, "extract", [iso_path], _log)
         
         result.extracted_dir = extracted_dir
         result.steps_completed.append("extract")
@@ -145,7 +197,7 @@ def full_pipeline(
         if not main_xex:
             result.error = "No se encontró ningún archivo .xex"
             _log(f"❌ {result.error}")
-            return result
+            return _record_failure(result, pipeline_start, "extract", [iso_path], _log)
         
         result.main_xex = main_xex
         _log(f"🎮 XEX principal: {os.path.basename(main_xex)}")
@@ -166,12 +218,16 @@ def full_pipeline(
             result.main_xex = xex_path
         
         analysis_dir = os.path.join(output_dir, "analysis")
+        step_start = time.perf_counter()
         analysis_result = analyse_xex(xex_path, out_dir=analysis_dir, log=_log)
+        result.stage_times["analyse"] = time.perf_counter() - step_start
         
         if not analysis_result or not analysis_result.success:
             result.error = f"Error analizando {xex_path}"
             _log(f"❌ {result.error}")
-            return result
+            return _record_failure(
+                result, pipeline_start, "analyse", [xex_path, result.iso_path or iso_path], _log
+            )
         
         # Extraer resultados del AnalysisResult
         result.analysis_json = analysis_result.json_file
@@ -190,7 +246,9 @@ def full_pipeline(
         _log(f"{'═'*50}")
         
         project_dir = os.path.join(output_dir, "project")
+        step_start = time.perf_counter()
         project_toml = generate_project_toml(xex_path, analysis_result.json_file, project_dir)
+        result.stage_times["toml"] = time.perf_counter() - step_start
         
         result.project_toml = project_toml
         result.steps_completed.append("toml")
@@ -234,13 +292,18 @@ def full_pipeline(
                 )
                 
                 # Guardar o actualizar en BD
-                with GameDatabase() as db:
-                    game_id = db.add_or_update_game(game)
+                metrics = {
+                    "duration_s": time.perf_counter() - pipeline_start,
+                    "stages": result.stage_times,
+                }
+                # Lock del workspace: otros workers pueden escribir la misma fila
+                with workspace_lock(xex_info.title_id), GameDatabase() as db:
+                    game_id = db.add_or_update_game(game, tool="pipeline", metrics=metrics)
                     result.game_id = game_id
                 
                 _log(f"✅ Juego guardado en BD con ID: {game_id}")
                 _log(f"   🎮 {game.game_name} ({game.title_id})")
-                
+            
             except Exception as e:
                 _log(f"⚠️ No se pudo guardar en BD: {e}")
     
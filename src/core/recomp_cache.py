@@ -0,0 +1,222 @@
+# core/recomp_cache.py
+"""
+Huella de entradas de XenonRecomp para recompilación incremental.
+
+XenonRecomp tarda minutos en juegos grandes. Tras una ejecución correcta se
+guarda junto a las salidas (.recomp_fingerprint.json) el hash de:
+
+- project.toml
+- los archivos que referencia (XEX, switch tables, parches...: cualquier
+  clave *_path que apunte a un archivo existente)
+- ppc_context.h
+- el ejecutable de XenonRecomp (una versión nueva genera otro código)
+
+y la lista de archivos generados. Si en la siguiente ejecución todo es
+idéntico y las salidas siguen ahí, se devuelve el resultado de caché.
+
+Igual que el manifiesto de integridad, solo se rehashea un archivo si su
+tamaño o mtime cambió desde la última vez.
+"""
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+from core.atomic_io import atomic_write_json
+from core.workspace_manifest import hash_file
+
+FINGERPRINT_FILE = ".recomp_fingerprint.json"
+FINGERPRINT_VERSION = 1
+
+# Claves del TOML que son salidas, no entradas
+_OUTPUT_KEYS = ("out_directory_path", "target_dir", "patched_file_path")
+
+
+@dataclass
+class InputState:
+    """Estado de un archivo de entrada."""
+    size: int
+    mtime_ns: int
+    hash: str
+
+
+@dataclass
+class RecompFingerprint:
+    """Huella de una recompilación correcta."""
+    inputs: Dict[str, Optional[InputState]] = field(default_factory=dict)  # None = no existía
+    cpp_files: List[str] = field(default_factory=list)     # Relativos a output_dir
+    header_files: List[str] = field(default_factory=list)
+    created: float = 0.0
+
+
+def referenced_inputs(toml_path: str) -> List[str]:
+    """
+    Archivos de entrada que referencia un project.toml.
+    
+    Sin tomllib/tomli o con un TOML inválido solo cuenta el propio TOML.
+    """
+    if tomllib is None:
+        return []
+    try:
+        with open(toml_path, "rb") as f:
+            data = tomllib.load(f)
+    except (OSError, ValueError):
+        return []
+    
+    base = os.path.dirname(os.path.abspath(toml_path))
+    found = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        for key, value in node.items():
+            if isinstance(value, dict):
+                stack.append(value)
+            elif (isinstance(value, str) and key.endswith("_path") and key not in _OUTPUT_KEYS
+                  and value):
+                path = os.path.normpath(os.path.join(base, value))
+                if os.path.isfile(path):
+                    found.append(path)
+    return sorted(set(found))
+
+
+def _input_state(path: str, previous: Optional[InputState]) -> Optional[InputState]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if previous is not None and (previous.size, previous.mtime_ns) == (st.st_size, st.st_mtime_ns):
+        return previous  # Sin cambios de tamaño/mtime: no rehashear
+    try:
+        return InputState(st.st_size, st.st_mtime_ns, hash_file(path))
+    except OSError:
+        return None
+
+
+def collect_inputs(
+    toml_path: str,
+    extra: List[str],
+    previous: Optional[RecompFingerprint] = None
+) -> Dict[str, Optional[InputState]]:
+    """
+    Estado actual de todas las entradas de una recompilación.
+    
+    :param toml_path: project.toml
+    :param extra: Entradas fuera del TOML (ppc_context.h, XenonRecomp)
+    :param previous: Huella anterior (para no rehashear lo que no cambió)
+    """
+    paths = [os.path.abspath(toml_path)] + referenced_inputs(toml_path)
+    paths += [os.path.abspath(p) for p in extra if p]
+    known = previous.inputs if previous else {}
+    return {path: _input_state(path, known.get(path)) for path in dict.fromkeys(paths)}
+
+
+def load_fingerprint(output_dir: str) -> Optional[RecompFingerprint]:
+    """Lee la huella guardada junto a las salidas (None si no hay o no es válida)."""
+    try:
+        with open(os.path.join(output_dir, FINGERPRINT_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if data.get("version") != FINGERPRINT_VERSION:
+        return None
+    try:
+        return RecompFingerprint(
+            inputs={
+                path: InputState(**state) if state else None
+                for path, state in data.get("inputs", {}).items()
+            },
+            cpp_files=data.get("cpp_files", []),
+            header_files=data.get("header_files", []),
+            created=data.get("created", 0.0),
+        )
+    except TypeError:
+        return None
+
+
+def _write_fingerprint(output_dir: str, fingerprint: RecompFingerprint):
+    atomic_write_json(os.path.join(output_dir, FINGERPRINT_FILE), {
+        "version": FINGERPRINT_VERSION,
+        "created": fingerprint.created,
+        "inputs": {
+            path: state.__dict__ if state else None for path, state in fingerprint.inputs.items()
+        },
+        "cpp_files": fingerprint.cpp_files,
+        "header_files": fingerprint.header_files,
+    }, indent=1)
+
+
+def save_fingerprint(
+    output_dir: str,
+    inputs: Dict[str, Optional[InputState]],
+    cpp_files: List[str],
+    header_files: List[str]
+) -> RecompFingerprint:
+    """
+    Guarda la huella de una recompilación correcta.
+    
+    :param cpp_files: Rutas de los .cpp generados (bajo output_dir)
+    :param header_files: Rutas de los headers generados
+    """
+    fingerprint = RecompFingerprint(
+        inputs=inputs,
+        cpp_files=[os.path.relpath(p, output_dir) for p in cpp_files],
+        header_files=[os.path.relpath(p, output_dir) for p in header_files],
+        created=time.time(),
+    )
+    _write_fingerprint(output_dir, fingerprint)
+    return fingerprint
+
+
+def clear_fingerprint(output_dir: str):
+    """Invalida la huella (antes de recompilar: las salidas van a cambiar)."""
+    try:
+        os.remove(os.path.join(output_dir, FINGERPRINT_FILE))
+    except OSError:
+        pass
+
+
+def check_fingerprint(
+    output_dir: str,
+    toml_path: str,
+    extra: List[str]
+) -> Tuple[Optional[RecompFingerprint], Dict[str, Optional[InputState]], str]:
+    """
+    Compara las entradas actuales con la última recompilación correcta.
+    
+    :return: (huella si se puede reutilizar o None, entradas actuales,
+        motivo: por qué se reutiliza o por qué hay que recompilar)
+    """
+    previous = load_fingerprint(output_dir)
+    inputs = collect_inputs(toml_path, extra, previous)
+    if previous is None:
+        return None, inputs, "sin recompilación previa"
+    
+    for path in sorted(set(inputs) | set(previous.inputs)):
+        if path not in previous.inputs:
+            return None, inputs, f"nueva entrada: {os.path.basename(path)}"
+        if path not in inputs:
+            return None, inputs, f"entrada eliminada del TOML: {os.path.basename(path)}"
+        old, new = previous.inputs[path], inputs[path]
+        if (old.hash if old else None) != (new.hash if new else None):
+            return None, inputs, f"{os.path.basename(path)} cambió"
+    
+    for rel in previous.cpp_files + previous.header_files:
+        if not os.path.isfile(os.path.join(output_dir, rel)):
+            return None, inputs, f"falta la salida {rel}"
+    
+    if inputs != previous.inputs:
+        # Mismo contenido con otro mtime (ej: TOML regenerado): guardar el
+        # estado nuevo para no rehashear en la próxima comprobación
+        previous.inputs = inputs
+        _write_fingerprint(output_dir, previous)
+    created = time.strftime("%Y-%m-%d %H:%M", time.localtime(previous.created))
+    return previous, inputs, f"entradas sin cambios desde {created}"
@@ -0,0 +1,217 @@
+# core/recomp_manifest.py
+"""
+Manifiesto de los archivos generados por XenonRecomp.
+
+Un juego grande genera miles de .cpp/.h. Antes cada consulta (fin de la
+recompilación, validación) recorría todo el árbol con os.walk, y build/ se
+recorría dos veces (una dentro de output_dir y otra por separado), así que
+sus archivos salían duplicados.
+
+Ahora, tras una recompilación correcta, se recorre output_dir una sola vez
+con os.scandir y se guarda .recomp_output.json con la ruta, tamaño, mtime y
+hash de cada fuente y header. La validación, la CLI y la GUI leen el
+manifiesto en vez de recorrer el árbol.
+"""
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from core.atomic_io import atomic_write_json
+from core.workspace_manifest import DEFAULT_HASH_WORKERS, hash_algorithm, hash_file
+
+OUTPUT_MANIFEST_FILE = ".recomp_output.json"
+OUTPUT_MANIFEST_VERSION = 1
+
+SOURCE_SUFFIXES = (".cpp",)
+HEADER_SUFFIXES = (".h", ".hpp")
+_GENERATED_SUFFIXES = SOURCE_SUFFIXES + HEADER_SUFFIXES
+
+
+@dataclass(slots=True)
+class GeneratedFile:
+    """Archivo generado (path relativo a output_dir, con "/")."""
+    path: str
+    size: int
+    mtime_ns: int
+    hash: Optional[str] = None
+    
+    @property
+    def is_source(self) -> bool:
+        return self.path.endswith(SOURCE_SUFFIXES)
+
+
+@dataclass
+class OutputManifest:
+    """Manifiesto de una salida de XenonRecomp."""
+    files: List[GeneratedFile] = field(default_factory=list)
+    algorithm: Optional[str] = None
+    created: float = 0.0
+    
+    @property
+    def total_bytes(self) -> int:
+        return sum(f.size for f in self.files)
+    
+    def cpp_files(self, output_dir: str) -> List[str]:
+        """Rutas absolutas de los .cpp."""
+        base = os.path.join(output_dir, "")
+        return [base + f.path for f in self.files if f.path.endswith(SOURCE_SUFFIXES)]
+    
+    def header_files(self, output_dir: str) -> List[str]:
+        """Rutas absolutas de los headers."""
+        base = os.path.join(output_dir, "")
+        return [base + f.path for f in self.files if not f.path.endswith(SOURCE_SUFFIXES)]
+
+
+def _walk_generated(directory: str):
+    """Genera (ruta relativa con "/", DirEntry) de cada fuente/header bajo directory."""
+    stack = [("", directory)]
+    while stack:
+        prefix, current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    stack.append((prefix + entry.name + "/", entry.path))
+                elif entry.name.endswith(_GENERATED_SUFFIXES):
+                    yield prefix + entry.name, entry
+
+
+def scan_generated_files(directory: str) -> List[GeneratedFile]:
+    """
+    Busca fuentes y headers bajo directory en una sola pasada (os.scandir).
+    
+    No sigue enlaces simbólicos a directorios (igual que os.walk). No calcula
+    hashes.
+    
+    :return: Archivos ordenados por ruta, sin duplicados
+    """
+    found = []
+    for rel, entry in _walk_generated(directory):
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        found.append(GeneratedFile(rel, st.st_size, st.st_mtime_ns))
+    found.sort(key=lambda f: f.path)
+    return found
+
+
+def split_generated_files(directory: str) -> Tuple[List[str], List[str]]:
+    """
+    (cpp_files, header_files) con rutas absolutas, recorriendo el árbol.
+    
+    No hace stat de cada archivo. Para cuando no hay manifiesto; si lo hay,
+    usar load_output_manifest().
+    """
+    base = os.path.join(directory, "")
+    rels = sorted(rel for rel, _ in _walk_generated(directory))
+    cpp_files = [base + rel for rel in rels if rel.endswith(SOURCE_SUFFIXES)]
+    header_files = [base + rel for rel in rels if not rel.endswith(SOURCE_SUFFIXES)]
+    return cpp_files, header_files
+
+
+def build_output_manifest(
+    output_dir: str,
+    previous: Optional[OutputManifest] = None,
+    workers: int = DEFAULT_HASH_WORKERS
+) -> OutputManifest:
+    """
+    Recorre output_dir, hashea los archivos generados y guarda el manifiesto.
+    
+    :param previous: Manifiesto anterior; no se rehashea un archivo con el
+        mismo tamaño y mtime
+    :param workers: Hilos de hasheo
+    """
+    algorithm = hash_algorithm()
+    files = scan_generated_files(output_dir)
+    known: Dict[str, GeneratedFile] = {}
+    if previous is not None and previous.algorithm == algorithm:
+        known = {f.path: f for f in previous.files}
+    
+    pending = []
+    for f in files:
+        old = known.get(f.path)
+        if old is not None and old.hash and (old.size, old.mtime_ns) == (f.size, f.mtime_ns):
+            f.hash = old.hash
+        else:
+            pending.append(f)
+    
+    def work(f: GeneratedFile):
+        try:
+            f.hash = hash_file(os.path.join(output_dir, f.path), algorithm)
+        except OSError:
+            f.hash = None
+    
+    if workers <= 1 or len(pending) <= 1:
+        for f in pending:
+            work(f)
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="recomp-hash") as pool:
+            list(pool.map(work, pending))
+    
+    manifest = OutputManifest(files=files, algorithm=algorithm, created=time.time())
+    save_output_manifest(output_dir, manifest)
+    return manifest
+
+
+def save_output_manifest(output_dir: str, manifest: OutputManifest):
+    """Escribe .recomp_output.json (compacto: puede tener decenas de miles de entradas)."""
+    atomic_write_json(os.path.join(output_dir, OUTPUT_MANIFEST_FILE), {
+        "version": OUTPUT_MANIFEST_VERSION,
+        "algorithm": manifest.algorithm,
+        "created": manifest.created,
+        "files": [[f.path, f.size, f.mtime_ns, f.hash] for f in manifest.files],
+    }, indent=None)
+
+
+def load_output_manifest(output_dir: str) -> Optional[OutputManifest]:
+    """Lee el manifiesto de output_dir (None si no hay o no es válido)."""
+    try:
+        with open(os.path.join(output_dir, OUTPUT_MANIFEST_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if data.get("version") != OUTPUT_MANIFEST_VERSION:
+        return None
+    try:
+        return OutputManifest(
+            files=[GeneratedFile(*entry) for entry in data.get("files", [])],
+            algorithm=data.get("algorithm"),
+            created=data.get("created", 0.0),
+        )
+    except TypeError:
+        return None
+
+
+def clear_output_manifest(output_dir: str):
+    """Borra el manifiesto (antes de recompilar: describe la salida anterior)."""
+    try:
+        os.remove(os.path.join(output_dir, OUTPUT_MANIFEST_FILE))
+    except OSError:
+        pass
+
+
+def stale_entries(output_dir: str, manifest: OutputManifest) -> List[str]:
+    """
+    Entradas que ya no coinciden con el disco (borradas o con otro tamaño).
+    
+    Solo hace un stat por entrada, sin recorrer directorios ni leer contenido.
+    """
+    stale = []
+    for f in manifest.files:
+        try:
+            if os.stat(os.path.join(output_dir, f.path)).st_size != f.size:
+                stale.append(f.path)
+        except OSError:
+            stale.append(f.path)
+    return stale
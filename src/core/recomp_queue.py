@@ -0,0 +1,537 @@
+# core/recomp_queue.py
+"""
+Cola de recompilación para toda la biblioteca.
+
+Acepta muchos project.toml o Title IDs y ejecuta varios XenonRecomp a la
+vez sin pasarse de un presupuesto global:
+
+- CPU: cada trabajo reserva `cpus` núcleos (XenonRecomp usa uno)
+- Memoria: cada trabajo reserva `mem_mb`; con psutil además no se arranca
+  uno nuevo si la memoria disponible real no alcanza
+- Prioridad: mayor primero, y a igual prioridad por orden de llegada. Si el
+  primero no cabe se espera (no se cuelan trabajos detrás: no hay inanición)
+- Timeout por trabajo
+
+El estado se guarda en ~/.mrmonkeyshopware/recomp_queue.json tras cada
+cambio: si el proceso muere, los trabajos "running" vuelven a "pending" y
+`run()` continúa donde se quedó. Los que no cambiaron de entradas salen
+de la caché de huellas (core.recomp_cache) al instante.
+
+`run()` tiene un lock (recomp_queue.json.lock) mientras dura: solo un
+proceso ejecuta la cola, y los "running" solo se consideran huérfanos si
+nadie tiene ese lock. Cada escritura relee el archivo y fusiona (con un
+lock corto, recomp_queue.json.state.lock), así que `queue add` durante un
+`run()` no se pierde: el runner lo incorpora y lo ejecuta.
+"""
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+from core.atomic_io import atomic_write_json
+from core.settings import get_setting
+from core.shader_recomp import RecompResult, run_recompilation
+from core.workspace_lock import LockTimeout, WorkspaceLock
+
+QUEUE_VERSION = 1
+
+# Estados de un trabajo
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+SKIPPED = "skipped"      # Entradas sin cambios (caché)
+FAILED = "failed"
+TIMEOUT = "timeout"
+FINISHED_STATES = (DONE, SKIPPED, FAILED, TIMEOUT)
+
+DEFAULT_JOB_TIMEOUT_S = 1800
+DEFAULT_JOB_MEM_MB = 2048
+
+# Espera máxima por el lock de recomp_queue.json (solo se tiene al leer/escribir)
+STATE_LOCK_TIMEOUT_S = 30.0
+
+# Fracción de la RAM total usada como presupuesto si no se configura
+_DEFAULT_MEM_FRACTION = 0.75
+
+
+def get_queue_path() -> Path:
+    """Ruta del estado persistente de la cola."""
+    return Path.home() / ".mrmonkeyshopware" / "recomp_queue.json"
+
+
+@dataclass
+class RecompJob:
+    """Trabajo de la cola."""
+    id: int
+    toml_path: str
+    output_dir: Optional[str] = None
+    title_id: Optional[str] = None
+    priority: int = 0
+    timeout: int = DEFAULT_JOB_TIMEOUT_S
+    cpus: int = 1
+    mem_mb: int = DEFAULT_JOB_MEM_MB
+    state: str = PENDING
+    attempts: int = 0
+    queued_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    skip_reason: Optional[str] = None
+    cpp_files: int = 0
+    rev: int = 0             # Se incrementa en cada cambio (para fusionar con otros procesos)
+    
+    @property
+    def duration(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+    
+    @property
+    def label(self) -> str:
+        return self.title_id or os.path.basename(os.path.dirname(self.toml_path)) or self.toml_path
+
+
+@dataclass
+class QueueSummary:
+    """Resumen de una ejecución de la cola."""
+    jobs: List[RecompJob] = field(default_factory=list)
+    wall_seconds: float = 0.0
+    cpu_budget: int = 0
+    mem_budget_mb: int = 0
+    
+    def count(self, state: str) -> int:
+        return sum(1 for job in self.jobs if job.state == state)
+    
+    @property
+    def busy_seconds(self) -> float:
+        """Suma de la duración de los trabajos (tiempo de proceso acumulado)."""
+        return sum(job.duration for job in self.jobs)
+    
+    @property
+    def parallelism(self) -> float:
+        """Trabajos simultáneos de media (busy / wall)."""
+        return self.busy_seconds / self.wall_seconds if self.wall_seconds else 0.0
+    
+    @property
+    def jobs_per_hour(self) -> float:
+        finished = sum(1 for job in self.jobs if job.state in FINISHED_STATES)
+        return finished * 3600 / self.wall_seconds if self.wall_seconds else 0.0
+    
+    @property
+    def cpp_files(self) -> int:
+        return sum(job.cpp_files for job in self.jobs if job.state == DONE)
+    
+    def slowest(self, n: int = 5) -> List[RecompJob]:
+        return sorted(self.jobs, key=lambda job: job.duration, reverse=True)[:n]
+
+
+def default_cpu_budget() -> int:
+    """Núcleos disponibles (recomp.cpu_budget, 0 = todos)."""
+    return int(get_setting("recomp.cpu_budget", 0) or 0) or (os.cpu_count() or 1)
+
+
+def default_mem_budget_mb() -> int:
+    """Memoria para recompilar (recomp.mem_budget_mb, 0 = 75% de la RAM; sin psutil, sin límite)."""
+    configured = int(get_setting("recomp.mem_budget_mb", 0) or 0)
+    if configured:
+        return configured
+    if HAS_PSUTIL:
+        return int(psutil.virtual_memory().total / (1024 * 1024) * _DEFAULT_MEM_FRACTION)
+    return 0
+
+
+def _available_mem_mb() -> Optional[float]:
+    if not HAS_PSUTIL:
+        return None
+    return psutil.virtual_memory().available / (1024 * 1024)
+
+
+class RecompQueue:
+    """
+    Cola persistente de recompilaciones.
+        
+        queue = RecompQueue()
+        queue.add_title("4E4D07F5", priority=10)
+        queue.add("C:/ports/otro/project.toml")
+        summary = queue.run(log=print)
+    """
+    
+    def __init__(self, path: Optional[Path] = None):
+        """:param path: Archivo de estado (None = get_queue_path())"""
+        self.path = Path(path) if path else get_queue_path()
+        self.jobs: List[RecompJob] = []
+        self._lock = threading.RLock()
+        self._next_id = 1
+        self._seen_ids: Set[int] = set()             # Ids leídos del archivo la última vez
+        self._running: Dict[int, RecompJob] = {}     # En marcha en este proceso
+        self._load(reset_running=not self.is_running())
+    
+    # ══════════════════════════════════════════════════════════════
+    # Persistencia
+    # ══════════════════════════════════════════════════════════════
+    
+    def runner_lock(self, timeout: Optional[float] = 0) -> WorkspaceLock:
+        """Lock del proceso que ejecuta la cola (ver run())."""
+        return WorkspaceLock("recomp_queue", timeout=timeout,
+                             path=self.path.with_name(self.path.name + ".lock"))
+    
+    def is_running(self) -> bool:
+        """True si otro proceso está ejecutando la cola (tiene el runner_lock)."""
+        try:
+            with self.runner_lock():
+                return False
+        except LockTimeout:
+            return True
+        except OSError:
+            return False
+    
+    def _state_lock(self) -> WorkspaceLock:
+        """Lock corto alrededor de leer-fusionar-escribir recomp_queue.json."""
+        return WorkspaceLock("recomp_queue.state", timeout=STATE_LOCK_TIMEOUT_S,
+                             path=self.path.with_name(self.path.name + ".state.lock"))
+    
+    def _read(self) -> Tuple[List[RecompJob], int]:
+        """(trabajos, next_id) del archivo; ([], 1) si no hay o no es válido."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return [], 1
+        if data.get("version") != QUEUE_VERSION:
+            return [], 1
+        jobs = []
+        for raw in data.get("jobs", []):
+            try:
+                jobs.append(RecompJob(**raw))
+            except TypeError:
+                continue
+        next_id = max(int(data.get("next_id", 1)), max((job.id for job in jobs), default=0) + 1)
+        return jobs, next_id
+    
+    def _load(self, reset_running: bool = True):
+        """
+        Lee el estado guardado (descarta el de memoria).
+        
+        :param reset_running: Pasar "running" a "pending" (el proceso que los
+                              ejecutaba murió); False si otro proceso los ejecuta
+        """
+        self.jobs, self._next_id = self._read()
+        self._seen_ids = {job.id for job in self.jobs}
+        if reset_running:
+            for job in self.jobs:
+                if job.state == RUNNING and job.id not in self._running:
+                    # El proceso anterior murió a mitad: se reanuda
+                    job.state = PENDING
+                    job.started_at = None
+    
+    def _merge(self):
+        """
+        Fusiona el archivo con el estado en memoria (con _state_lock tomado).
+        
+        - Trabajos que otro proceso añadió: se incorporan
+        - Trabajos que otro proceso quitó (clear): se quitan, salvo los que
+          están en marcha aquí
+        - En ambos: gana la copia con mayor `rev` (a igualdad, la de memoria)
+        """
+        disk, next_id = self._read()
+        mine = {job.id: job for job in self.jobs}
+        merged = []
+        for theirs in disk:
+            own = mine.pop(theirs.id, None)
+            merged.append(own if own is not None and own.rev >= theirs.rev else theirs)
+        # Solo en memoria: nuevos sin guardar, o borrados por otro proceso
+        merged += [job for job in mine.values() if job.id not in self._seen_ids or job.id in self._running]
+        self.jobs = merged
+        self._next_id = max(self._next_id, next_id)
+        self._seen_ids = {job.id for job in disk}
+    
+    def refresh(self):
+        """Incorpora los cambios que otros procesos guardaron (ej: `queue add` durante `run()`)."""
+        with self._lock, self._state_lock():
+            self._merge()
+    
+    def _write(self):
+        """Escribe el estado en memoria tal cual (con _state_lock tomado)."""
+        atomic_write_json(self.path, {
+            "version": QUEUE_VERSION,
+            "next_id": self._next_id,
+            "jobs": [asdict(job) for job in self.jobs],
+        }, indent=1)
+        self._seen_ids = {job.id for job in self.jobs}
+    
+    def save(self):
+        """Fusiona con el archivo y guarda el resultado (escritura atómica)."""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._state_lock():
+                self._merge()
+                self._write()
+    
+    # ══════════════════════════════════════════════════════════════
+    # Gestión de trabajos
+    # ══════════════════════════════════════════════════════════════
+    
+    def add(
+        self,
+        toml_path: str,
+        output_dir: Optional[str] = None,
+        title_id: Optional[str] = None,
+        priority: int = 0,
+        timeout: Optional[int] = None,
+        cpus: int = 1,
+        mem_mb: Optional[int] = None
+    ) -> RecompJob:
+        """
+        Encola un project.toml.
+        
+        Si ya hay un trabajo pendiente para el mismo TOML y salida, se
+        actualiza su prioridad en lugar de duplicarlo.
+        
+        :param timeout: Segundos (None = recomp.job_timeout_s)
+        :param mem_mb: Memoria a reservar (None = recomp.job_mem_mb)
+        """
+        toml_path = os.path.abspath(toml_path)
+        output_dir = os.path.abspath(output_dir) if output_dir else None
+        if timeout is None:
+            timeout = int(get_setting("recomp.job_timeout_s", DEFAULT_JOB_TIMEOUT_S))
+        if mem_mb is None:
+            mem_mb = int(get_setting("recomp.job_mem_mb", DEFAULT_JOB_MEM_MB))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, self._state_lock():
+            self._merge()
+            for job in self.jobs:
+                if job.state == PENDING and (job.toml_path, job.output_dir) == (toml_path, output_dir):
+                    job.priority = max(job.priority, priority)
+                    job.timeout, job.cpus, job.mem_mb = timeout, cpus, mem_mb
+                    job.rev += 1
+                    self.save()
+                    return job
+            job = RecompJob(
+                id=self._next_id,
+                toml_path=toml_path,
+                output_dir=output_dir,
+                title_id=title_id,
+                priority=priority,
+                timeout=timeout,
+                cpus=max(1, cpus),
+                mem_mb=mem_mb,
+                queued_at=time.time(),
+            )
+            self._next_id += 1
+            self.jobs.append(job)
+            self.save()
+            return job
+    
+    def add_title(self, title_id: str, **kwargs) -> RecompJob:
+        """
+        Encola el workspace de un Title ID (TOML de analysis/ → recompiled/).
+        
+        :raises LookupError: Si no hay workspace o no tiene TOML
+        """
+        from core.game_workspace import GameWorkspace
+        from core.workspace_eviction import regeneration_source
+        
+        workspace = GameWorkspace.find_existing(title_id.upper())
+        if workspace is None:
+            raise LookupError(f"No se encontró workspace para Title ID: {title_id.upper()}")
+        toml_path = regeneration_source(workspace.root, "recompiled")
+        if toml_path is None:
+            raise LookupError(f"El workspace {workspace.title_id} no tiene TOML en analysis/")
+        return self.add(str(toml_path), output_dir=str(workspace.recompiled_dir),
+                        title_id=workspace.title_id, **kwargs)
+    
+    def pending(self) -> List[RecompJob]:
+        """Trabajos pendientes en orden de ejecución."""
+        with self._lock:
+            jobs = [job for job in self.jobs if job.state == PENDING]
+        return sorted(jobs, key=lambda job: (-job.priority, job.queued_at, job.id))
+    
+    def retry(self, states=(FAILED, TIMEOUT)) -> int:
+        """Vuelve a poner en pendiente los trabajos fallidos. :return: Cuántos"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, self._state_lock():
+            self._merge()
+            jobs = [job for job in self.jobs if job.state in states]
+            for job in jobs:
+                job.state = PENDING
+                job.error = None
+                job.started_at = job.finished_at = None
+                job.rev += 1
+            if jobs:
+                self._write()
+        return len(jobs)
+    
+    def clear(self, states=FINISHED_STATES) -> int:
+        """Quita de la cola los trabajos terminados. :return: Cuántos"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, self._state_lock():
+            self._merge()
+            before = len(self.jobs)
+            self.jobs = [job for job in self.jobs if job.state not in states]
+            removed = before - len(self.jobs)
+            if removed:
+                self._write()
+        return removed
+    
+    # ══════════════════════════════════════════════════════════════
+    # Ejecución
+    # ══════════════════════════════════════════════════════════════
+    
+    def _execute(self, job: RecompJob, force: bool, log: Optional[Callable[[str], None]]) -> RecompResult:
+        job_log = (lambda msg: log(f"[{job.label}] {msg}")) if log else None
+        if not job.title_id:
+            return run_recompilation(job.toml_path, output_dir=job.output_dir, log=job_log,
+                                     timeout=job.timeout, force=force)
+        
+        from core.game_workspace import GameWorkspace
+        from core.workspace_usage import refresh_dirs
+        
+        workspace = GameWorkspace.find_existing(job.title_id)
+        if workspace is None:
+            return RecompResult(success=False, error=f"Workspace {job.title_id} no encontrado")
+        # Lock del workspace: que no se desaloje ni se escriba recompiled/ a la vez
+        with workspace.lock():
+            result = run_recompilation(job.toml_path, output_dir=job.output_dir, log=job_log,
+                                       timeout=job.timeout, force=force)
+            if not result.skipped:
+                refresh_dirs(workspace.root, ["recompiled"])
+            workspace.touch("recompiled")
+        return result
+    
+    def _finish(self, job: RecompJob, result: Optional[RecompResult], error: Optional[str] = None):
+        job.finished_at = time.time()
+        job.rev += 1
+        if result is None:
+            job.state, job.error = FAILED, error
+        elif result.skipped:
+            job.state, job.skip_reason = SKIPPED, result.skip_reason
+        elif result.success:
+            job.state = DONE
+        else:
+            job.state = TIMEOUT if result.timed_out else FAILED
+            job.error = result.error
+        if result is not None:
+            job.cpp_files = len(result.cpp_files)
+    
+    def run(
+        self,
+        cpu_budget: Optional[int] = None,
+        mem_budget_mb: Optional[int] = None,
+        force: bool = False,
+        log: Optional[Callable[[str], None]] = None
+    ) -> QueueSummary:
+        """
+        Ejecuta los trabajos pendientes respetando el presupuesto.
+        
+        Un trabajo que por sí solo excede el presupuesto se ejecuta cuando
+        no hay nada más en marcha.
+        
+        :param cpu_budget: Núcleos (None = recomp.cpu_budget / todos)
+        :param mem_budget_mb: MB (None = recomp.mem_budget_mb / 75% RAM; 0 = sin límite)
+        :param force: Recompilar aunque las entradas no hayan cambiado
+        :return: Resumen con los trabajos ejecutados en esta llamada
+        :raises LockTimeout: Si otro proceso ya está ejecutando la cola
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            runner = self.runner_lock().acquire()
+        except LockTimeout:
+            raise LockTimeout(f"La cola ya se está ejecutando en otro proceso ({self.path})") from None
+        try:
+            with self._lock:
+                # Con el lock: releer (otro proceso pudo cambiarla) y reanudar huérfanos
+                self._load(reset_running=True)
+            return self._run_locked(cpu_budget, mem_budget_mb, force, log)
+        finally:
+            runner.release()
+    
+    def _run_locked(
+        self,
+        cpu_budget: Optional[int],
+        mem_budget_mb: Optional[int],
+        force: bool,
+        log: Optional[Callable[[str], None]]
+    ) -> QueueSummary:
+        cpu_budget = cpu_budget or default_cpu_budget()
+        mem_budget_mb = default_mem_budget_mb() if mem_budget_mb is None else mem_budget_mb
+        summary = QueueSummary(cpu_budget=cpu_budget, mem_budget_mb=mem_budget_mb)
+        start = time.perf_counter()
+        
+        done = threading.Condition(self._lock)
+        running = self._running
+        running.clear()
+        
+        def worker(job: RecompJob):
+            try:
+                result, error = self._execute(job, force, log), None
+            except Exception as e:
+                result, error = None, str(e)
+            with done:
+                self._finish(job, result, error)
+                del running[job.id]
+                self.save()
+                if log:
+                    icon = {DONE: "✅", SKIPPED: "⏭️", TIMEOUT: "⏰"}.get(job.state, "❌")
+                    log(f"{icon} [{job.label}] {job.state} en {job.duration:.1f}s")
+                done.notify_all()
+        
+        def fits(job: RecompJob) -> bool:
+            if not running:
+                return True  # Siempre se puede ejecutar al menos uno
+            cpus = sum(j.cpus for j in running.values())
+            if cpus + job.cpus > cpu_budget:
+                return False
+            if mem_budget_mb:
+                if sum(j.mem_mb for j in running.values()) + job.mem_mb > mem_budget_mb:
+                    return False
+                available = _available_mem_mb()
+                if available is not None and available < job.mem_mb:
+                    return False
+            return True
+        
+        try:
+            with done:
+                while True:
+                    self.refresh()  # Trabajos añadidos por otros procesos (`queue add`)
+                    queue = self.pending()
+                    if not queue and not running:
+                        break
+                    if queue and fits(queue[0]):
+                        job = queue[0]
+                        job.state = RUNNING
+                        job.rev += 1
+                        job.attempts += 1
+                        job.started_at = time.time()
+                        job.finished_at = None
+                        running[job.id] = job
+                        summary.jobs.append(job)
+                        self.save()
+                        if log:
+                            log(f"🚀 [{job.label}] prioridad {job.priority} "
+                                f"({len(running)} en marcha, {len(queue) - 1} en cola)")
+                        threading.Thread(target=worker, args=(job,), daemon=True).start()
+                        continue
+                    # Esperar a que termine alguno (o re-evaluar la memoria libre)
+                    done.wait(timeout=1.0)
+        except KeyboardInterrupt:
+            with self._lock:
+                # Los que estaban en marcha se reanudan en la próxima ejecución
+                interrupted = list(running.values())
+                running.clear()
+                for job in interrupted:
+                    job.state, job.started_at = PENDING, None
+                    job.rev += 1
+                self.save()
+            raise
+        
+        summary.wall_seconds = time.perf_counter() - start
+        return summary
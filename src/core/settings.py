@@ -73,6 +73,24 @@ def get_default_settings() -> Dict[str, Any]:
             "level": "INFO",
             "log_dir": str(Path.home() / ".mrmonkeyshopware" / "logs"),
             "max_size_mb": 5
+        },
+        "storage": {
+            "dedup": True,
+            "quota_gb": 0,
+            "fsync": "file"
+        },
+        "recomp": {
+            "cpu_budget": 0,
+            "mem_budget_mb": 0,
+            "job_timeout_s": 1800,
+            "job_mem_mb": 2048,
+            "output_tail_kb": 64
+        },
+        "build": {
+            "cxx": "",
+            "cxxflags": "-O2 -std=c++20",
+            "jobs": 0,
+            "cache_max_mb": 4096
         }
     }
 
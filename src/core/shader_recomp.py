@@ -9,6 +9,16 @@ from dataclasses import dataclass, field
 from pathlib import Path
 
 from core.config import XENON_RECOMP_PATH, PPC_CONTEXT_PATH
+from core.output_capture import DEFAULT_TAIL_BYTES, run_captured
+from core.recomp_cache import check_fingerprint, clear_fingerprint, save_fingerprint
+from core.recomp_manifest import (
+    build_output_manifest, clear_output_manifest, load_output_manifest, split_generated_files,
+    stale_entries
+)
+from core.settings import get_setting
+
+# Salida completa de XenonRecomp (comprimida), junto a los archivos generados
+RECOMP_LOG_FILE = "xenonrecomp.log.gz"
 
 
 @dataclass
@@ -20,8 +30,12 @@ class RecompResult:
     header_files: List[str] = field(default_factory=list)
     error: Optional[str] = None
     return_code: int = 0
-    stdout: str = ""
+    stdout: str = ""   # Solo la cola (recomp.output_tail_kb); completa en log_path
     stderr: str = ""
+    log_path: Optional[str] = None
+    skipped: bool = False  # True = entradas sin cambios, resultado de caché
+    skip_reason: Optional[str] = None
+    timed_out: bool = False
 
 
 def check_xenon_recomp_available() -> bool:
@@ -64,15 +78,24 @@ def run_recompilation(
     toml_path: str,
     output_dir: str = None,
     log: Callable[[str], None] = None,
-    timeout: int = 300
+    timeout: int = 300,
+    force: bool = False
 ) -> RecompResult:
     """
     Ejecuta XenonRecomp para recompilar el XEX.
     
+    Si project.toml, los archivos que referencia, ppc_context.h y XenonRecomp
+    son idénticos a los de la última recompilación correcta en output_dir,
+    no se ejecuta nada y se devuelve el resultado de caché (skipped=True).
+    
+    La salida de XenonRecomp se lee en streaming: en memoria solo queda la
+    cola de stdout/stderr y la salida completa se guarda en RECOMP_LOG_FILE.
+    
     :param toml_path: Ruta al project.toml
     :param output_dir: Directorio de salida (opcional, usa el del TOML)
     :param log: Función de logging
     :param timeout: Timeout en segundos (default: 5 minutos)
+    :param force: Recompilar aunque las entradas no hayan cambiado
     :return: RecompResult con estado y archivos generados
     """
     if log:
@@ -105,6 +128,36 @@ def run_recompilation(
     
     os.makedirs(output_dir, exist_ok=True)
     
+    # ¿Mismas entradas que la última recompilación correcta?
+    try:
+        cached, inputs, reason = check_fingerprint(
+            output_dir, toml_path, [PPC_CONTEXT_PATH, XENON_RECOMP_PATH]
+        )
+    except OSError as e:
+        cached, inputs, reason = None, None, f"no se pudo calcular la huella: {e}"
+    
+    if cached is not None and not force:
+        if log:
+            log(f"⏭️ Recompilación omitida: {reason}")
+            log(f"📄 Archivos C++ (caché): {len(cached.cpp_files)}")
+        log_path = os.path.join(output_dir, RECOMP_LOG_FILE)
+        return RecompResult(
+            success=True,
+            output_dir=output_dir,
+            cpp_files=[os.path.join(output_dir, p) for p in cached.cpp_files],
+            header_files=[os.path.join(output_dir, p) for p in cached.header_files],
+            log_path=log_path if os.path.isfile(log_path) else None,
+            skipped=True,
+            skip_reason=reason
+        )
+    
+    if log:
+        log(f"🔄 Recompilando: {'forzado (--force)' if cached is not None else reason}")
+    # Las salidas van a cambiar: si esto se interrumpe no debe quedar una huella válida
+    clear_fingerprint(output_dir)
+    previous_manifest = load_output_manifest(output_dir)
+    clear_output_manifest(output_dir)
+    
     # Construir comando
     cmd = [
         XENON_RECOMP_PATH,
@@ -116,26 +169,58 @@ def run_recompilation(
         log(f"📋 Comando: {' '.join(cmd)}")
         log(f"📁 Directorio de trabajo: {os.path.dirname(toml_path)}")
     
+    tail_bytes = int(get_setting("recomp.output_tail_kb", DEFAULT_TAIL_BYTES // 1024)) * 1024
+    log_path = os.path.join(output_dir, RECOMP_LOG_FILE)
+    
     try:
-        result = subprocess.run(
+        result = run_captured(
             cmd,
-            capture_output=True,
-            text=True,
             cwd=os.path.dirname(toml_path),
-            timeout=timeout
+            timeout=timeout,
+            tail_bytes=tail_bytes,
+            log_path=log_path
         )
         
+        if result.timed_out:
+            error_msg = f"Timeout después de {timeout} segundos"
+            if log:
+                log(f"⏰ {error_msg}")
+                log(f"📜 Salida hasta el timeout: {log_path}")
+            return RecompResult(
+                success=False,
+                output_dir=output_dir,
+                error=error_msg,
+                stdout=result.stdout,
+                stderr=result.stderr,
+                log_path=log_path,
+                timed_out=True
+            )
+        
         if result.returncode == 0:
             if log:
                 log("✅ Recompilación completada exitosamente")
             
-            # Buscar archivos generados
-            cpp_files, header_files = _find_generated_files(output_dir)
+            # Buscar archivos generados (una pasada) y guardar el manifiesto
+            try:
+                manifest = build_output_manifest(output_dir, previous=previous_manifest)
+                cpp_files = manifest.cpp_files(output_dir)
+                header_files = manifest.header_files(output_dir)
+            except OSError as e:
+                if log:
+                    log(f"⚠️ No se pudo guardar el manifiesto de salida: {e}")
+                cpp_files, header_files = _find_generated_files(output_dir)
             
             if log:
                 log(f"📄 Archivos C++ generados: {len(cpp_files)}")
                 log(f"📄 Headers generados: {len(header_files)}")
             
+            if inputs is not None:
+                try:
+                    save_fingerprint(output_dir, inputs, cpp_files, header_files)
+                except OSError as e:
+                    if log:
+                        log(f"⚠️ No se pudo guardar la huella de entradas: {e}")
+            
             return RecompResult(
                 success=True,
                 output_dir=output_dir,
@@ -143,16 +228,19 @@ def run_recompilation(
                 header_files=header_files,
                 return_code=result.returncode,
                 stdout=result.stdout,
-                stderr=result.stderr
+                stderr=result.stderr,
+                log_path=log_path
             )
         else:
             error_msg = f"XenonRecomp falló con código: {result.returncode}"
             if log:
                 log(f"❌ {error_msg}")
+                # El error suele estar al final: mostrar las últimas líneas
                 if result.stdout:
-                    log(f"STDOUT: {result.stdout[:500]}")
+                    log(f"STDOUT: {result.stdout[-500:]}")
                 if result.stderr:
-                    log(f"STDERR: {result.stderr[:500]}")
+                    log(f"STDERR: {result.stderr[-500:]}")
+                log(f"📜 Salida completa: {log_path}")
             
             return RecompResult(
                 success=False,
@@ -160,15 +248,10 @@ def run_recompilation(
                 error=error_msg,
                 return_code=result.returncode,
                 stdout=result.stdout,
-                stderr=result.stderr
+                stderr=result.stderr,
+                log_path=log_path
             )
     
-    except subprocess.TimeoutExpired:
-        error_msg = f"Timeout después de {timeout} segundos"
-        if log:
-            log(f"⏰ {error_msg}")
-        return RecompResult(success=False, error=error_msg)
-    
     except Exception as e:
         error_msg = f"Error al ejecutar XenonRecomp: {e}"
         if log:
@@ -180,36 +263,31 @@ def _find_generated_files(directory: str) -> Tuple[List[str], List[str]]:
     """
     Busca archivos generados por la recompilación.
     
+    Recorre el árbol una sola vez (build/ incluido, sin duplicados).
+    
     :param directory: Directorio donde buscar
     :return: Tupla (cpp_files, header_files)
     """
-    cpp_files = []
-    header_files = []
-    
-    build_dir = os.path.join(directory, "build")
-    search_dirs = [directory, build_dir] if os.path.isdir(build_dir) else [directory]
-    
-    for search_dir in search_dirs:
-        if not os.path.isdir(search_dir):
-            continue
-        
-        for root, _, files in os.walk(search_dir):
-            for file in files:
-                full_path = os.path.join(root, file)
-                if file.endswith(".cpp"):
-                    cpp_files.append(full_path)
-                elif file.endswith(".h") or file.endswith(".hpp"):
-                    header_files.append(full_path)
-    
-    return cpp_files, header_files
+    if not os.path.isdir(directory):
+        return [], []
+    return split_generated_files(directory)
 
 
-def validate_recomp_output(output_dir: str, log: Callable[[str], None] = None) -> Tuple[bool, List[str]]:
+def validate_recomp_output(
+    output_dir: str,
+    log: Callable[[str], None] = None,
+    verify: bool = False
+) -> Tuple[bool, List[str]]:
     """
     Valida que la recompilación generó los archivos esperados.
     
+    Usa el manifiesto de salida (.recomp_output.json) si existe; si no,
+    recorre el directorio.
+    
     :param output_dir: Directorio de salida
     :param log: Función de logging opcional
+    :param verify: Comprobar además que cada archivo del manifiesto sigue en
+        disco con el mismo tamaño (un stat por archivo)
     :return: (success, list of all generated files)
     """
     if not os.path.isdir(output_dir):
@@ -217,7 +295,22 @@ def validate_recomp_output(output_dir: str, log: Callable[[str], None] = None) -
             log(f"❌ Directorio no existe: {output_dir}")
         return False, []
     
-    cpp_files, header_files = _find_generated_files(output_dir)
+    manifest = load_output_manifest(output_dir)
+    if manifest is not None:
+        cpp_files = manifest.cpp_files(output_dir)
+        header_files = manifest.header_files(output_dir)
+        if log:
+            log(f"📋 Manifiesto de salida: {len(manifest.files)} archivos")
+        if verify:
+            stale = stale_entries(output_dir, manifest)
+            if stale:
+                if log:
+                    log(f"❌ {len(stale)} archivos no coinciden con el manifiesto")
+                    for path in stale[:10]:
+                        log(f"   - {path}")
+                return False, cpp_files + header_files
+    else:
+        cpp_files, header_files = _find_generated_files(output_dir)
     all_files = cpp_files + header_files
     
     if log:
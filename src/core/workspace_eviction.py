@@ -0,0 +1,297 @@
+# core/workspace_eviction.py
+"""
+Desalojo de datos regenerables por cuota de disco.
+
+extracted/, cleaned/ y recompiled/ se pueden rehacer desde la ISO, el XEX
+o el TOML del workspace, pero se quedan en disco para siempre. Con una
+cuota configurada (storage.quota_gb) se borran los menos usados
+recientemente hasta volver a estar por debajo.
+
+- Cada workspace guarda en .eviction.json el último acceso de cada
+  subdirectorio y lo que se desalojó (para regenerarlo bajo demanda)
+- Solo se desaloja un directorio si su fuente de regeneración está en el
+  workspace; ISO, XEX, analysis/, notes.md e info.json nunca se tocan
+"""
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from core.settings import get_setting
+from core.workspace_manifest import MANIFEST_NAME, update_manifest
+from core.workspace_lock import LockTimeout, workspace_lock
+from core.workspace_registry import parse_folder_name
+from core.workspace_usage import dir_usage, get_usage, refresh_dirs, set_dir
+
+EVICTION_FILE = ".eviction.json"
+EVICTION_VERSION = 1
+
+# Subdirectorios que se pueden borrar y regenerar
+REGENERABLE_DIRS = ("extracted", "cleaned", "recompiled")
+
+# Un acceso solo se escribe a disco si el anterior es más viejo que esto
+ACCESS_RESOLUTION_S = 60
+
+# Lo usado en la última hora nunca se desaloja (puede estar en uso)
+MIN_IDLE_S = 3600
+
+
+@dataclass
+class EvictedDir:
+    """Subdirectorio desalojado (o que se desalojaría en dry_run)."""
+    root: str
+    subdir: str
+    bytes: int
+    files: int
+    last_access: float
+
+
+@dataclass
+class EvictionReport:
+    """Resultado de enforce_quota()."""
+    library_bytes: int
+    quota_bytes: int
+    evicted: List[EvictedDir] = field(default_factory=list)
+    dry_run: bool = False
+    
+    @property
+    def freed_bytes(self) -> int:
+        return sum(e.bytes for e in self.evicted)
+    
+    @property
+    def over_quota(self) -> bool:
+        """True si ni desalojando todo lo posible se baja de la cuota."""
+        return self.library_bytes - self.freed_bytes > self.quota_bytes
+
+
+def quota_bytes() -> int:
+    """Cuota configurada en storage.quota_gb (0 = sin cuota)."""
+    return int(float(get_setting("storage.quota_gb", 0) or 0) * 1024 ** 3)
+
+
+# ══════════════════════════════════════════════════════════════════
+# Estado por workspace (.eviction.json)
+# ══════════════════════════════════════════════════════════════════
+
+def _load_state(root: Path) -> dict:
+    try:
+        with open(Path(root) / EVICTION_FILE, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        state = {}
+    if state.get("version") != EVICTION_VERSION:
+        state = {"version": EVICTION_VERSION}
+    state.setdefault("access", {})
+    state.setdefault("evicted", {})
+    return state
+
+
+def _save_state(root: Path, state: dict):
+    path = Path(root) / EVICTION_FILE
+    tmp_path = path.with_name(EVICTION_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def touch(root: Path, subdir: str, now: float = None):
+    """
+    Registra un acceso a un subdirectorio regenerable.
+    
+    :param root: Raíz del workspace
+    :param subdir: "extracted", "cleaned" o "recompiled"
+    """
+    if subdir not in REGENERABLE_DIRS:
+        return
+    now = now or time.time()
+    state = _load_state(root)
+    if now - state["access"].get(subdir, 0) < ACCESS_RESOLUTION_S:
+        return
+    state["access"][subdir] = now
+    _save_state(root, state)
+
+
+def last_access(root: Path, subdir: str, state: dict = None) -> float:
+    """Último acceso registrado (o el mtime del directorio si no hay registro)."""
+    state = state or _load_state(root)
+    if subdir in state["access"]:
+        return state["access"][subdir]
+    try:
+        return (Path(root) / subdir).stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def evicted_dirs(root: Path) -> Dict[str, dict]:
+    """Subdirectorios desalojados: {subdir: {evicted_at, bytes, files, source}}."""
+    return _load_state(root)["evicted"]
+
+
+def record_evicted(root: Path, subdir: str, size: int = 0, files: int = 0, reason: str = "quota"):
+    """Marca un subdirectorio como pendiente de regenerar."""
+    state = _load_state(root)
+    source = regeneration_source(root, subdir)
+    state["evicted"][subdir] = {
+        "evicted_at": time.time(),
+        "bytes": size,
+        "files": files,
+        "source": source.relative_to(root).as_posix() if source else None,
+        "reason": reason,
+    }
+    state["access"].pop(subdir, None)
+    _save_state(root, state)
+
+
+def regeneration_source(root: Path, subdir: str) -> Optional[Path]:
+    """
+    Archivo del workspace desde el que se regenera un subdirectorio.
+    
+    - extracted/  ← ISO
+    - cleaned/    ← XEX
+    - recompiled/ ← TOML de analysis/
+    
+    :return: Ruta o None si no está (entonces no se puede desalojar)
+    """
+    root = Path(root)
+    if subdir == "extracted":
+        candidates = sorted(root.glob("*.iso"))
+    elif subdir == "cleaned":
+        candidates = sorted(root.glob("*.xex"))
+    elif subdir == "recompiled":
+        candidates = sorted((root / "analysis").glob("*.toml"))
+    else:
+        return None
+    return candidates[0] if candidates else None
+
+
+# ══════════════════════════════════════════════════════════════════
+# Desalojo
+# ══════════════════════════════════════════════════════════════════
+
+def evict_dir(root: Path, subdir: str, log: Optional[Callable[[str], None]] = None) -> Optional[EvictedDir]:
+    """
+    Borra el contenido de un subdirectorio regenerable y lo registra.
+    
+    :return: EvictedDir, o None si no es regenerable o falta su fuente
+    """
+    root = Path(root)
+    path = root / subdir
+    if subdir not in REGENERABLE_DIRS or regeneration_source(root, subdir) is None:
+        return None
+    size, files = dir_usage(path)
+    accessed = last_access(root, subdir)
+    shutil.rmtree(path, ignore_errors=True)
+    path.mkdir(exist_ok=True)
+    record_evicted(root, subdir, size, files)
+    set_dir(root, subdir, 0, 0)
+    if (root / MANIFEST_NAME).exists():
+        update_manifest(root)
+    if log:
+        log(f"🧹 {root.name}/{subdir}: {size / (1024 * 1024):.1f} MB desalojados")
+    return EvictedDir(str(root), subdir, size, files, accessed)
+
+
+def enforce_quota(
+    roots: Iterable[Path],
+    quota: Optional[int] = None,
+    dry_run: bool = False,
+    log: Optional[Callable[[str], None]] = None,
+    now: float = None
+) -> EvictionReport:
+    """
+    Desaloja los subdirectorios regenerables menos usados hasta cumplir la cuota.
+    
+    :param roots: Raíces de los workspaces de la biblioteca
+    :param quota: Bytes máximos (None = storage.quota_gb; 0 = sin cuota)
+    :param dry_run: Solo calcular qué se desalojaría
+    :param log: Función de logging
+    :return: EvictionReport
+    """
+    quota = quota_bytes() if quota is None else quota
+    now = now or time.time()
+    roots = [Path(root) for root in roots]
+    
+    # Tamaños desde los contadores de core.workspace_usage: sin recorrer extracted/
+    library = 0
+    candidates: List[EvictedDir] = []
+    for root in roots:
+        usage = get_usage(root)
+        library += usage.total_bytes
+        state = _load_state(root)
+        for subdir in REGENERABLE_DIRS:
+            accessed = last_access(root, subdir, state)
+            if now - accessed < MIN_IDLE_S or regeneration_source(root, subdir) is None:
+                continue
+            used = usage.get(subdir)
+            if used.bytes:
+                candidates.append(EvictedDir(str(root), subdir, used.bytes, used.files, accessed))
+    
+    report = EvictionReport(library_bytes=library, quota_bytes=quota, dry_run=dry_run)
+    if not quota or library <= quota:
+        return report
+    
+    excess = library - quota
+    for candidate in sorted(candidates, key=lambda c: c.last_access):
+        if excess <= 0:
+            break
+        if dry_run:
+            evicted = candidate
+        else:
+            root = Path(candidate.root)
+            parsed = parse_folder_name(root.name)
+            try:
+                # Sin esperar: un workspace bloqueado está en uso y no se toca
+                with workspace_lock(parsed[1] if parsed else root.name, timeout=0, base_dir=root.parent):
+                    evicted = evict_dir(root, candidate.subdir, log)
+            except LockTimeout:
+                if log:
+                    log(f"🔒 {root.name}: en uso, no se desaloja")
+                continue
+            if evicted is None:
+                continue
+        report.evicted.append(evicted)
+        excess -= evicted.bytes
+    return report
+
+
+def regenerate(root: Path, subdir: str, log: Optional[Callable[[str], None]] = None) -> bool:
+    """
+    Regenera un subdirectorio desalojado desde su fuente.
+    
+    :return: True si se regeneró
+    """
+    root = Path(root)
+    source = regeneration_source(root, subdir)
+    if source is None:
+        if log:
+            log(f"❌ No hay fuente para regenerar {subdir}/")
+        return False
+    path = root / subdir
+    
+    if subdir == "extracted":
+        from core.extractor import extract_iso
+        # extract_iso no reutiliza carpetas existentes
+        shutil.rmtree(path, ignore_errors=True)
+        ok = extract_iso(str(source), output_dir=str(path), log=log) is not None
+    elif subdir == "cleaned":
+        from core.cleaner_xex import clean_xex
+        # Si falla, clean_xex devuelve el XEX original: comprobar que cleaned/ tiene el limpio
+        clean_xex(str(source), str(path), log=log)
+        ok = any(path.glob("*_clean.xex"))
+    else:
+        from core.shader_recomp import run_recompilation
+        ok = run_recompilation(str(source), output_dir=str(path), log=log).success
+    
+    if not ok:
+        return False
+    state = _load_state(root)
+    state["evicted"].pop(subdir, None)
+    state["access"][subdir] = time.time()
+    _save_state(root, state)
+    refresh_dirs(root, [subdir])
+    if (root / MANIFEST_NAME).exists():
+        update_manifest(root)
+    return True
@@ -0,0 +1,175 @@
+# core/workspace_lock.py
+"""
+Locks consultivos por workspace entre procesos.
+
+Dos workers de pipeline, o la CLI y la GUI a la vez, pueden escribir el
+mismo info.json, analysis/ o fila de la BD. Cada escritor toma el lock del
+workspace (por title_id):
+
+- Exclusivo para escribir, compartido para leer de forma consistente
+- Linux/macOS: fcntl.flock; Windows: msvcrt.locking (solo exclusivo, el
+  modo compartido se trata como exclusivo)
+- Reentrante dentro del mismo hilo: un método con lock puede llamar a otro
+- Con timeout: LockTimeout si otro proceso no lo suelta a tiempo
+
+Los archivos de lock viven en <ports>/.locks/<title_id>.lock, fuera del
+workspace (no entran en el manifiesto, el pack ni los contadores de uso).
+"""
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+try:
+    import msvcrt
+    HAS_MSVCRT = True
+except ImportError:
+    HAS_MSVCRT = False
+
+LOCKS_DIRNAME = ".locks"
+
+# Espera máxima por defecto (un sync de una ISO grande puede tardar)
+DEFAULT_LOCK_TIMEOUT_S = 300.0
+
+_POLL_MIN_S = 0.01
+_POLL_MAX_S = 0.5
+
+# Locks tomados por el hilo actual: {ruta: [fd, shared, profundidad]}
+_held = threading.local()
+
+
+class LockTimeout(TimeoutError):
+    """Otro proceso o hilo tiene el workspace bloqueado."""
+
+
+def lock_path(title_id: str, base_dir: Optional[Path] = None) -> Path:
+    """Archivo de lock de un workspace."""
+    if base_dir is None:
+        from core.game_workspace import get_base_ports_dir
+        base_dir = get_base_ports_dir()
+    return Path(base_dir) / LOCKS_DIRNAME / f"{title_id}.lock"
+
+
+def _held_locks() -> Dict[str, list]:
+    if not hasattr(_held, "locks"):
+        _held.locks = {}
+    return _held.locks
+
+
+def _try_lock(fd: int, shared: bool) -> bool:
+    if HAS_FCNTL:
+        try:
+            fcntl.flock(fd, (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+    if HAS_MSVCRT:
+        try:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+    return True  # Sin soporte de locks: sin exclusión entre procesos
+
+
+def _unlock(fd: int):
+    if HAS_FCNTL:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    elif HAS_MSVCRT:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class WorkspaceLock:
+    """
+    Lock de un workspace. Usar como context manager:
+        
+        with workspace_lock("4E4D07F5"):
+            workspace.save_info(info)
+    """
+    
+    def __init__(
+        self,
+        title_id: str,
+        shared: bool = False,
+        timeout: Optional[float] = DEFAULT_LOCK_TIMEOUT_S,
+        base_dir: Optional[Path] = None,
+        path: Optional[Path] = None
+    ):
+        """
+        :param title_id: Title ID del workspace
+        :param shared: Modo compartido (lectores); False = exclusivo
+        :param timeout: Segundos de espera (0 = no esperar, None = sin límite)
+        :param base_dir: Directorio de ports (None = el por defecto)
+        :param path: Archivo de lock explícito, para recursos que no son un
+                     workspace (ej: la cola de recompilación)
+        """
+        self.title_id = title_id
+        self.shared = shared
+        self.timeout = timeout
+        self.path = Path(path) if path is not None else lock_path(title_id, base_dir)
+    
+    def acquire(self) -> "WorkspaceLock":
+        """
+        :raises LockTimeout: Si no se obtiene en `timeout` segundos
+        :raises RuntimeError: Si el hilo ya lo tiene compartido y pide exclusivo
+        """
+        key = str(self.path)
+        held = _held_locks().get(key)
+        if held is not None:
+            if held[1] and not self.shared:
+                raise RuntimeError(f"No se puede pasar de lock compartido a exclusivo: {self.title_id}")
+            held[2] += 1
+            return self
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        delay = _POLL_MIN_S
+        while not _try_lock(fd, self.shared):
+            if deadline is not None and time.monotonic() >= deadline:
+                os.close(fd)
+                mode = "compartido" if self.shared else "exclusivo"
+                raise LockTimeout(f"Workspace {self.title_id} bloqueado (lock {mode}, {self.timeout:.0f}s)")
+            time.sleep(delay)
+            delay = min(delay * 2, _POLL_MAX_S)
+        _held_locks()[key] = [fd, self.shared, 1]
+        return self
+    
+    def release(self):
+        key = str(self.path)
+        held = _held_locks().get(key)
+        if held is None:
+            return
+        held[2] -= 1
+        if held[2]:
+            return
+        del _held_locks()[key]
+        try:
+            _unlock(held[0])
+        finally:
+            os.close(held[0])
+    
+    def __enter__(self):
+        return self.acquire()
+    
+    def __exit__(self, *exc):
+        self.release()
+
+
+def workspace_lock(
+    title_id: str,
+    shared: bool = False,
+    timeout: Optional[float] = DEFAULT_LOCK_TIMEOUT_S,
+    base_dir: Optional[Path] = None
+) -> WorkspaceLock:
+    """Lock de un workspace (ver WorkspaceLock)."""
+    return WorkspaceLock(title_id, shared=shared, timeout=timeout, base_dir=base_dir)
@@ -0,0 +1,364 @@
+# core/workspace_manifest.py
+"""
+Manifiesto de integridad de un workspace (.manifest.json).
+
+Guarda ruta, tamaño, mtime y hash rápido de cada archivo del workspace
+(ISO, XEX, análisis, fuentes generadas...). Permite:
+- actualizarlo de forma incremental: solo se rehashean los archivos cuyo
+  tamaño o mtime cambió
+- verificarlo: un archivo con el mismo tamaño y mtime pero distinto hash
+  se corrompió en disco (bit rot); uno con tamaño/mtime distintos se editó
+
+El hash usa xxHash (XXH3-128) si está instalado y BLAKE2b si no. Ambos
+liberan el GIL, así que varios archivos se hashean en paralelo con hilos.
+"""
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+from core.atomic_io import atomic_write_json
+from core.workspace_snapshot import SNAPSHOTS_DIRNAME
+
+MANIFEST_NAME = ".manifest.json"
+MANIFEST_VERSION = 1
+
+# Hilos de hasheo por defecto
+DEFAULT_HASH_WORKERS = min(8, (os.cpu_count() or 2))
+
+# Tamaño de lectura al hashear
+_READ_SIZE = 1024 * 1024
+
+# Archivos que no se incluyen (el propio manifiesto y temporales de sync).
+# Tampoco los snapshots de recompiled/ (.snapshots/): son historial local
+_EXCLUDED_SUFFIXES = (".part", ".part.json", ".tmp")
+
+
+def hash_algorithm() -> str:
+    """Algoritmo de hash disponible."""
+    return "xxh3_128" if HAS_XXHASH else "blake2b"
+
+
+def hash_file(path, algorithm: Optional[str] = None) -> str:
+    """
+    Hash rápido de un archivo completo.
+    
+    :param path: Archivo
+    :param algorithm: "xxh3_128" o "blake2b" (None = el disponible)
+    :return: Hash en hexadecimal
+    """
+    algorithm = algorithm or hash_algorithm()
+    if algorithm == "xxh3_128":
+        hasher = xxhash.xxh3_128()
+    else:
+        hasher = hashlib.blake2b(digest_size=16)
+    
+    buffer = bytearray(_READ_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            hasher.update(view[:n])
+    return hasher.hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    """Estado registrado de un archivo."""
+    size: int
+    mtime_ns: int
+    hash: str
+
+
+@dataclass
+class VerifyReport:
+    """Resultado de verificar o actualizar un manifiesto."""
+    root: str
+    ok: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)   # Tamaño/mtime cambiaron (editado)
+    corrupt: List[str] = field(default_factory=list)    # Mismo tamaño/mtime, distinto hash
+    missing: List[str] = field(default_factory=list)
+    added: List[str] = field(default_factory=list)
+    files_hashed: int = 0
+    bytes_hashed: int = 0
+    seconds: float = 0.0
+    created: bool = False  # No había manifiesto: se creó
+    
+    @property
+    def has_problems(self) -> bool:
+        """True si hay archivos corruptos o desaparecidos."""
+        return bool(self.corrupt or self.missing)
+    
+    @property
+    def rate(self) -> float:
+        """Bytes hasheados por segundo."""
+        return self.bytes_hashed / self.seconds if self.seconds else 0.0
+
+
+def _is_excluded(name: str, top_level: bool = False) -> bool:
+    # Los .json ocultos de la raíz son metadatos del workspace (manifiesto,
+    # registro de desalojo...) que cambian sin que cambien los datos
+    if top_level and name.startswith(".") and name.endswith(".json"):
+        return True
+    return name == MANIFEST_NAME or name.endswith(_EXCLUDED_SUFFIXES)
+
+
+def scan_files(root: Path) -> Dict[str, os.stat_result]:
+    """
+    Recorre el workspace con scandir.
+    
+    :return: {ruta relativa (con /): stat}
+    """
+    files: Dict[str, os.stat_result] = {}
+    stack = [(str(root), "")]
+    while stack:
+        path, prefix = stack.pop()
+        try:
+            scan = os.scandir(path)
+        except OSError:
+            continue
+        with scan:
+            for entry in scan:
+                rel = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if prefix or entry.name != SNAPSHOTS_DIRNAME:
+                        stack.append((entry.path, rel + "/"))
+                elif entry.is_file() and not _is_excluded(entry.name, top_level=not prefix):
+                    files[rel] = entry.stat()
+    return files
+
+
+def load_manifest(root: Path) -> Optional[Tuple[str, Dict[str, ManifestEntry]]]:
+    """
+    Lee el manifiesto de un workspace.
+    
+    :return: (algoritmo, {ruta: ManifestEntry}) o None si no existe o no es válido
+    """
+    try:
+        with open(Path(root) / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if data.get("version") != MANIFEST_VERSION:
+        return None
+    entries = {
+        path: ManifestEntry(**entry) for path, entry in data.get("files", {}).items()
+    }
+    return data.get("algorithm", "blake2b"), entries
+
+
+def save_manifest(root: Path, algorithm: str, entries: Dict[str, ManifestEntry]):
+    """Guarda el manifiesto de forma atómica."""
+    path = Path(root) / MANIFEST_NAME
+    data = {
+        "version": MANIFEST_VERSION,
+        "algorithm": algorithm,
+        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "files": {
+            rel: {"size": e.size, "mtime_ns": e.mtime_ns, "hash": e.hash}
+            for rel, e in sorted(entries.items())
+        },
+    }
+    # Temporal por proceso/hilo: dos verify/update simultáneos no se lo pisan
+    atomic_write_json(path, data, indent=1)
+
+
+def forget_dirs(root: Path, dirs: Iterable[str]) -> int:
+    """
+    Quita del manifiesto las entradas bajo unos subdirectorios de primer nivel.
+    
+    Para directorios vaciados a propósito (ej: excluidos de un pack), que
+    verify no debe dar por "missing". Sin rehashear nada.
+    
+    :return: Entradas eliminadas
+    """
+    dirs = set(dirs)
+    loaded = load_manifest(root)
+    if loaded is None or not dirs:
+        return 0
+    algorithm, entries = loaded
+    kept = {rel: e for rel, e in entries.items() if rel.split("/", 1)[0] not in dirs}
+    if len(kept) != len(entries):
+        save_manifest(root, algorithm, kept)
+    return len(entries) - len(kept)
+
+
+def _hash_many(
+    root: Path,
+    paths: Iterable[Tuple[str, int]],
+    algorithm: str,
+    workers: int,
+    executor: Optional[ThreadPoolExecutor] = None
+) -> Dict[str, Optional[str]]:
+    """
+    Hashea varios archivos en paralelo, los grandes primero.
+    
+    :param paths: (ruta relativa, tamaño)
+    :return: {ruta: hash o None si no se pudo leer}
+    """
+    rels = [rel for rel, _ in sorted(paths, key=lambda item: item[1], reverse=True)]
+    
+    def work(rel: str) -> Optional[str]:
+        try:
+            return hash_file(root / rel, algorithm)
+        except OSError:
+            return None
+    
+    if executor is not None:
+        return dict(zip(rels, executor.map(work, rels)))
+    if workers <= 1 or len(rels) <= 1:
+        return {rel: work(rel) for rel in rels}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="manifest-hash") as pool:
+        return dict(zip(rels, pool.map(work, rels)))
+
+
+def update_manifest(
+    root: Path,
+    workers: int = DEFAULT_HASH_WORKERS,
+    executor: Optional[ThreadPoolExecutor] = None
+) -> VerifyReport:
+    """
+    Crea o actualiza el manifiesto de forma incremental.
+    
+    Solo se hashean los archivos nuevos o cuyo tamaño/mtime cambió.
+    
+    :param root: Raíz del workspace
+    :param workers: Hilos de hasheo
+    :param executor: Pool compartido (ej: verificación de toda la biblioteca)
+    :return: VerifyReport (added/modified/missing = cambios registrados)
+    """
+    return _check(Path(root), full=False, update=True, workers=workers, executor=executor)
+
+
+def verify_manifest(
+    root: Path,
+    full: bool = True,
+    update: bool = False,
+    workers: int = DEFAULT_HASH_WORKERS,
+    executor: Optional[ThreadPoolExecutor] = None
+) -> VerifyReport:
+    """
+    Compara el workspace con su manifiesto.
+    
+    Si no hay manifiesto se crea (report.created = True).
+    
+    :param root: Raíz del workspace
+    :param full: Rehashear también los archivos sin cambios de tamaño/mtime
+                 (detecta corrupción silenciosa); False = solo stat
+    :param update: Registrar en el manifiesto los cambios encontrados
+                   (los corruptos nunca se aceptan)
+    :param workers: Hilos de hasheo
+    :param executor: Pool compartido
+    :return: VerifyReport
+    """
+    return _check(Path(root), full=full, update=update, workers=workers, executor=executor)
+
+
+def _check(
+    root: Path,
+    full: bool,
+    update: bool,
+    workers: int,
+    executor: Optional[ThreadPoolExecutor]
+) -> VerifyReport:
+    start = time.perf_counter()
+    report = VerifyReport(root=str(root))
+    current = scan_files(root)
+    
+    loaded = load_manifest(root)
+    algorithm = hash_algorithm()
+    comparable = True  # Los hashes guardados se pueden comparar con los nuevos
+    if loaded is None:
+        report.created = True
+        entries: Dict[str, ManifestEntry] = {}
+    else:
+        stored_algorithm, entries = loaded
+        if stored_algorithm == "blake2b" or HAS_XXHASH:
+            algorithm = stored_algorithm
+        else:
+            # Manifiesto hecho con xxhash, que ya no está: rehashear todo con
+            # BLAKE2b; la corrupción solo se puede detectar a partir de ahora
+            comparable = False
+            full = True
+            update = True
+    
+    to_hash: List[Tuple[str, int]] = []
+    for rel, st in current.items():
+        entry = entries.get(rel)
+        if entry is None:
+            report.added.append(rel)
+            to_hash.append((rel, st.st_size))
+        elif entry.size != st.st_size or entry.mtime_ns != st.st_mtime_ns:
+            report.modified.append(rel)
+            to_hash.append((rel, st.st_size))
+        elif full:
+            to_hash.append((rel, st.st_size))
+        else:
+            report.ok.append(rel)
+    report.missing = sorted(rel for rel in entries if rel not in current)
+    
+    hashes = _hash_many(root, to_hash, algorithm, workers, executor)
+    report.files_hashed = len(hashes)
+    report.bytes_hashed = sum(size for rel, size in to_hash)
+    
+    new_entries = dict(entries)
+    for rel, digest in hashes.items():
+        st = current[rel]
+        if digest is None:
+            report.missing.append(rel)  # Desapareció o no se pudo leer durante el escaneo
+            continue
+        entry = entries.get(rel)
+        if entry is not None and entry.size == st.st_size and entry.mtime_ns == st.st_mtime_ns:
+            if digest == entry.hash or not comparable:
+                report.ok.append(rel)
+                new_entries[rel] = ManifestEntry(size=st.st_size, mtime_ns=st.st_mtime_ns, hash=digest)
+            else:
+                report.corrupt.append(rel)
+            continue
+        new_entries[rel] = ManifestEntry(size=st.st_size, mtime_ns=st.st_mtime_ns, hash=digest)
+    
+    for rel in report.missing:
+        new_entries.pop(rel, None)
+    
+    if update or report.created:
+        save_manifest(root, algorithm, new_entries)
+    
+    for names in (report.ok, report.modified, report.corrupt, report.missing, report.added):
+        names.sort()
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def verify_many(
+    roots: List[Path],
+    full: bool = True,
+    update: bool = False,
+    workers: int = DEFAULT_HASH_WORKERS,
+    on_report: Optional[Callable[[VerifyReport], None]] = None
+) -> List[VerifyReport]:
+    """
+    Verifica varios workspaces compartiendo un único pool de hasheo.
+    
+    :param on_report: Callback tras cada workspace
+    :return: Un VerifyReport por workspace
+    """
+    reports = []
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="manifest-hash") as pool:
+        for root in roots:
+            report = verify_manifest(root, full=full, update=update, workers=workers, executor=pool)
+            reports.append(report)
+            if on_report:
+                on_report(report)
+    return reports
@@ -0,0 +1,531 @@
+# core/workspace_pack.py
+"""
+Empaquetado de un workspace en un único archivo para moverlo entre equipos.
+
+Formato principal (si está instalado zstandard): tar comprimido con zstd
+en frames independientes de BLOCK_SIZE, comprimidos en paralelo. Al final
+van dos frames "skippable" (que zstd ignora al descomprimir) con el índice
+de miembros y frames, así que:
+- `zstd -d juego.tar.zst | tar x` funciona con herramientas estándar
+- listar no descomprime nada y extraer un miembro solo descomprime desde
+  el frame donde empieza
+
+Sin zstandard se usa zip (ZIP_DEFLATED), que ya trae índice propio.
+
+Los directorios regenerables (REGENERABLE_DIRS) se pueden excluir: se
+rehacen desde la ISO/XEX con extract/recomp. Los snapshots de recompiled/
+(.snapshots/) nunca se empaquetan: son historial local.
+"""
+import io
+import json
+import os
+import struct
+import tarfile
+import threading
+import time
+import zipfile
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from core.workspace_eviction import REGENERABLE_DIRS, record_evicted
+from core.workspace_manifest import forget_dirs
+from core.workspace_snapshot import SNAPSHOTS_DIRNAME
+from core.workspace_usage import reconcile
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+PACK_VERSION = 1
+
+# Datos sin comprimir por frame zstd (unidad de acceso aleatorio)
+BLOCK_SIZE = 8 * 1024 * 1024
+
+DEFAULT_LEVEL = 3
+
+FORMATS = ("zstd", "zip")
+
+# Frame skippable de zstd: magic 0x184D2A50-0x184D2A5F + tamaño (LE)
+_SKIPPABLE_MAGIC = 0x184D2A5E
+_TRAILER_TAG = b"MMPK"
+_TRAILER = struct.Struct("<II4sQ")  # magic, tamaño, tag, offset del índice
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_ZIP_MAGIC = b"PK\x03\x04"
+
+# Temporales que nunca se empaquetan
+_EXCLUDED_SUFFIXES = (".part", ".part.json", ".tmp")
+
+
+class PackError(Exception):
+    """Archivo de pack inválido o miembro inexistente."""
+
+
+@dataclass
+class PackMember:
+    """Archivo dentro de un pack."""
+    name: str
+    size: int
+    mtime: float
+    offset: int = 0  # Offset del header tar en el stream sin comprimir (zstd)
+
+
+@dataclass
+class PackResult:
+    """Resultado de pack_workspace()."""
+    path: str
+    format: str
+    members: int
+    bytes_in: int
+    bytes_out: int
+    seconds: float
+    excluded: List[str] = field(default_factory=list)
+    
+    @property
+    def ratio(self) -> float:
+        return self.bytes_in / self.bytes_out if self.bytes_out else 1.0
+
+
+def default_format() -> str:
+    """zstd si está instalado, zip si no."""
+    return "zstd" if HAS_ZSTD else "zip"
+
+
+def _check_name(name: str):
+    """Rechaza rutas absolutas o con '..' (path traversal al desempaquetar)."""
+    parts = name.replace("\\", "/").split("/")
+    if name.startswith(("/", "\\")) or ".." in parts or (parts and ":" in parts[0]):
+        raise PackError(f"Ruta no permitida en el pack: {name}")
+
+
+def collect_files(root: Path, exclude_regenerable: bool = False) -> List[Path]:
+    """
+    Archivos del workspace a empaquetar, ordenados.
+    
+    :param root: Raíz del workspace
+    :param exclude_regenerable: Omitir REGENERABLE_DIRS
+    """
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        if Path(dirpath) == root:
+            skip = (SNAPSHOTS_DIRNAME,) + (REGENERABLE_DIRS if exclude_regenerable else ())
+            dirnames[:] = [d for d in dirnames if d not in skip]
+        dirnames.sort()
+        for name in sorted(filenames):
+            if not name.endswith(_EXCLUDED_SUFFIXES):
+                files.append(Path(dirpath) / name)
+    return files
+
+
+# ══════════════════════════════════════════════════════════════════
+# Escritura
+# ══════════════════════════════════════════════════════════════════
+
+class _FrameWriter:
+    """
+    Destino de tarfile que comprime bloques de BLOCK_SIZE en paralelo.
+    
+    Cada bloque es un frame zstd independiente; se escriben en orden y se
+    registra su offset comprimido y sin comprimir para el índice.
+    """
+    
+    def __init__(self, out, block_size: int, level: int, workers: int):
+        self.out = out
+        self.block_size = block_size
+        self.level = level
+        self.workers = workers
+        self.frames: List[List[int]] = []  # [offset comprimido, offset sin comprimir, tamaño]
+        self._buffer = bytearray()
+        self._flushed = 0
+        self._local = threading.local()
+        self._pending = deque()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pack-zstd")
+    
+    def _compress(self, block: bytes) -> bytes:
+        # ZstdCompressor no es thread-safe: uno por hilo
+        cctx = getattr(self._local, "cctx", None)
+        if cctx is None:
+            cctx = self._local.cctx = zstandard.ZstdCompressor(level=self.level, write_content_size=True)
+        return cctx.compress(block)
+    
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self.block_size:
+            self._submit(bytes(self._buffer[:self.block_size]))
+            del self._buffer[:self.block_size]
+        return len(data)
+    
+    def _submit(self, block: bytes):
+        self._pending.append((self._pool.submit(self._compress, block), len(block)))
+        # Limitar la memoria: como mucho 2 bloques por hilo en vuelo
+        while len(self._pending) > self.workers * 2:
+            self._drain_one()
+    
+    def _drain_one(self):
+        future, size = self._pending.popleft()
+        data = future.result()
+        self.frames.append([self.out.tell(), self._flushed, size])
+        self.out.write(data)
+        self._flushed += size
+    
+    def close(self):
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        while self._pending:
+            self._drain_one()
+        self._pool.shutdown()
+
+
+def _write_skippable(out, payload: bytes):
+    out.write(struct.pack("<II", _SKIPPABLE_MAGIC, len(payload)))
+    out.write(payload)
+
+
+def _pack_zstd(
+    root: Path,
+    files: List[Path],
+    out,
+    meta: dict,
+    level: int,
+    workers: int,
+    progress: Optional[Callable[[int, int], None]],
+    total: int
+) -> int:
+    writer = _FrameWriter(out, BLOCK_SIZE, level, workers)
+    members = []
+    done = 0
+    with tarfile.open(fileobj=writer, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+        for path in files:
+            st = path.stat()
+            name = path.relative_to(root).as_posix()
+            # TarInfo propio: los hardlinks al almacén de objetos se guardan
+            # como archivos normales
+            info = tarfile.TarInfo(name)
+            info.size = st.st_size
+            info.mtime = st.st_mtime
+            info.mode = st.st_mode & 0o777 | 0o200
+            members.append([name, st.st_size, st.st_mtime, tar.offset])
+            with open(path, "rb") as f:
+                tar.addfile(info, f)
+            done += st.st_size
+            if progress:
+                progress(done, total)
+    writer.close()
+    
+    index_offset = out.tell()
+    index = dict(meta, block_size=BLOCK_SIZE, members=members, frames=writer.frames)
+    _write_skippable(out, json.dumps(index, ensure_ascii=False).encode("utf-8"))
+    out.write(_TRAILER.pack(_SKIPPABLE_MAGIC, 12, _TRAILER_TAG, index_offset))
+    return len(members)
+
+
+def _pack_zip(
+    root: Path,
+    files: List[Path],
+    out,
+    meta: dict,
+    level: int,
+    progress: Optional[Callable[[int, int], None]],
+    total: int
+) -> int:
+    done = 0
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED, compresslevel=min(level, 9), allowZip64=True) as zf:
+        for path in files:
+            zf.write(path, path.relative_to(root).as_posix())
+            done += path.stat().st_size
+            if progress:
+                progress(done, total)
+        zf.comment = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+    return len(files)
+
+
+def pack_workspace(
+    workspace,
+    output: Optional[str] = None,
+    exclude_regenerable: bool = False,
+    fmt: Optional[str] = None,
+    level: int = DEFAULT_LEVEL,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> PackResult:
+    """
+    Empaqueta un workspace en un único archivo.
+    
+    :param workspace: GameWorkspace
+    :param output: Archivo destino (None = "<carpeta>.tar.zst"/".zip" en el cwd)
+    :param exclude_regenerable: Omitir extracted/, cleaned/ y recompiled/
+    :param fmt: "zstd" o "zip" (None = zstd si está disponible)
+    :param level: Nivel de compresión
+    :param workers: Hilos de compresión (solo zstd; None = nº de CPUs)
+    :param progress: Callback (bytes procesados, total)
+    :return: PackResult
+    """
+    fmt = fmt or default_format()
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato no soportado: {fmt} (usa {', '.join(FORMATS)})")
+    if fmt == "zstd" and not HAS_ZSTD:
+        raise RuntimeError("zstandard no está instalado (pip install zstandard) - usa fmt='zip'")
+    
+    start = time.perf_counter()
+    root = Path(workspace.root)
+    files = collect_files(root, exclude_regenerable)
+    total = sum(path.stat().st_size for path in files)
+    if output is None:
+        output = root.name + (".tar.zst" if fmt == "zstd" else ".zip")
+    
+    meta = {
+        "version": PACK_VERSION,
+        "title_id": workspace.title_id,
+        "game_name": workspace.game_name,
+        "folder": root.name,
+        "created_at": datetime.now().isoformat(),
+        "excluded": list(REGENERABLE_DIRS) if exclude_regenerable else [],
+    }
+    
+    tmp_path = output + ".tmp"
+    with open(tmp_path, "wb") as out:
+        if fmt == "zstd":
+            count = _pack_zstd(root, files, out, meta, level, workers or os.cpu_count() or 2, progress, total)
+        else:
+            count = _pack_zip(root, files, out, meta, level, progress, total)
+    os.replace(tmp_path, output)
+    
+    return PackResult(
+        path=output,
+        format=fmt,
+        members=count,
+        bytes_in=total,
+        bytes_out=os.path.getsize(output),
+        seconds=time.perf_counter() - start,
+        excluded=meta["excluded"],
+    )
+
+
+# ══════════════════════════════════════════════════════════════════
+# Lectura
+# ══════════════════════════════════════════════════════════════════
+
+class PackReader:
+    """
+    Acceso a un pack: listar, leer y extraer miembros sin desempaquetar todo.
+    
+    Usar como context manager.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        magic = self._file.read(4)
+        if magic == _ZIP_MAGIC:
+            self.format = "zip"
+            self._zip = zipfile.ZipFile(self._file)
+            try:
+                self.meta = json.loads(self._zip.comment.decode("utf-8")) if self._zip.comment else {}
+            except ValueError:
+                self.meta = {}
+            self._members = {
+                info.filename: PackMember(info.filename, info.file_size, time.mktime(info.date_time + (0, 0, -1)))
+                for info in self._zip.infolist() if not info.is_dir()
+            }
+        elif magic == _ZSTD_MAGIC:
+            if not HAS_ZSTD:
+                self.close()
+                raise PackError("El pack usa zstd y zstandard no está instalado (pip install zstandard)")
+            self.format = "zstd"
+            self.meta = self._read_index()
+            self._members = {
+                name: PackMember(name, size, mtime, offset)
+                for name, size, mtime, offset in self.meta.pop("members")
+            }
+            self._frames = self.meta.pop("frames")
+            self._frame_starts = [frame[1] for frame in self._frames]
+        else:
+            self.close()
+            raise PackError(f"No es un pack de MrMonkeyShopWare: {path}")
+    
+    def _read_index(self) -> dict:
+        f = self._file
+        f.seek(-_TRAILER.size, os.SEEK_END)
+        magic, size, tag, index_offset = _TRAILER.unpack(f.read(_TRAILER.size))
+        if magic != _SKIPPABLE_MAGIC or tag != _TRAILER_TAG:
+            raise PackError(f"Pack sin índice: {self.path}")
+        f.seek(index_offset)
+        magic, size = struct.unpack("<II", f.read(8))
+        return json.loads(f.read(size).decode("utf-8"))
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        if getattr(self, "_zip", None) is not None:
+            self._zip.close()
+        self._file.close()
+    
+    def members(self) -> List[PackMember]:
+        """Miembros del pack (sin descomprimir nada)."""
+        return list(self._members.values())
+    
+    def _stream_from(self, offset: int):
+        """Stream sin comprimir que empieza en `offset` (descomprime desde su frame)."""
+        frame = self._frames[bisect_right(self._frame_starts, offset) - 1]
+        self._file.seek(frame[0])
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            self._file, read_across_frames=True, closefd=False
+        )
+        skip = offset - frame[1]
+        while skip > 0:
+            chunk = reader.read(min(skip, 1024 * 1024))
+            if not chunk:
+                raise PackError("Pack truncado")
+            skip -= len(chunk)
+        return reader
+    
+    def open(self, name: str):
+        """
+        Abre un miembro para leerlo en streaming.
+        
+        :raises PackError: Si no existe
+        """
+        member = self._members.get(name)
+        if member is None:
+            raise PackError(f"No existe en el pack: {name}")
+        if self.format == "zip":
+            return self._zip.open(name)
+        tar = tarfile.open(fileobj=self._stream_from(member.offset), mode="r|")
+        info = tar.next()
+        if info is None or info.name != name:
+            raise PackError(f"Índice inconsistente para {name}")
+        return tar.extractfile(info)
+    
+    def read(self, name: str) -> bytes:
+        """Contenido completo de un miembro."""
+        with self.open(name) as f:
+            return f.read()
+    
+    def extract(self, name: str, dest_dir: str) -> Path:
+        """
+        Extrae un miembro conservando su ruta relativa.
+        
+        :return: Ruta del archivo extraído
+        """
+        _check_name(name)
+        member = self._members.get(name)
+        if member is None:
+            raise PackError(f"No existe en el pack: {name}")
+        target = Path(dest_dir) / name
+        with self.open(name) as src:
+            _write_member(src, target, member.mtime)
+        return target
+    
+    def extract_all(self, dest_dir: str) -> int:
+        """
+        Extrae todo en dest_dir (una sola pasada secuencial).
+        
+        :return: Número de archivos extraídos
+        """
+        for name in self._members:
+            _check_name(name)
+        if self.format == "zip":
+            for member in self._members.values():
+                with self._zip.open(member.name) as src:
+                    _write_member(src, Path(dest_dir) / member.name, member.mtime)
+            return len(self._members)
+        
+        self._file.seek(0)
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            self._file, read_across_frames=True, closefd=False
+        )
+        count = 0
+        with tarfile.open(fileobj=reader, mode="r|") as tar:
+            for info in tar:
+                if not info.isfile():
+                    continue
+                _check_name(info.name)
+                with tar.extractfile(info) as src:
+                    _write_member(src, Path(dest_dir) / info.name, info.mtime)
+                count += 1
+        return count
+
+
+def _write_member(src, target: Path, mtime: float):
+    """
+    Escribe un miembro en un temporal y lo mueve sobre target.
+    
+    Nunca se abre el archivo existente para escribir: en un workspace
+    deduplicado es un hardlink a un objeto de solo lectura del almacén, y
+    sobrescribirlo cambiaría ese objeto en todos los workspaces.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.unpack")
+    try:
+        with open(tmp, "wb") as dst:
+            while True:
+                chunk = src.read(1024 * 1024)
+                if not chunk:
+                    break
+                dst.write(chunk)
+        os.utime(tmp, (mtime, mtime))
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def open_pack(path: str) -> PackReader:
+    """Abre un pack (zstd o zip) para listarlo o extraer miembros."""
+    return PackReader(path)
+
+
+def unpack_workspace(path: str, base_dir: Optional[Path] = None, overwrite: bool = False):
+    """
+    Desempaqueta un pack como workspace en el directorio de ports.
+    
+    :param path: Archivo .tar.zst / .zip
+    :param base_dir: Directorio de ports (None = el por defecto)
+    :param overwrite: Permitir extraer sobre un workspace existente
+    :return: GameWorkspace desempaquetado
+    :raises FileExistsError: Si el workspace existe y overwrite=False
+    """
+    from core.game_workspace import GameWorkspace, get_base_ports_dir
+    from core.workspace_registry import get_registry
+    
+    base_dir = Path(base_dir) if base_dir else get_base_ports_dir()
+    with open_pack(path) as pack:
+        meta = pack.meta
+        folder = meta.get("folder") or Path(path).name.split(".")[0]
+        _check_name(folder)
+        dest = base_dir / folder
+        if dest.exists() and any(dest.iterdir()) and not overwrite:
+            raise FileExistsError(f"El workspace ya existe: {dest}")
+        dest.mkdir(parents=True, exist_ok=True)
+        pack.extract_all(str(dest))
+    
+    # Los directorios excluidos se recrean vacíos y quedan pendientes de regenerar
+    excluded = meta.get("excluded", [])
+    for name in excluded:
+        (dest / name).mkdir(exist_ok=True)
+        record_evicted(dest, name, reason="pack")
+    # El manifiesto del origen aún lista sus archivos: que verify no los dé por perdidos
+    forget_dirs(dest, excluded)
+    # Los contadores de uso del pack son los del equipo de origen
+    reconcile(dest)
+    
+    get_registry(base_dir).refresh(validate_info=True)
+    workspace = GameWorkspace._from_folder(base_dir, folder)
+    if workspace is None:
+        workspace = GameWorkspace(meta.get("title_id", ""), meta.get("game_name", ""))
+        workspace._root = dest
+    return workspace
@@ -0,0 +1,280 @@
+# core/workspace_registry.py
+"""
+Índice persistente title_id → workspace.
+
+Evita recorrer ~/MrMonkeyShopWare/ports y abrir cada info.json en cada
+búsqueda. El índice vive en ~/.mrmonkeyshopware/workspaces.json (fuera
+del directorio de ports, para que guardarlo no cambie su mtime) con:
+- la carpeta de cada title_id
+- el contenido de info.json y su mtime
+
+Solo se reconstruye desde disco cuando cambia el mtime del directorio de
+ports (se creó, borró o renombró un workspace). Al reconstruir se reutiliza
+la info cacheada de los info.json cuyo mtime no cambió. Los info.json
+editados a mano se detectan con refresh() (mrmonkey list --refresh).
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from core.atomic_io import FsyncPolicy, atomic_write_json
+
+# Versión del formato de workspaces.json
+REGISTRY_VERSION = 1
+
+# Resolución de mtime en el peor caso (FAT/exFAT: 2 s). Si el directorio
+# cambió menos de esto antes de escanearlo, otro cambio en el mismo "tick"
+# no movería el mtime: ese escaneo se considera dudoso y se repite.
+_RACY_WINDOW_NS = 2_000_000_000
+
+
+def _get_registry_path() -> Path:
+    """Retorna la ruta del índice de workspaces."""
+    registry_dir = Path.home() / ".mrmonkeyshopware"
+    registry_dir.mkdir(parents=True, exist_ok=True)
+    return registry_dir / "workspaces.json"
+
+
+def parse_folder_name(name: str) -> Optional[Tuple[str, str]]:
+    """
+    Extrae (game_name, title_id) de "GameName [TitleID]".
+    
+    :return: Tupla o None si la carpeta no es un workspace
+    """
+    if not name.endswith("]") or " [" not in name:
+        return None
+    game_name, title_id = name.rsplit(" [", 1)
+    return game_name, title_id[:-1]
+
+
+def _mtime_ns(path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class WorkspaceRegistry:
+    """
+    Índice de workspaces de un directorio de ports.
+    
+    Las consultas cuestan un stat() del directorio de ports; el índice
+    en memoria se comparte dentro del proceso (ver get_registry()).
+    """
+    
+    def __init__(self, base_dir: Path, registry_path: Path = None):
+        self.base_dir = Path(base_dir)
+        self.registry_path = Path(registry_path) if registry_path else _get_registry_path()
+        self._lock = threading.RLock()
+        self._entries: Dict[str, dict] = {}
+        self._base_mtime: Optional[int] = None
+        self._file_mtime: Optional[int] = None
+        self._scanned_at: Optional[int] = None
+        self.rebuilds = 0
+    
+    # ══════════════════════════════════════════════════════════════
+    # Consultas
+    # ══════════════════════════════════════════════════════════════
+    
+    def get(self, title_id: str) -> Optional[dict]:
+        """
+        Entrada de un title_id: {"folder", "game_name", "info", "info_mtime"}.
+        
+        :return: Copia de la entrada o None si no hay workspace
+        """
+        with self._lock:
+            self._ensure_fresh()
+            entry = self._entries.get(title_id)
+            return dict(entry) if entry else None
+    
+    def entries(self) -> Iterator[Tuple[str, dict]]:
+        """Recorre (title_id, entrada) ordenado por nombre de carpeta."""
+        with self._lock:
+            self._ensure_fresh()
+            items = sorted(self._entries.items(), key=lambda item: item[1]["folder"])
+        for title_id, entry in items:
+            yield title_id, dict(entry)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_fresh()
+            return len(self._entries)
+    
+    # ══════════════════════════════════════════════════════════════
+    # Actualizaciones (GameWorkspace.create / save_info)
+    # ══════════════════════════════════════════════════════════════
+    
+    def register(self, title_id: str, folder: str, game_name: str, base_mtime_before: Optional[int]):
+        """
+        Añade un workspace recién creado.
+        
+        :param base_mtime_before: mtime del directorio de ports antes de
+            crear la carpeta. Si coincide con el del índice, el único cambio
+            fue este y se evita la reconstrucción; si no, se reconstruye en
+            la siguiente consulta.
+        """
+        with self._lock:
+            self._reload_if_changed()
+            if base_mtime_before is None or base_mtime_before != self._base_mtime:
+                self._ensure_fresh()  # Hubo otros cambios: reconstruir
+            else:
+                self._base_mtime = _mtime_ns(self.base_dir)
+                self._scanned_at = time.time_ns()  # Dudoso: la próxima consulta reescanea
+            
+            entry = self._entries.get(title_id)
+            if entry is None or entry["folder"] != folder:
+                self._entries[title_id] = {
+                    "folder": folder,
+                    "game_name": game_name,
+                    "info": None,
+                    "info_mtime": None,
+                }
+            self._save()
+    
+    def update_info(self, title_id: str, folder: str, info: dict):
+        """Guarda la info recién escrita en info.json de un workspace."""
+        with self._lock:
+            self._ensure_fresh()
+            entry = self._entries.get(title_id)
+            if entry is None or entry["folder"] != folder:
+                return  # Carpeta no indexada: la siguiente reconstrucción la recoge
+            entry["info"] = info
+            entry["info_mtime"] = _mtime_ns(self.base_dir / folder / "info.json")
+            entry["game_name"] = parse_folder_name(folder)[0]
+            self._save()
+    
+    def refresh(self, validate_info: bool = True):
+        """
+        Reconstruye el índice desde disco.
+        
+        :param validate_info: Releer los info.json cuyo mtime cambió
+            (ej: editados a mano)
+        """
+        with self._lock:
+            self._rebuild(validate_info=validate_info)
+    
+    # ══════════════════════════════════════════════════════════════
+    # Persistencia
+    # ══════════════════════════════════════════════════════════════
+    
+    def _reload_if_changed(self):
+        """Relee workspaces.json si otro proceso lo guardó."""
+        file_mtime = _mtime_ns(self.registry_path)
+        if file_mtime is not None and file_mtime != self._file_mtime:
+            self._load()
+    
+    def _ensure_fresh(self):
+        """Recarga o reconstruye el índice si el disco cambió."""
+        self._reload_if_changed()
+        if _mtime_ns(self.base_dir) != self._base_mtime:
+            self._rebuild(validate_info=True)
+        elif self._is_racy():
+            self._rebuild(validate_info=False)
+    
+    def _is_racy(self) -> bool:
+        """True si el último escaneo fue demasiado cerca del último cambio."""
+        if self._base_mtime is None or self._scanned_at is None:
+            return True
+        return self._scanned_at - self._base_mtime < _RACY_WINDOW_NS
+    
+    def _load(self):
+        try:
+            with open(self.registry_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        self._file_mtime = _mtime_ns(self.registry_path)
+        if data.get("version") != REGISTRY_VERSION or data.get("base") != str(self.base_dir):
+            return
+        self._entries = data.get("workspaces", {})
+        self._base_mtime = data.get("base_mtime")
+        self._scanned_at = data.get("scanned_at")
+    
+    def _save(self):
+        data = {
+            "version": REGISTRY_VERSION,
+            "base": str(self.base_dir),
+            "base_mtime": self._base_mtime,
+            "scanned_at": self._scanned_at,
+            "workspaces": self._entries,
+        }
+        try:
+            # Temporal por proceso/hilo: otro proceso puede estar guardando a la vez
+            atomic_write_json(self.registry_path, data, indent=None, fsync=FsyncPolicy.NONE)
+            self._file_mtime = _mtime_ns(self.registry_path)
+        except OSError:
+            pass  # El índice es una caché: sin él se reconstruye
+    
+    def _rebuild(self, validate_info: bool):
+        """Recorre el directorio de ports con scandir y rehace el índice."""
+        self.rebuilds += 1
+        scanned_at = time.time_ns()
+        base_mtime = _mtime_ns(self.base_dir)
+        entries: Dict[str, dict] = {}
+        
+        try:
+            scan = os.scandir(self.base_dir)
+        except OSError:
+            scan = None
+        
+        if scan is not None:
+            with scan:
+                for dir_entry in scan:
+                    parsed = parse_folder_name(dir_entry.name)
+                    if parsed is None or not dir_entry.is_dir():
+                        continue
+                    game_name, title_id = parsed
+                    previous = self._entries.get(title_id)
+                    entry = {
+                        "folder": dir_entry.name,
+                        "game_name": game_name,
+                        "info": None,
+                        "info_mtime": None,
+                    }
+                    if previous and previous["folder"] == dir_entry.name:
+                        entry["info"] = previous.get("info")
+                        entry["info_mtime"] = previous.get("info_mtime")
+                    if validate_info:
+                        self._refresh_info(entry, Path(dir_entry.path) / "info.json")
+                    entries[title_id] = entry
+        
+        self._entries = entries
+        self._base_mtime = base_mtime
+        self._scanned_at = scanned_at
+        self._save()
+    
+    @staticmethod
+    def _refresh_info(entry: dict, info_path: Path):
+        """Relee info.json solo si su mtime no coincide con el cacheado."""
+        info_mtime = _mtime_ns(info_path)
+        if info_mtime == entry["info_mtime"]:
+            return
+        entry["info_mtime"] = info_mtime
+        entry["info"] = None
+        if info_mtime is None:
+            return
+        try:
+            with open(info_path, "r", encoding="utf-8") as f:
+                entry["info"] = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            pass
+
+
+# Un índice por directorio de ports dentro del proceso
+_registries: Dict[str, WorkspaceRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(base_dir: Path) -> WorkspaceRegistry:
+    """Retorna el índice compartido de un directorio de ports."""
+    key = str(base_dir)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = WorkspaceRegistry(base_dir)
+            registry._load()
+            _registries[key] = registry
+        return registry
@@ -0,0 +1,271 @@
+# core/workspace_snapshot.py
+"""
+Snapshots baratos de recompiled/ con hardlinks (estilo rsync --link-dest).
+
+Cada ejecución de XenonRecomp sobrescribe recompiled/. Un snapshot guarda
+el estado actual en .snapshots/<AAAAMMDD-HHMMSS>/:
+
+- Los archivos iguales a los del snapshot anterior se enlazan (hardlink)
+  a él: cero bytes extra, una operación de metadatos por archivo
+- Los que cambiaron se copian. Nunca se enlaza al archivo vivo: el
+  recompilador reescribe sus salidas en el sitio y modificaría el snapshot
+- Comparar dos snapshots es casi gratis: mismo inodo = mismo contenido
+
+Cada snapshot lleva un .snapshot.json con sus estadísticas.
+"""
+import filecmp
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from core.atomic_io import FsyncPolicy, atomic_write_json, read_text
+
+SNAPSHOTS_DIRNAME = ".snapshots"
+SNAPSHOT_META = ".snapshot.json"
+SNAPSHOT_VERSION = 1
+
+_NAME_FORMAT = "%Y%m%d-%H%M%S"
+
+
+@dataclass
+class Snapshot:
+    """Snapshot existente (o recién creado)."""
+    name: str
+    path: str
+    created: float
+    files: int = 0
+    bytes: int = 0         # Tamaño lógico del árbol
+    new_bytes: int = 0     # Bytes copiados al crearlo (el resto son hardlinks)
+    linked: int = 0        # Archivos enlazados al snapshot anterior
+    base: Optional[str] = None  # Snapshot anterior usado como --link-dest
+    seconds: float = 0.0
+
+
+@dataclass
+class SnapshotDiff:
+    """Diferencias entre dos árboles (snapshot o recompiled/ actual)."""
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+
+def _scan_tree(root: Path) -> Dict[str, os.stat_result]:
+    """{ruta relativa (con /): stat} de los archivos bajo root (sin .snapshot.json)."""
+    files: Dict[str, os.stat_result] = {}
+    stack = [(str(root), "")]
+    while stack:
+        path, prefix = stack.pop()
+        try:
+            scan = os.scandir(path)
+        except OSError:
+            continue
+        with scan:
+            for entry in scan:
+                rel = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, rel + "/"))
+                elif entry.is_file(follow_symlinks=False) and rel != SNAPSHOT_META:
+                    files[rel] = entry.stat(follow_symlinks=False)
+    return files
+
+
+def _same_content(a: str, st_a: os.stat_result, b: str, st_b: os.stat_result) -> bool:
+    if (st_a.st_dev, st_a.st_ino) == (st_b.st_dev, st_b.st_ino):
+        return True
+    if st_a.st_size != st_b.st_size:
+        return False
+    if st_a.st_mtime_ns == st_b.st_mtime_ns:
+        return True  # Criterio rápido de rsync: tamaño + mtime
+    # Regenerado con el mismo contenido (XenonRecomp reescribe todo)
+    return filecmp.cmp(a, b, shallow=False)
+
+
+# ══════════════════════════════════════════════════════════════════
+# Listado
+# ══════════════════════════════════════════════════════════════════
+
+def load_snapshot(path: Path) -> Optional[Snapshot]:
+    """Lee un snapshot (None si no existe o su .snapshot.json no es válido)."""
+    path = Path(path)
+    try:
+        data = json.loads(read_text(path / SNAPSHOT_META))
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != SNAPSHOT_VERSION:
+        return None
+    data.pop("version")
+    return Snapshot(name=path.name, path=str(path), **data)
+
+
+def list_snapshots(snapshots_dir: Path) -> List[Snapshot]:
+    """Snapshots de un directorio, del más antiguo al más reciente."""
+    try:
+        with os.scandir(snapshots_dir) as scan:
+            names = sorted(
+                entry.name for entry in scan
+                if entry.is_dir(follow_symlinks=False) and not entry.name.startswith(".")
+            )
+    except OSError:
+        return []
+    snapshots = []
+    for name in names:
+        snapshot = load_snapshot(Path(snapshots_dir) / name)
+        if snapshot is not None:
+            snapshots.append(snapshot)
+    return snapshots
+
+
+def find_snapshot(snapshots_dir: Path, name: str) -> Optional[Snapshot]:
+    """Snapshot por nombre o prefijo único de nombre ("latest" = el último)."""
+    snapshots = list_snapshots(snapshots_dir)
+    if name == "latest":
+        return snapshots[-1] if snapshots else None
+    matches = [s for s in snapshots if s.name.startswith(name)]
+    return matches[0] if len(matches) == 1 else None
+
+
+# ══════════════════════════════════════════════════════════════════
+# Creación
+# ══════════════════════════════════════════════════════════════════
+
+def _new_name(snapshots_dir: Path, now: float) -> str:
+    base = time.strftime(_NAME_FORMAT, time.localtime(now))
+    name, n = base, 1
+    while (snapshots_dir / name).exists():
+        n += 1
+        name = f"{base}-{n}"
+    return name
+
+
+def create_snapshot(source: Path, snapshots_dir: Path, now: float = None) -> Snapshot:
+    """
+    Crea un snapshot de source enlazando lo que no cambió desde el anterior.
+    
+    Se construye en un directorio temporal y se renombra al final: un corte
+    a mitad no deja un snapshot incompleto en el listado.
+    
+    :param source: Directorio a capturar (recompiled/)
+    :param snapshots_dir: Directorio de snapshots (.snapshots/)
+    :param now: Marca de tiempo del snapshot (None = ahora)
+    :raises FileNotFoundError: Si source no existe
+    """
+    source = Path(source)
+    snapshots_dir = Path(snapshots_dir)
+    if not source.is_dir():
+        raise FileNotFoundError(f"No existe el directorio: {source}")
+    start = time.perf_counter()
+    now = time.time() if now is None else now
+    
+    previous = list_snapshots(snapshots_dir)
+    base = previous[-1] if previous else None
+    base_files = _scan_tree(Path(base.path)) if base else {}
+    
+    snapshots_dir.mkdir(parents=True, exist_ok=True)
+    name = _new_name(snapshots_dir, now)
+    tmp_dir = snapshots_dir / f".{name}.tmp"
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    
+    snapshot = Snapshot(name=name, path=str(snapshots_dir / name), created=now,
+                        base=base.name if base else None)
+    try:
+        made_dirs = set()
+        for rel, st in sorted(_scan_tree(source).items()):
+            src = os.path.join(source, rel)
+            dst = os.path.join(tmp_dir, rel)
+            parent = os.path.dirname(dst)
+            if parent not in made_dirs:
+                os.makedirs(parent, exist_ok=True)
+                made_dirs.add(parent)
+            
+            snapshot.files += 1
+            snapshot.bytes += st.st_size
+            prev_st = base_files.get(rel)
+            if prev_st is not None:
+                prev = os.path.join(base.path, rel)
+                if _same_content(src, st, prev, prev_st):
+                    try:
+                        os.link(prev, dst)
+                        snapshot.linked += 1
+                        continue
+                    except OSError:
+                        pass  # Sin hardlinks (FAT/exFAT) o límite de enlaces: copiar
+            shutil.copy2(src, dst)
+            snapshot.new_bytes += st.st_size
+        
+        tmp_dir.mkdir(parents=True, exist_ok=True)  # source vacío
+        snapshot.seconds = time.perf_counter() - start
+        meta = {"version": SNAPSHOT_VERSION}
+        meta.update({k: v for k, v in snapshot.__dict__.items() if k not in ("name", "path")})
+        atomic_write_json(tmp_dir / SNAPSHOT_META, meta, indent=1, fsync=FsyncPolicy.NONE)
+        os.rename(tmp_dir, snapshot.path)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return snapshot
+
+
+# ══════════════════════════════════════════════════════════════════
+# Comparación y limpieza
+# ══════════════════════════════════════════════════════════════════
+
+def diff_trees(old: Path, new: Path) -> SnapshotDiff:
+    """
+    Compara dos árboles (snapshots o recompiled/).
+    
+    Los archivos enlazados entre sí se dan por iguales sin leerlos.
+    """
+    old_files = _scan_tree(Path(old))
+    new_files = _scan_tree(Path(new))
+    diff = SnapshotDiff()
+    for rel, st in sorted(new_files.items()):
+        old_st = old_files.get(rel)
+        if old_st is None:
+            diff.added.append(rel)
+        elif _same_content(os.path.join(old, rel), old_st, os.path.join(new, rel), st):
+            diff.unchanged += 1
+        else:
+            diff.modified.append(rel)
+    diff.removed = sorted(set(old_files) - set(new_files))
+    return diff
+
+
+def prune_snapshots(
+    snapshots_dir: Path,
+    keep: int = None,
+    older_than: float = None,
+    now: float = None,
+    dry_run: bool = False
+) -> List[Snapshot]:
+    """
+    Borra snapshots antiguos. El más reciente nunca se borra.
+    
+    Borrar un snapshot no afecta a los demás: los archivos compartidos
+    siguen vivos mientras otro snapshot los enlace.
+    
+    :param keep: Conservar los N más recientes
+    :param older_than: Borrar los creados hace más de estos segundos
+    :param dry_run: Solo calcular qué se borraría
+    :return: Snapshots borrados
+    """
+    snapshots = list_snapshots(snapshots_dir)[:-1]
+    if keep is not None:
+        snapshots = snapshots[:max(0, len(snapshots) + 1 - keep)]
+    if older_than is not None:
+        now = time.time() if now is None else now
+        snapshots = [s for s in snapshots if now - s.created > older_than]
+    elif keep is None:
+        snapshots = []
+    if not dry_run:
+        for snapshot in snapshots:
+            shutil.rmtree(snapshot.path)
+    return snapshots
@@ -0,0 +1,237 @@
+# core/workspace_usage.py
+"""
+Contadores de uso de disco por workspace (.usage.json).
+
+Calcular el tamaño de un workspace significa recorrer extracted/, con miles
+de archivos. En su lugar cada workspace guarda bytes y nº de archivos por
+subdirectorio de primer nivel ("." = archivos de la raíz):
+
+- Quien escribe en un subdirectorio lo recuenta al terminar (sync → raíz,
+  extracted/ y analysis/; regeneración tras un desalojo → ese subdirectorio;
+  cola de recompilación y `recomp toml/xex/build` sobre un workspace →
+  recompiled/); los demás contadores no se tocan
+- El desalojo por cuota pone el contador a cero sin recorrer nada
+- Cada RECONCILE_INTERVAL_S se reconcilia todo con un recorrido scandir,
+  por si algo cambió fuera de la aplicación
+
+Los tamaños son lógicos: un hardlink al almacén de objetos cuenta en cada
+workspace que lo usa (el ahorro real está en `mrmonkey store report`).
+La excepción son los snapshots (.snapshots/): un archivo enlazado en varios
+snapshots cuenta una sola vez.
+"""
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.atomic_io import FsyncPolicy, atomic_write_json
+from core.workspace_snapshot import SNAPSHOTS_DIRNAME
+
+USAGE_FILE = ".usage.json"
+USAGE_VERSION = 1
+
+# Contador de los archivos sueltos en la raíz del workspace
+ROOT_BUCKET = "."
+
+# Reconciliación completa como mucho una vez al día
+RECONCILE_INTERVAL_S = 24 * 3600
+
+# Lectura-modificación-escritura de .usage.json desde varios hilos (sync)
+_lock = threading.Lock()
+
+
+@dataclass
+class DirUsage:
+    """Uso de un subdirectorio."""
+    bytes: int = 0
+    files: int = 0
+
+
+@dataclass
+class WorkspaceUsage:
+    """Uso de un workspace por subdirectorio."""
+    root: str
+    dirs: Dict[str, DirUsage] = field(default_factory=dict)
+    reconciled_at: float = 0.0
+    
+    @property
+    def total_bytes(self) -> int:
+        return sum(d.bytes for d in self.dirs.values())
+    
+    @property
+    def total_files(self) -> int:
+        return sum(d.files for d in self.dirs.values())
+    
+    def get(self, subdir: str) -> DirUsage:
+        """Uso de un subdirectorio (vacío si no hay contador)."""
+        return self.dirs.get(subdir, DirUsage())
+
+
+def dir_usage(path: Path, seen: set = None) -> Tuple[int, int]:
+    """
+    Bytes y nº de archivos bajo path (scandir, sin seguir symlinks).
+    
+    :param seen: Inodos ya contados (los hardlinks al almacén cuentan una vez)
+    """
+    total = files = 0
+    stack = [str(path)]
+    while stack:
+        try:
+            scan = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with scan:
+            for entry in scan:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    if seen is not None and st.st_nlink > 1:
+                        key = (st.st_dev, st.st_ino)
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                    total += st.st_size
+                    files += 1
+    return total, files
+
+
+def _is_metadata(name: str) -> bool:
+    """Los .json ocultos de la raíz son metadatos del workspace (no cuentan)."""
+    # Incluye los temporales de atomic_write_json (.<nombre>.<pid>.<hilo>.tmp)
+    return name.startswith(".") and (name.endswith(".json") or name.endswith(".tmp"))
+
+
+def _scan_bucket(root: Path, bucket: str) -> DirUsage:
+    if bucket == SNAPSHOTS_DIRNAME:
+        return DirUsage(*dir_usage(root / bucket, seen=set()))
+    if bucket != ROOT_BUCKET:
+        return DirUsage(*dir_usage(root / bucket))
+    usage = DirUsage()
+    try:
+        scan = os.scandir(root)
+    except OSError:
+        return usage
+    with scan:
+        for entry in scan:
+            if entry.is_file(follow_symlinks=False) and not _is_metadata(entry.name):
+                usage.bytes += entry.stat(follow_symlinks=False).st_size
+                usage.files += 1
+    return usage
+
+
+def bucket_of(root: Path, path) -> str:
+    """Contador al que pertenece una ruta del workspace."""
+    parts = Path(os.path.abspath(path)).relative_to(os.path.abspath(root)).parts
+    return parts[0] if len(parts) > 1 else ROOT_BUCKET
+
+
+# ══════════════════════════════════════════════════════════════════
+# Persistencia
+# ══════════════════════════════════════════════════════════════════
+
+def load_usage(root: Path) -> Optional[WorkspaceUsage]:
+    """Lee .usage.json (None si no existe o no es válido)."""
+    try:
+        with open(Path(root) / USAGE_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if data.get("version") != USAGE_VERSION:
+        return None
+    return WorkspaceUsage(
+        root=str(root),
+        dirs={name: DirUsage(**d) for name, d in data.get("dirs", {}).items()},
+        reconciled_at=data.get("reconciled_at", 0.0),
+    )
+
+
+def _save_usage(usage: WorkspaceUsage):
+    path = Path(usage.root) / USAGE_FILE
+    data = {
+        "version": USAGE_VERSION,
+        "reconciled_at": usage.reconciled_at,
+        "dirs": {name: {"bytes": d.bytes, "files": d.files} for name, d in sorted(usage.dirs.items())},
+    }
+    # Temporal por proceso/hilo: dos procesos pueden guardar a la vez.
+    # Sin fsync: es una caché que reconcile() rehace
+    atomic_write_json(path, data, indent=1, fsync=FsyncPolicy.NONE)
+
+
+# ══════════════════════════════════════════════════════════════════
+# Actualización
+# ══════════════════════════════════════════════════════════════════
+
+def reconcile(root: Path) -> WorkspaceUsage:
+    """Recalcula todos los contadores con un recorrido scandir completo."""
+    root = Path(root)
+    usage = WorkspaceUsage(root=str(root), reconciled_at=time.time())
+    usage.dirs[ROOT_BUCKET] = _scan_bucket(root, ROOT_BUCKET)
+    try:
+        with os.scandir(root) as scan:
+            subdirs = [entry.name for entry in scan if entry.is_dir(follow_symlinks=False)]
+    except OSError:
+        subdirs = []
+    for name in subdirs:
+        usage.dirs[name] = _scan_bucket(root, name)
+    with _lock:
+        _save_usage(usage)
+    return usage
+
+
+def refresh_dirs(root: Path, buckets: Iterable[str]) -> WorkspaceUsage:
+    """
+    Recuenta solo algunos subdirectorios (tras escribir en ellos).
+    
+    Sin contadores previos hace una reconciliación completa.
+    
+    :param buckets: Subdirectorios de primer nivel o ROOT_BUCKET
+    """
+    root = Path(root)
+    with _lock:
+        usage = load_usage(root)
+        if usage is not None:
+            for bucket in set(buckets):
+                scanned = _scan_bucket(root, bucket)
+                if scanned.files or (root / bucket).is_dir():
+                    usage.dirs[bucket] = scanned
+                else:
+                    usage.dirs.pop(bucket, None)
+            _save_usage(usage)
+            return usage
+    return reconcile(root)
+
+
+def refresh_paths(root: Path, paths: Iterable) -> WorkspaceUsage:
+    """Recuenta los subdirectorios que contienen estas rutas."""
+    return refresh_dirs(root, {bucket_of(root, path) for path in paths})
+
+
+def set_dir(root: Path, bucket: str, bytes_: int = 0, files: int = 0):
+    """Fija un contador sin recorrer nada (ej: subdirectorio recién vaciado)."""
+    with _lock:
+        usage = load_usage(root)
+        if usage is None:
+            return  # Se calculará entero en la próxima lectura
+        usage.dirs[bucket] = DirUsage(bytes_, files)
+        _save_usage(usage)
+
+
+def get_usage(root: Path, max_age: float = RECONCILE_INTERVAL_S) -> WorkspaceUsage:
+    """
+    Uso de un workspace (instantáneo salvo que toque reconciliar).
+    
+    :param max_age: Reconciliar si la última es más vieja (None = nunca)
+    """
+    usage = load_usage(root)
+    if usage is None or (max_age is not None and time.time() - usage.reconciled_at > max_age):
+        return reconcile(root)
+    return usage
+
+
+def library_usage(roots: Iterable[Path], max_age: float = RECONCILE_INTERVAL_S) -> List[WorkspaceUsage]:
+    """Uso de varios workspaces (la suma de total_bytes es el de la biblioteca)."""
+    return [get_usage(root, max_age) for root in roots]
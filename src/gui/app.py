@@ -896,6 +896,8 @@ class ModernApp(ctk.CTk if not HAS_DND else TkinterDnD.Tk):
             try:
                 import json
                 from core.game_workspace import GameWorkspace, GameInfo, get_or_create_workspace
+                from core.workspace_lock import workspace_lock
+                from core.atomic_io import write_behind
                 
                 result = analyse_xex(file_path, log=self._log)
                 
@@ -924,69 +926,66 @@ class ModernApp(ctk.CTk if not HAS_DND else TkinterDnD.Tk):
                                 self._log(f"\n⚠️ Juego ya existe en BD (ID: {existing.id})")
                                 self._log(f"   Actualizando información...")
                         
-                        # Crear/obtener workspace organizado
-                        game_name = xex_info.display_name or os.path.basename(file_path).replace(".xex", "")
-                        workspace, is_new = get_or_create_workspace(xex_info.title_id, game_name)
-                        
-                        if is_new:
-                            self._log(f"\n📁 Creado directorio del juego:")
-                        else:
-                            self._log(f"\n📁 Usando directorio existente:")
-                        self._log(f"   {workspace.root}")
-                        
-                        # Guardar info.json en el workspace
-                        game_info = GameInfo.from_xex_info(
-                            xex_info, 
-                            source_type="xex", 
-                            source_path=file_path
-                        )
-                        workspace.save_info(game_info)
-                        self._log(f"   ✅ info.json guardado")
-                        
-                        # Mover/copiar archivos de análisis al workspace
-                        import shutil
-                        if result.json_file and os.path.exists(result.json_file):
-                            dest = workspace.analysis_dir / os.path.basename(result.json_file)
-                            shutil.copy2(result.json_file, dest)
-                            result.json_file = str(dest)
-                        
-                        if result.toml_file and os.path.exists(result.toml_file):
-                            dest = workspace.analysis_dir / os.path.basename(result.toml_file)
-                            shutil.copy2(result.toml_file, dest)
-                            result.toml_file = str(dest)
-                        
-                        # Guardar en base de datos
-                        try:
-                            game = Game(
-                                title_id=xex_info.title_id,
-                                game_name=game_name,
-                                status=GameStatus.ANALYSED,
-                                xex_path=file_path,
-                                extracted_dir=str(workspace.root),  # Directorio del workspace
-                                analysis_json=result.json_file,
-                                project_toml=result.toml_file,
-                                media_id=xex_info.media_id,
-                                version=xex_info.version,
-                                disc_number=xex_info.disc_number,
-                                total_discs=xex_info.total_discs,
-                                regions=xex_info.regions,
-                                esrb_rating=xex_info.esrb_rating,
-                                entry_point=xex_info.entry_point,
-                                original_pe_name=xex_info.original_pe_name,
-                                xex_info_json=json.dumps({
-                                    "static_libraries": xex_info.static_libraries[:10],
-                                    "is_retail": xex_info.is_retail,
-                                    "workspace": str(workspace.root)
-                                })
+                        # Lock del workspace: un batch o la CLI pueden estar escribiéndolo
+                        with workspace_lock(xex_info.title_id), write_behind():
+                            # Crear/obtener workspace organizado
+                            game_name = xex_info.display_name or os.path.basename(file_path).replace(".xex", "")
+                            workspace, is_new = get_or_create_workspace(xex_info.title_id, game_name)
+                            
+                            if is_new:
+                                self._log(f"\n📁 Creado directorio del juego:")
+                            else:
+                                self._log(f"\n📁 Usando directorio existente:")
+                            self._log(f"   {workspace.root}")
+                            
+                            # Guardar info.json en el workspace
+                            game_info = GameInfo.from_xex_info(
+                                xex_info, 
+                                source_type="xex", 
+                                source_path=file_path
                             )
+                            workspace.save_info(game_info)
+                            self._log(f"   ✅ info.json guardado")
+                            
+                            # Mover/copiar archivos de análisis al workspace
+                            if result.json_file and os.path.exists(result.json_file):
+                                result.json_file = workspace.import_analysis_file(result.json_file).dst
                             
-                            with GameDatabase() as db:
-                                game_id = db.add_or_update_game(game)
+                            if result.toml_file and os.path.exists(result.toml_file):
+                                result.toml_file = workspace.import_analysis_file(result.toml_file).dst
                             
-                            self._log(f"\n💾 Juego guardado en base de datos (ID: {game_id})")
-                            self._log(f"📚 Ve a 'Historial' para ver el juego")
-                        except Exception as e:
-                            self._log(f"⚠️ No se pudo guardar en BD: {e}")
+                            # Guardar en base de datos
+                            try:
+                                game = Game(
+                                    title_id=xex_info.title_id,
+                                    game_name=game_name,
+                                    status=GameStatus.ANALYSED,
+                                    xex_path=file_path,
+                                    extracted_dir=str(workspace.root),  # Directorio del workspace
+                                    analysis_json=result.json_file,
+                                    project_toml=result.toml_file,
+                                    media_id=xex_info.media_id,
+                                    version=xex_info.version,
+                                    disc_number=xex_info.disc_number,
+                                    total_discs=xex_info.total_discs,
+                                    regions=xex_info.regions,
+                                    esrb_rating=xex_info.esrb_rating,
+                                    entry_point=xex_info.entry_point,
+                                    original_pe_name=xex_info.original_pe_name,
+                                    xex_info_json=json.dumps({
+                                        "static_libraries": xex_info.static_libraries[:10],
+                                        "is_retail": xex_info.is_retail,
+                                        "workspace": str(workspace.root)
+                                    })
+                                )
+                                
+                                with GameDatabase() as db:
+                                    game_id = db.add_or_update_game(game, tool="gui")
+                                
+                                self._log(f"\n💾 Juego guardado en base de datos (ID: {game_id})")
+                                self._log(f"📚 Ve a 'Historial' para ver el juego")
+                            except Exception as e:
+                                self._log(f"⚠️ No se pudo guardar en BD: {e}")
                     else:
                         self._log("⚠️ No se pudo detectar información del juego")
                     
@@ -86,6 +86,15 @@ class FileStructureViewer(ctk.CTkFrame):
             command=self._populate_files
         )
         refresh_btn.grid(row=0, column=2, padx=(10, 0))
+        
+        # Uso de disco (contadores de .usage.json, sin recorrer extracted/)
+        self.usage_label = ctk.CTkLabel(
+            header,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color=("gray40", "gray60")
+        )
+        self.usage_label.grid(row=0, column=3, padx=(15, 0), sticky="w")
     
     def _create_viewer(self):
         """Crea el área de visualización."""
@@ -123,9 +132,41 @@ class FileStructureViewer(ctk.CTkFrame):
                 for f in analysis_dir.iterdir():
                     if f.suffix in [".json", ".toml"]:
                         files.append(f"analysis/{f.name}")
+            
+            self._load_usage()
         
         self.file_menu.configure(values=files)
     
+    def _load_usage(self):
+        """Carga el uso de disco y el resumen de la salida recompilada en un hilo."""
+        import threading
+        from core.recomp_manifest import load_output_manifest
+        from core.workspace_eviction import touch
+        from core.workspace_usage import get_usage
+        
+        def work():
+            try:
+                usage = get_usage(self.workspace_dir)
+            except OSError:
+                return
+            parts = [f"💾 {_format_size(usage.total_bytes)}"]
+            for name in ("extracted", "cleaned", "recompiled", "analysis"):
+                size = usage.get(name).bytes
+                if size:
+                    parts.append(f"{name}/ {_format_size(size)}")
+            # Archivos generados: del manifiesto de salida, sin recorrer recompiled/
+            manifest = load_output_manifest(str(self.workspace_dir / "recompiled"))
+            if manifest is not None:
+                try:
+                    touch(self.workspace_dir, "recompiled")  # Orden LRU del desalojo por cuota
+                except OSError:
+                    pass
+                cpp_count = sum(1 for f in manifest.files if f.is_source)
+                parts.append(f"🧩 {cpp_count} .cpp / {len(manifest.files) - cpp_count} .h")
+            self.after(0, lambda: self.usage_label.configure(text="  ·  ".join(parts)))
+        
+        threading.Thread(target=work, daemon=True).start()
+    
     def _on_file_select(self, filename: str):
         """Maneja selección de archivo."""
         if filename == "Seleccionar..." or not self.workspace_dir:
@@ -152,7 +193,7 @@ class FileStructureViewer(ctk.CTkFrame):
                 with open(file_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                 self._render_tree(file_path.name, data)
-                
+            
             elif suffix == ".toml":
                 try:
                     import tomllib
@@ -162,15 +203,15 @@ class FileStructureViewer(ctk.CTkFrame):
                 with open(file_path, 'rb') as f:
                     data = tomllib.load(f)
                 self._render_tree(file_path.name, data)
-                
+            
             elif suffix == ".md":
                 with open(file_path, 'r', encoding='utf-8') as f:
                     content = f.read()
                 self._render_text(file_path.name, content)
-                
+            
             else:
                 self._show_error(f"Formato no soportado: {suffix}")
-                
+        
         except Exception as e:
             self._show_error(f"Error al leer archivo: {e}")
     
@@ -210,7 +251,7 @@ class FileStructureViewer(ctk.CTkFrame):
             # Renderizar hijos
             for i, (k, v) in enumerate(value.items()):
                 self._render_value(parent, k, v, depth + 1 if key else depth)
-                
+        
         elif isinstance(value, list):
             icon = TYPE_ICONS["list"]
             type_color = TYPE_COLORS["list"]
@@ -231,27 +272,27 @@ class FileStructureViewer(ctk.CTkFrame):
                     font=ctk.CTkFont(size=11),
                     text_color=("gray50", "gray60")
                 ).pack(side="left")
-                
+        
         elif isinstance(value, bool):
             icon = TYPE_ICONS["bool_true"] if value else TYPE_ICONS["bool_false"]
             type_color = TYPE_COLORS["bool"]
             self._add_key_value_row(row_frame, key, str(value), icon, type_color)
-            
+        
         elif isinstance(value, int):
             icon = TYPE_ICONS["int"]
             type_color = TYPE_COLORS["int"]
             self._add_key_value_row(row_frame, key, str(value), icon, type_color)
-            
+        
         elif isinstance(value, float):
             icon = TYPE_ICONS["float"]
             type_color = TYPE_COLORS["float"]
             self._add_key_value_row(row_frame, key, f"{value:.4f}", icon, type_color)
-            
+        
         elif value is None:
             icon = TYPE_ICONS["none"]
             type_color = TYPE_COLORS["none"]
             self._add_key_value_row(row_frame, key, "null", icon, type_color)
-            
+        
         else:
             # String u otro
             icon = TYPE_ICONS["str"]
@@ -329,3 +370,12 @@ class FileStructureViewer(ctk.CTkFrame):
             font=ctk.CTkFont(size=12),
             text_color=("#CC0000", "#FF6B6B")
         ).grid(row=0, column=0, pady=50)
+
+
+def _format_size(size: float) -> str:
+    """Formatea un tamaño en B/KB/MB/GB."""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
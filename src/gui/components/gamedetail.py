@@ -229,11 +229,13 @@ class GameDetailView(ctk.CTkFrame):
                     command=self._sync_all_files
                 )
                 sync_btn.pack(side="right", padx=(5, 0))
+                self._sync_btn = sync_btn
         
         # Banner de advertencia si hay externos
         if external_files:
             warning_frame = ctk.CTkFrame(tab, fg_color=("#FFF3E0", "#3D2814"))
             warning_frame.grid(row=1, column=0, sticky="ew", padx=5, pady=(0, 5))
+            self._sync_banner = warning_frame
             
             ctk.CTkLabel(
                 warning_frame,
@@ -346,7 +348,7 @@ class GameDetailView(ctk.CTkFrame):
         """Busca un archivo y lo copia al workspace."""
         from tkinter import filedialog, messagebox
         from pathlib import Path
-        import shutil
+        from core.file_placement import place_file
         
         # Construir filtro de extensiones
         ext_str = " ".join(f"*{e}" for e in extensions)
@@ -372,8 +374,9 @@ class GameDetailView(ctk.CTkFrame):
         dest_path.parent.mkdir(parents=True, exist_ok=True)
         
         try:
-            shutil.copy2(file_path, dest_path)
-            messagebox.showinfo("Copiado", f"✅ Archivo copiado a:\n{dest_path}")
+            # XEX/ISO no se modifican: se pueden enlazar en vez de copiar
+            placed = place_file(file_path, str(dest_path), immutable=file_id in ("xex", "iso"))
+            messagebox.showinfo("Copiado", f"✅ Archivo colocado ({placed.method.value}) en:\n{dest_path}")
             
             # Actualizar UI - refrescar pestaña
             self._setup_files_tab()
@@ -404,12 +407,76 @@ class GameDetailView(ctk.CTkFrame):
         ):
             return
         
-        # Ejecutar sincronización
+        self._start_sync()
+    
+    def _start_sync(self):
+        """Ejecuta la sincronización en un hilo mostrando el progreso en el banner."""
+        import threading
+        import time
+        from core.file_sync import format_rate
+        
+        cancel = threading.Event()
+        self._sync_btn.configure(
+            text="⏹ Cancelar", command=lambda: (cancel.set(), self._sync_btn.configure(state="disabled"))
+        )
+        
+        # El banner de advertencia pasa a mostrar el progreso
+        for child in self._sync_banner.winfo_children():
+            child.destroy()
+        progress_bar = ctk.CTkProgressBar(self._sync_banner)
+        progress_bar.set(0)
+        progress_bar.pack(fill="x", padx=10, pady=(8, 2))
+        progress_label = ctk.CTkLabel(
+            self._sync_banner,
+            text="📥 Preparando copia...",
+            font=ctk.CTkFont(size=11),
+            text_color=("#E65100", "#FFB74D")
+        )
+        progress_label.pack(padx=10, pady=(0, 6))
+        
+        last_update = [0.0]
+        
+        def show_progress(fraction, text):
+            if progress_bar.winfo_exists():
+                progress_bar.set(fraction)
+                progress_label.configure(text=text)
+        
+        def on_progress(progress):
+            # Llamado desde los hilos copiadores: limitar a ~10 refrescos/s
+            now = time.monotonic()
+            if now - last_update[0] < 0.1:
+                return
+            last_update[0] = now
+            text = (
+                f"📥 {progress.task.label}  {progress.percent:.0f}%  "
+                f"({format_rate(progress.file_rate)} · total {format_rate(progress.total_rate)})"
+            )
+            self.after(0, lambda: show_progress(progress.percent / 100, text))
+        
         messages = []
-        def log(msg):
-            messages.append(msg)
         
-        new_paths = self.workspace.sync_all_files(self.game, log=log)
+        def worker():
+            # LockTimeout (otro proceso usa el workspace), OSError (disco lleno,
+            # permisos) o un checksum que no coincide: la pestaña no debe
+            # quedarse en "copiando"
+            try:
+                new_paths = self.workspace.sync_all_files(
+                    self.game, log=messages.append, progress=on_progress, cancel=cancel
+                )
+                error = None
+            except Exception as e:
+                new_paths, error = {}, str(e) or type(e).__name__
+            self.after(0, lambda: self._finish_sync(new_paths, messages, cancel.is_set(), error))
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def _finish_sync(self, new_paths: dict, messages: list, cancelled: bool, error: str = None):
+        """
+        Actualiza la BD y la pestaña al terminar la sincronización (hilo de la GUI).
+        
+        :param error: Texto de la excepción si la copia falló
+        """
+        from tkinter import messagebox
         
         # Actualizar rutas en BD si hay cambios
         if new_paths:
@@ -424,8 +491,18 @@ class GameDetailView(ctk.CTkFrame):
             except Exception as e:
                 messages.append(f"\n⚠️ Error actualizando BD: {e}")
         
+        if cancelled:
+            messages.append("\n⏹ Cancelado: la copia se reanudará donde quedó")
+        
+        if not self.winfo_exists():
+            return
+        
         # Mostrar resultado
-        messagebox.showinfo("Sincronización", "\n".join(messages))
+        if error:
+            messages.append(f"\n❌ La copia falló: {error}")
+            messagebox.showerror("Sincronización", "\n".join(messages))
+        else:
+            messagebox.showinfo("Sincronización", "\n".join(messages))
         
         # Refrescar pestaña
         self._setup_files_tab()
@@ -559,7 +636,7 @@ class GameDetailView(ctk.CTkFrame):
         try:
             self.game.status = GameStatus(new_status)
             with GameDatabase() as db:
-                db.update_game(self.game)
+                db.update_game(self.game, tool="gui")
             
             # Actualizar badge
             color = self.STATUS_COLORS.get(self.game.status, ("#666666", "#666666"))
@@ -567,7 +644,7 @@ class GameDetailView(ctk.CTkFrame):
             
             if self.on_update:
                 self.on_update(self.game)
-                
+        
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo cambiar el estado: {e}")
     
@@ -389,18 +389,20 @@ class SettingsView(ctk.CTkFrame):
         try:
             from core.database import GameDatabase
             db = GameDatabase()
-            games = db.list_games()
+            status_counts = db.status_counts()
             
-            stats = f"📊 Total de juegos: {len(games)}\n"
-            
-            from core.database import GameStatus
-            status_counts = {}
-            for g in games:
-                s = g.status.value
-                status_counts[s] = status_counts.get(s, 0) + 1
+            stats = f"📊 Total de juegos: {sum(status_counts.values())}\n"
             
             for status, count in status_counts.items():
-                stats += f"   • {status}: {count}\n"
+                if count:
+                    stats += f"   • {status.value}: {count}\n"
+            
+            cache = db.cache_stats()
+            if cache:
+                stats += (
+                    f"\n⚡ Caché: {cache['hits']} aciertos / {cache['misses']} fallos "
+                    f"({cache['hit_rate']:.0%})\n"
+                )
             
             db.close()
             self.stats_label.configure(text=stats)
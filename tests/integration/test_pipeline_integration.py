@@ -9,6 +9,13 @@ from unittest.mock import patch, MagicMock
 from core.pipeline import full_pipeline
 
 
+@pytest.fixture(autouse=True)
+def isolated_home(tmp_path, monkeypatch):
+    """La BD por defecto (~/.mrmonkeyshopware) va a un HOME temporal."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path / "home"))
+
+
 @pytest.fixture
 def mock_external_tools(tmp_path):
     """
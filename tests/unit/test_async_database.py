@@ -0,0 +1,92 @@
+# tests/unit/test_async_database.py
+"""
+Tests unitarios para la fachada asíncrona de la base de datos.
+"""
+import asyncio
+import sqlite3
+
+import pytest
+
+from core.async_database import AsyncGameDatabase
+from core.database import Game, GameStatus
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Ruta a una BD en disco (los lectores necesitan un archivo)."""
+    return str(tmp_path / "games.db")
+
+
+class TestAsyncGameDatabase:
+    """Tests para AsyncGameDatabase."""
+    
+    def test_write_then_read(self, db_path):
+        """Verifica que una lectura ve lo escrito antes."""
+        async def scenario():
+            async with AsyncGameDatabase(db_path) as adb:
+                game_id = await adb.add_game(Game(title_id="12345678", game_name="Async"))
+                return await adb.get_game(game_id)
+        
+        game = asyncio.run(scenario())
+        
+        assert game.game_name == "Async"
+    
+    def test_group_commit(self, db_path):
+        """Verifica que escrituras concurrentes se agrupan en pocos commits."""
+        async def scenario():
+            async with AsyncGameDatabase(db_path, flush_latency=0.05) as adb:
+                await asyncio.gather(*(
+                    adb.add_game(Game(game_name=f"Game {i}")) for i in range(50)
+                ))
+                return adb.commits, await adb.count()
+        
+        commits, total = asyncio.run(scenario())
+        
+        assert total == 50
+        assert commits < 50
+    
+    def test_failed_write_does_not_abort_group(self, db_path):
+        """Verifica que un fallo solo afecta a su propia escritura."""
+        async def scenario():
+            async with AsyncGameDatabase(db_path, flush_latency=0.05) as adb:
+                results = await asyncio.gather(
+                    adb.add_game(Game(title_id="DUP00001", game_name="A")),
+                    adb.add_game(Game(title_id="DUP00001", game_name="B")),
+                    adb.add_game(Game(title_id="OK000001", game_name="C")),
+                    return_exceptions=True
+                )
+                return results, await adb.count()
+        
+        results, total = asyncio.run(scenario())
+        
+        assert isinstance(results[1], sqlite3.IntegrityError)
+        assert total == 2
+    
+    def test_iter_games_streams_all(self, db_path):
+        """Verifica el recorrido con async for por bloques."""
+        async def scenario():
+            async with AsyncGameDatabase(db_path) as adb:
+                for i in range(25):
+                    await adb.add_game(Game(
+                        game_name=f"Game {i}",
+                        status=GameStatus.ANALYSED if i % 2 else GameStatus.PENDING
+                    ))
+                all_names = [g.game_name async for g in adb.iter_games(chunk_size=4)]
+                analysed = [g async for g in adb.iter_games(GameStatus.ANALYSED, chunk_size=4)]
+                return all_names, analysed
+        
+        all_names, analysed = asyncio.run(scenario())
+        
+        assert len(all_names) == 25
+        assert len(analysed) == 12
+    
+    def test_in_memory_reads_through_writer(self):
+        """Verifica que con ":memory:" las lecturas usan la conexión del escritor."""
+        async def scenario():
+            async with AsyncGameDatabase(":memory:") as adb:
+                await adb.add_game(Game(game_name="Mem"))
+                return await adb.list_games()
+        
+        games = asyncio.run(scenario())
+        
+        assert [g.game_name for g in games] == ["Mem"]
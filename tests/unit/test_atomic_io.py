@@ -0,0 +1,99 @@
+# tests/unit/test_atomic_io.py
+"""
+Tests unitarios para las escrituras atómicas y el write-behind.
+"""
+import os
+
+import pytest
+
+from core import atomic_io
+from core.atomic_io import FsyncPolicy, WriteCoalescer, atomic_write_json, atomic_write_text
+
+
+class TestAtomicWrite:
+    """Tests para atomic_write_*."""
+    
+    def test_failed_write_keeps_previous_file(self, tmp_path, monkeypatch):
+        path = tmp_path / "info.json"
+        atomic_write_json(path, {"title_id": "4E4D07F5"})
+        
+        def crash(*args):
+            raise OSError("disco lleno")
+        monkeypatch.setattr(atomic_io.os, "replace", crash)
+        
+        with pytest.raises(OSError):
+            atomic_write_text(path, '{"trunc')
+        
+        assert '"4E4D07F5"' in path.read_text(encoding="utf-8")
+        assert os.listdir(tmp_path) == ["info.json"]  # Sin temporales huérfanos
+    
+    @pytest.mark.parametrize("policy", list(FsyncPolicy))
+    def test_fsync_policies(self, tmp_path, policy):
+        path = tmp_path / "notes.md"
+        
+        atomic_write_text(path, "# Halo\n", fsync=policy)
+        
+        assert path.read_text(encoding="utf-8") == "# Halo\n"
+
+
+class TestWriteCoalescer:
+    """Tests para WriteCoalescer."""
+    
+    def test_outside_batch_writes_immediately(self, tmp_path):
+        coalescer = WriteCoalescer()
+        
+        coalescer.submit(tmp_path / "a.txt", b"1")
+        
+        assert (tmp_path / "a.txt").read_bytes() == b"1"
+        assert coalescer.writes == 1
+    
+    def test_batch_merges_writes_per_file(self, tmp_path):
+        coalescer = WriteCoalescer(interval=60)
+        written = []
+        
+        with coalescer.batch():
+            for i in range(5):
+                coalescer.submit(tmp_path / "info.json", str(i).encode(), on_written=lambda: written.append(1))
+            coalescer.submit(tmp_path / "notes.md", b"n")
+            
+            assert not (tmp_path / "info.json").exists()
+            assert coalescer.pending(tmp_path / "info.json") == b"4"
+        
+        assert (tmp_path / "info.json").read_bytes() == b"4"
+        assert coalescer.writes == 2
+        assert coalescer.coalesced == 4
+        assert len(written) == 5  # Todos los callbacks, tras la escritura real
+    
+    def test_timer_flushes_inside_batch(self, tmp_path):
+        coalescer = WriteCoalescer(interval=0.01)
+        
+        with coalescer.batch():
+            coalescer.submit(tmp_path / "info.json", b"x")
+            coalescer._timer.join(5)
+            
+            assert (tmp_path / "info.json").read_bytes() == b"x"
+            assert coalescer.pending(tmp_path / "info.json") is None
+
+
+class TestWorkspaceMetadata:
+    """save_info / save_notes sobre el write-behind."""
+    
+    def test_reads_see_pending_writes(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setenv("USERPROFILE", str(tmp_path))
+        from core.atomic_io import write_behind
+        from core.game_workspace import GameInfo, GameWorkspace
+        
+        workspace = GameWorkspace("4E4D07F5", "Halo")
+        workspace.create()
+        
+        with write_behind():
+            workspace.save_info(GameInfo(title_id="4E4D07F5", game_name="Halo"))
+            workspace.save_notes("# Halo\n\nPendiente\n")
+            
+            assert not workspace.info_file.exists()
+            assert workspace.load_info().game_name == "Halo"
+            assert workspace.get_notes() == "# Halo\n\nPendiente\n"
+        
+        assert workspace.info_file.exists()
+        assert workspace.cached_info().game_name == "Halo"
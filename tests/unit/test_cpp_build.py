@@ -0,0 +1,107 @@
+# tests/unit/test_cpp_build.py
+"""
+Tests unitarios para la compilación del C++ generado.
+"""
+import os
+import time
+
+import pytest
+
+from core.cpp_build import ObjectCache, build_objects, find_compiler
+
+CXX = find_compiler()
+needs_compiler = pytest.mark.skipif(CXX is None, reason="sin compilador C++ (g++/clang++)")
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Salida de XenonRecomp mínima: 3 unidades que incluyen ppc_context.h."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path / "home"))
+    out = tmp_path / "recompiled"
+    out.mkdir()
+    (tmp_path / "ppc_context.h").write_text("#pragma once\nstruct PPCContext { int r3; };\n")
+    (out / "ppc_recomp_shared.h").write_text('#pragma once\n#include "ppc_context.h"\n')
+    for n in range(3):
+        (out / f"ppc_recomp.{n}.cpp").write_text(
+            f'#include "ppc_recomp_shared.h"\nint f{n}(PPCContext& c) {{ return c.r3 + {n}; }}\n'
+        )
+    
+    def build(**kwargs):
+        return build_objects(str(out), cxx=CXX, cxxflags="-O0", jobs=2,
+                             cache=ObjectCache(tmp_path / "cache"),
+                             ppc_context=str(tmp_path / "ppc_context.h"), **kwargs)
+    return out, build
+
+
+class TestObjectCache:
+    """Tests para ObjectCache."""
+    
+    def test_fetch_store_and_prune(self, tmp_path):
+        cache = ObjectCache(tmp_path / "cache")
+        for key in ("aa01", "bb02"):
+            obj = tmp_path / f"{key}.o"
+            obj.write_bytes(b"\x7fELF" + b"\0" * 100)
+            cache.store(key, str(obj))
+        os.utime(cache.path_for("aa01"), (time.time() - 60, time.time() - 60))
+        
+        assert cache.fetch("bb02", str(tmp_path / "out.o")) is True
+        assert cache.fetch("cc03", str(tmp_path / "none.o")) is False
+        assert cache.prune(150) == 1
+        assert not cache.path_for("aa01").exists() and cache.path_for("bb02").exists()
+
+
+@needs_compiler
+class TestBuildObjects:
+    """Tests para build_objects() con el compilador local."""
+    
+    def test_second_build_comes_from_cache(self, project):
+        out, build = project
+        
+        first = build()
+        second = build()
+        
+        assert first.success and len(first.compiled) == 3
+        assert second.success and len(second.cached) == 3 and not second.compiled
+        assert sorted(os.listdir(out / "obj")) == [
+            "build_report.json", "ppc_recomp.0.o", "ppc_recomp.1.o", "ppc_recomp.2.o"
+        ]
+        assert [u.source for u in first.slowest(1)][0].endswith(".cpp")
+    
+    def test_only_changed_units_recompile(self, project, tmp_path):
+        out, build = project
+        build()
+        
+        with open(out / "ppc_recomp.1.cpp", "a") as f:
+            f.write("int extra() { return 1; }\n")
+        edited = build()
+        (tmp_path / "ppc_context.h").write_text("#pragma once\nstruct PPCContext { long r3; };\n")
+        context_changed = build()
+        
+        assert [u.source for u in edited.compiled] == ["ppc_recomp.1.cpp"]
+        assert len(context_changed.compiled) == 3
+    
+    def test_failed_unit_is_reported_and_not_cached(self, project):
+        out, build = project
+        build()
+        (out / "ppc_recomp.2.cpp").write_text("int broken(\n")
+        
+        result = build()
+        
+        assert result.success is False
+        assert [u.source for u in result.failed] == ["ppc_recomp.2.cpp"]
+        assert "error" in result.failed[0].error
+        assert not (out / "obj" / "ppc_recomp.2.o").exists()
+    
+    def test_only_own_stale_objects_removed(self, project):
+        """Un .o del usuario en obj_dir no se borra; el de un .cpp eliminado sí."""
+        out, build = project
+        build()
+        (out / "obj" / "runtime.o").write_bytes(b"\x7fELF")
+        (out / "ppc_recomp.2.cpp").unlink()
+        
+        result = build()
+        
+        assert result.success
+        assert (out / "obj" / "runtime.o").exists()
+        assert not (out / "obj" / "ppc_recomp.2.o").exists()
@@ -3,8 +3,10 @@
 Tests unitarios para el módulo database.
 """
 import pytest
+import sqlite3
 from datetime import datetime
-from core.database import GameDatabase, Game, GameStatus
+from core.database import GameDatabase, Game, GameStatus, SCHEMA_VERSION, _row_mapper
+from core.game_cache import GameCache
 
 
 @pytest.fixture
@@ -51,6 +53,46 @@ class TestGameDataclass:
         assert game.game_name == "My Game"
         assert game.status == GameStatus.COMPLETED
         assert game.iso_path == "/path/to/game.iso"
+    
+    def test_slots(self):
+        """Verifica que Game no tiene __dict__ por instancia."""
+        game = Game()
+        
+        assert not hasattr(game, "__dict__")
+        with pytest.raises(AttributeError):
+            game.unknown_field = 1
+
+
+class TestRowMapping:
+    """Tests para la conversión fila → Game."""
+    
+    def test_lazy_datetimes(self, db, sample_game):
+        """Verifica que las fechas se guardan en crudo hasta consultarlas."""
+        game_id = db.add_game(sample_game)
+        game = db.list_games()[0]
+        raw_slot = Game.__dict__["created_at"].slot
+        
+        assert isinstance(raw_slot.__get__(game), str)
+        assert isinstance(game.created_at, datetime)
+        assert isinstance(raw_slot.__get__(game), datetime)
+        assert db.get_game(game_id).updated_at == game.updated_at
+    
+    def test_missing_columns_use_defaults(self):
+        """Verifica filas de BD antiguas sin columnas de metadata."""
+        map_row = _row_mapper(("id", "game_name", "status", "created_at"))
+        
+        game = map_row((3, "Old", "completed", None))
+        
+        assert game == Game(id=3, game_name="Old", status=GameStatus.COMPLETED)
+        assert game.disc_number == 1
+        assert map_row is _row_mapper(("id", "game_name", "status", "created_at"))
+    
+    def test_row_to_game_accepts_sqlite_row(self, db, sample_game):
+        """Verifica la compatibilidad de _row_to_game con sqlite3.Row."""
+        game_id = db.add_game(sample_game)
+        row = db.conn.execute("SELECT * FROM games WHERE id = ?", (game_id,)).fetchone()
+        
+        assert db._row_to_game(row) == db.get_game(game_id)
 
 
 class TestGameStatus:
@@ -91,6 +133,92 @@ class TestGameDatabaseInit:
         assert cursor.fetchone() is not None
 
 
+class TestSchemaMigrations:
+    """Tests para las migraciones versionadas con PRAGMA user_version."""
+    
+    def test_new_db_at_current_version(self, db):
+        """Verifica que una BD nueva queda en la versión actual."""
+        version = db.conn.execute("PRAGMA user_version").fetchone()[0]
+        
+        assert version == SCHEMA_VERSION
+    
+    def test_legacy_db_is_migrated(self, tmp_path):
+        """Verifica que una BD antigua sin metadata recibe las columnas nuevas."""
+        db_path = str(tmp_path / "legacy.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            CREATE TABLE games (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title_id TEXT UNIQUE,
+                game_name TEXT NOT NULL,
+                status TEXT DEFAULT 'pending',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                iso_path TEXT,
+                extracted_dir TEXT,
+                xex_path TEXT,
+                analysis_json TEXT,
+                project_toml TEXT,
+                notes TEXT
+            )
+        """)
+        conn.execute("INSERT INTO games (title_id, game_name) VALUES ('ABCD0001', 'Old')")
+        conn.commit()
+        conn.close()
+        
+        with GameDatabase(db_path) as db:
+            game = db.get_by_title_id("ABCD0001")
+            columns = {row[1] for row in db.conn.execute("PRAGMA table_info(games)")}
+            version = db.conn.execute("PRAGMA user_version").fetchone()[0]
+        
+        assert game.game_name == "Old"
+        assert game.disc_number == 1
+        assert "xex_info_json" in columns
+        assert version == SCHEMA_VERSION
+    
+    def test_v3_failure_events_are_migrated(self, tmp_path):
+        """Verifica que los fallos del pipeline de una BD v3 pasan a ser no-transición."""
+        db_path = str(tmp_path / "v3.db")
+        with GameDatabase(db_path) as db:
+            game_id = db.add_game(Game(game_name="G"))
+            db.conn.executescript("""
+                DROP TRIGGER trg_game_events_no_update;
+                PRAGMA user_version = 3;
+            """)
+            db.conn.execute("ALTER TABLE game_events DROP COLUMN is_transition")
+            db.conn.execute(
+                "INSERT INTO game_events (game_id, from_status, to_status, tool) "
+                "VALUES (?, 'pending', 'failed', 'pipeline')", (game_id,)
+            )
+            db.conn.commit()
+        
+        with GameDatabase(db_path) as db:
+            events = db.get_events(game_id)
+            with pytest.raises(sqlite3.IntegrityError):
+                db.conn.execute("UPDATE game_events SET tool = 'x'")
+        
+        assert [e.is_transition for e in events] == [True, False]
+    
+    def test_current_db_only_reads_pragma(self, tmp_path):
+        """Verifica que abrir una BD al día no ejecuta DDL."""
+        db_path = str(tmp_path / "games.db")
+        GameDatabase(db_path).close()
+        
+        statements = []
+        original_connect = sqlite3.connect
+        
+        def tracing_connect(*args, **kwargs):
+            conn = original_connect(*args, **kwargs)
+            conn.set_trace_callback(statements.append)
+            return conn
+        
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(sqlite3, "connect", tracing_connect)
+            GameDatabase(db_path).close()
+        
+        assert statements == ["PRAGMA user_version"]
+
+
 class TestAddGame:
     """Tests para añadir juegos."""
     
@@ -298,6 +426,323 @@ class TestCount:
         assert db.count(GameStatus.PENDING) == 1
 
 
+class TestStatusCounts:
+    """Tests para conteo agregado por status."""
+    
+    def test_status_counts_empty(self, db):
+        """Verifica que todos los status aparecen con 0."""
+        counts = db.status_counts()
+        
+        assert set(counts) == set(GameStatus)
+        assert sum(counts.values()) == 0
+    
+    def test_status_counts_group_by(self, db):
+        """Verifica conteo agregado sin tabla de estadísticas."""
+        db.add_game(Game(game_name="G1", status=GameStatus.PENDING))
+        db.add_game(Game(game_name="G2", status=GameStatus.COMPLETED))
+        db.add_game(Game(game_name="G3", status=GameStatus.COMPLETED))
+        
+        counts = db.status_counts()
+        
+        assert db.has_stats_table() is False
+        assert counts[GameStatus.COMPLETED] == 2
+        assert counts[GameStatus.PENDING] == 1
+        assert counts[GameStatus.FAILED] == 0
+    
+    def test_stats_table_seeded_from_existing_rows(self, db):
+        """Verifica que la tabla de estadísticas se inicializa con los datos actuales."""
+        db.add_game(Game(game_name="G1", status=GameStatus.FAILED))
+        db.add_game(Game(game_name="G2", status=GameStatus.FAILED))
+        
+        db.enable_stats_table()
+        
+        assert db.has_stats_table() is True
+        assert db.status_counts()[GameStatus.FAILED] == 2
+    
+    def test_stats_table_follows_writes(self, db):
+        """Verifica que los triggers mantienen los contadores."""
+        db.enable_stats_table()
+        
+        game_id = db.add_game(Game(game_name="G1", status=GameStatus.PENDING))
+        db.add_game(Game(game_name="G2", status=GameStatus.PENDING))
+        db.update_status(game_id, GameStatus.ANALYSED)
+        db.update_status(game_id, GameStatus.ANALYSED)  # Sin cambio real
+        
+        counts = db.status_counts()
+        assert counts[GameStatus.PENDING] == 1
+        assert counts[GameStatus.ANALYSED] == 1
+        
+        db.delete_game(game_id)
+        
+        counts = db.status_counts()
+        assert counts[GameStatus.ANALYSED] == 0
+        assert sum(counts.values()) == db.count()
+    
+    def test_disable_stats_table(self, db):
+        """Verifica que se puede volver al GROUP BY."""
+        db.enable_stats_table()
+        db.disable_stats_table()
+        db.add_game(Game(game_name="G1", status=GameStatus.DUMPED))
+        
+        assert db.has_stats_table() is False
+        assert db.status_counts()[GameStatus.DUMPED] == 1
+
+
+class TestGameEvents:
+    """Tests para el historial de transiciones y sus analíticas."""
+    
+    def _backdate(self, db, game_id, *timestamps):
+        """Reescribe created_at de los eventos de un juego (saltando el trigger)."""
+        db.conn.execute("DROP TRIGGER IF EXISTS trg_game_events_no_update")
+        rows = db.conn.execute(
+            "SELECT id FROM game_events WHERE game_id = ? ORDER BY id", (game_id,)
+        ).fetchall()
+        for (event_id,), ts in zip(rows, timestamps):
+            db.conn.execute(
+                "UPDATE game_events SET created_at = ? WHERE id = ?", (ts, event_id)
+            )
+        db.conn.commit()
+    
+    def test_add_and_update_record_transitions(self, db, sample_game):
+        """Verifica que se registran alta y cambios de status."""
+        game_id = db.add_game(sample_game)
+        db.update_status(game_id, GameStatus.EXTRACTED, tool="extract",
+                         metrics={"duration_s": 12.5})
+        db.update_status(game_id, GameStatus.FAILED, tool="analyse",
+                         error="XenonAnalyse falló")
+        
+        events = db.get_events(game_id)
+        
+        assert [e.to_status for e in events] == [
+            GameStatus.PENDING, GameStatus.EXTRACTED, GameStatus.FAILED
+        ]
+        assert events[0].from_status is None
+        assert events[1].from_status == GameStatus.PENDING
+        assert events[1].duration_s == 12.5
+        assert events[1].metrics == {"duration_s": 12.5}
+        assert events[2].error == "XenonAnalyse falló"
+    
+    def test_no_event_without_transition(self, db, sample_game):
+        """Verifica que actualizar sin cambiar status no añade eventos."""
+        game_id = db.add_game(sample_game)
+        sample_game.id = game_id
+        sample_game.notes = "solo notas"
+        db.update_game(sample_game)
+        db.update_status(game_id, GameStatus.PENDING)
+        
+        assert len(db.get_events(game_id)) == 1
+    
+    def test_events_are_append_only(self, db, sample_game):
+        """Verifica que game_events no admite UPDATE ni DELETE."""
+        game_id = db.add_game(sample_game)
+        
+        with pytest.raises(sqlite3.IntegrityError):
+            db.conn.execute("DELETE FROM game_events WHERE game_id = ?", (game_id,))
+        
+        db.delete_game(game_id)
+        assert len(db.get_events(game_id)) == 1
+    
+    def test_state_durations(self, db):
+        """Verifica percentiles del tiempo en cada status."""
+        for minutes in (10, 20, 30):
+            game_id = db.add_game(Game(game_name=f"G{minutes}"))
+            db.update_status(game_id, GameStatus.ANALYSED)
+            self._backdate(db, game_id, "2025-01-01 10:00:00.000",
+                           f"2025-01-01 10:{minutes:02d}:00.000")
+        
+        durations = db.state_durations(percentiles=(50,))
+        pending = durations[GameStatus.PENDING]
+        
+        assert pending["count"] == 3
+        assert pending["p50"] == pytest.approx(1200, abs=0.01)
+        assert GameStatus.ANALYSED not in durations
+        assert db.state_durations(include_open=True)[GameStatus.ANALYSED]["count"] == 3
+    
+    def test_time_between(self, db):
+        """Verifica el tiempo de pending a analysed."""
+        game_id = db.add_game(Game(game_name="G"))
+        db.update_status(game_id, GameStatus.EXTRACTED)
+        db.update_status(game_id, GameStatus.ANALYSED)
+        self._backdate(db, game_id, "2025-01-01 10:00:00.000",
+                       "2025-01-01 10:05:00.000", "2025-01-01 11:00:00.000")
+        
+        summary = db.time_between(GameStatus.PENDING, GameStatus.ANALYSED)
+        
+        assert summary["count"] == 1
+        assert summary["p50"] == pytest.approx(3600, abs=0.01)
+    
+    def test_failure_event_is_not_a_transition(self, db):
+        """Un fallo registrado sin cambiar el status no corta ni suma como FAILED."""
+        game_id = db.add_game(Game(game_name="G"))
+        db.update_status(game_id, GameStatus.EXTRACTED)
+        db.record_event(game_id, GameStatus.FAILED, tool="pipeline", error="boom")
+        db.update_status(game_id, GameStatus.ANALYSED)
+        self._backdate(db, game_id, "2025-01-01 10:00:00.000", "2025-01-01 10:05:00.000",
+                       "2025-01-01 10:06:00.000", "2025-01-01 11:05:00.000")
+        
+        events = db.get_events(game_id)
+        durations = db.state_durations(percentiles=(50,))
+        
+        assert [e.is_transition for e in events] == [True, True, False, True]
+        assert events[3].from_status == GameStatus.EXTRACTED
+        assert durations[GameStatus.EXTRACTED]["p50"] == pytest.approx(3600, abs=0.01)
+        assert GameStatus.FAILED not in durations
+        assert db.time_between(GameStatus.PENDING, GameStatus.FAILED)["count"] == 0
+        assert db.throughput_per_day(GameStatus.FAILED, days=100000) == []
+        assert db.failure_rate_by_tool()["pipeline"]["failed"] == 1
+    
+    def test_throughput_and_failure_rate(self, db):
+        """Verifica throughput diario y tasa de fallos por herramienta."""
+        ok_id = db.add_game(Game(game_name="OK"))
+        bad_id = db.add_game(Game(game_name="Bad"))
+        db.update_status(ok_id, GameStatus.ANALYSED, tool="analyse")
+        db.update_status(bad_id, GameStatus.FAILED, tool="analyse", error="boom")
+        
+        throughput = db.throughput_per_day(GameStatus.ANALYSED, days=1)
+        rates = db.failure_rate_by_tool()
+        
+        assert sum(n for _, n in throughput) == 1
+        assert rates["analyse"] == {"total": 2, "failed": 1, "rate": 0.5}
+        assert rates["manual"]["failed"] == 0
+
+
+class TestGameCache:
+    """Tests para la caché LRU de objetos Game."""
+    
+    def test_second_lookup_hits_cache(self, db, sample_game):
+        """Verifica que la segunda lectura no consulta la tabla (solo data_version)."""
+        game_id = db.add_game(sample_game)
+        db.get_game(game_id)
+        
+        statements = []
+        db.conn.set_trace_callback(statements.append)
+        by_id = db.get_game(game_id)
+        by_title = db.get_by_title_id(sample_game.title_id)
+        db.conn.set_trace_callback(None)
+        
+        assert statements == ["PRAGMA data_version"] * 2
+        assert by_id.game_name == by_title.game_name == "Test Game"
+        assert db.cache_stats()["hits"] == 2
+    
+    def test_returns_copies(self, db, sample_game):
+        """Verifica que modificar un Game obtenido no altera la caché."""
+        game_id = db.add_game(sample_game)
+        db.get_game(game_id).game_name = "Cambiado sin guardar"
+        
+        assert db.get_game(game_id).game_name == "Test Game"
+    
+    def test_invalidated_on_writes(self, db, sample_game):
+        """Verifica la invalidación en update_status, update_game y delete_game."""
+        game_id = db.add_game(sample_game)
+        
+        db.get_game(game_id)
+        db.update_status(game_id, GameStatus.EXTRACTED)
+        assert db.get_game(game_id).status == GameStatus.EXTRACTED
+        
+        game = db.get_by_title_id(sample_game.title_id)
+        game.game_name = "Renamed"
+        db.update_game(game)
+        assert db.get_by_title_id(sample_game.title_id).game_name == "Renamed"
+        
+        db.delete_game(game_id)
+        assert db.get_game(game_id) is None
+        assert db.get_by_title_id(sample_game.title_id) is None
+    
+    def test_upsert_invalidates(self, db, sample_game):
+        """Verifica que add_or_update_game no deja datos obsoletos."""
+        db.add_game(sample_game)
+        db.get_by_title_id(sample_game.title_id)
+        
+        db.add_or_update_game(Game(title_id=sample_game.title_id, game_name="Upserted"))
+        
+        assert db.get_by_title_id(sample_game.title_id).game_name == "Upserted"
+    
+    def test_shared_between_instances(self, tmp_path, sample_game):
+        """Verifica que instancias de la misma ruta comparten caché."""
+        db_path = str(tmp_path / "games.db")
+        with GameDatabase(db_path) as db1, GameDatabase(db_path) as db2:
+            game_id = db1.add_game(sample_game)
+            db1.get_game(game_id)
+            db2.update_status(game_id, GameStatus.COMPLETED)
+            
+            assert db2.cache is db1.cache
+            assert db1.get_game(game_id).status == GameStatus.COMPLETED
+    
+    def test_external_write_clears_cache(self, tmp_path, sample_game):
+        """Verifica que un cambio de otra conexión (otro proceso) no deja datos obsoletos."""
+        db_path = str(tmp_path / "games.db")
+        with GameDatabase(db_path) as db:
+            game_id = db.add_game(sample_game)
+            db.get_game(game_id)
+            db.get_game(game_id)
+            
+            other = sqlite3.connect(db_path)
+            other.execute("UPDATE games SET status = 'completed' WHERE id = ?", (game_id,))
+            other.commit()
+            other.close()
+            
+            assert db.get_game(game_id).status == GameStatus.COMPLETED
+            assert db.get_by_title_id(sample_game.title_id).status == GameStatus.COMPLETED
+    
+    def test_external_write_before_new_instance(self, tmp_path, sample_game):
+        """Verifica que una instancia nueva no sirve lo cacheado por otra anterior."""
+        db_path = str(tmp_path / "games.db")
+        with GameDatabase(db_path) as db:
+            db.add_game(sample_game)
+            db.get_by_title_id(sample_game.title_id)
+        
+        other = sqlite3.connect(db_path)
+        other.execute("UPDATE games SET status = 'completed' WHERE title_id = ?", (sample_game.title_id,))
+        other.commit()
+        other.close()
+        
+        with GameDatabase(db_path) as db:
+            assert db.get_by_title_id(sample_game.title_id).status == GameStatus.COMPLETED
+    
+    def test_rollback_clears_cache(self, db, sample_game):
+        """Verifica que un rollback de batch() no deja datos no confirmados."""
+        game_id = db.add_game(sample_game)
+        
+        with pytest.raises(RuntimeError):
+            with db.batch():
+                db.update_status(game_id, GameStatus.FAILED)
+                db.get_game(game_id)
+                raise RuntimeError("abortar")
+        
+        assert db.get_game(game_id).status == GameStatus.PENDING
+    
+    def test_disabled(self, sample_game):
+        """Verifica cache_size=0."""
+        with GameDatabase(":memory:", cache_size=0) as db:
+            game_id = db.add_game(sample_game)
+            db.get_game(game_id)
+            
+            assert db.cache is None
+            assert db.cache_stats() == {}
+    
+    def test_lru_eviction(self):
+        """Verifica la expulsión del menos usado."""
+        cache = GameCache(max_size=2)
+        for i in (1, 2):
+            cache.put(Game(id=i, title_id=f"T{i}"), cache.generation)
+        cache.get_by_id(1)
+        cache.put(Game(id=3, title_id="T3"), cache.generation)
+        
+        assert cache.get_by_id(2) is None
+        assert cache.get_by_title_id("T2") is None
+        assert cache.get_by_id(1) is not None
+        assert cache.stats()["evictions"] == 1
+    
+    def test_stale_put_discarded(self):
+        """Verifica que una lectura anterior a una invalidación no se cachea."""
+        cache = GameCache()
+        generation = cache.generation
+        cache.invalidate(1)
+        cache.put(Game(id=1, game_name="Vieja"), generation)
+        
+        assert cache.get_by_id(1) is None
+
+
 class TestContextManager:
     """Tests para context manager."""
     
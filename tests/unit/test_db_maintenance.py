@@ -0,0 +1,125 @@
+# tests/unit/test_db_maintenance.py
+"""
+Tests unitarios para el mantenimiento de la BD.
+"""
+import sqlite3
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from core.database import GameDatabase, Game
+from core import db_maintenance
+from core.db_maintenance import (
+    backup, compact, get_health, maintain, maintenance_due, maybe_maintain
+)
+
+
+@pytest.fixture
+def file_db(tmp_path):
+    """BD en archivo con espacio libre tras borrar la mitad de los juegos."""
+    database = GameDatabase(str(tmp_path / "games.db"))
+    with database.batch():
+        for i in range(300):
+            database.add_game(Game(
+                title_id=f"{i:08X}", game_name=f"Game {i}", analysis_json="x" * 2000
+            ))
+    database.conn.execute("DELETE FROM games WHERE id % 2 = 0")
+    database.conn.commit()
+    yield database
+    database.close()
+
+
+class TestHealth:
+    """Tests para get_health."""
+    
+    def test_reports_free_pages(self, file_db):
+        health = get_health(file_db)
+        
+        assert health.size_bytes == health.page_size * health.page_count
+        assert health.freelist_count > 0
+        assert 0 < health.free_ratio <= health.fragmentation < 1
+
+
+class TestBackup:
+    """Tests para backup."""
+    
+    def test_backup_copies_data(self, file_db, tmp_path):
+        dest = backup(file_db, str(tmp_path / "copy.db"), pages=4)
+        
+        with sqlite3.connect(dest) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM games").fetchone()[0] == 150
+    
+    def test_default_dir_rotation(self, file_db, tmp_path, monkeypatch):
+        """Verifica que solo se conservan los `keep` backups más recientes."""
+        backup_dir = tmp_path / "backups"
+        monkeypatch.setattr(db_maintenance, "default_backup_dir", lambda: backup_dir)
+        backup_dir.mkdir()
+        for day in range(1, 5):
+            (backup_dir / f"games-2025010{day}-000000.db").touch()
+        
+        path = backup(file_db, keep=2)
+        
+        assert sorted(p.name for p in backup_dir.iterdir()) == [
+            "games-20250104-000000.db", Path(path).name
+        ]
+
+
+class TestCompact:
+    """Tests para compact."""
+    
+    def test_reclaims_free_pages(self, file_db):
+        before = get_health(file_db)
+        
+        assert compact(file_db) is True
+        
+        after = get_health(file_db)
+        assert after.freelist_count == 0
+        assert after.size_bytes < before.size_bytes
+        assert file_db.count() == 150
+        file_db.add_game(Game(title_id="NEW00001", game_name="Tras compactar"))
+    
+    def test_concurrent_connection_keeps_its_commits(self, file_db):
+        other = GameDatabase(file_db.db_path)
+        try:
+            other.add_game(Game(title_id="OTHER001", game_name="Antes"))
+            
+            assert compact(file_db) is True
+            other.add_game(Game(title_id="OTHER002", game_name="Después"))
+            
+            assert file_db.get_by_title_id("OTHER001") is not None
+            assert file_db.get_by_title_id("OTHER002") is not None
+            assert other.count() == file_db.count() == 152
+        finally:
+            other.close()
+    
+    def test_memory_db_is_skipped(self):
+        with GameDatabase(":memory:") as db:
+            assert compact(db) is False
+
+
+class TestMaintain:
+    """Tests para maintain y la programación."""
+    
+    def test_full_run_is_recorded(self, file_db, tmp_path):
+        assert maintenance_due(file_db)
+        
+        report = maintain(file_db, backup_dest=str(tmp_path / "b.db"))
+        
+        assert report.actions == ["backup", "vacuum", "optimize"]
+        assert report.after.size_bytes < report.before.size_bytes
+        assert not maintenance_due(file_db)
+        row = file_db.conn.execute("SELECT actions, backup_path FROM maintenance_runs").fetchone()
+        assert tuple(row) == ("backup,vacuum,optimize", str(tmp_path / "b.db"))
+    
+    def test_compaction_below_threshold_skipped(self, file_db):
+        report = maintain(file_db, do_backup=False, compact_threshold=0.99)
+        
+        assert report.actions == ["optimize"]
+    
+    def test_maybe_maintain_only_optimizes_when_not_due(self, file_db, tmp_path, monkeypatch):
+        monkeypatch.setattr(db_maintenance, "default_backup_dir", lambda: tmp_path / "backups")
+        maintain(file_db, do_backup=False)
+        
+        assert maybe_maintain(file_db, interval=timedelta(days=1)) is None
+        assert maybe_maintain(file_db, interval=timedelta(0)) is not None
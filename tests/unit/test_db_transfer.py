@@ -0,0 +1,204 @@
+# tests/unit/test_db_transfer.py
+"""
+Tests unitarios para la exportación/importación de la BD.
+"""
+import gzip
+import json
+import sqlite3
+
+import pytest
+
+from core.database import GameDatabase, Game, GameStatus
+from core.db_transfer import export_games, import_games, detect_format
+
+
+@pytest.fixture
+def source_db():
+    """BD con más juegos que el antiguo límite de list_games()."""
+    database = GameDatabase(":memory:")
+    with database.batch():
+        for i in range(150):
+            database.add_game(Game(
+                title_id=f"{i:08X}",
+                game_name=f"Game {i}",
+                status=GameStatus.ANALYSED if i % 2 else GameStatus.PENDING,
+                notes="línea 1\nlínea 2" if i == 0 else None,
+            ))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def target_db():
+    database = GameDatabase(":memory:")
+    yield database
+    database.close()
+
+
+class TestDetectFormat:
+    """Tests para la detección de formato por extensión."""
+    
+    def test_extensions(self):
+        assert detect_format("games.jsonl") == ("jsonl", False)
+        assert detect_format("games.csv.gz") == ("csv", True)
+        assert detect_format("old_export.json") == ("json", False)
+        assert detect_format("games.dump") == ("jsonl", False)
+
+
+class TestExport:
+    """Tests para export_games."""
+    
+    def test_exports_all_games_and_columns(self, source_db, tmp_path):
+        """Verifica que no hay límite de 100 y que salen todas las columnas."""
+        output = tmp_path / "games.jsonl"
+        
+        assert export_games(source_db, str(output), chunk_size=16) == 150
+        
+        lines = output.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 150
+        first = json.loads(lines[0])
+        assert first["notes"] == "línea 1\nlínea 2"
+        assert {"created_at", "updated_at", "xex_info_json"} <= set(first)
+    
+    def test_gzip(self, source_db, tmp_path):
+        """Verifica la compresión según extensión."""
+        output = tmp_path / "games.csv.gz"
+        
+        export_games(source_db, str(output))
+        
+        with gzip.open(output, "rt", encoding="utf-8") as f:
+            assert f.readline().startswith("id,title_id,game_name")
+    
+    def test_filter_by_status(self, source_db, tmp_path):
+        output = tmp_path / "analysed.jsonl"
+        
+        assert export_games(source_db, str(output), status=GameStatus.ANALYSED) == 75
+
+
+class TestImport:
+    """Tests para import_games."""
+    
+    @pytest.mark.parametrize("filename", ["games.jsonl", "games.csv", "games.jsonl.gz"])
+    def test_roundtrip(self, source_db, target_db, tmp_path, filename):
+        """Verifica exportar e importar sin perder datos."""
+        path = str(tmp_path / filename)
+        export_games(source_db, path)
+        
+        result = import_games(target_db, path, batch_size=40)
+        
+        assert result.inserted == 150
+        assert target_db.count() == 150
+        assert target_db.status_counts() == source_db.status_counts()
+        game = target_db.get_by_title_id("00000000")
+        assert game.notes == "línea 1\nlínea 2"
+        assert game.xex_path is None
+        assert target_db.get_events(game.id)[-1].tool == "import"
+    
+    def test_conflict_policies(self, source_db, target_db, tmp_path):
+        """Verifica skip, replace y fail ante title_id repetidos."""
+        path = str(tmp_path / "games.jsonl")
+        export_games(source_db, path)
+        target_db.add_game(Game(title_id="00000001", game_name="Local"))
+        
+        result = import_games(target_db, path, on_conflict="skip")
+        assert (result.inserted, result.updated, result.skipped) == (149, 0, 1)
+        assert target_db.get_by_title_id("00000001").game_name == "Local"
+        
+        result = import_games(target_db, path, on_conflict="replace")
+        assert (result.inserted, result.updated) == (0, 150)
+        assert target_db.get_by_title_id("00000001").game_name == "Game 1"
+        
+        with pytest.raises(sqlite3.IntegrityError):
+            import_games(target_db, path, on_conflict="fail")
+        assert target_db.count() == 150
+    
+    def test_newer_policy(self, target_db, tmp_path):
+        """Verifica que 'newer' solo sobrescribe con updated_at posterior."""
+        target_db.add_game(Game(title_id="AAAAAAAA", game_name="Local"))
+        target_db.add_game(Game(title_id="BBBBBBBB", game_name="Local"))
+        target_db.conn.execute(
+            "UPDATE games SET updated_at = '2024-06-01 00:00:00'"
+        )
+        target_db.conn.commit()
+        path = tmp_path / "games.jsonl"
+        path.write_text(
+            json.dumps({"title_id": "AAAAAAAA", "game_name": "Remoto",
+                        "updated_at": "2025-01-01 00:00:00"}) + "\n" +
+            json.dumps({"title_id": "BBBBBBBB", "game_name": "Remoto",
+                        "updated_at": "2023-01-01 00:00:00"}) + "\n",
+            encoding="utf-8"
+        )
+        
+        result = import_games(target_db, str(path), on_conflict="newer")
+        
+        assert (result.updated, result.skipped) == (1, 1)
+        assert target_db.get_by_title_id("AAAAAAAA").game_name == "Remoto"
+        assert target_db.get_by_title_id("BBBBBBBB").game_name == "Local"
+    
+    @pytest.mark.parametrize("on_conflict", ["replace", "newer"])
+    def test_status_change_on_conflict_is_recorded(self, target_db, tmp_path, on_conflict):
+        """Un DO UPDATE que cambia el status deja su evento en el historial."""
+        game_id = target_db.add_game(Game(title_id="AAAAAAAA", game_name="Local"))
+        target_db.add_game(Game(title_id="BBBBBBBB", game_name="Local"))
+        target_db.conn.execute("UPDATE games SET updated_at = '2024-06-01 00:00:00'")
+        target_db.conn.commit()
+        path = tmp_path / "games.jsonl"
+        path.write_text(
+            json.dumps({"title_id": "AAAAAAAA", "game_name": "Remoto", "status": "analysed",
+                        "updated_at": "2025-01-01 00:00:00"}) + "\n" +
+            json.dumps({"title_id": "BBBBBBBB", "game_name": "Remoto", "status": "pending",
+                        "updated_at": "2025-01-01 00:00:00"}) + "\n",
+            encoding="utf-8"
+        )
+        
+        import_games(target_db, str(path), on_conflict=on_conflict)
+        
+        event = target_db.get_events(game_id)[-1]
+        assert (event.from_status, event.to_status, event.tool) == (
+            GameStatus.PENDING, GameStatus.ANALYSED, "import"
+        )
+        other = target_db.get_by_title_id("BBBBBBBB")
+        assert all(e.tool != "import" for e in target_db.get_events(other.id))
+    
+    def test_legacy_json_export(self, target_db, tmp_path):
+        """Verifica la importación del antiguo formato JSON indentado."""
+        path = tmp_path / "games_export.json"
+        path.write_text(json.dumps([
+            {"id": 7, "title_id": "4E4D07F5", "game_name": "Viejo",
+             "status": "completed", "xex_path": None, "iso_path": None},
+        ], indent=2), encoding="utf-8")
+        
+        result = import_games(target_db, str(path))
+        
+        assert result.inserted == 1
+        assert target_db.get_by_title_id("4E4D07F5").status == GameStatus.COMPLETED
+    
+    def test_invalid_rows_skipped_and_defaults_applied(self, target_db, tmp_path):
+        """Verifica que un status desconocido no entra y que los campos ausentes toman el DEFAULT."""
+        path = tmp_path / "games.jsonl"
+        path.write_text("\n".join(json.dumps(r) for r in [
+            {"title_id": "AAAA0001", "game_name": "Malo", "status": "bogus"},
+            {"title_id": "AAAA0002", "game_name": "Sin status"},
+            {"title_id": "AAAA0003", "game_name": "Completo", "status": "completed", "notes": "x"},
+            {"title_id": "AAAA0004", "game_name": "Status vacío", "status": None},
+            {"title_id": "AAAA0005", "status": "pending"},
+        ]), encoding="utf-8")
+        
+        result = import_games(target_db, str(path))
+        
+        assert (result.inserted, result.invalid, result.total) == (3, 2, 5)
+        assert target_db.get_by_title_id("AAAA0001") is None
+        assert target_db.get_by_title_id("AAAA0002").status == GameStatus.PENDING
+        assert target_db.get_by_title_id("AAAA0004").created_at is not None
+        assert len(list(target_db.iter_games())) == 3
+    
+    def test_invalidates_cache(self, source_db, target_db, tmp_path):
+        """Verifica que la caché no devuelve datos previos a la importación."""
+        path = str(tmp_path / "games.jsonl")
+        export_games(source_db, path)
+        target_db.add_game(Game(title_id="00000002", game_name="Local"))
+        target_db.get_by_title_id("00000002")
+        
+        import_games(target_db, path, on_conflict="replace")
+        
+        assert target_db.get_by_title_id("00000002").game_name == "Game 2"
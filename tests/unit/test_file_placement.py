@@ -0,0 +1,143 @@
+# tests/unit/test_file_placement.py
+"""
+Tests unitarios para las estrategias de colocación de archivos.
+"""
+import errno
+import os
+
+import pytest
+
+from core import file_placement
+from core.file_placement import PlacementStrategy, detect_capabilities, place_file, try_place
+
+
+@pytest.fixture(autouse=True)
+def clear_capabilities():
+    """Cada test detecta capacidades desde cero."""
+    file_placement._unsupported.clear()
+    yield
+    file_placement._unsupported.clear()
+
+
+@pytest.fixture
+def src_file(tmp_path):
+    path = tmp_path / "in" / "game.iso"
+    path.parent.mkdir()
+    path.write_bytes(b"x" * 4096)
+    return path
+
+
+def _no_reflink(monkeypatch):
+    def fail(src, dst):
+        raise OSError(errno.EOPNOTSUPP, "sin reflink")
+    monkeypatch.setattr(file_placement, "reflink", fail)
+
+
+class TestPlaceFile:
+    """Tests para place_file / try_place."""
+    
+    def test_move_temporary_file(self, src_file, tmp_path):
+        dst = tmp_path / "ws" / "analysis" / "game.iso"
+        
+        result = place_file(str(src_file), str(dst), keep_source=False)
+        
+        assert result.method == PlacementStrategy.MOVE
+        assert result.bytes_saved == 4096
+        assert dst.read_bytes() == b"x" * 4096
+        assert not src_file.exists()
+    
+    def test_hardlink_for_immutable_inputs(self, src_file, tmp_path, monkeypatch):
+        _no_reflink(monkeypatch)
+        dst = tmp_path / "ws" / "game.iso"
+        
+        result = place_file(str(src_file), str(dst), immutable=True)
+        
+        assert result.method == PlacementStrategy.HARDLINK
+        assert os.path.samefile(src_file, dst)
+        assert src_file.exists()
+    
+    def test_mutable_file_falls_back_to_copy(self, src_file, tmp_path, monkeypatch):
+        """Sin reflink, un archivo editable nunca se enlaza."""
+        _no_reflink(monkeypatch)
+        dst = tmp_path / "ws" / "analysis.toml"
+        
+        result = place_file(str(src_file), str(dst))
+        
+        assert result.method == PlacementStrategy.COPY
+        assert result.bytes_saved == 0
+        assert not os.path.samefile(src_file, dst)
+    
+    def test_unsupported_reflink_is_remembered(self, src_file, tmp_path, monkeypatch):
+        calls = []
+        
+        def fail(src, dst):
+            calls.append(dst)
+            raise OSError(errno.EOPNOTSUPP, "sin reflink")
+        monkeypatch.setattr(file_placement, "reflink", fail)
+        (tmp_path / "ws").mkdir()
+        
+        try_place(str(src_file), str(tmp_path / "ws" / "a"))
+        try_place(str(src_file), str(tmp_path / "ws" / "b"))
+        
+        assert len(calls) == 1
+        assert not detect_capabilities(str(src_file), str(tmp_path / "ws" / "c")).reflink
+    
+    def test_per_file_link_failure_is_not_remembered(self, src_file, tmp_path, monkeypatch):
+        """EMLINK/EPERM son de un archivo: el siguiente vuelve a intentar el hardlink."""
+        _no_reflink(monkeypatch)
+        real_link = os.link
+        failures = [errno.EMLINK, errno.EPERM]
+        
+        def link(src, dst):
+            if failures:
+                raise OSError(failures.pop(0), "fallo del archivo")
+            real_link(src, dst)
+        monkeypatch.setattr(os, "link", link)
+        
+        first = place_file(str(src_file), str(tmp_path / "ws" / "a"), immutable=True)
+        second = place_file(str(src_file), str(tmp_path / "ws" / "b"), immutable=True)
+        third = place_file(str(src_file), str(tmp_path / "ws" / "c"), immutable=True)
+        
+        assert first.method == second.method == PlacementStrategy.COPY
+        assert third.method == PlacementStrategy.HARDLINK
+    
+    def test_cross_device_move_copies_and_deletes(self, src_file, tmp_path, monkeypatch):
+        monkeypatch.setattr(file_placement, "_device_pair", lambda src, dst: (1, 2))
+        dst = tmp_path / "ws" / "game.iso"
+        
+        result = place_file(str(src_file), str(dst), strategy=PlacementStrategy.MOVE)
+        
+        assert result.method == PlacementStrategy.COPY
+        assert dst.exists() and not src_file.exists()
+    
+    def test_explicit_copy(self, src_file, tmp_path):
+        assert try_place(str(src_file), str(tmp_path / "x"), strategy="copy") is None
+
+
+class TestWorkspacePlacement:
+    """Tests para la colocación desde GameWorkspace."""
+    
+    def test_sync_reports_bytes_saved(self, src_file, tmp_path, monkeypatch):
+        from core.database import Game
+        from core.game_workspace import get_or_create_workspace
+        from core.settings import set_setting
+        
+        _no_reflink(monkeypatch)
+        monkeypatch.setenv("HOME", str(tmp_path / "home"))
+        monkeypatch.setenv("USERPROFILE", str(tmp_path / "home"))
+        set_setting("storage.dedup", False)
+        toml = tmp_path / "in" / "analysis.toml"
+        toml.write_text("[main]\n")
+        ws, _ = get_or_create_workspace("4E4D07F5", "Dead To Rights")
+        game = Game(
+            title_id="4E4D07F5", game_name="Dead To Rights",
+            iso_path=str(src_file), project_toml=str(toml)
+        )
+        messages = []
+        
+        new_paths = ws.sync_all_files(game, log=messages.append)
+        
+        assert set(new_paths) == {"iso_path", "project_toml"}
+        assert os.path.samefile(src_file, ws.root / "game.iso")
+        assert not os.path.samefile(toml, ws.analysis_dir / "analysis.toml")
+        assert any("sin copiar" in msg for msg in messages)
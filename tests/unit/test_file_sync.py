@@ -0,0 +1,140 @@
+# tests/unit/test_file_sync.py
+"""
+Tests unitarios para el motor de sincronización de archivos.
+"""
+import json
+import os
+import threading
+
+import pytest
+
+from core import file_sync
+from core.file_sync import SyncTask, copy_file, sync_files
+
+CHUNK = 64 * 1024
+
+
+@pytest.fixture
+def big_file(tmp_path):
+    """Archivo de ~1 MB con contenido no repetitivo."""
+    path = tmp_path / "src" / "game.iso"
+    path.parent.mkdir()
+    path.write_bytes(os.urandom(16 * CHUNK + 123))
+    return path
+
+
+class TestCopyFile:
+    """Tests para copy_file."""
+    
+    def test_copies_content_and_metadata(self, big_file, tmp_path):
+        dst = tmp_path / "ws" / "game.iso"
+        
+        result = copy_file(SyncTask(str(big_file), str(dst)), chunk_size=CHUNK)
+        
+        assert result.success
+        assert dst.read_bytes() == big_file.read_bytes()
+        assert os.stat(dst).st_mtime_ns == os.stat(big_file).st_mtime_ns
+        assert result.checksum and result.bytes_copied == big_file.stat().st_size
+        assert not os.path.exists(str(dst) + file_sync.PART_SUFFIX)
+        assert not os.path.exists(str(dst) + file_sync.JOURNAL_SUFFIX)
+    
+    def test_fallback_without_copy_file_range(self, big_file, tmp_path, monkeypatch):
+        monkeypatch.setattr(file_sync, "HAS_COPY_FILE_RANGE", False)
+        dst = tmp_path / "game.iso"
+        
+        result = copy_file(SyncTask(str(big_file), str(dst)), chunk_size=CHUNK)
+        
+        assert result.success
+        assert dst.read_bytes() == big_file.read_bytes()
+    
+    def test_resume_after_cancel(self, big_file, tmp_path, monkeypatch):
+        """Verifica que una copia cancelada continúa desde el diario."""
+        monkeypatch.setattr(file_sync, "JOURNAL_EVERY", 2)
+        dst = tmp_path / "game.iso"
+        cancel = threading.Event()
+        
+        def on_progress(progress):
+            if progress.file_copied >= 6 * CHUNK:
+                cancel.set()
+        
+        first = copy_file(SyncTask(str(big_file), str(dst)), CHUNK, progress=on_progress, cancel=cancel)
+        assert not first.success and not dst.exists()
+        journal = json.loads((tmp_path / ("game.iso" + file_sync.JOURNAL_SUFFIX)).read_text())
+        second = copy_file(SyncTask(str(big_file), str(dst)), CHUNK)
+        full = copy_file(SyncTask(str(big_file), str(tmp_path / "full.iso")), CHUNK)
+        
+        assert len(journal["chunks"]) == 6
+        assert second.success and second.resumed_from == 6 * CHUNK
+        assert dst.read_bytes() == big_file.read_bytes()
+        assert second.checksum == full.checksum
+    
+    def test_changed_source_restarts(self, big_file, tmp_path):
+        dst = tmp_path / "game.iso"
+        part = tmp_path / ("game.iso" + file_sync.PART_SUFFIX)
+        part.write_bytes(b"\0" * 4 * CHUNK)
+        file_sync._write_journal(
+            str(dst) + file_sync.JOURNAL_SUFFIX, str(big_file), os.stat(big_file), CHUNK, ["00"] * 4
+        )
+        big_file.write_bytes(os.urandom(3 * CHUNK))
+        
+        result = copy_file(SyncTask(str(big_file), str(dst)), CHUNK)
+        
+        assert result.success and result.resumed_from == 0
+        assert dst.read_bytes() == big_file.read_bytes()
+    
+    def test_checksum_mismatch_discards_partial(self, big_file, tmp_path, monkeypatch):
+        digests = iter([b"a", b"b"])
+        monkeypatch.setattr(file_sync, "_chunk_digest", lambda data: next(digests))
+        dst = tmp_path / "game.iso"
+        
+        result = copy_file(SyncTask(str(big_file), str(dst)), CHUNK)
+        
+        assert not result.success and "no coincide" in result.error
+        assert not os.path.exists(str(dst) + file_sync.PART_SUFFIX)
+
+
+class TestSyncFiles:
+    """Tests para sync_files."""
+    
+    def test_parallel_with_progress(self, tmp_path):
+        sources = []
+        for i in range(5):
+            src = tmp_path / f"file{i}.bin"
+            src.write_bytes(os.urandom((i + 1) * CHUNK))
+            sources.append(src)
+        tasks = [SyncTask(str(src), str(tmp_path / "ws" / src.name)) for src in sources]
+        updates = []
+        
+        results = sync_files(tasks, workers=3, chunk_size=CHUNK, progress=updates.append)
+        
+        assert [r.task for r in results] == tasks
+        assert all(r.success for r in results)
+        for src in sources:
+            assert (tmp_path / "ws" / src.name).read_bytes() == src.read_bytes()
+        assert updates[-1].total_size == sum(src.stat().st_size for src in sources)
+        assert max(u.total_copied for u in updates) == updates[-1].total_size
+    
+    def test_missing_source_reports_error(self, tmp_path):
+        results = sync_files([SyncTask(str(tmp_path / "nope.iso"), str(tmp_path / "dst.iso"))])
+        
+        assert not results[0].success and results[0].error
+
+
+class TestWorkspaceSync:
+    """Tests para GameWorkspace.sync_all_files."""
+    
+    def test_sync_all_files_returns_new_paths(self, big_file, tmp_path, monkeypatch):
+        from core.database import Game
+        from core.game_workspace import get_or_create_workspace
+        
+        monkeypatch.setenv("HOME", str(tmp_path / "home"))
+        monkeypatch.setenv("USERPROFILE", str(tmp_path / "home"))
+        ws, _ = get_or_create_workspace("4E4D07F5", "Dead To Rights")
+        game = Game(title_id="4E4D07F5", game_name="Dead To Rights", iso_path=str(big_file))
+        messages = []
+        
+        new_paths = ws.sync_all_files(game, log=messages.append, strategy="copy")
+        
+        assert new_paths == {"iso_path": str(ws.root / "game.iso")}
+        assert (ws.root / "game.iso").read_bytes() == big_file.read_bytes()
+        assert any("MB/s" in msg for msg in messages)
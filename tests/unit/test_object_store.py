@@ -0,0 +1,114 @@
+# tests/unit/test_object_store.py
+"""
+Tests unitarios para el almacén de objetos deduplicado.
+"""
+import os
+
+import pytest
+
+from core import file_placement
+from core.file_sync import content_hash, copy_file, SyncTask
+from core.object_store import ObjectStore
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path / "home"))
+    file_placement._unsupported.clear()
+    return tmp_path / "home"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ObjectStore(tmp_path / "objects")
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def iso(tmp_path):
+    path = tmp_path / "dumps" / "game.iso"
+    path.parent.mkdir()
+    path.write_bytes(os.urandom(200_000))
+    return path
+
+
+class TestObjectStore:
+    """Tests para ObjectStore."""
+    
+    def test_content_hash_matches_copy_checksum(self, iso, tmp_path):
+        result = copy_file(SyncTask(str(iso), str(tmp_path / "copy.iso")), chunk_size=64 * 1024)
+        
+        assert content_hash(str(iso), chunk_size=64 * 1024) == result.checksum
+    
+    def test_same_content_stored_once(self, store, iso, tmp_path):
+        digest = store.add_file(str(iso))
+        store.link(digest, str(tmp_path / "ws1" / "game.iso"), "AAAA0001")
+        store.link(store.add_file(str(iso)), str(tmp_path / "ws2" / "game.iso"), "AAAA0002")
+        
+        report = store.report()
+        
+        assert report.objects == 1 and report.refs == 2
+        assert report.logical_bytes == 2 * 200_000
+        assert report.physical_bytes == 200_000
+        assert os.path.samefile(tmp_path / "ws1" / "game.iso", tmp_path / "ws2" / "game.iso")
+        assert iso.exists()  # El original del usuario no se toca
+    
+    def test_gc_removes_unreferenced_objects(self, store, iso, tmp_path):
+        digest = store.add_file(str(iso))
+        linked = tmp_path / "ws" / "game.iso"
+        store.link(digest, str(linked), "AAAA0001")
+        
+        assert store.gc().removed_objects == 0
+        
+        linked.unlink()
+        preview = store.gc(dry_run=True)
+        assert preview.removed_objects == 1 and store.has(digest)
+        
+        report = store.gc()
+        assert report.stale_refs == 1
+        assert report.freed_bytes == 200_000
+        assert not store.has(digest)
+    
+    def test_replaced_file_drops_reference(self, store, iso, tmp_path):
+        linked = tmp_path / "ws" / "game.iso"
+        store.link(store.add_file(str(iso)), str(linked))
+        linked.unlink()
+        linked.write_bytes(b"otro contenido")
+        
+        assert store.gc().removed_objects == 1
+    
+    def test_adopt_existing_workspace_file(self, store, tmp_path):
+        ws_file = tmp_path / "ws" / "default.xex"
+        ws_file.parent.mkdir()
+        ws_file.write_bytes(b"XEX2" * 1000)
+        
+        placed = store.adopt(str(ws_file), "AAAA0001")
+        
+        assert placed.method.value == "hardlink"
+        assert ws_file.read_bytes() == b"XEX2" * 1000
+        assert store.report().refs == 1
+
+
+class TestWorkspaceDedup:
+    """Tests para la sincronización vía almacén."""
+    
+    def test_second_workspace_reuses_object(self, home, iso):
+        from core.database import Game
+        from core.game_workspace import get_or_create_workspace
+        from core.object_store import get_object_store
+        
+        ws1, _ = get_or_create_workspace("AAAA0001", "Juego (USA)")
+        ws2, _ = get_or_create_workspace("AAAA0002", "Juego (EUR)")
+        messages = []
+        
+        ws1.sync_all_files(Game(title_id="AAAA0001", game_name="Juego (USA)", iso_path=str(iso)))
+        ws2.sync_all_files(
+            Game(title_id="AAAA0002", game_name="Juego (EUR)", iso_path=str(iso)), log=messages.append
+        )
+        
+        assert os.path.samefile(ws1.root / "game.iso", ws2.root / "game.iso")
+        assert (ws2.root / "game.iso").read_bytes() == iso.read_bytes()
+        assert any("dedup" in msg for msg in messages)
+        assert get_object_store().report().saved_bytes == 200_000
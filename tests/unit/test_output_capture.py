@@ -0,0 +1,68 @@
+# tests/unit/test_output_capture.py
+"""
+Tests unitarios para la captura acotada de salida de procesos.
+"""
+import gzip
+import sys
+
+from core.output_capture import RingBuffer, run_captured
+
+# Proceso que escribe ~2 MB en stdout y una línea de error al final
+_NOISY = (
+    "import sys\n"
+    "for i in range(40000):\n"
+    "    print(f'linea {i:06d} ' + 'x' * 40)\n"
+    "sys.stdout.flush()\n"
+    "print('fallo final', file=sys.stderr)\n"
+    "sys.exit(3)\n"
+)
+
+
+class TestRingBuffer:
+    """Tests para RingBuffer."""
+    
+    def test_keeps_only_tail(self):
+        ring = RingBuffer(max_bytes=10)
+        for line in (b"aaaa\n", b"bbbb\n", b"cccc\n"):
+            ring.append(line)
+        
+        assert ring.getvalue() == "bbbb\ncccc\n"
+        assert ring.total_bytes == 15
+        assert ring.dropped_bytes == 5
+    
+    def test_oversized_chunk_is_trimmed(self):
+        ring = RingBuffer(max_bytes=4)
+        
+        ring.append(b"0123456789")
+        
+        assert ring.getvalue() == "6789"
+
+
+class TestRunCaptured:
+    """Tests para run_captured()."""
+    
+    def test_tail_in_memory_full_output_in_log(self, tmp_path):
+        log_path = str(tmp_path / "out.log.gz")
+        
+        run = run_captured([sys.executable, "-c", _NOISY], tail_bytes=4096, log_path=log_path)
+        
+        assert run.returncode == 3
+        assert run.timed_out is False
+        assert len(run.stdout) <= 4096
+        assert run.stdout.rstrip().endswith("linea 039999 " + "x" * 40)
+        assert run.stdout_bytes > 1_000_000
+        assert run.stderr.strip() == "fallo final"
+        with gzip.open(log_path, "rt") as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 40001
+        assert lines[0].startswith("linea 000000")
+        assert "[stderr] fallo final" in lines
+    
+    def test_timeout_kills_process(self, tmp_path):
+        script = "import time\nprint('arrancando', flush=True)\ntime.sleep(30)\n"
+        
+        run = run_captured([sys.executable, "-c", script], timeout=0.5, log_path=str(tmp_path / "t.log.gz"))
+        
+        assert run.timed_out is True
+        assert run.seconds < 10
+        assert "arrancando" in run.stdout
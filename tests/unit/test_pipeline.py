@@ -5,6 +5,7 @@ Tests unitarios para el módulo pipeline.
 import os
 import pytest
 from unittest.mock import Mock, patch, MagicMock
+from core.database import Game, GameDatabase, GameStatus
 from core.pipeline import (
     PipelineResult,
     find_main_xex,
@@ -12,6 +13,13 @@ from core.pipeline import (
 )
 
 
+@pytest.fixture(autouse=True)
+def isolated_home(tmp_path, monkeypatch):
+    """La BD por defecto (~/.mrmonkeyshopware) va a un HOME temporal."""
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path / "home"))
+
+
 class TestPipelineResult:
     """Tests para la dataclass PipelineResult."""
     
@@ -167,6 +175,43 @@ class TestFullPipeline:
         assert "extract" in result.steps_completed
 
 
+class TestFailureEvents:
+    """Tests para el registro de fallos en game_events."""
+    
+    @patch('core.pipeline.analyse_xex')
+    def test_analysis_failure_recorded(self, mock_analyse, tmp_path):
+        """Verifica que un fallo de análisis queda en el historial del juego."""
+        xex_file = tmp_path / "default.xex"
+        xex_file.touch()
+        with GameDatabase() as db:
+            game_id = db.add_game(Game(title_id="4D5307E6", game_name="Halo 3",
+                                       status=GameStatus.ANALYSED, xex_path=str(xex_file)))
+        mock_analyse.return_value = None
+        
+        result = full_pipeline(xex_path=str(xex_file), output_dir=str(tmp_path / "out"))
+        
+        assert result.success is False
+        assert result.game_id == game_id
+        with GameDatabase() as db:
+            event = db.get_events(game_id)[-1]
+            assert db.get_game(game_id).status == GameStatus.ANALYSED
+        assert event.to_status == GameStatus.FAILED
+        assert event.tool == "pipeline"
+        assert event.error == result.error
+        assert event.metrics["failed_stage"] == "analyse"
+        assert "analyse" in event.metrics["stages"]
+    
+    @patch('core.pipeline.extract_iso')
+    def test_unknown_game_not_recorded(self, mock_extract, tmp_path):
+        """Verifica que sin juego en BD el fallo solo se reporta en el resultado."""
+        mock_extract.return_value = None
+        
+        result = full_pipeline(iso_path=str(tmp_path / "game.iso"), output_dir=str(tmp_path / "out"))
+        
+        assert result.success is False
+        assert result.game_id is None
+
+
 class TestPipelineLogging:
     """Tests para verificar que logging funciona."""
     
@@ -0,0 +1,80 @@
+# tests/unit/test_recomp_manifest.py
+"""
+Tests unitarios para el manifiesto de salida de XenonRecomp.
+"""
+import os
+
+from core.recomp_manifest import (
+    OUTPUT_MANIFEST_FILE,
+    build_output_manifest,
+    load_output_manifest,
+    scan_generated_files,
+    stale_entries,
+)
+from core.shader_recomp import _find_generated_files, validate_recomp_output
+
+
+def _make_output(root):
+    (root / "build").mkdir()
+    (root / "ppc_recomp.0.cpp").write_text("// 0\n")
+    (root / "ppc_recomp.h").write_text("#pragma once\n")
+    (root / "build" / "ppc_func_mapping.cpp").write_text("// map\n")
+    (root / "build" / "notes.txt").write_text("no es código\n")
+
+
+class TestScanGeneratedFiles:
+    """Tests para scan_generated_files()."""
+    
+    def test_build_dir_is_not_counted_twice(self, tmp_path):
+        _make_output(tmp_path)
+        
+        files = scan_generated_files(str(tmp_path))
+        cpp_files, header_files = _find_generated_files(str(tmp_path))
+        
+        assert [f.path for f in files] == ["build/ppc_func_mapping.cpp", "ppc_recomp.0.cpp", "ppc_recomp.h"]
+        assert len(cpp_files) == 2 and len(header_files) == 1
+
+
+class TestOutputManifest:
+    """Tests para build_output_manifest() y la validación desde el manifiesto."""
+    
+    def test_roundtrip_with_hashes(self, tmp_path):
+        _make_output(tmp_path)
+        
+        built = build_output_manifest(str(tmp_path), workers=2)
+        loaded = load_output_manifest(str(tmp_path))
+        
+        assert loaded == built
+        assert all(f.hash for f in loaded.files)
+        assert loaded.cpp_files(str(tmp_path))[0] == os.path.join(str(tmp_path), "build/ppc_func_mapping.cpp")
+    
+    def test_unchanged_files_are_not_rehashed(self, tmp_path, monkeypatch):
+        import core.recomp_manifest as recomp_manifest
+        _make_output(tmp_path)
+        first = build_output_manifest(str(tmp_path), workers=1)
+        (tmp_path / "ppc_recomp.0.cpp").write_text("// 0 regenerado\n")
+        hashed = []
+        real_hash = recomp_manifest.hash_file
+        monkeypatch.setattr(recomp_manifest, "hash_file",
+                            lambda path, algorithm=None: hashed.append(path) or real_hash(path, algorithm))
+        
+        build_output_manifest(str(tmp_path), previous=first, workers=1)
+        
+        assert hashed == [os.path.join(str(tmp_path), "ppc_recomp.0.cpp")]
+    
+    def test_validate_reads_manifest_and_verifies(self, tmp_path):
+        _make_output(tmp_path)
+        build_output_manifest(str(tmp_path), workers=1)
+        # Un archivo nuevo que no está en el manifiesto no se ve sin recorrer el árbol
+        (tmp_path / "extra.cpp").write_text("// fuera del manifiesto\n")
+        
+        success, files = validate_recomp_output(str(tmp_path))
+        assert success is True and len(files) == 3
+        
+        (tmp_path / "ppc_recomp.h").unlink()
+        manifest = load_output_manifest(str(tmp_path))
+        assert stale_entries(str(tmp_path), manifest) == ["ppc_recomp.h"]
+        assert validate_recomp_output(str(tmp_path), verify=True)[0] is False
+        
+        os.remove(tmp_path / OUTPUT_MANIFEST_FILE)
+        assert len(validate_recomp_output(str(tmp_path))[1]) == 3  # Sin manifiesto: recorre
@@ -0,0 +1,164 @@
+# tests/unit/test_recomp_queue.py
+"""
+Tests unitarios para la cola de recompilación.
+"""
+import os
+import threading
+import time
+
+import pytest
+
+from core import recomp_queue
+from core.recomp_queue import DONE, FAILED, PENDING, RUNNING, SKIPPED, TIMEOUT, RecompQueue
+from core.shader_recomp import RecompResult
+
+
+@pytest.fixture
+def fake_recomp(monkeypatch):
+    """Sustituye XenonRecomp: cada trabajo dura 50 ms y registra la concurrencia."""
+    state = {"running": 0, "max": 0, "order": []}
+    lock = threading.Lock()
+    outcomes = {}
+    
+    def run(toml_path, output_dir=None, log=None, timeout=300, force=False):
+        with lock:
+            state["running"] += 1
+            state["max"] = max(state["max"], state["running"])
+            state["order"].append(toml_path)
+        time.sleep(0.05)
+        with lock:
+            state["running"] -= 1
+        return outcomes.get(toml_path, RecompResult(success=True, cpp_files=["a.cpp"]))
+    monkeypatch.setattr(recomp_queue, "run_recompilation", run)
+    state["outcomes"] = outcomes
+    return state
+
+
+class TestRecompQueue:
+    """Tests para RecompQueue."""
+    
+    def test_priority_order_and_cpu_budget(self, tmp_path, fake_recomp):
+        queue = RecompQueue(tmp_path / "queue.json")
+        for n in range(5):
+            queue.add(str(tmp_path / f"g{n}" / "project.toml"), priority=n, mem_mb=1)
+        
+        summary = queue.run(cpu_budget=2, mem_budget_mb=0)
+        
+        assert fake_recomp["max"] == 2
+        assert fake_recomp["order"][0].endswith(os.path.join("g4", "project.toml"))
+        assert summary.count(DONE) == 5
+        assert summary.cpp_files == 5
+        assert summary.parallelism > 1.2
+        assert summary.jobs_per_hour > 0
+    
+    def test_memory_budget_limits_concurrency(self, tmp_path, fake_recomp):
+        queue = RecompQueue(tmp_path / "queue.json")
+        for n in range(3):
+            queue.add(str(tmp_path / f"g{n}.toml"), mem_mb=2048)
+        
+        queue.run(cpu_budget=8, mem_budget_mb=3000)
+        
+        assert fake_recomp["max"] == 1
+    
+    def test_failures_timeouts_and_retry(self, tmp_path, fake_recomp):
+        queue = RecompQueue(tmp_path / "queue.json")
+        ok = queue.add(str(tmp_path / "ok.toml"))
+        bad = queue.add(str(tmp_path / "bad.toml"))
+        slow = queue.add(str(tmp_path / "slow.toml"), timeout=1)
+        cached = queue.add(str(tmp_path / "cached.toml"))
+        outcomes = fake_recomp["outcomes"]
+        outcomes[bad.toml_path] = RecompResult(success=False, error="XenonRecomp falló con código: 1")
+        outcomes[slow.toml_path] = RecompResult(success=False, error="Timeout", timed_out=True)
+        outcomes[cached.toml_path] = RecompResult(success=True, skipped=True, skip_reason="sin cambios")
+        
+        queue.run(cpu_budget=4, mem_budget_mb=0)
+        
+        states = {job.id: job.state for job in RecompQueue(tmp_path / "queue.json").jobs}
+        assert states == {ok.id: DONE, bad.id: FAILED, slow.id: TIMEOUT, cached.id: SKIPPED}
+        assert queue.retry() == 2
+        assert queue.clear() == 2
+        assert [job.state for job in queue.jobs] == [PENDING, PENDING]
+    
+    def test_restart_resumes_running_jobs(self, tmp_path):
+        queue = RecompQueue(tmp_path / "queue.json")
+        job = queue.add(str(tmp_path / "game.toml"), priority=3)
+        job.state = RUNNING
+        job.started_at = time.time()
+        queue.save()  # Proceso muerto a mitad de la recompilación
+        
+        resumed = RecompQueue(tmp_path / "queue.json")
+        
+        assert [(j.id, j.state, j.priority) for j in resumed.pending()] == [(job.id, PENDING, 3)]
+    
+    def test_running_jobs_of_live_runner_are_kept(self, tmp_path):
+        """Con otro proceso ejecutando la cola (lock tomado) no se reanudan sus trabajos."""
+        queue = RecompQueue(tmp_path / "queue.json")
+        job = queue.add(str(tmp_path / "game.toml"))
+        job.state = RUNNING
+        queue.save()
+        holding, release = threading.Event(), threading.Event()
+        
+        def other_runner():
+            with queue.runner_lock():
+                holding.set()
+                release.wait(5)
+        thread = threading.Thread(target=other_runner)
+        thread.start()
+        holding.wait(5)
+        try:
+            observer = RecompQueue(tmp_path / "queue.json")
+            
+            assert observer.is_running()
+            assert [j.state for j in observer.jobs] == [RUNNING]
+            with pytest.raises(recomp_queue.LockTimeout):
+                observer.run(cpu_budget=1, mem_budget_mb=0)
+        finally:
+            release.set()
+            thread.join()
+        
+        assert [j.state for j in RecompQueue(tmp_path / "queue.json").jobs] == [PENDING]
+    
+    def test_add_during_run_is_kept_and_executed(self, tmp_path, fake_recomp, monkeypatch):
+        """Un `queue add` de otro proceso mientras run() está activo no se pierde."""
+        path = tmp_path / "queue.json"
+        queue = RecompQueue(path)
+        first = queue.add(str(tmp_path / "a.toml"))
+        fake_run = recomp_queue.run_recompilation
+        
+        def run(toml_path, **kwargs):
+            if toml_path == first.toml_path:
+                RecompQueue(path).add(str(tmp_path / "b.toml"))
+            return fake_run(toml_path, **kwargs)
+        monkeypatch.setattr(recomp_queue, "run_recompilation", run)
+        
+        summary = queue.run(cpu_budget=1, mem_budget_mb=0)
+        
+        jobs = RecompQueue(path).jobs
+        assert [os.path.basename(j.toml_path) for j in jobs] == ["a.toml", "b.toml"]
+        assert [j.state for j in jobs] == [DONE, DONE]
+        assert summary.count(DONE) == 2
+        assert len({j.id for j in jobs}) == 2
+    
+    def test_retry_and_clear_from_other_instance(self, tmp_path, fake_recomp):
+        path = tmp_path / "queue.json"
+        queue = RecompQueue(path)
+        ok = queue.add(str(tmp_path / "ok.toml"))
+        bad = queue.add(str(tmp_path / "bad.toml"))
+        fake_recomp["outcomes"][bad.toml_path] = RecompResult(success=False, error="falló")
+        queue.run(cpu_budget=2, mem_budget_mb=0)
+        
+        other = RecompQueue(path)
+        assert other.retry() == 1 and other.clear() == 1
+        queue.save()  # Estado viejo en memoria: no debe deshacer lo anterior
+        
+        assert [(j.id, j.state) for j in RecompQueue(path).jobs] == [(bad.id, PENDING)]
+        assert queue.add(str(tmp_path / "new.toml")).id not in (ok.id, bad.id)
+    
+    def test_duplicate_add_updates_priority(self, tmp_path):
+        queue = RecompQueue(tmp_path / "queue.json")
+        first = queue.add(str(tmp_path / "game.toml"), priority=1)
+        
+        second = queue.add(str(tmp_path / "game.toml"), priority=9)
+        
+        assert second.id == first.id
+        assert len(queue.jobs) == 1 and queue.jobs[0].priority == 9
@@ -3,10 +3,11 @@
 Tests unitarios para el módulo shader_recomp.
 """
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 import os
 import tempfile
 
+from core.output_capture import CapturedRun
 from core.shader_recomp import (
     RecompResult,
     run_recompilation,
@@ -99,7 +100,7 @@ class TestRunRecompilation:
         assert result.success is False
         assert "TOML no encontrado" in result.error
     
-    @patch('core.shader_recomp.subprocess.run')
+    @patch('core.shader_recomp.run_captured')
     @patch('core.shader_recomp.os.path.isfile')
     @patch('core.shader_recomp.check_xenon_recomp_available')
     def test_successful_recompilation(self, mock_check, mock_isfile, mock_run):
@@ -107,11 +108,7 @@ class TestRunRecompilation:
         mock_check.return_value = True
         mock_isfile.return_value = True
         
-        mock_result = MagicMock()
-        mock_result.returncode = 0
-        mock_result.stdout = "Success"
-        mock_result.stderr = ""
-        mock_run.return_value = mock_result
+        mock_run.return_value = CapturedRun(returncode=0, stdout="Success", stderr="")
         
         with tempfile.TemporaryDirectory() as tmpdir:
             toml_path = os.path.join(tmpdir, "project.toml")
@@ -123,7 +120,7 @@ class TestRunRecompilation:
             assert result.success is True
             assert result.return_code == 0
     
-    @patch('core.shader_recomp.subprocess.run')
+    @patch('core.shader_recomp.run_captured')
     @patch('core.shader_recomp.os.path.isfile')
     @patch('core.shader_recomp.check_xenon_recomp_available')
     def test_failed_recompilation(self, mock_check, mock_isfile, mock_run):
@@ -131,11 +128,7 @@ class TestRunRecompilation:
         mock_check.return_value = True
         mock_isfile.return_value = True
         
-        mock_result = MagicMock()
-        mock_result.returncode = 1
-        mock_result.stdout = ""
-        mock_result.stderr = "Error"
-        mock_run.return_value = mock_result
+        mock_run.return_value = CapturedRun(returncode=1, stdout="", stderr="Error")
         
         with tempfile.TemporaryDirectory() as tmpdir:
             toml_path = os.path.join(tmpdir, "project.toml")
@@ -214,3 +207,70 @@ class TestValidateRecompOutput:
         
         assert success is False
         assert files == []
+
+
+class TestIncrementalRecompilation:
+    """Tests para la huella de entradas (recompilación incremental)."""
+    
+    @pytest.fixture
+    def project(self, tmp_path, monkeypatch):
+        """project.toml que referencia un XEX y una switch table, con XenonRecomp simulado."""
+        import core.shader_recomp as shader_recomp
+        
+        (tmp_path / "default.xex").write_bytes(b"XEX2" + b"\0" * 64)
+        (tmp_path / "switch_tables.toml").write_text("[[switch]]\n")
+        (tmp_path / "ppc_context.h").write_text("#pragma once\n")
+        (tmp_path / "XenonRecomp.exe").write_bytes(b"MZ")
+        toml_path = tmp_path / "project.toml"
+        toml_path.write_text(
+            '[main]\nfile_path = "default.xex"\n'
+            'switch_table_file_path = "switch_tables.toml"\nout_directory_path = "out"\n'
+        )
+        monkeypatch.setattr(shader_recomp, "PPC_CONTEXT_PATH", str(tmp_path / "ppc_context.h"))
+        monkeypatch.setattr(shader_recomp, "XENON_RECOMP_PATH", str(tmp_path / "XenonRecomp.exe"))
+        
+        calls = []
+        
+        def fake_run(cmd, **kwargs):
+            calls.append(cmd)
+            (tmp_path / "out").mkdir(exist_ok=True)
+            (tmp_path / "out" / "ppc_recomp.0.cpp").write_text("// gen\n")
+            return CapturedRun(returncode=0, stdout="", stderr="")
+        monkeypatch.setattr(shader_recomp, "run_captured", fake_run)
+        return tmp_path, calls
+    
+    def test_unchanged_inputs_are_skipped(self, project):
+        """Verifica que una segunda ejecución con las mismas entradas sale de caché."""
+        root, calls = project
+        first = run_recompilation(str(root / "project.toml"), output_dir=str(root / "out"))
+        
+        second = run_recompilation(str(root / "project.toml"), output_dir=str(root / "out"))
+        
+        assert first.skipped is False
+        assert second.success is True and second.skipped is True
+        assert "sin cambios" in second.skip_reason
+        assert second.cpp_files == first.cpp_files
+        assert len(calls) == 1
+    
+    def test_changed_referenced_input_reruns(self, project):
+        """Verifica que cambiar la switch table (referenciada desde el TOML) recompila."""
+        root, calls = project
+        logs = []
+        run_recompilation(str(root / "project.toml"), output_dir=str(root / "out"))
+        (root / "switch_tables.toml").write_text("[[switch]]\nbase = 0x82000000\n")
+        
+        result = run_recompilation(str(root / "project.toml"), output_dir=str(root / "out"), log=logs.append)
+        
+        assert result.skipped is False
+        assert len(calls) == 2
+        assert any("switch_tables.toml cambió" in msg for msg in logs)
+    
+    def test_force_and_missing_outputs_rerun(self, project):
+        """Verifica --force y que faltan salidas invalidan la caché."""
+        root, calls = project
+        run_recompilation(str(root / "project.toml"), output_dir=str(root / "out"))
+        
+        assert run_recompilation(str(root / "project.toml"), output_dir=str(root / "out"), force=True).skipped is False
+        (root / "out" / "ppc_recomp.0.cpp").unlink()
+        assert run_recompilation(str(root / "project.toml"), output_dir=str(root / "out")).skipped is False
+        assert len(calls) == 3
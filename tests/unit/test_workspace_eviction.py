@@ -0,0 +1,143 @@
+# tests/unit/test_workspace_eviction.py
+"""
+Tests unitarios para el desalojo de datos regenerables por cuota.
+"""
+import os
+import time
+
+import pytest
+
+from core import workspace_eviction
+from core.workspace_eviction import (
+    MIN_IDLE_S, enforce_quota, evict_dir, evicted_dirs, touch
+)
+from core.workspace_manifest import update_manifest, verify_manifest
+
+OLD = time.time() - 10 * MIN_IDLE_S
+
+
+def _make_workspace(base, name, extracted_size, iso=True):
+    root = base / name
+    (root / "extracted").mkdir(parents=True)
+    (root / "analysis").mkdir()
+    (root / "extracted" / "data.bin").write_bytes(b"e" * extracted_size)
+    (root / "notes.md").write_text("# Notas\n")
+    (root / "info.json").write_text("{}")
+    if iso:
+        (root / "game.iso").write_bytes(b"i" * 1000)
+    return root
+
+
+@pytest.fixture
+def library(tmp_path):
+    a = _make_workspace(tmp_path, "A [11111111]", 50_000)
+    b = _make_workspace(tmp_path, "B [22222222]", 50_000)
+    touch(a, "extracted", now=OLD)
+    touch(b, "extracted", now=OLD + 100)
+    return a, b
+
+
+class TestEviction:
+    """Tests para enforce_quota / evict_dir."""
+    
+    def test_under_quota_does_nothing(self, library):
+        report = enforce_quota(library, quota=10 ** 9)
+        
+        assert report.evicted == []
+        assert all((root / "extracted" / "data.bin").exists() for root in library)
+    
+    def test_evicts_least_recently_used_first(self, library):
+        a, b = library
+        
+        report = enforce_quota(library, quota=80_000)
+        
+        assert [(os.path.basename(e.root), e.subdir) for e in report.evicted] == [("A [11111111]", "extracted")]
+        assert not (a / "extracted" / "data.bin").exists()
+        assert (a / "extracted").is_dir()
+        assert (b / "extracted" / "data.bin").exists()
+        assert evicted_dirs(a)["extracted"]["source"] == "game.iso"
+        assert evicted_dirs(a)["extracted"]["bytes"] == 50_000
+    
+    def test_never_touches_sources_or_notes(self, library):
+        a, _ = library
+        
+        enforce_quota(library, quota=1)
+        
+        assert {p.name for p in a.iterdir()} >= {"game.iso", "notes.md", "info.json", "analysis"}
+    
+    def test_skips_dirs_without_regeneration_source(self, tmp_path):
+        root = _make_workspace(tmp_path, "C [33333333]", 50_000, iso=False)
+        touch(root, "extracted", now=OLD)
+        
+        report = enforce_quota([root], quota=1)
+        
+        assert report.evicted == [] and report.over_quota
+        assert evict_dir(root, "extracted") is None
+    
+    def test_recently_used_is_protected(self, library):
+        a, b = library
+        touch(a, "extracted")
+        
+        report = enforce_quota(library, quota=80_000)
+        
+        assert [os.path.basename(e.root) for e in report.evicted] == ["B [22222222]"]
+    
+    def test_dry_run_and_manifest(self, library):
+        a, _ = library
+        update_manifest(a)
+        
+        dry = enforce_quota(library, quota=80_000, dry_run=True)
+        assert dry.freed_bytes == 50_000
+        assert (a / "extracted" / "data.bin").exists()
+        
+        enforce_quota(library, quota=80_000)
+        assert not verify_manifest(a).has_problems
+    
+    def test_quota_from_settings(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(workspace_eviction, "get_setting", lambda key, default=None: 1.5)
+        
+        assert workspace_eviction.quota_bytes() == int(1.5 * 1024 ** 3)
+
+
+class TestRegenerate:
+
+    def test_failed_clean_is_not_regenerated(self, tmp_path, monkeypatch):
+        """clean_xex devuelve el XEX original si falla: cleaned/ sigue desalojado."""
+        import core.cleaner_xex
+        root = _make_workspace(tmp_path, "A [11111111]", 10)
+        (root / "default.xex").write_bytes(b"x" * 100)
+        (root / "cleaned").mkdir()
+        (root / "cleaned" / "default_clean.xex").write_bytes(b"c" * 100)
+        evict_dir(root, "cleaned")
+        monkeypatch.setattr(core.cleaner_xex, "clean_xex", lambda xex, out, log=None: xex)
+        
+        assert workspace_eviction.regenerate(root, "cleaned") is False
+        assert "cleaned" in evicted_dirs(root)
+    
+    def test_clean_regenerated(self, tmp_path, monkeypatch):
+        import core.cleaner_xex
+        root = _make_workspace(tmp_path, "A [11111111]", 10)
+        (root / "default.xex").write_bytes(b"x" * 100)
+        (root / "cleaned").mkdir()
+        evict_dir(root, "cleaned")
+        
+        def fake_clean(xex, out, log=None):
+            clean = os.path.join(out, "default_clean.xex")
+            with open(clean, "wb") as f:
+                f.write(b"c" * 100)
+            return clean
+        monkeypatch.setattr(core.cleaner_xex, "clean_xex", fake_clean)
+        
+        assert workspace_eviction.regenerate(root, "cleaned") is True
+        assert "cleaned" not in evicted_dirs(root)
+    
+    def test_workspace_containing(self, tmp_path):
+        from core.game_workspace import GameWorkspace
+        root = _make_workspace(tmp_path, "Halo 3 [4D5307E6]", 10)
+        
+        workspace, subdir = GameWorkspace.containing(root / "recompiled" / "obj")
+        
+        assert (workspace.title_id, subdir) == ("4D5307E6", "recompiled")
+        assert workspace.root == root
+        assert GameWorkspace.containing(root / "analysis") is None
+        assert GameWorkspace.containing(tmp_path) is None
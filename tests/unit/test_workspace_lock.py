@@ -0,0 +1,112 @@
+# tests/unit/test_workspace_lock.py
+"""
+Tests unitarios para los locks de workspace entre procesos.
+"""
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from core import workspace_lock as lock_module
+from core.workspace_lock import LockTimeout, workspace_lock
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+
+
+def _in_other_thread(fn):
+    """Ejecuta fn en otro hilo (los locks son reentrantes por hilo) y retorna su excepción."""
+    errors = []
+    
+    def run():
+        try:
+            fn()
+        except Exception as e:
+            errors.append(e)
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return errors[0] if errors else None
+
+
+class TestWorkspaceLock:
+    """Tests para workspace_lock."""
+    
+    def test_exclusive_blocks_others(self, tmp_path):
+        with workspace_lock("4E4D07F5", base_dir=tmp_path):
+            error = _in_other_thread(
+                lambda: workspace_lock("4E4D07F5", timeout=0, base_dir=tmp_path).acquire()
+            )
+        assert isinstance(error, LockTimeout)
+        
+        # Liberado: ya se puede tomar
+        assert _in_other_thread(
+            lambda: workspace_lock("4E4D07F5", timeout=0, base_dir=tmp_path).acquire().release()
+        ) is None
+    
+    @pytest.mark.skipif(not lock_module.HAS_FCNTL, reason="modo compartido solo con fcntl")
+    def test_shared_readers_coexist(self, tmp_path):
+        with workspace_lock("4E4D07F5", shared=True, base_dir=tmp_path):
+            shared = _in_other_thread(
+                lambda: workspace_lock("4E4D07F5", shared=True, timeout=0, base_dir=tmp_path).acquire().release()
+            )
+            exclusive = _in_other_thread(
+                lambda: workspace_lock("4E4D07F5", timeout=0, base_dir=tmp_path).acquire()
+            )
+        assert shared is None
+        assert isinstance(exclusive, LockTimeout)
+    
+    def test_reentrant_in_same_thread(self, tmp_path):
+        with workspace_lock("4E4D07F5", base_dir=tmp_path):
+            with workspace_lock("4E4D07F5", timeout=0, base_dir=tmp_path):
+                pass
+            # Sigue tomado tras salir del anidado
+            assert isinstance(
+                _in_other_thread(lambda: workspace_lock("4E4D07F5", timeout=0, base_dir=tmp_path).acquire()),
+                LockTimeout
+            )
+    
+    def test_other_workspaces_are_independent(self, tmp_path):
+        with workspace_lock("4E4D07F5", base_dir=tmp_path):
+            assert _in_other_thread(
+                lambda: workspace_lock("11111111", timeout=0, base_dir=tmp_path).acquire().release()
+            ) is None
+    
+    def test_cross_process(self, tmp_path):
+        holder = subprocess.Popen(
+            [sys.executable, "-c", (
+                "import sys\n"
+                f"sys.path.insert(0, {str(SRC_DIR)!r})\n"
+                "from core.workspace_lock import workspace_lock\n"
+                f"with workspace_lock('4E4D07F5', base_dir={str(tmp_path)!r}):\n"
+                "    print('ok', flush=True)\n"
+                "    sys.stdin.readline()\n"
+            )],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        )
+        try:
+            assert holder.stdout.readline().strip() == "ok"
+            with pytest.raises(LockTimeout):
+                workspace_lock("4E4D07F5", timeout=0.2, base_dir=tmp_path).acquire()
+        finally:
+            holder.communicate("\n", timeout=10)
+        
+        with workspace_lock("4E4D07F5", timeout=0, base_dir=tmp_path):
+            pass
+    
+    def test_eviction_skips_locked_workspace(self, tmp_path):
+        from core.workspace_eviction import enforce_quota, touch
+        
+        root = tmp_path / "Game [4E4D07F5]"
+        (root / "extracted").mkdir(parents=True)
+        (root / "extracted" / "data.bin").write_bytes(b"e" * 5000)
+        (root / "game.iso").write_bytes(b"i" * 100)
+        touch(root, "extracted", now=1.0)
+        
+        def evict():
+            assert enforce_quota([root], quota=1).evicted == []
+        with workspace_lock("4E4D07F5", base_dir=tmp_path):
+            assert _in_other_thread(evict) is None
+        
+        assert (root / "extracted" / "data.bin").exists()
@@ -0,0 +1,137 @@
+# tests/unit/test_workspace_manifest.py
+"""
+Tests unitarios para el manifiesto de integridad de workspaces.
+"""
+import json
+import os
+import threading
+
+import pytest
+
+from core import workspace_manifest
+from core.workspace_manifest import (
+    MANIFEST_NAME, load_manifest, save_manifest, update_manifest, verify_manifest, verify_many
+)
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    """Workspace con una ISO, un XEX y fuentes generadas."""
+    root = tmp_path / "Game [4E4D07F5]"
+    (root / "recompiled" / "src").mkdir(parents=True)
+    (root / "game.iso").write_bytes(os.urandom(300_000))
+    (root / "default.xex").write_bytes(os.urandom(5_000))
+    (root / "recompiled" / "src" / "main.cpp").write_text("int main() {}\n")
+    return root
+
+
+def _rot(path):
+    """Cambia un byte conservando tamaño y mtime (corrupción silenciosa)."""
+    st = os.stat(path)
+    data = bytearray(path.read_bytes())
+    data[len(data) // 2] ^= 0xFF
+    path.write_bytes(bytes(data))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+class TestManifest:
+    """Tests para update_manifest / verify_manifest."""
+    
+    def test_first_verify_creates_manifest(self, workspace):
+        report = verify_manifest(workspace)
+        
+        assert report.created
+        assert report.added == ["default.xex", "game.iso", "recompiled/src/main.cpp"]
+        _, entries = load_manifest(workspace)
+        assert entries["game.iso"].size == 300_000
+    
+    def test_incremental_update_only_rehashes_changed(self, workspace, monkeypatch):
+        update_manifest(workspace)
+        (workspace / "recompiled" / "src" / "main.cpp").write_text("int main() { return 1; }\n")
+        hashed = []
+        original = workspace_manifest.hash_file
+        monkeypatch.setattr(
+            workspace_manifest, "hash_file",
+            lambda path, algorithm=None: hashed.append(os.path.basename(path)) or original(path, algorithm)
+        )
+        
+        report = update_manifest(workspace)
+        
+        assert hashed == ["main.cpp"]
+        assert report.modified == ["recompiled/src/main.cpp"]
+        assert verify_manifest(workspace).ok == sorted(report.ok + report.modified)
+    
+    def test_detects_silent_corruption(self, workspace):
+        update_manifest(workspace)
+        _rot(workspace / "game.iso")
+        
+        quick = verify_manifest(workspace, full=False)
+        full = verify_manifest(workspace)
+        
+        assert not quick.has_problems
+        assert full.corrupt == ["game.iso"]
+        assert full.has_problems
+    
+    def test_corrupt_files_are_never_accepted(self, workspace):
+        update_manifest(workspace)
+        _rot(workspace / "game.iso")
+        
+        verify_manifest(workspace, update=True)
+        
+        assert verify_manifest(workspace).corrupt == ["game.iso"]
+    
+    def test_missing_and_added(self, workspace):
+        update_manifest(workspace)
+        (workspace / "default.xex").unlink()
+        (workspace / "notes.md").write_text("# Notas\n")
+        (workspace / "game.iso.part").write_bytes(b"temporal de sync")
+        
+        report = verify_manifest(workspace, update=True)
+        
+        assert report.missing == ["default.xex"]
+        assert report.added == ["notes.md"]
+        assert not verify_manifest(workspace).has_problems
+    
+    def test_manifest_is_excluded_and_versioned(self, workspace):
+        update_manifest(workspace)
+        data = json.loads((workspace / MANIFEST_NAME).read_text())
+        
+        assert data["version"] == workspace_manifest.MANIFEST_VERSION
+        assert MANIFEST_NAME not in data["files"]
+    
+    def test_concurrent_saves(self, workspace):
+        """Dos escritores a la vez (otro proceso) no se pisan el temporal."""
+        update_manifest(workspace)
+        algorithm, entries = load_manifest(workspace)
+        errors = []
+        
+        def save():
+            try:
+                for _ in range(50):
+                    save_manifest(workspace, algorithm, entries)
+            except OSError as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=save) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert errors == []
+        assert load_manifest(workspace)[1] == entries
+        assert not any(p.name.endswith(".tmp") for p in workspace.iterdir())
+    
+    def test_verify_many(self, workspace, tmp_path):
+        other = tmp_path / "Other [11111111]"
+        other.mkdir()
+        (other / "default.xex").write_bytes(b"xex")
+        update_manifest(workspace)
+        update_manifest(other)
+        (other / "default.xex").unlink()
+        seen = []
+        
+        reports = verify_many([workspace, other], workers=2, on_report=seen.append)
+        
+        assert [r.has_problems for r in reports] == [False, True]
+        assert seen == reports
@@ -0,0 +1,133 @@
+# tests/unit/test_workspace_pack.py
+"""
+Tests unitarios para el empaquetado de workspaces.
+"""
+import os
+
+import pytest
+
+from core import workspace_pack
+from core.workspace_pack import PackError, open_pack, pack_workspace, unpack_workspace
+
+
+class _Workspace:
+    """Lo mínimo de GameWorkspace que usa pack_workspace."""
+    
+    def __init__(self, root):
+        self.root = root
+        self.title_id = "4E4D07F5"
+        self.game_name = "Dead To Rights"
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    root = tmp_path / "ports" / "Dead To Rights [4E4D07F5]"
+    (root / "extracted" / "media").mkdir(parents=True)
+    (root / "analysis").mkdir()
+    (root / "game.iso").write_bytes(os.urandom(200_000))
+    (root / "default.xex").write_bytes(b"XEX2" + b"\0" * 5000)
+    (root / "analysis" / "analysis.toml").write_text("[main]\n")
+    (root / "extracted" / "media" / "intro.bik").write_bytes(b"bik" * 1000)
+    (root / "game.iso.part").write_bytes(b"temporal de sync")
+    return _Workspace(root)
+
+
+@pytest.fixture(params=["zip", "zstd"])
+def fmt(request):
+    if request.param == "zstd" and not workspace_pack.HAS_ZSTD:
+        pytest.skip("zstandard no está instalado")
+    return request.param
+
+
+class TestPack:
+    """Tests para pack_workspace / PackReader."""
+    
+    def test_list_without_unpacking(self, workspace, tmp_path, fmt):
+        result = pack_workspace(workspace, output=str(tmp_path / "ws.pack"), fmt=fmt)
+        
+        with open_pack(result.path) as pack:
+            names = sorted(m.name for m in pack.members())
+            assert pack.format == fmt
+            assert pack.meta["title_id"] == "4E4D07F5"
+        assert names == [
+            "analysis/analysis.toml", "default.xex", "extracted/media/intro.bik", "game.iso"
+        ]
+        assert result.members == 4
+    
+    def test_read_single_member(self, workspace, tmp_path, fmt):
+        result = pack_workspace(workspace, output=str(tmp_path / "ws.pack"), fmt=fmt)
+        
+        with open_pack(result.path) as pack:
+            assert pack.read("game.iso") == (workspace.root / "game.iso").read_bytes()
+            target = pack.extract("analysis/analysis.toml", str(tmp_path / "out"))
+            with pytest.raises(PackError):
+                pack.read("no-existe.bin")
+        assert target.read_text() == "[main]\n"
+    
+    def test_exclude_regenerable(self, workspace, tmp_path, fmt):
+        result = pack_workspace(
+            workspace, output=str(tmp_path / "ws.pack"), fmt=fmt, exclude_regenerable=True
+        )
+        
+        with open_pack(result.path) as pack:
+            assert not any(m.name.startswith("extracted/") for m in pack.members())
+        assert result.excluded == list(workspace_pack.REGENERABLE_DIRS)
+    
+    def test_unpack_roundtrip(self, workspace, tmp_path, fmt, monkeypatch):
+        monkeypatch.setenv("HOME", str(tmp_path / "home"))
+        monkeypatch.setenv("USERPROFILE", str(tmp_path / "home"))
+        result = pack_workspace(workspace, output=str(tmp_path / "ws.pack"), fmt=fmt)
+        base = tmp_path / "other"
+        
+        restored = unpack_workspace(result.path, base_dir=base)
+        
+        assert restored.title_id == "4E4D07F5"
+        assert restored.root == base / "Dead To Rights [4E4D07F5]"
+        for rel in ("game.iso", "default.xex", "extracted/media/intro.bik"):
+            assert (restored.root / rel).read_bytes() == (workspace.root / rel).read_bytes()
+        with pytest.raises(FileExistsError):
+            unpack_workspace(result.path, base_dir=base)
+    
+    def test_slim_pack_unpacks_with_clean_manifest(self, workspace, tmp_path, fmt, monkeypatch):
+        """pack sin regenerables → unpack → verify sin "missing"."""
+        from core.workspace_manifest import update_manifest, verify_manifest
+        monkeypatch.setenv("HOME", str(tmp_path / "home"))
+        monkeypatch.setenv("USERPROFILE", str(tmp_path / "home"))
+        update_manifest(workspace.root)
+        result = pack_workspace(
+            workspace, output=str(tmp_path / "ws.pack"), fmt=fmt, exclude_regenerable=True
+        )
+        
+        restored = unpack_workspace(result.path, base_dir=tmp_path / "other")
+        report = verify_manifest(restored.root)
+        
+        assert report.missing == []
+        assert not report.has_problems
+        assert "extracted" in restored.evicted_dirs()
+    
+    def test_unpack_over_hardlink_does_not_touch_shared_object(self, workspace, tmp_path, fmt, monkeypatch):
+        monkeypatch.setenv("HOME", str(tmp_path / "home"))
+        monkeypatch.setenv("USERPROFILE", str(tmp_path / "home"))
+        result = pack_workspace(workspace, output=str(tmp_path / "ws.pack"), fmt=fmt)
+        base = tmp_path / "other"
+        dest = base / workspace.root.name
+        dest.mkdir(parents=True)
+        # Workspace deduplicado: game.iso es un hardlink a un objeto de solo lectura
+        shared = tmp_path / "objects" / "ab" / "ab07"
+        shared.parent.mkdir(parents=True)
+        shared.write_bytes(b"contenido del almacen")
+        os.chmod(shared, 0o444)
+        os.link(shared, dest / "game.iso")
+        
+        unpack_workspace(result.path, base_dir=base, overwrite=True)
+        
+        assert shared.read_bytes() == b"contenido del almacen"
+        assert (dest / "game.iso").read_bytes() == (workspace.root / "game.iso").read_bytes()
+        assert not any(p.name.endswith(".unpack") for p in dest.iterdir())
+    
+    def test_rejects_unknown_files(self, tmp_path):
+        path = tmp_path / "junk.bin"
+        path.write_bytes(b"no es un pack")
+        
+        with pytest.raises(PackError):
+            open_pack(str(path))
@@ -0,0 +1,153 @@
+# tests/unit/test_workspace_registry.py
+"""
+Tests unitarios para el índice de workspaces.
+"""
+import json
+import os
+import threading
+
+import pytest
+
+from core import workspace_registry
+from core.game_workspace import GameWorkspace, GameInfo, get_or_create_workspace
+from core.workspace_registry import WorkspaceRegistry, get_registry, parse_folder_name
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    """HOME temporal: ports y workspaces.json fuera del usuario real."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def ports_dir(home):
+    return home / "MrMonkeyShopWare" / "ports"
+
+
+def _age_dir(path, seconds=10):
+    """Retrasa el mtime para que el escaneo no se considere dudoso."""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 1_000_000_000))
+
+
+class TestParseFolderName:
+    """Tests para parse_folder_name."""
+    
+    def test_parse(self):
+        assert parse_folder_name("Halo 3 [4D5307E6]") == ("Halo 3", "4D5307E6")
+        assert parse_folder_name("Game [v2] [ABCD0001]") == ("Game [v2]", "ABCD0001")
+        assert parse_folder_name("random_folder") is None
+
+
+class TestWorkspaceRegistry:
+    """Tests para WorkspaceRegistry y su uso desde GameWorkspace."""
+    
+    def test_lookup_after_create(self, home):
+        """Verifica find_existing y cached_info sin abrir info.json."""
+        ws, is_new = get_or_create_workspace("4E4D07F5", "Dead To Rights")
+        ws.save_info(GameInfo(title_id="4E4D07F5", game_name="Dead To Rights", status="analysed"))
+        
+        found = GameWorkspace.find_existing("4E4D07F5")
+        
+        assert is_new
+        assert found.root == ws.root
+        assert found.game_name == "Dead To Rights"
+        assert found.cached_info().status == "analysed"
+        assert GameWorkspace.find_existing("FFFFFFFF") is None
+    
+    def test_cached_info_does_not_read_disk(self, home, monkeypatch):
+        ws, _ = get_or_create_workspace("11111111", "Cached")
+        ws.save_info(GameInfo(title_id="11111111", game_name="Cached", status="completed"))
+        monkeypatch.setattr(GameWorkspace, "load_info", lambda self: pytest.fail("leyó disco"))
+        
+        assert GameWorkspace.list_all()[0].cached_info().status == "completed"
+    
+    def test_external_changes_trigger_rebuild(self, home, ports_dir):
+        """Verifica carpetas creadas/borradas fuera de GameWorkspace."""
+        get_or_create_workspace("11111111", "Uno")
+        (ports_dir / "Manual [22222222]").mkdir()
+        
+        assert GameWorkspace.find_existing("22222222").game_name == "Manual"
+        
+        (ports_dir / "Manual [22222222]").rmdir()
+        assert GameWorkspace.find_existing("22222222") is None
+        assert [ws.title_id for ws in GameWorkspace.list_all()] == ["11111111"]
+    
+    def test_no_rescan_when_unchanged(self, home, ports_dir):
+        """Verifica que con el mtime estable las consultas no escanean."""
+        for i in range(5):
+            get_or_create_workspace(f"AAAA000{i}", f"Game {i}")
+        _age_dir(ports_dir)
+        registry = get_registry(ports_dir)
+        registry.get("AAAA0000")
+        rebuilds = registry.rebuilds
+        
+        for i in range(5):
+            assert registry.get(f"AAAA000{i}") is not None
+        
+        assert registry.rebuilds == rebuilds
+    
+    def test_persisted_between_processes(self, home, ports_dir, monkeypatch):
+        """Verifica que otra instancia (otro proceso) carga el índice sin escanear."""
+        ws, _ = get_or_create_workspace("33333333", "Persistido")
+        ws.save_info(GameInfo(title_id="33333333", game_name="Persistido", status="analysed"))
+        _age_dir(ports_dir)
+        get_registry(ports_dir).refresh()
+        
+        fresh = WorkspaceRegistry(ports_dir)
+        fresh._load()
+        monkeypatch.setattr(os, "scandir", lambda *_: pytest.fail("escaneó el directorio"))
+        
+        assert fresh.get("33333333")["info"]["status"] == "analysed"
+        assert fresh.rebuilds == 0
+    
+    def test_refresh_picks_up_hand_edited_info(self, home):
+        ws, _ = get_or_create_workspace("44444444", "Editado")
+        ws.save_info(GameInfo(title_id="44444444", game_name="Editado", status="analysed"))
+        data = json.loads(ws.info_file.read_text(encoding="utf-8"))
+        data["status"] = "completed"
+        ws.info_file.write_text(json.dumps(data), encoding="utf-8")
+        st = os.stat(ws.info_file)
+        os.utime(ws.info_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        
+        workspaces = GameWorkspace.list_all(refresh=True)
+        
+        assert workspaces[0].cached_info().status == "completed"
+    
+    def test_corrupt_registry_is_rebuilt(self, home, ports_dir):
+        get_or_create_workspace("55555555", "Corrupto")
+        registry_path = workspace_registry._get_registry_path()
+        registry_path.write_text("{no es json", encoding="utf-8")
+        
+        fresh = WorkspaceRegistry(ports_dir)
+        fresh._load()
+        
+        assert fresh.get("55555555")["folder"] == "Corrupto [55555555]"
+    
+    def test_concurrent_saves_from_other_instances(self, home, ports_dir):
+        """Instancias distintas (otros procesos) no se pisan el temporal al guardar."""
+        get_or_create_workspace("66666666", "Concurrente")
+        registry_path = workspace_registry._get_registry_path()
+        registries = [WorkspaceRegistry(ports_dir) for _ in range(8)]
+        for registry in registries:
+            registry._load()
+        errors = []
+        
+        def save(registry):
+            try:
+                for _ in range(50):
+                    registry._save()
+                    json.loads(registry_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=save, args=(r,)) for r in registries]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert errors == []
+        assert [p.name for p in registry_path.parent.iterdir() if p.name.endswith(".tmp")] == []
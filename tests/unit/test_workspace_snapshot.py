@@ -0,0 +1,113 @@
+# tests/unit/test_workspace_snapshot.py
+"""
+Tests unitarios para los snapshots de recompiled/ con hardlinks.
+"""
+import os
+
+import pytest
+
+from core.workspace_snapshot import (
+    SNAPSHOTS_DIRNAME, create_snapshot, diff_trees, find_snapshot, list_snapshots, prune_snapshots
+)
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "Game [4E4D07F5]"
+    (root / "recompiled" / "src").mkdir(parents=True)
+    (root / "recompiled" / "src" / "ppc_recomp.0.cpp").write_text("int a;\n" * 100)
+    (root / "recompiled" / "src" / "ppc_recomp.1.cpp").write_text("int b;\n" * 100)
+    (root / "recompiled" / "ppc_config.h").write_text("#pragma once\n")
+    return root
+
+
+def _inode(path):
+    st = os.stat(path)
+    return st.st_dev, st.st_ino
+
+
+class TestCreateSnapshot:
+    """Tests para create_snapshot."""
+    
+    def test_first_snapshot_copies(self, root):
+        snapshot = create_snapshot(root / "recompiled", root / SNAPSHOTS_DIRNAME, now=1000.0)
+        
+        assert snapshot.files == 3
+        assert snapshot.linked == 0
+        assert snapshot.new_bytes == snapshot.bytes
+        # Nunca se enlaza al archivo vivo (el recompilador lo reescribe en el sitio)
+        live = root / "recompiled" / "ppc_config.h"
+        assert _inode(live) != _inode(os.path.join(snapshot.path, "ppc_config.h"))
+    
+    def test_unchanged_files_are_linked_to_previous(self, root):
+        snapshots_dir = root / SNAPSHOTS_DIRNAME
+        first = create_snapshot(root / "recompiled", snapshots_dir, now=1000.0)
+        # Recompilación: todo reescrito, solo un archivo cambia de contenido
+        for path in (root / "recompiled").rglob("*.cpp"):
+            path.write_text(path.read_text())
+        (root / "recompiled" / "src" / "ppc_recomp.1.cpp").write_text("int c;\n" * 100)
+        
+        second = create_snapshot(root / "recompiled", snapshots_dir, now=2000.0)
+        
+        assert second.base == first.name
+        assert second.linked == 2
+        assert second.new_bytes == 700
+        rel = os.path.join("src", "ppc_recomp.0.cpp")
+        assert _inode(os.path.join(first.path, rel)) == _inode(os.path.join(second.path, rel))
+        assert [s.name for s in list_snapshots(snapshots_dir)] == [first.name, second.name]
+    
+    def test_rewriting_live_files_does_not_touch_snapshot(self, root):
+        snapshot = create_snapshot(root / "recompiled", root / SNAPSHOTS_DIRNAME)
+        
+        with open(root / "recompiled" / "ppc_config.h", "w") as f:  # En el sitio
+            f.write("// nuevo\n")
+        
+        assert open(os.path.join(snapshot.path, "ppc_config.h")).read() == "#pragma once\n"
+
+
+class TestDiffAndPrune:
+    """Tests para diff_trees / prune_snapshots."""
+    
+    def test_diff_against_live_tree(self, root):
+        snapshots_dir = root / SNAPSHOTS_DIRNAME
+        snapshot = create_snapshot(root / "recompiled", snapshots_dir)
+        (root / "recompiled" / "src" / "ppc_recomp.1.cpp").write_text("int c;\n" * 100)
+        (root / "recompiled" / "ppc_config.h").unlink()
+        (root / "recompiled" / "src" / "ppc_recomp.2.cpp").write_text("int d;\n")
+        
+        diff = diff_trees(snapshot.path, root / "recompiled")
+        
+        assert diff.added == ["src/ppc_recomp.2.cpp"]
+        assert diff.removed == ["ppc_config.h"]
+        assert diff.modified == ["src/ppc_recomp.1.cpp"]
+        assert diff.unchanged == 1
+        assert find_snapshot(snapshots_dir, "latest").name == snapshot.name
+    
+    def test_prune_keeps_latest_and_shared_files(self, root):
+        snapshots_dir = root / SNAPSHOTS_DIRNAME
+        for now in (1000.0, 2000.0, 3000.0):
+            create_snapshot(root / "recompiled", snapshots_dir, now=now)
+        
+        pruned = prune_snapshots(snapshots_dir, keep=1)
+        
+        remaining = list_snapshots(snapshots_dir)
+        assert len(pruned) == 2
+        assert [s.created for s in remaining] == [3000.0]
+        assert diff_trees(remaining[0].path, root / "recompiled").has_changes is False
+        assert prune_snapshots(snapshots_dir, older_than=0, now=10 ** 9) == []
+    
+    def test_snapshots_count_once_in_usage_and_skip_manifest(self, root):
+        from core.workspace_manifest import scan_files
+        from core.workspace_snapshot import SNAPSHOT_META
+        from core.workspace_usage import reconcile
+        
+        snapshots = [
+            create_snapshot(root / "recompiled", root / SNAPSHOTS_DIRNAME, now=now)
+            for now in (1000.0, 2000.0)
+        ]
+        
+        usage = reconcile(root)
+        
+        meta_bytes = sum(os.path.getsize(os.path.join(s.path, SNAPSHOT_META)) for s in snapshots)
+        assert usage.get(SNAPSHOTS_DIRNAME).bytes - meta_bytes == usage.get("recompiled").bytes
+        assert not any(rel.startswith(SNAPSHOTS_DIRNAME) for rel in scan_files(root))
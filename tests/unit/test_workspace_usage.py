@@ -0,0 +1,99 @@
+# tests/unit/test_workspace_usage.py
+"""
+Tests unitarios para los contadores de uso de disco por workspace.
+"""
+import threading
+
+import pytest
+
+from core import workspace_usage
+from core.workspace_usage import (
+    ROOT_BUCKET, USAGE_FILE, get_usage, load_usage, reconcile, refresh_paths, set_dir
+)
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "Game [4E4D07F5]"
+    (root / "extracted" / "media").mkdir(parents=True)
+    (root / "analysis").mkdir()
+    (root / "game.iso").write_bytes(b"i" * 1000)
+    (root / "notes.md").write_text("# N\n")
+    (root / "extracted" / "media" / "a.bik").write_bytes(b"a" * 300)
+    (root / "extracted" / "b.bin").write_bytes(b"b" * 200)
+    (root / ".manifest.json").write_text("{}")
+    return root
+
+
+class TestUsage:
+    """Tests para get_usage / refresh_paths / reconcile."""
+    
+    def test_first_read_reconciles(self, root):
+        usage = get_usage(root)
+        
+        assert usage.get("extracted").bytes == 500
+        assert usage.get("extracted").files == 2
+        assert usage.get(ROOT_BUCKET).files == 2  # Sin los .json ocultos
+        assert usage.total_bytes == 1504
+        assert (root / USAGE_FILE).exists()
+    
+    def test_reads_do_not_walk_the_tree(self, root, monkeypatch):
+        reconcile(root)
+        monkeypatch.setattr(workspace_usage, "dir_usage", lambda *a, **kw: pytest.fail("recorrido"))
+        
+        assert get_usage(root).get("extracted").bytes == 500
+    
+    def test_refresh_only_rescans_touched_buckets(self, root, monkeypatch):
+        reconcile(root)
+        (root / "analysis" / "analysis.toml").write_text("x" * 40)
+        (root / "extracted" / "c.bin").write_bytes(b"c" * 10)  # Cambio externo
+        scanned = []
+        original = workspace_usage._scan_bucket
+        monkeypatch.setattr(
+            workspace_usage, "_scan_bucket",
+            lambda r, bucket: scanned.append(bucket) or original(r, bucket)
+        )
+        
+        usage = refresh_paths(root, [root / "analysis" / "analysis.toml"])
+        
+        assert scanned == ["analysis"]
+        assert usage.get("analysis").bytes == 40
+        assert usage.get("extracted").bytes == 500  # Hasta la próxima reconciliación
+        assert reconcile(root).get("extracted").bytes == 510
+    
+    def test_stale_counters_are_reconciled(self, root):
+        reconcile(root)
+        (root / "extracted" / "c.bin").write_bytes(b"c" * 10)
+        
+        assert get_usage(root).get("extracted").bytes == 500
+        assert get_usage(root, max_age=0).get("extracted").bytes == 510
+    
+    def test_set_dir_after_eviction(self, root):
+        reconcile(root)
+        
+        set_dir(root, "extracted", 0, 0)
+        
+        assert load_usage(root).get("extracted").bytes == 0
+        assert load_usage(root).total_bytes == 1004
+    
+    def test_concurrent_saves_without_shared_lock(self, root):
+        """Escritores que no comparten el lock (otro proceso) no se pisan el temporal."""
+        usage = reconcile(root)
+        errors = []
+        
+        def save():
+            try:
+                for _ in range(50):
+                    workspace_usage._save_usage(usage)
+            except OSError as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=save) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert errors == []
+        assert load_usage(root).get("extracted").bytes == 500
+        assert [p.name for p in root.iterdir() if p.name.endswith(".tmp")] == []